@@ -152,7 +152,8 @@ def format_code_with_generator(output):
         rhs_no_size = re.sub(r',\s*[^,()]+(?=\s*\))', '', rhs, count=1)
         result.append(f"        yield  {rhs_no_size}")
     elif is_scipy_cont:
-        result.append(f"        yield {varname}.rvs()")
+        # Draw the variates in blocks instead of one rvs() call per value
+        result.append(f"        yield from {varname}.rvs(size=1024).tolist()")
     else:
         result.append(f"        yield int({varname})")
     return "\n".join(result)
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Headless distribution fitting engine for DataFITR.
+
+Fits candidate distributions to every column of a DataFrame and ranks them by goodness of fit, without
+Streamlit or plotting. The (column x distribution) fits are independent, so they are spread over a process
+pool; each worker receives the columns once, when it starts.
+
+The goodness-of-fit measures are the ones of modular_IM.modelmatch: the SSE between the histogram density and
+the fitted pdf (pmf for discrete data), the KS test and the chi squared test on 6 equal-width bins.
+
+Example:
+    tables=fit_columns(df,progress=lambda done,total,col,dist: print(done,"/",total))
+    best=tables['temp'].iloc[0]['Test']
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import scipy
+import scipy.stats as stats
+
+from IM import listparamsofdistributions
+from IM import prescreen
+
+Continuous_Popular=['expon','norm','lognorm','triang','uniform','weibull_min','gamma']
+Discrete_Popular=['binom','poisson','geom']
+
+GOF_COLUMNS=['Chi squared Test','KStest','SSE']
+
+#columns of the worker process, installed by _init_worker
+_columns={}
+
+
+def default_bins(n):
+    """Histogram bin count used by DataFITR for a column of n values."""
+    return int(min((1+np.ceil(np.log(n))),max(100,n/10)))
+
+
+def datatype(data):
+    """Return 'discrete' for integer-valued columns (also floats like 1.0, 2.0), else 'continuous'."""
+    if pd.api.types.is_integer_dtype(data):
+        return 'discrete'
+    values=pd.Series(data).dropna()
+    if pd.api.types.is_float_dtype(values) and (values==np.floor(values)).all():
+        return 'discrete'
+    return 'continuous'
+
+
+def _discrete_model(data,dist):
+    """scipy distribution and argument tuple of a discrete candidate, with the parameters of the code generator."""
+    params=listparamsofdistributions.calc_param(data,dist)
+    if dist=='binom':
+        return params,(params[0],params[1])
+    if dist=='poisson':
+        return params,(params[0],params[1])
+    if dist=='geom':
+        return params,(params,)
+    raise ValueError("The distribution is not a valid discrete distribution: "+str(dist))
+
+
+def _chisquared(data,cdf):
+    #6 equal-width bins between the min and the max of the data, as in modelmatch.binning(6)
+    nbins=6
+    minval,maxval=data[0],data[-1]
+    interval=(maxval-minval)/nbins
+    edges=np.round(minval+np.arange(nbins+1)*interval,2)
+    idx=np.searchsorted(edges,data,side='right')-1
+    inside=(idx>=0)&(idx<nbins)&(data<edges[-1])
+    obs=np.bincount(idx[inside],minlength=nbins).astype(float)
+    exp=np.abs(cdf(edges[1:])-cdf(edges[:-1]))*len(data)
+    obs=obs/np.sum(obs)
+    exp=exp/np.sum(exp)
+    chi,p=scipy.stats.power_divergence(obs,exp,ddof=1,lambda_=1)
+    return (np.round(chi,4),np.round(p,4))
+
+
+def fit_distribution(data,dist,typ,bins,seed=None):
+    """
+    Fit one distribution to a sorted column and compute its goodness of fit.
+
+    Args:
+        data (array): The column values, sorted.
+        dist (str): Name of the scipy.stats distribution.
+        typ (str): 'continuous' or 'discrete'.
+        bins (int): Number of histogram bins of the SSE.
+        seed (tuple, optional): Starting parameters of the MLE of a continuous distribution.
+
+    Returns:
+        dict: 'Test' (the distribution), 'params', 'Chi squared Test', 'KStest' and 'SSE'. The two tests are
+            (statistic, p-value) tuples.
+    """
+    if typ=='continuous':
+        k=getattr(stats,dist)
+        params=listparamsofdistributions.fit_params(data,dist,seed=seed)
+        args,loc,scale=params[:-2],params[-2],params[-1]
+        histpdf,edges=np.histogram(data,bins,density=True)
+        centre=(edges[:-1]+edges[1:])/2.0
+        sse=np.sum(np.power(histpdf-k.pdf(centre,*args,loc=loc,scale=scale),2.0))
+        ks,p=stats.kstest(data,dist,params)
+        chi=_chisquared(data,lambda x:k.cdf(x,*args,loc=loc,scale=scale))
+    else:
+        k=getattr(stats,dist)
+        params,args=_discrete_model(data,dist)
+        histpdf,edges=np.histogram(data,bins,density=True)
+        histpdf=histpdf/histpdf.sum()
+        centre=np.array((edges[:-1]+edges[1:])/2.0,dtype=int)
+        sse=np.sum(np.power(histpdf-k.pmf(centre,*args),2))
+        ks,p=stats.kstest(data,dist,args=args)
+        chi=_chisquared(data,lambda x:k.cdf(np.floor(x),*args))
+    return {'Test':dist,'params':params,'Chi squared Test':chi,'KStest':(np.round(ks,4),np.round(p,4)),
+            'SSE':np.round(sse,4)}
+
+
+def _init_worker(columns):
+    global _columns
+    _columns=columns
+
+
+def _fit_task(column,dist,typ,bins,seed=None):
+    try:
+        return fit_distribution(_columns[column],dist,typ,bins,seed)
+    except Exception as e:
+        return {'Test':dist,'params':None,'Chi squared Test':(np.nan,np.nan),'KStest':(np.nan,np.nan),
+                'SSE':np.nan,'error':str(e)}
+
+
+def ranked_table(rows,rank_by):
+    """Goodness-of-fit table of the rows returned by fit_distribution, best first by the `rank_by` statistic."""
+    table=pd.DataFrame(rows)
+    if 'error' not in table.columns:
+        table['error']=None
+    table=table[['Test']+GOF_COLUMNS+['params','error']]
+    #the tests are ranked by their statistic, failed fits go last
+    key=table[rank_by].apply(lambda X: X[0] if isinstance(X,tuple) else X)
+    table=table.iloc[np.argsort(key.to_numpy(dtype=float),kind='stable')].reset_index(drop=True)
+    return table
+
+
+def fit_columns(df,distributions=None,rank_by='KStest',bins=None,max_workers=None,progress=None,top_k=None):
+    """
+    Fit candidate distributions to every column of a DataFrame in parallel and rank them.
+
+    Args:
+        df (pandas.DataFrame): Numerical columns to fit.
+        distributions (dict, optional): Maps 'continuous' and/or 'discrete' to the candidate distributions of
+            that type of column. Defaults to Continuous_Popular and Discrete_Popular.
+        rank_by (str, optional): 'KStest', 'Chi squared Test' or 'SSE'. Lower statistics rank first.
+            Defaults to 'KStest'.
+        bins (int, optional): Histogram bins of the SSE. Defaults to default_bins(len(column)) per column.
+        max_workers (int, optional): Number of worker processes. Defaults to the number of cores. With 1, the
+            fits run one after the other in this process.
+        progress (callable, optional): Called as progress(done, total, column, dist) after each fit.
+        top_k (int, optional): Pre-screen the continuous candidates with prescreen.screen and fit only the best
+            top_k, starting from their moment estimates. Defaults to None, which fits every candidate.
+
+    Returns:
+        dict: Maps each column to its ranked goodness-of-fit table (pandas.DataFrame with the columns 'Test',
+            'Chi squared Test', 'KStest', 'SSE', 'params' and 'error'), or, for a constant column, to its value.
+
+    Raises:
+        ValueError: If rank_by is not a goodness-of-fit measure or a column is not numerical.
+    """
+    if rank_by not in GOF_COLUMNS:
+        raise ValueError("rank_by must be one of "+str(GOF_COLUMNS))
+    candidates={'continuous':Continuous_Popular,'discrete':Discrete_Popular}
+    if distributions is not None:
+        candidates.update(distributions)
+
+    columns={}
+    types={}
+    results={}
+    tasks=[]
+    for col in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            raise ValueError("Column "+str(col)+" is not a numerical column")
+        data=df[col].dropna()
+        typ=datatype(data)
+        data=np.sort(data.to_numpy())
+        if len(np.unique(data))==1:
+            results[col]=data[0]
+            continue
+        columns[col]=data
+        types[col]=typ
+        nbins=bins if bins is not None else default_bins(len(data))
+        results[col]=[]
+        if typ=='continuous' and top_k is not None:
+            tasks+=[(col,dist,typ,nbins,seed) for dist,_,seed in prescreen.screen(data,candidates[typ],top_k)]
+        else:
+            tasks+=[(col,dist,typ,nbins) for dist in candidates[typ]]
+
+    total=len(tasks)
+    done=0
+    if max_workers==1:
+        _init_worker(columns)
+        for task in tasks:
+            results[task[0]].append(_fit_task(*task))
+            done+=1
+            if progress is not None:
+                progress(done,total,task[0],task[1])
+    elif tasks:
+        workers=min(max_workers or os.cpu_count() or 1,total)
+        with ProcessPoolExecutor(max_workers=workers,initializer=_init_worker,initargs=(columns,)) as executor:
+            futures={executor.submit(_fit_task,*task):task for task in tasks}
+            for future in as_completed(futures):
+                task=futures[future]
+                results[task[0]].append(future.result())
+                done+=1
+                if progress is not None:
+                    progress(done,total,task[0],task[1])
+
+    for col,data in columns.items():
+        if types[col]=='continuous':
+            #the fits ran in the workers; share them with the code generator of this process
+            key=listparamsofdistributions.datakey(data)
+            for row in results[col]:
+                if row['params'] is not None:
+                    listparamsofdistributions.store_fit_params(key,row['Test'],row['params'])
+        results[col]=ranked_table(results[col],rank_by)
+    return results
@@ -8,7 +8,6 @@ Created on Fri Jun  3 16:10:27 2022
 
 import numpy as np
 import matplotlib.pyplot as plt
-from numpy import atleast_2d
 
 
 
@@ -17,6 +16,75 @@ def gaussian(x,b=1):
     return np.exp(-x**2/(2*b**2))/(b*np.sqrt(2*np.pi))
 
 
+def silverman(data):
+    #Silverman's Rule(bandwidth)
+    return 1.06*np.std(data)*len(data)**(-1/5.0)
+
+
+def binned_kde(data,h=None,gridsize=2048):
+    """
+    Gaussian KDE of the data on a regular grid, computed with linear binning and an FFT convolution.
+
+    The data is spread over the grid points (each value is split between its two neighbouring points in
+    proportion to its distance), and the binned counts are convolved with the kernel sampled on the grid.
+    The cost is O(N + gridsize log gridsize) instead of O(N x points) for the direct sum. The grid extends
+    4 bandwidths beyond the data, so it covers the tails of the density.
+
+    Args:
+        data (array): The data.
+        h (float, optional): Bandwidth. Defaults to Silverman's rule.
+        gridsize (int, optional): Number of grid points. Defaults to 2048.
+
+    Returns:
+        tuple: (grid, density, h)
+
+    Raises:
+        ValueError: If the bandwidth is not positive (constant data).
+    """
+    data=np.asarray(data,dtype=float).ravel()
+    if h is None:
+        h=silverman(data)
+    if not h>0:
+        raise ValueError("KDE bandwidth must be positive; the data is constant")
+    grid=np.linspace(np.min(data)-4*h,np.max(data)+4*h,gridsize)
+    delta=grid[1]-grid[0]
+
+    #linear binning
+    t=(data-grid[0])/delta
+    i=np.minimum(np.floor(t).astype(np.int64),gridsize-2)
+    w=t-i
+    counts=np.bincount(i,weights=1-w,minlength=gridsize)+np.bincount(i+1,weights=w,minlength=gridsize)
+
+    #convolution with the kernel, truncated at 4 bandwidths (zero padded, so there is no wrap around)
+    L=min(gridsize-1,int(np.ceil(4*h/delta)))
+    kernel=gaussian(np.arange(-L,L+1)*delta,h)
+    size=1<<int(np.ceil(np.log2(gridsize+2*L+1)))
+    conv=np.fft.irfft(np.fft.rfft(counts,size)*np.fft.rfft(kernel,size),size)[L:L+gridsize]
+    density=np.maximum(conv,0)/len(data)
+    return grid,density,h
+
+
+def sample_kde(data,size,h=None,gridsize=2048,rng=None):
+    """
+    Draw `size` values from the Gaussian KDE of the data by inverting its CDF on the grid of binned_kde.
+
+    Args:
+        data (array): The data.
+        size (int): Number of values to draw.
+        h (float, optional): Bandwidth. Defaults to Silverman's rule.
+        gridsize (int, optional): Number of grid points. Defaults to 2048.
+        rng (numpy.random.Generator, optional): Random generator. Defaults to numpy's global generator.
+
+    Returns:
+        array: The drawn values.
+    """
+    grid,density,h=binned_kde(data,h,gridsize)
+    cdf=np.concatenate(([0.0],np.cumsum((density[1:]+density[:-1])/2)))
+    cdf/=cdf[-1]
+    u=rng.random(size) if rng is not None else np.random.random_sample(size)
+    return np.interp(u,cdf,grid)
+
+
 
 
 def kde_plotfunc(data,name):
@@ -27,11 +95,8 @@ def kde_plotfunc(data,name):
     center = (bins[:-1] + bins[1:]) / 2
     
     #Silverman's Rule(bandwidth)
-    sumPdfSilverman=np.zeros(len(center))
-    h=1.06*np.std(data)*lenDataset**(-1/5.0)
-    
-    for i in range(0, lenDataset):
-        sumPdfSilverman+=((gaussian(center-data[i],h))/lenDataset)
+    grid,density,h=binned_kde(data)
+    sumPdfSilverman=np.interp(center,grid,density)
     
     plt.hist(data,N, density=True )
     plt.plot(center, sumPdfSilverman,color='red', )
@@ -49,49 +114,19 @@ def kde_func(data,name,bins):
     center = (bins[:-1] + bins[1:]) / 2
     
     #Silverman's Rule(bandwidth)
-    sumPdfSilverman=np.zeros(len(center))
-    h=1.06*np.std(data)*lenDataset**(-1/5.0)
-    
-    for i in range(0, lenDataset):
-        sumPdfSilverman+=((gaussian(center-data[i],h))/lenDataset)
+    grid,density,h=binned_kde(data)
+    sumPdfSilverman=np.interp(center,grid,density)
     return (center,sumPdfSilverman,h)
     
  
     
 
 def bandwidth(data):
-    N=100#Number of bins
-    lenDataset = len(data)
-    #normalized histogram of loaded datase
-    hist, bins = np.histogram(data, bins=N, range=(np.min(data), np.max(data)), density=True)
-    center = (bins[:-1] + bins[1:]) / 2
-    
     #Silverman's Rule(bandwidth)
-    sumPdfSilverman=np.zeros(len(center))
-    h=1.06*np.std(data)*lenDataset**(-1/5.0)
-    
-    return h
+    return silverman(data)
 
 def resample(k1, size,name):
-    h=bandwidth(k1)
-    k1=atleast_2d(k1)
-    n, d = k1.shape
-    indices = np.random.randint(0, d, size)
-    
-    #cov1=(np.cov(k1))*(h*h)
-    cov1=h**2
-    cov_list=[cov1 for i in range(n)]
-    
-    cov = np.diag(cov_list)
-    
-    means = k1[:,indices]
-    #print("m",means)
-    norm = np.random.multivariate_normal(np.zeros(n), cov, size)
-    
-    
-    y=np.transpose(norm)+means
-    plt.show()
-    return y[0]
+    return sample_kde(k1,size)
 
 #h=kde_func(data,"kde",100)
 #resample(k1,h,"kde")
@@ -100,16 +135,7 @@ def resample(k1, size,name):
 
 
 def resample2(data,N):
-    lenDataset = len(data)
-    h=1.06*np.std(data)*lenDataset**(-1/5.0)
-    i=0
-    lenDataset=len(data)
-    generatedDataPdfSilverman=np.zeros(N)
-    while i<N:
-        randNo=np.random.rand(1)*(np.max(data)-np.min(data))-np.absolute(np.min(data))
-        if np.random.rand(1)<=np.sum((gaussian(randNo-data,h))/lenDataset):
-            generatedDataPdfSilverman[i]=randNo
-            i+=1
+    generatedDataPdfSilverman=sample_kde(data,N)
 
 
 
@@ -8,10 +8,61 @@ Created on Thu Jan 12 12:06:49 2023
 
 import scipy.stats as stats
 import re,math,scipy
+import hashlib
 import pandas as pd
 import numpy as np
 import sys
 
+#fitted parameters of the continuous distributions, keyed by (data key, distribution)
+#the MLE fit is the dominant cost of DataFITR, so every distribution is fit once per column and shared by
+#the SSE, the KS and chi squared tests of modular_IM.modelmatch and the code generation below
+_fit_cache={}
+_FIT_CACHE_SIZE=2048
+
+
+def datakey(data):
+    """Return a key identifying the values of a data column, used to look up its fitted parameters."""
+    arr=np.ascontiguousarray(data)
+    return (arr.dtype.str,arr.shape,hashlib.sha1(arr.tobytes()).hexdigest())
+
+
+def fit_params(data,distribution,key=None,seed=None):
+    """
+    Fit a scipy.stats continuous distribution to the data, reusing the parameters if the same data was
+    already fit with this distribution.
+
+    Args:
+        data (array): The data column.
+        distribution (str): Name of the scipy.stats distribution.
+        key (tuple, optional): datakey(data), if the caller already computed it.
+        seed (tuple, optional): Starting parameters of the MLE (shape parameters, loc, scale), e.g. the moment
+            estimate of prescreen.screen.
+
+    Returns:
+        tuple: The fitted parameters, shape parameters first, then loc and scale.
+    """
+    if key is None:
+        key=datakey(data)
+    params=_fit_cache.get((key,distribution))
+    if params is None:
+        if seed is None:
+            params=getattr(stats,distribution).fit(data)
+        else:
+            params=getattr(stats,distribution).fit(data,*seed[:-2],loc=seed[-2],scale=seed[-1])
+        store_fit_params(key,distribution,params)
+    return params
+
+
+def store_fit_params(key,distribution,params):
+    """Record the parameters fitted elsewhere (e.g. in a worker process) for the data with datakey `key`."""
+    if (key,distribution) not in _fit_cache and len(_fit_cache)>=_FIT_CACHE_SIZE:
+        #drop the oldest entry
+        del _fit_cache[next(iter(_fit_cache))]
+    _fit_cache[(key,distribution)]=params
+
+
+def clear_fit_cache():
+    _fit_cache.clear()
 
 
 
@@ -200,6 +251,5 @@ def calc_param(data,distribution):
      
     
      else:
-         k=getattr(stats,distribution)
-         return k.fit(data)        
+         return fit_params(data,distribution)
         
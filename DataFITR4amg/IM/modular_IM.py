@@ -55,6 +55,9 @@ class modelmatch:
         self.GOFpval={}
         self.gofoption=gofoption
         self.binskde=binskde
+        #fitted parameters of each continuous distribution, fit once and shared by SSE, GOF tests and gencode
+        self.fitted_params={}
+        self.datakey=listparamsofdistributions.datakey(self.data)
 
         
         if self.typeofdata=='discrete':
@@ -91,8 +94,9 @@ class modelmatch:
         else:
             #print(distribution,type(distribution))
             #print(distribution)
-            k=getattr(stats,distribution)
-            return k.fit(self.data)
+            if distribution not in self.fitted_params:
+                self.fitted_params[distribution]=listparamsofdistributions.fit_params(self.data,distribution,self.datakey)
+            return self.fitted_params[distribution]
         
     #calculating pdf of distribution
     
@@ -503,8 +507,8 @@ class modelmatch:
         if self.typeofdata =='continuous': 
             k=getattr(stats,self.dist) 
             #n=len(obs_freq)-cont_dict[self.dist] 
-            n=len(obs_freq)-len(k.fit(self.data)) #gets the number of params of each distribution
             self.param=self.calc_param(self.dist)
+            n=len(obs_freq)-len(self.param) #gets the number of params of each distribution
             #print("hereher",self.param)
             args=self.param[:-2]
             for r in self.cnt.keys():
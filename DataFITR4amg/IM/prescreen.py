@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cheap pre-screening of candidate continuous distributions before the MLE fit.
+
+The sample statistics of a column (moments, L-moments, range) are computed once. Each candidate family is
+compared with them through its L-moment ratios (L-skewness t3 and L-kurtosis t4), which exist whenever the
+mean exists and are far less noisy than the ordinary skewness and kurtosis. For every family, the ratios are
+tabulated once per process over a grid of shape parameters, from the quantile function. The shape on the grid
+closest to the sample ratios gives, with loc and scale matched to the first two L-moments, a moment estimate
+of the parameters.
+
+A family is rejected when its moment estimate leaves data outside its support (e.g. uniform or triangular
+families on long-tailed data, or distributions bounded below on data with a long left tail), and, for
+non-negative data, when it puts noticeable probability below 0 (e.g. norm on strongly skewed data). The remaining
+families are ranked by the distance of their ratios to the sample ones, and only the best `top_k` are fit,
+starting from their moment estimates.
+
+Example:
+    for dist,score,seed in screen(data,listparamsofdistributions.getcontinuousdist(),top_k=8):
+        params=listparamsofdistributions.fit_params(data,dist,seed=seed)
+"""
+
+import functools
+import numbers
+import warnings
+
+import numpy as np
+import scipy.stats as stats
+
+#shape values tried for families with 1, 2 and more shape parameters
+SHAPE_GRID={
+    1:[-5,-2,-1,-0.5,-0.2,-0.05,0.05,0.2,0.5,0.8,0.95,1,1.5,2,3,5,10,20],
+    2:[-2,-0.5,0.2,0.5,0.8,1,2,5,10],
+    3:[-1,0.5,1,2,5],
+}
+
+def _quadrature(n):
+    #Gauss-Legendre nodes on (0,1), and the weights times the shifted Legendre polynomials P*_0..P*_3 at the nodes,
+    #for the L-moment integrals of the quantile function
+    nodes,weights=np.polynomial.legendre.leggauss(n)
+    F=(nodes+1)/2
+    P=np.array([np.ones_like(F),2*F-1,6*F**2-6*F+1,20*F**3-30*F**2+12*F-1])
+    return F,P*weights/2
+
+#the L-moments are computed with two rules; if they disagree, the tails are too heavy (or the mean infinite)
+#for the quadrature and the shape is left out
+_F,_PW=_quadrature(64)
+_F2,_PW2=_quadrature(32)
+
+
+def sample_lmoments(data):
+    """
+    First four sample L-moments of the data, from its probability weighted moments.
+
+    Returns:
+        tuple: (l1, l2, t3, t4), with t3 = l3/l2 and t4 = l4/l2.
+
+    Raises:
+        ValueError: If the data has fewer than 4 values.
+    """
+    x=np.sort(np.asarray(data,dtype=float))
+    n=len(x)
+    if n<4:
+        raise ValueError("at least 4 values are needed for the sample L-moments")
+    i=np.arange(n,dtype=float)
+    b0=x.mean()
+    b1=np.sum(i/(n-1)*x)/n
+    b2=np.sum(i*(i-1)/((n-1)*(n-2))*x)/n
+    b3=np.sum(i*(i-1)*(i-2)/((n-1)*(n-2)*(n-3))*x)/n
+    l1=b0
+    l2=2*b1-b0
+    l3=6*b2-6*b1+b0
+    l4=20*b3-30*b2+12*b1-b0
+    return l1,l2,l3/l2,l4/l2
+
+
+def column_summary(data):
+    """
+    Sample statistics used by the screening, computed once per column.
+
+    Returns:
+        dict: 'n', 'min', 'max', 'mean', 'std', 'skew', 'kurtosis', 'l1', 'l2', 't3', 't4' and 'nonnegative'.
+    """
+    x=np.asarray(data,dtype=float)
+    l1,l2,t3,t4=sample_lmoments(x)
+    return {'n':len(x),'min':float(x.min()),'max':float(x.max()),'mean':float(x.mean()),'std':float(x.std()),
+            'skew':float(stats.skew(x)),'kurtosis':float(stats.kurtosis(x)),
+            'l1':l1,'l2':l2,'t3':t3,'t4':t4,'nonnegative':bool(x.min()>=0)}
+
+
+def _shape_candidates(dist):
+    k=dist.numargs
+    if k==0:
+        return [()]
+    values=SHAPE_GRID[min(k,3)]
+    grid=np.array(np.meshgrid(*[values]*k)).reshape(k,-1).T
+    return [tuple(s) for s in grid]
+
+
+@functools.lru_cache(maxsize=None)
+def family_table(distribution):
+    """
+    L-moments of the standard form (loc 0, scale 1) of a family over its grid of shape parameters.
+
+    Families without a closed-form quantile function are not tabulated: scipy inverts their cdf numerically,
+    which costs seconds per shape.
+
+    Returns:
+        list: (shapes, lambda1, lambda2, t3, t4, support) for every valid shape on the grid whose L-moments
+            exist, or None if the family is not tabulated.
+    """
+    dist=getattr(stats,distribution)
+    if type(dist)._ppf is stats.rv_continuous._ppf:
+        return None
+    table=[]
+    with warnings.catch_warnings(), np.errstate(all='ignore'):
+        warnings.simplefilter('ignore')
+        for shapes in _shape_candidates(dist):
+            try:
+                a,b=dist.support(*shapes)
+                if np.isnan(a) or np.isnan(b):
+                    continue
+                lam=_PW@dist.ppf(_F,*shapes)
+                lam2=_PW2@dist.ppf(_F2,*shapes)
+            except Exception:
+                continue
+            if not (np.all(np.isfinite(lam)) and np.all(np.isfinite(lam2)) and lam[1]>0):
+                continue
+            if np.max(np.abs(lam-lam2))>0.05*lam[1] or max(abs(lam[2]/lam[1]-lam2[2]/lam2[1]),abs(lam[3]/lam[1]-lam2[3]/lam2[1]))>0.02:
+                continue
+            table.append((shapes,lam[0],lam[1],lam[2]/lam[1],lam[3]/lam[1],(a,b)))
+    return table
+
+
+def screen(data,distributions,top_k=5,summary=None,tolerance=0.01):
+    """
+    Rank candidate continuous distributions by their L-moment ratios and keep the best `top_k`.
+
+    Args:
+        data (array): The column values.
+        distributions (list): Names of scipy.stats continuous distributions.
+        top_k (int, optional): Number of candidates kept. Defaults to 5.
+        summary (dict, optional): column_summary(data), if the caller already computed it.
+        tolerance (float, optional): Largest fraction of the data allowed outside the support of the moment
+            estimate of a family. Defaults to 0.01.
+
+    Returns:
+        list: (distribution, score, seed) for the kept candidates, best first. The score is the distance of
+            the (t3, t4) ratios of the family to the sample ones; the seed is the moment estimate of the
+            parameters, shape parameters first, then loc and scale, to start the MLE from. Families that are
+            not tabulated (see family_table) rank after the others, with score inf and seed None. A column
+            of fewer than 4 values is not screened: the first top_k distributions are returned, with score inf
+            and seed None.
+
+    Raises:
+        ValueError: If top_k is not a positive integer.
+    """
+    if not isinstance(top_k,numbers.Integral) or top_k<1:
+        raise ValueError("top_k must be a positive integer")
+    top_k=int(top_k)
+    x=np.sort(np.asarray(data,dtype=float))
+    if len(x)<4:
+        #too short for the L-moments: leave the candidates to the MLE
+        return [(dist,float('inf'),None) for dist in distributions][:top_k]
+    if summary is None:
+        summary=column_summary(x)
+    l1,l2,t3,t4=summary['l1'],summary['l2'],summary['t3'],summary['t4']
+    n=len(x)
+
+    ranked=[]
+    untabulated=[]
+    for dist in distributions:
+        table=family_table(dist)
+        if table is None:
+            untabulated.append((dist,float('inf'),None))
+            continue
+        best=None
+        for shapes,lam1,lam2,ft3,ft4,(a,b) in table:
+            score=np.hypot(ft3-t3,ft4-t4)
+            if best is not None and score>=best[0]:
+                continue
+            scale=l2/lam2
+            loc=l1-scale*lam1
+            #support check: the moment estimate must cover the data
+            low,high=loc+scale*a,loc+scale*b
+            outside=np.searchsorted(x,low,side='left')+(n-np.searchsorted(x,high,side='right'))
+            if outside>tolerance*n:
+                continue
+            best=(score,tuple(shapes)+(loc,scale))
+        if best is None:
+            continue
+        if summary['nonnegative']:
+            #non-negative data: the moment estimate must not put noticeable probability below 0
+            seed=best[1]
+            with np.errstate(all='ignore'):
+                below=getattr(stats,dist).cdf(0,*seed[:-2],loc=seed[-2],scale=seed[-1])
+            if below>tolerance:
+                continue
+        ranked.append((dist,float(best[0]),best[1]))
+    ranked.sort(key=lambda r:r[1])
+    return (ranked+untabulated)[:top_k]
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming ingestion of large CSV files for DataFITR.
+
+The CSV is read in chunks and every numerical column is reduced, in one pass, to a ColumnSummary of bounded
+size: the count, power sums (mean, variance, skewness, kurtosis), the exact min and max, a fixed-size
+histogram and a uniform reservoir sample. The chunks are dropped after they are summarized, so the memory
+does not depend on the number of rows.
+
+Fitting and the goodness-of-fit tests then run on the summaries:
+
+    - parameters: closed form from the sufficient statistics where the MLE has one (norm, expon, uniform and
+      the discrete candidates, with the parameters of listparamsofdistributions.calc_param), else the MLE on
+      the reservoir sample;
+    - KS test: the empirical cdf of all the rows at the histogram edges against the fitted cdf;
+    - chi squared test: the histogram merged into 6 bins, as in modular_IM.modelmatch;
+    - SSE: the histogram density against the fitted pdf (pmf for discrete data).
+
+Example:
+    summaries=summarize_csv('shopfloor_log.csv',chunksize=500000)
+    tables=fit_csv_summaries(summaries,top_k=5)
+    print(tables['cycle_time'].iloc[0])
+"""
+
+import numpy as np
+import pandas as pd
+import scipy
+import scipy.stats as stats
+
+from IM import fitengine
+from IM import listparamsofdistributions
+from IM import prescreen
+
+
+class ColumnSummary:
+    """
+    One-pass summary of a numerical column.
+
+    The histogram has a fixed number of bins. Its range is set from the first chunk and doubled (by merging
+    pairs of neighbouring bins) whenever a later value falls outside it, so it always covers [min, max] with
+    at most `bins` bins. For integer-valued data the bin edges are half-integers, so no bin splits an integer.
+
+    Parameters:
+        name (str): Name of the column.
+        bins (int, optional): Number of histogram bins, even. Defaults to 1024.
+        reservoir (int, optional): Size of the reservoir sample. Defaults to 100000.
+        rng (numpy.random.Generator, optional): Random generator of the reservoir sample.
+
+    Attributes:
+        n (int): Number of values, NaN excluded.
+        missing (int): Number of NaN values.
+        min, max (float): Exact minimum and maximum.
+        integer (bool): Whether all values are integers.
+        sample (numpy.ndarray): Reservoir sample, a uniform sample of min(n, reservoir) values.
+
+    Raises:
+        ValueError: If bins is not a positive even integer or reservoir is not a positive integer.
+    """
+
+    def __init__(self, name, bins=1024, reservoir=100000, rng=None):
+        if not isinstance(bins,int) or bins<2 or bins%2:
+            raise ValueError("bins must be a positive even integer")
+        if not isinstance(reservoir,int) or reservoir<1:
+            raise ValueError("reservoir must be a positive integer")
+        self.name=name
+        self.bins=bins
+        self.reservoir=reservoir
+        self.rng=rng if rng is not None else np.random.default_rng()
+        self.n=0
+        self.missing=0
+        self.min=np.inf
+        self.max=-np.inf
+        self.integer=True
+        self.sample=np.empty(0)
+        self._shift=None       #power sums are taken about the mean of the first chunk, for accuracy
+        self._sums=np.zeros(4) #sums of (x-shift)**1..4
+        self._counts=None
+        self._lo=None
+        self._width=None
+
+    def update(self, values):
+        """Add a chunk of values of the column."""
+        x=np.asarray(values,dtype=float).ravel()
+        nan=np.isnan(x)
+        if nan.any():
+            self.missing+=int(nan.sum())
+            x=x[~nan]
+        if len(x)==0:
+            return
+        if self.integer and not np.all(x==np.floor(x)):
+            self.integer=False
+        self.min=min(self.min,float(x.min()))
+        self.max=max(self.max,float(x.max()))
+        if self._shift is None:
+            self._shift=float(x.mean())
+        d=x-self._shift
+        d2=d*d
+        self._sums+=(d.sum(),d2.sum(),(d2*d).sum(),(d2*d2).sum())
+        self._add_to_histogram(x)
+        self._add_to_reservoir(x)
+        self.n+=len(x)
+
+    def _add_to_histogram(self, x):
+        lo,hi=float(x.min()),float(x.max())
+        if self._counts is None:
+            #leave a quarter of the bins free on each side of the first chunk
+            width=(hi-lo)/(self.bins//2) if hi>lo else max(abs(lo),1.0)*1e-9
+            if self.integer:
+                width=float(2**max(0,int(np.ceil(np.log2(width))))) if width>1 else 1.0
+                self._lo=np.floor(lo-(self.bins//4)*width)+0.5
+            else:
+                self._lo=lo-(self.bins//4)*width
+            self._width=width
+            self._counts=np.zeros(self.bins,dtype=np.int64)
+        while lo<self._lo or hi>=self._lo+self._width*self.bins:
+            merged=self._counts.reshape(-1,2).sum(axis=1)
+            empty=np.zeros(self.bins//2,dtype=np.int64)
+            if lo<self._lo:
+                #grow to the left: the current range becomes the upper half
+                self._counts=np.concatenate((empty,merged))
+                self._lo-=self._width*self.bins
+            else:
+                self._counts=np.concatenate((merged,empty))
+            self._width*=2
+        idx=np.clip(((x-self._lo)/self._width).astype(np.int64),0,self.bins-1)
+        self._counts+=np.bincount(idx,minlength=self.bins)
+
+    def _add_to_reservoir(self, x):
+        free=self.reservoir-len(self.sample)
+        if free>0:
+            self.sample=np.concatenate((self.sample,x[:free]))
+            x=x[free:]
+            start=self.n+free
+        else:
+            start=self.n
+        if len(x)==0:
+            return
+        #algorithm R: the value with index i (0-based, over all values) replaces a random slot with probability k/(i+1)
+        slots=self.rng.integers(0,start+np.arange(1,len(x)+1))
+        accepted=np.flatnonzero(slots<self.reservoir)
+        if len(accepted):
+            #when a slot is drawn several times in the chunk, the last value wins
+            last=len(accepted)-1-np.unique(slots[accepted][::-1],return_index=True)[1]
+            self.sample[slots[accepted[last]]]=x[accepted[last]]
+
+    @property
+    def mean(self):
+        return self._shift+self._sums[0]/self.n
+
+    def _central_moments(self):
+        a,s2,s3,s4=self._sums/self.n
+        m2=s2-a*a
+        m3=s3-3*a*s2+2*a**3
+        m4=s4-4*a*s3+6*a*a*s2-3*a**4
+        return m2,m3,m4
+
+    @property
+    def std(self):
+        return float(np.sqrt(max(self._central_moments()[0],0.0)))
+
+    @property
+    def skew(self):
+        m2,m3,_=self._central_moments()
+        return m3/m2**1.5 if m2>0 else 0.0
+
+    @property
+    def kurtosis(self):
+        """Excess kurtosis, as scipy.stats.kurtosis."""
+        m2,_,m4=self._central_moments()
+        return m4/(m2*m2)-3 if m2>0 else 0.0
+
+    def histogram(self):
+        """
+        Returns:
+            tuple: (counts, edges) of the histogram, trimmed to the bins between the min and the max.
+        """
+        if self._counts is None:
+            return np.zeros(0,dtype=np.int64),np.zeros(1)
+        nonzero=np.flatnonzero(self._counts)
+        first,last=nonzero[0],nonzero[-1]+1
+        edges=self._lo+self._width*np.arange(first,last+1)
+        return self._counts[first:last],edges
+
+
+def summarize_csv(path, chunksize=1000000, bins=1024, reservoir=100000, seed=None, **read_csv_kwargs):
+    """
+    Read a CSV file in chunks and summarize each numerical column in one pass.
+
+    Args:
+        path (str or file): The CSV file.
+        chunksize (int, optional): Number of rows per chunk. Defaults to 1000000.
+        bins (int, optional): Histogram bins per column. Defaults to 1024.
+        reservoir (int, optional): Reservoir sample size per column. Defaults to 100000.
+        seed (int, optional): Seed of the reservoir samples. Defaults to None.
+        **read_csv_kwargs: Passed to pandas.read_csv, e.g. usecols or sep.
+
+    Returns:
+        dict: Maps each column to its ColumnSummary, in the order of the file.
+
+    Raises:
+        ValueError: If a column is not numerical.
+    """
+    rng=np.random.default_rng(seed)
+    summaries={}
+    for chunk in pd.read_csv(path,chunksize=chunksize,**read_csv_kwargs):
+        for col in chunk.columns:
+            if not pd.api.types.is_numeric_dtype(chunk[col]):
+                raise ValueError("Column "+str(col)+" is not a numerical column")
+            if col not in summaries:
+                summaries[col]=ColumnSummary(col,bins,reservoir,rng)
+            summaries[col].update(chunk[col].to_numpy())
+    return summaries
+
+
+def summary_params(summary, dist):
+    """
+    Parameters of a distribution for a summarized column.
+
+    Returns:
+        tuple: The parameters in the order of listparamsofdistributions.calc_param (closed form for norm, expon,
+            uniform and the discrete candidates), or None if the distribution needs the MLE on the sample.
+    """
+    if dist=='norm':
+        return (summary.mean,summary.std)
+    if dist=='expon':
+        return (summary.min,summary.mean-summary.min)
+    if dist=='uniform':
+        return (summary.min,summary.max-summary.min)
+    if dist=='binom':
+        return (summary.max,summary.mean/summary.max)
+    if dist=='poisson':
+        return (summary.mean,summary.min)
+    if dist=='geom':
+        return (1/summary.mean)
+    return None
+
+
+def fit_summary_distribution(summary, dist, seed=None):
+    """
+    Fit one distribution to a summarized column and compute its goodness of fit on the histogram.
+
+    Args:
+        summary (ColumnSummary): The column.
+        dist (str): Name of the scipy.stats distribution.
+        seed (tuple, optional): Starting parameters of the MLE on the reservoir sample.
+
+    Returns:
+        dict: As fitengine.fit_distribution.
+    """
+    k=getattr(stats,dist)
+    counts,edges=summary.histogram()
+    n=summary.n
+    params=summary_params(summary,dist)
+    if summary.integer:
+        if params is None:
+            raise ValueError("The distribution is not a valid discrete distribution: "+str(dist))
+        args=(params,) if dist=='geom' else (params[0],params[1])
+        cdf=k.cdf(np.floor(edges),*args)
+        centre=np.array((edges[:-1]+edges[1:])/2.0,dtype=int)
+        sse=np.sum(np.power(counts/n-k.pmf(centre,*args),2))
+    else:
+        if params is None:
+            params=listparamsofdistributions.fit_params(summary.sample,dist,seed=seed)
+        args,loc,scale=params[:-2],params[-2],params[-1]
+        cdf=k.cdf(edges,*args,loc=loc,scale=scale)
+        centre=(edges[:-1]+edges[1:])/2.0
+        density=counts/(n*np.diff(edges))
+        sse=np.sum(np.power(density-k.pdf(centre,*args,loc=loc,scale=scale),2.0))
+
+    #KS: the empirical cdf of all the rows is exact at the histogram edges
+    ecdf=np.concatenate(([0],np.cumsum(counts)))/n
+    ks=np.max(np.abs(ecdf-cdf))
+    p=stats.kstwo.sf(ks,n)
+
+    #chi squared: the histogram merged into 6 bins of neighbouring histogram bins
+    starts=np.unique(np.linspace(0,len(counts),7).astype(int))
+    obs=np.add.reduceat(counts,starts[:-1]).astype(float)
+    exp=np.abs(np.diff(cdf[starts]))*n
+    obs=obs/np.sum(obs)
+    exp=exp/np.sum(exp)
+    chi,chip=scipy.stats.power_divergence(obs,exp,ddof=1,lambda_=1)
+    return {'Test':dist,'params':params,'Chi squared Test':(np.round(chi,4),np.round(chip,4)),
+            'KStest':(np.round(ks,4),np.round(p,4)),'SSE':np.round(sse,4)}
+
+
+def fit_csv_summaries(summaries, distributions=None, rank_by='KStest', top_k=None, progress=None):
+    """
+    Fit candidate distributions to summarized columns and rank them.
+
+    Args:
+        summaries (dict): ColumnSummary per column, as returned by summarize_csv.
+        distributions (dict, optional): Maps 'continuous' and/or 'discrete' to the candidate distributions.
+            Defaults to fitengine.Continuous_Popular and fitengine.Discrete_Popular.
+        rank_by (str, optional): 'KStest', 'Chi squared Test' or 'SSE'. Defaults to 'KStest'.
+        top_k (int, optional): Pre-screen the continuous candidates on the reservoir sample with
+            prescreen.screen and fit only the best top_k. Defaults to None, which fits every candidate.
+        progress (callable, optional): Called as progress(done, total, column, dist) after each fit.
+
+    Returns:
+        dict: Maps each column to its ranked goodness-of-fit table (see fitengine.fit_columns), or, for a
+            constant column, to its value. Columns without values are left out.
+
+    Raises:
+        ValueError: If rank_by is not a goodness-of-fit measure.
+    """
+    if rank_by not in fitengine.GOF_COLUMNS:
+        raise ValueError("rank_by must be one of "+str(fitengine.GOF_COLUMNS))
+    candidates={'continuous':fitengine.Continuous_Popular,'discrete':fitengine.Discrete_Popular}
+    if distributions is not None:
+        candidates.update(distributions)
+
+    tasks=[]
+    results={}
+    for col,summary in summaries.items():
+        if summary.n==0:
+            continue
+        if summary.min==summary.max:
+            results[col]=summary.min
+            continue
+        results[col]=[]
+        if summary.integer:
+            tasks+=[(col,dist,None) for dist in candidates['discrete']]
+        elif top_k is not None:
+            tasks+=[(col,dist,seed) for dist,_,seed in prescreen.screen(summary.sample,candidates['continuous'],top_k)]
+        else:
+            tasks+=[(col,dist,None) for dist in candidates['continuous']]
+
+    for done,(col,dist,seed) in enumerate(tasks,1):
+        try:
+            row=fit_summary_distribution(summaries[col],dist,seed)
+        except Exception as e:
+            row={'Test':dist,'params':None,'Chi squared Test':(np.nan,np.nan),'KStest':(np.nan,np.nan),
+                 'SSE':np.nan,'error':str(e)}
+        results[col].append(row)
+        if progress is not None:
+            progress(done,len(tasks),col,dist)
+    for col in results:
+        if isinstance(results[col],list):
+            results[col]=fitengine.ranked_table(results[col],rank_by)
+    return results
@@ -0,0 +1,59 @@
+# tests/test_fitengine.py
+
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from IM import fitengine
+
+
+def sample_frame():
+    rng=np.random.default_rng(0)
+    return pd.DataFrame({'cycle':rng.gamma(3.0,2.0,1500),'arrivals':rng.poisson(4.0,1500),
+                         'setup':np.full(1500,7.0)})
+
+
+class TestFitColumns(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.df=sample_frame()
+        cls.tables=fitengine.fit_columns(cls.df,max_workers=1)
+
+    def test_ranks_the_generating_distribution_first(self):
+        cycle=self.tables['cycle']
+        self.assertEqual(list(cycle.columns),['Test']+fitengine.GOF_COLUMNS+['params','error'])
+        self.assertEqual(len(cycle),len(fitengine.Continuous_Popular))
+        self.assertEqual(cycle.iloc[0]['Test'],'gamma')
+        statistics=[ks[0] for ks in cycle['KStest']]
+        self.assertEqual(statistics,sorted(statistics))
+        self.assertEqual(self.tables['arrivals'].iloc[0]['Test'],'poisson')
+        self.assertEqual(self.tables['setup'],7.0)
+
+    def test_parallel_fits_match_the_serial_fits(self):
+        tables=fitengine.fit_columns(self.df,max_workers=2)
+        for col in ('cycle','arrivals'):
+            pd.testing.assert_frame_equal(tables[col].drop(columns=['params']),
+                                          self.tables[col].drop(columns=['params']))
+
+    def test_prescreened_fit(self):
+        calls=[]
+        tables=fitengine.fit_columns(self.df[['cycle']],max_workers=1,top_k=3,
+                                     progress=lambda done,total,col,dist: calls.append((done,total)))
+        self.assertEqual(len(tables['cycle']),3)
+        self.assertEqual(tables['cycle'].iloc[0]['Test'],'gamma')
+        self.assertEqual(calls,[(1,3),(2,3),(3,3)])
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            fitengine.fit_columns(self.df,rank_by='AIC')
+        with self.assertRaises(ValueError):
+            fitengine.fit_columns(pd.DataFrame({'name':['a','b','c']}))
+
+
+if __name__ == '__main__':
+    unittest.main()
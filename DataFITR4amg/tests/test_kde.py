@@ -0,0 +1,45 @@
+# tests/test_kde.py
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from IM import kde_silverman_both as kde
+
+
+def direct_kde(data,x,h):
+    return kde.gaussian(x[:,None]-data[None,:],h).mean(axis=1)
+
+
+class TestBinnedKde(unittest.TestCase):
+    def test_matches_the_direct_sum(self):
+        data=np.random.default_rng(0).gamma(2.0,1.5,5000)
+        grid,density,h=kde.binned_kde(data)
+        self.assertAlmostEqual(h,kde.silverman(data))
+        self.assertTrue(grid[0]<=data.min()-4*h and data.max()+4*h<=grid[-1]+1e-9)
+        x=grid[::16]
+        np.testing.assert_allclose(density[::16],direct_kde(data,x,h),atol=1e-3*direct_kde(data,x,h).max())
+        self.assertAlmostEqual(density.sum()*(grid[1]-grid[0]),1.0,places=3)
+
+    def test_sample_follows_the_density(self):
+        data=np.random.default_rng(1).normal(10.0,2.0,4000)
+        values=kde.sample_kde(data,20000,rng=np.random.default_rng(2))
+        self.assertEqual(len(values),20000)
+        self.assertAlmostEqual(values.mean(),data.mean(),delta=0.1)
+        # the kernel adds its own variance to the data
+        h=kde.silverman(data)
+        self.assertAlmostEqual(values.var(),data.var()+h**2,delta=0.2)
+        np.testing.assert_array_equal(kde.sample_kde(data,5,rng=np.random.default_rng(3)),
+                                      kde.sample_kde(data,5,rng=np.random.default_rng(3)))
+
+    def test_constant_data(self):
+        with self.assertRaises(ValueError):
+            kde.binned_kde(np.full(50,3.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+# tests/test_prescreen.py
+
+import os
+import sys
+import unittest
+
+import numpy as np
+import scipy.stats as stats
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from IM import prescreen
+
+CANDIDATES=['expon','norm','lognorm','triang','uniform','weibull_min','gamma']
+
+
+class TestLMoments(unittest.TestCase):
+    def test_known_ratios(self):
+        rng=np.random.default_rng(1)
+        l1,l2,t3,t4=prescreen.sample_lmoments(rng.uniform(0,1,200000))
+        self.assertAlmostEqual(l1,0.5,delta=0.005)
+        self.assertAlmostEqual(l2,1/6,delta=0.002)
+        self.assertAlmostEqual(t3,0,delta=0.01)
+        self.assertAlmostEqual(t4,0,delta=0.01)
+        _,_,t3,t4=prescreen.sample_lmoments(rng.exponential(2.0,200000))
+        self.assertAlmostEqual(t3,1/3,delta=0.01)
+        self.assertAlmostEqual(t4,1/6,delta=0.01)
+        with self.assertRaises(ValueError):
+            prescreen.sample_lmoments([1.0,2.0,3.0])
+
+    def test_family_table_matches_the_distribution(self):
+        table=prescreen.family_table('expon')
+        self.assertEqual(len(table),1)
+        shapes,lam1,lam2,t3,t4,support=table[0]
+        self.assertEqual(shapes,())
+        self.assertAlmostEqual(lam1,1.0,places=3)
+        self.assertAlmostEqual(t3,1/3,places=3)
+        self.assertEqual(support,(0.0,np.inf))
+
+
+class TestScreen(unittest.TestCase):
+    def test_keeps_the_generating_family(self):
+        data=np.random.default_rng(2).gamma(2.5,3.0,3000)
+        kept=prescreen.screen(data,CANDIDATES,top_k=3)
+        self.assertEqual(len(kept),3)
+        self.assertIn('gamma',[dist for dist,_,_ in kept])
+        scores=[score for _,score,_ in kept]
+        self.assertEqual(scores,sorted(scores))
+        # the moment estimate is close to the true parameters
+        seed=dict((dist,seed) for dist,_,seed in kept)['gamma']
+        self.assertAlmostEqual(seed[0],2.5,delta=0.6)
+
+    def test_rejects_families_that_do_not_cover_the_data(self):
+        data=np.random.default_rng(3).exponential(1.0,3000)
+        kept=[dist for dist,_,_ in prescreen.screen(data,CANDIDATES,top_k=len(CANDIDATES))]
+        for dist in ('uniform','triang','norm'):
+            self.assertNotIn(dist,kept)
+        self.assertIn('expon',kept)
+
+    def test_moment_estimate_starts_the_fit(self):
+        data=np.random.default_rng(4).lognormal(0.5,0.4,2000)
+        dist,_,seed=prescreen.screen(data,['lognorm'],top_k=1)[0]
+        fitted=stats.lognorm.fit(data,*seed[:-2],loc=seed[-2],scale=seed[-1])
+        self.assertAlmostEqual(fitted[0],0.4,delta=0.05)
+
+    def test_short_columns_and_top_k(self):
+        self.assertEqual(prescreen.screen([1.0,2.0,3.0],CANDIDATES,top_k=2),
+                         [('expon',float('inf'),None),('norm',float('inf'),None)])
+        self.assertEqual(len(prescreen.screen(np.random.default_rng(5).gamma(2.0,1.0,500),CANDIDATES,top_k=np.int64(2))),2)
+        with self.assertRaises(ValueError):
+            prescreen.screen(np.arange(10.0),CANDIDATES,top_k=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
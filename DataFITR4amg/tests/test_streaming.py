@@ -0,0 +1,103 @@
+# tests/test_streaming.py
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from IM import streaming
+
+
+def sample_frame(n=20000):
+    rng=np.random.default_rng(0)
+    frame=pd.DataFrame({'cycle':rng.gamma(3.0,2.0,n),'arrivals':rng.poisson(4.0,n),'setup':np.full(n,7.0)})
+    frame.loc[::100,'cycle']=np.nan
+    return frame
+
+
+class TestColumnSummary(unittest.TestCase):
+    def test_chunks_give_the_statistics_of_the_column(self):
+        x=np.random.default_rng(1).normal(50.0,5.0,30000)
+        summary=streaming.ColumnSummary('x',bins=64,reservoir=1000,rng=np.random.default_rng(2))
+        for chunk in np.array_split(x,7):
+            summary.update(chunk)
+        self.assertEqual(summary.n,len(x))
+        self.assertFalse(summary.integer)
+        self.assertEqual((summary.min,summary.max),(x.min(),x.max()))
+        self.assertAlmostEqual(summary.mean,x.mean(),places=9)
+        self.assertAlmostEqual(summary.std,x.std(),places=9)
+        self.assertAlmostEqual(summary.skew,stats.skew(x),places=6)
+        self.assertAlmostEqual(summary.kurtosis,stats.kurtosis(x),places=6)
+        counts,edges=summary.histogram()
+        self.assertEqual(counts.sum(),len(x))
+        self.assertLessEqual(len(counts),64)
+        self.assertTrue(edges[0]<=x.min() and x.max()<edges[-1])
+        self.assertEqual(len(summary.sample),1000)
+        self.assertTrue(np.isin(summary.sample,x).all())
+
+    def test_histogram_grows_with_later_chunks(self):
+        summary=streaming.ColumnSummary('k',bins=8)
+        summary.update([3,4,5,np.nan])
+        summary.update([-40,100])
+        self.assertTrue(summary.integer)
+        self.assertEqual(summary.missing,1)
+        counts,edges=summary.histogram()
+        self.assertEqual(counts.sum(),5)
+        # half-integer edges: no bin splits an integer
+        np.testing.assert_array_equal(edges%1,0.5)
+        self.assertTrue(edges[0]<=-40 and 100<edges[-1])
+
+    def test_invalid_sizes(self):
+        with self.assertRaises(ValueError):
+            streaming.ColumnSummary('x',bins=7)
+        with self.assertRaises(ValueError):
+            streaming.ColumnSummary('x',reservoir=0)
+
+
+class TestCsvFitting(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory=tempfile.TemporaryDirectory()
+        cls.path=os.path.join(cls.directory.name,'log.csv')
+        cls.frame=sample_frame()
+        cls.frame.to_csv(cls.path,index=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def test_chunked_reading_matches_one_chunk(self):
+        chunked=streaming.summarize_csv(self.path,chunksize=3000,seed=0)
+        whole=streaming.summarize_csv(self.path,chunksize=len(self.frame),seed=0)
+        self.assertEqual(list(chunked),['cycle','arrivals','setup'])
+        for col in chunked:
+            self.assertEqual(chunked[col].n,whole[col].n)
+            self.assertAlmostEqual(chunked[col].mean,whole[col].mean,places=9)
+            self.assertAlmostEqual(chunked[col].std,whole[col].std,places=9)
+        self.assertEqual(chunked['cycle'].missing,200)
+        self.assertAlmostEqual(chunked['cycle'].mean,self.frame['cycle'].mean(),places=9)
+
+    def test_fit_ranks_the_generating_distributions(self):
+        tables=streaming.fit_csv_summaries(streaming.summarize_csv(self.path,chunksize=5000,seed=0),top_k=3)
+        self.assertEqual(tables['cycle'].iloc[0]['Test'],'gamma')
+        self.assertLessEqual(len(tables['cycle']),3)
+        self.assertEqual(tables['arrivals'].iloc[0]['Test'],'poisson')
+        self.assertEqual(tables['setup'],7.0)
+        params=tables['cycle'].iloc[0]['params']
+        self.assertAlmostEqual(params[0],3.0,delta=0.3)
+
+    def test_non_numerical_column(self):
+        path=os.path.join(self.directory.name,'names.csv')
+        pd.DataFrame({'name':['a','b']}).to_csv(path,index=False)
+        with self.assertRaises(ValueError):
+            streaming.summarize_csv(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
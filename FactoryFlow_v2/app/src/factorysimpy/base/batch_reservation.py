@@ -0,0 +1,83 @@
+class BatchSlot:
+    """
+    One unit of space or one item held by a batch reservation made with `reserve_put_many`/`reserve_get_many`.
+
+    A granted batch event records one slot per unit in `reservations_put` (or, for gets, one slot per reserved
+    item in `reservations_get`), so the stores and edges keep counting reservations with len() exactly as
+    for single reservations. The slots are released together by `put_many`/`get_many` or by the cancel of
+    the batch event.
+    """
+
+    __slots__ = ("batch", "resourcename", "requesting_process", "triggered")
+
+    def __init__(self, batch):
+        self.batch = batch
+        self.resourcename = batch.resourcename
+        self.requesting_process = batch.requesting_process
+        self.triggered = True
+
+    def __repr__(self):
+        return f"BatchSlot({self.resourcename})"
+
+
+def batch_event(store, quantity, priority=None):
+    """
+    Create the event of a batch reservation of `quantity` units on `store`.
+
+    The event carries `quantity` and, once granted, `slots`: the list of its `BatchSlot`.
+
+    Args:
+        store (Store): The store the reservation is made on.
+        quantity (int): Number of units to reserve at once.
+        priority (int, optional): Priority of the reservation, for stores with priority queues.
+
+    Returns:
+        event (simpy.Event): The reservation event, not yet queued.
+
+    Raises:
+        ValueError: If quantity is not a positive integer or exceeds the capacity of the store.
+    """
+    if not isinstance(quantity, int) or quantity < 1:
+        raise ValueError("quantity must be a positive integer")
+    if quantity > store.capacity:
+        raise ValueError(f"quantity {quantity} exceeds the capacity {store.capacity} of the store")
+    event = store.env.event()
+    event.resourcename = store
+    event.requesting_process = store.env.active_process
+    event.quantity = quantity
+    event.slots = None
+    if priority is not None:
+        event.priority_to_put = priority
+        event.priority_to_get = priority
+    return event
+
+
+def grant_batch(event):
+    """
+    Create the slots of a batch event and succeed it.
+
+    Returns:
+        list: The `BatchSlot` of the event, one per unit.
+    """
+    event.slots = [BatchSlot(event) for _ in range(event.quantity)]
+    event.succeed()
+    return event.slots
+
+
+def take_batch(event, env):
+    """
+    Check that the active process holds the granted batch event and consume its slots.
+
+    Returns:
+        list: The slots of the event, in the order they were granted.
+
+    Raises:
+        RuntimeError: If the event is not a granted batch reservation of the active process.
+    """
+    slots = getattr(event, "slots", None)
+    if slots is None or event.requesting_process != env.active_process:
+        raise RuntimeError(
+            f"Time {env.now:.2f}, no matching batch reservation for process {env.active_process}."
+        )
+    event.slots = None
+    return slots
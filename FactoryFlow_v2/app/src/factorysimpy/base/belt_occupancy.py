@@ -0,0 +1,116 @@
+"""
+Bitset helpers for the slot occupancy of conveyor belts.
+
+The occupancy of a belt with `capacity` slots is kept in a Python int where bit i is set when slot i
+(counted from the entry of the belt) holds an item. Python ints are arbitrary precision, so belts with
+thousands of slots are handled with a few word operations instead of scanning a '*'/'_' string.
+"""
+
+
+def occupy(occupancy, slot):
+    """
+    Return the occupancy with the given slot marked as occupied.
+
+    Args:
+        occupancy (int): Occupancy bitset.
+        slot (int): Index of the slot.
+
+    Returns:
+        int: The updated occupancy bitset.
+    """
+    return occupancy | (1 << slot)
+
+
+def is_occupied(occupancy, slot):
+    """Return True if the given slot is occupied."""
+    return (occupancy >> slot) & 1 == 1
+
+
+def is_full(occupancy, capacity):
+    """Return True if all the `capacity` slots are occupied."""
+    return occupancy == (1 << capacity) - 1
+
+
+def occupied_slots(occupancy):
+    """
+    Return the indices of the occupied slots in increasing order.
+
+    Args:
+        occupancy (int): Occupancy bitset.
+
+    Returns:
+        list: Indices of the set bits.
+    """
+    slots = []
+    while occupancy:
+        lowest = occupancy & -occupancy
+        slots.append(lowest.bit_length() - 1)
+        occupancy ^= lowest
+    return slots
+
+
+def lowest_occupied_slot(occupancy):
+    """Return the index of the occupied slot nearest to the entry, or -1 if the belt is empty."""
+    return (occupancy & -occupancy).bit_length() - 1
+
+
+def count_occupied(occupancy):
+    """Return the number of occupied slots."""
+    return bin(occupancy).count("1")
+
+
+def count_free_after(occupancy, slot, capacity):
+    """
+    Return the number of free slots between `slot` (exclusive) and the exit of the belt.
+
+    Args:
+        occupancy (int): Occupancy bitset.
+        slot (int): Index of the slot.
+        capacity (int): Number of slots on the belt.
+
+    Returns:
+        int: Number of free slots ahead of the slot.
+    """
+    return (capacity - slot - 1) - count_occupied(occupancy >> (slot + 1))
+
+
+def is_contiguous(occupancy):
+    """
+    Return True if the occupied slots form a single run without gaps. An empty belt or a belt with a
+    single item is contiguous.
+    """
+    if not occupancy:
+        return True
+    run = occupancy >> lowest_occupied_slot(occupancy)
+    return run & (run + 1) == 0
+
+
+def highest_free_slot(occupancy, slot):
+    """
+    Return the highest free slot at or below `slot`, or -1 if all of them are occupied.
+
+    Args:
+        occupancy (int): Occupancy bitset.
+        slot (int): Index of the slot to start from.
+
+    Returns:
+        int: Index of the free slot or -1.
+    """
+    if slot < 0:
+        return -1
+    free = ~occupancy & ((1 << (slot + 1)) - 1)
+    return free.bit_length() - 1
+
+
+def to_pattern(occupancy, capacity):
+    """
+    Return the occupancy as a pattern string where '*' represents an item and '_' an empty slot.
+
+    Args:
+        occupancy (int): Occupancy bitset.
+        capacity (int): Number of slots on the belt.
+
+    Returns:
+        str: The belt pattern, slot 0 first.
+    """
+    return format(occupancy, "b").zfill(capacity)[::-1].replace("1", "*").replace("0", "_")[:capacity]
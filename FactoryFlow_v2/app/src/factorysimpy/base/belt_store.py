@@ -6,6 +6,9 @@ import simpy
 import math
 import numpy as np
 from simpy.resources.store import Store
+from factorysimpy.base import belt_occupancy
+from factorysimpy.base.reservation_queue import ReservationQueue
+from factorysimpy.utils.tracer import DEBUG
 
 class BeltStore(Store):
     """
@@ -36,9 +39,9 @@ class BeltStore(Store):
 
         Attributes:
            reserved_events (list):  Maintains events corresponding to reserved items to preserve item order by index
-           reserve_put_queue (list): Queue for managing reserve_put reservations
+           reserve_put_queue (ReservationQueue): Queue for managing reserve_put reservations
            reservations_put (list): List of successful put reservations
-           reserve_get_queue (list): Queue for managing reserve_get reservations
+           reserve_get_queue (ReservationQueue): Queue for managing reserve_get reservations
            reservations_get (list):List of successful get reservations
         """
    
@@ -59,15 +62,17 @@ class BeltStore(Store):
         """
         super().__init__(env, capacity)
         self.env = env
+        self.trace = None # Trace handle installed by utils.tracer.Tracer; None when tracing is off.
         
         self.speed = speed  # Speed of the conveyor belt (units per time)
-        self.reserve_put_queue = []  # Queue for managing reserve_put reservations
+        self.reserve_put_queue = ReservationQueue()  # Queue for managing reserve_put reservations
         self.reservations_put = []   # List of successful put reservations
-        self.reserve_get_queue = []  # Queue for managing reserve_get reservations
+        self.reserve_get_queue = ReservationQueue()  # Queue for managing reserve_get reservations
         self.reservations_get = []   # List of successful get reservations
         self.reserved_events = []     # Maintains events corresponding to reserved items to preserve item order
         self.ready_items=[]  #Maintains the items ready to be taken out
         self.reserved_items   = []   # parallel list of the exact items reserved
+        self._stats_start_time = self.env.now  # Start of the period the time-averaged level is computed over
         self._last_level_change_time = self.env.now
         self._last_num_items = 0
         self._weighted_sum = 0.0
@@ -88,11 +93,21 @@ class BeltStore(Store):
         self._last_level_change_time = now
         self._last_num_items = len(self.items)+len(self.ready_items)
         
-        total_time = now
+        total_time = now - self._stats_start_time
         self.time_averaged_num_of_items_in_store = (
             self._weighted_sum / total_time if total_time > 0 else 0.0
         )
 
+    def reset_statistics(self):
+        """
+        Restart the time-averaged level at the current time. The items in the store are kept and
+        count from now on.
+        """
+        self._update_time_averaged_level()
+        self._stats_start_time = self.env.now
+        self._weighted_sum = 0.0
+        self.time_averaged_num_of_items_in_store = 0.0
+
     def reserve_put(self):
         """
         Create a reservation request to put an item into the store.
@@ -114,7 +129,7 @@ class BeltStore(Store):
         event.resourcename = self  # Store reference
         event.requesting_process = self.env.active_process  # Process making the reservation
         
-        self.reserve_put_queue.append(event)
+        self.reserve_put_queue.push(event)
         
 
         # Attempt to process reservations
@@ -138,15 +153,12 @@ class BeltStore(Store):
             RuntimeError: If an event expected to be in `reserve_put_queue` is not found
                           when attempting to remove it after successful processing.
         """
-        idx=0
-
-        while idx < len(self.reserve_put_queue):
-
-          reserve_put_event = self.reserve_put_queue[idx]
+        while self.reserve_put_queue:
+          reserve_put_event = self.reserve_put_queue.peek()
           proceed = self._do_reserve_put(reserve_put_event)
           if not reserve_put_event.triggered:
-            idx += 1
-          elif self.reserve_put_queue.pop(idx) != reserve_put_event:
+            break
+          if self.reserve_put_queue.pop() is not reserve_put_event:
             raise RuntimeError('Reserve put queue invariant violated')
 
           if not proceed:
@@ -181,27 +193,37 @@ class BeltStore(Store):
 
                     time_on_belt = self.env.now- self.items[-1][0].conveyor_entry_time - self.items[-1][0].total_interruption_time 
                     time_on_belt_last_item =self.env.now- self.items[0][0].conveyor_entry_time - self.items[0][0].total_interruption_time 
-                    print(f"T={self.env.now:.2f}: time_on_belt1111 for {self.items[-1][0].id} is {time_on_belt} rounding to {np.round(time_on_belt)}, item length is {self.items[-1][0].length}, speed is {self.speed}, length/speed is {self.items[-1][0].length/self.speed}")
+                    if self.trace and self.trace.level >= DEBUG:
+                        self.trace.debug("time_on_belt1111 for %s is %s rounding to %s, item length is %s, speed is %s, length/speed is %s", self.items[-1][0].id, time_on_belt, np.round(time_on_belt), self.items[-1][0].length, self.speed, self.items[-1][0].length / self.speed)
                     
                     if self.items[-1][0].interruption_start_time is not None:
-                        print(self._get_belt_pattern()[1])
+                        if self.trace and self.trace.level >= DEBUG:
+                            self.trace.debug("%s", self._get_belt_pattern()[1])
                         time_on_belt = self.env.now- self.items[-1][0].conveyor_entry_time - (self.env.now - self.items[-1][0].interruption_start_time)- self.items[-1][0].total_interruption_time
                     if self.items[0][0].interruption_start_time is not None:
-                        print(self._get_belt_pattern()[1])
+                        if self.trace and self.trace.level >= DEBUG:
+                            self.trace.debug("%s", self._get_belt_pattern()[1])
                         time_on_belt_last_item = self.env.now- self.items[0][0].conveyor_entry_time - (self.env.now - self.items[0][0].interruption_start_time)- self.items[0][0].total_interruption_time
-                    print(f"T={self.env.now:.2f}: time_on_belt2222 for {self.items[-1][0].id} is {time_on_belt} rounding to {np.round(time_on_belt)}, item length is {self.items[-1][0].length}, speed is {self.speed}, length/speed is {self.items[-1][0].length/self.speed}")
+                    if self.trace and self.trace.level >= DEBUG:
+                        self.trace.debug("time_on_belt2222 for %s is %s rounding to %s, item length is %s, speed is %s, length/speed is %s", self.items[-1][0].id, time_on_belt, np.round(time_on_belt), self.items[-1][0].length, self.speed, self.items[-1][0].length / self.speed)
                     #There is an item going to be in ready_items in the same time step, so do not allow another item to be put. It is because "put" was called first before the otem was moved to ready_items. all happens at same time instant.
                     if np.abs(time_on_belt  - self.items[-1][0].length/self.speed) < 1e-5 or time_on_belt > self.items[-1][0].length/self.speed:
-                        print("the last item check",self.items[0][0].id, time_on_belt_last_item)
-                        if time_on_belt_last_item >= self.items[0][0].length* self.capacity/self.speed:
-                            print("the first item check",self.items[0][0].id, time_on_belt_last_item)
+                        if self.trace:
+                            self.trace.debug("the last item check %s %s", self.items[0][0].id, time_on_belt_last_item)
+                        # on a non-accumulating belt the head item may have reached the exit up to rounding of
+                        # the interruption times; it is moved to ready_items in this time step, so no put either
+                        exit_tolerance = 0 if self.accumulation_mode_indicator else 1e-5
+                        if time_on_belt_last_item >= self.items[0][0].length* self.capacity/self.speed - exit_tolerance:
+                            if self.trace:
+                                self.trace.debug("the first item check %s %s", self.items[0][0].id, time_on_belt_last_item)
                     #if self.env.now>= self.items[-1][0].conveyor_entry_time + self.items[-1][0].length/self.speed:
                         #print(f"At time={self.env.now:.2f}, Process {self.env.active_process} "
                         # f"reserved space. Total reservations: {len(self.reservations_put)}")
                         else:
                             self.reservations_put.append(event)
                             event.succeed()
-                            print(f"T={self.env.now:.2f}: yielded reserve_put when noaccumulation_mode_on is {self.noaccumulation_mode_on}")
+                            if self.trace:
+                                self.trace.debug("yielded reserve_put when noaccumulation_mode_on is %s", self.noaccumulation_mode_on)
                         
         else:# if not items succeed, belt is empty and succeed immediately
             #if self.accumulation_mode_indicator==False or (self.accumulation_mode_indicator==True and len(self.ready_items)==0):
@@ -209,7 +231,8 @@ class BeltStore(Store):
 
                     self.reservations_put.append(event)  # Add reservation
                     event.succeed()
-                    print(f"T={self.env.now:.2f}: yielded reserve_put when {self.noaccumulation_mode_on}")
+                    if self.trace:
+                        self.trace.debug("yielded reserve_put when %s", self.noaccumulation_mode_on)
                     # Log the success of the reservation
                     #print(f"At time={self.env.now:.2f}, Process {self.env.active_process} "
                     #      f"reserved space. Total reservations: {len(self.reservations_put)}")
@@ -327,7 +350,7 @@ class BeltStore(Store):
         
 
         
-        self.reserve_get_queue.append(event)
+        self.reserve_get_queue.push(event)
         
 
         self._trigger_reserve_get(event)
@@ -349,16 +372,12 @@ class BeltStore(Store):
             RuntimeError: If an event expected to be in `reserve_get_queue` is not
                           found when attempting to remove it after successful processing.
         """
-        idx=0
-        
-        while idx < len(self.reserve_get_queue):
-          reserve_get_event = self.reserve_get_queue[idx]
+        while self.reserve_get_queue:
+          reserve_get_event = self.reserve_get_queue.peek()
           proceed = self._do_reserve_get(reserve_get_event)
-          
           if not reserve_get_event.triggered:
-            
-            idx += 1
-          elif self.reserve_get_queue.pop(idx) != reserve_get_event:
+            break
+          if self.reserve_get_queue.pop() is not reserve_get_event:
             raise RuntimeError('Reserve get queue invariant violated')
 
           if not proceed:
@@ -500,7 +519,8 @@ class BeltStore(Store):
         except ValueError:
             raise ValueError(f"Item {assigned_item} not in ready_items.")
         self._update_time_averaged_level()
-        print(self.env.now, assigned_item, ev_idx)
+        if self.trace:
+            self.trace.debug("%s %s", assigned_item, ev_idx)
         return assigned_item
 
     
@@ -621,7 +641,8 @@ class BeltStore(Store):
             # Handle selective interruption for new items during no accumulation mode
         
          
-            print(f"T={self.env.now:.2f}: BeltStore:_do_put: putting item on belt {item[0].id} and belt items are {[(i[0].id) for i in self.items]} and ready items are {[(i.id) for i in self.ready_items]}")
+            if self.trace and self.trace.level >= DEBUG:
+                self.trace.debug("BeltStore:_do_put: putting item on belt %s and belt items are %s and ready items are %s", item[0].id, [i[0].id for i in self.items], [i.id for i in self.ready_items])
             return True  # Successfully added item
 
 
@@ -653,11 +674,13 @@ class BeltStore(Store):
         try:
             # Move items to the ready_items list
             if self.items:
-                print(f"T={self.env.now:.2f} beltstore received an item {item[0].id, item[1]} . Item started moving in belt")
+                if self.trace:
+                    self.trace.debug("beltstore received an item %s . Item started moving in belt", (item[0].id, item[1]))
                 
                 # Phase 1: Item entering the belt (length/speed time)
                 remaining_phase1_time = phase1_time
-                print(f"T={self.env.now:.2f} Item {item_id} starting Phase 1 (entering belt): {phase1_time:.2f} time")
+                if self.trace:
+                    self.trace.debug("Item %s starting Phase 1 (entering belt): %.2f time", item_id, phase1_time)
                 
                 while remaining_phase1_time > 0:
                     try:
@@ -671,26 +694,33 @@ class BeltStore(Store):
                         # Calculate how much time has passed
                         interruption_start_time_phase1 = self.env.now
                         item[0].interruption_start_time= interruption_start_time_phase1
-                        print(f"{self.env.now} for item {item_id} Phase 1 started interruption at {interruption_start_time_phase1}")
+                        if self.trace:
+                            self.trace.debug("for item %s Phase 1 started interruption at %s", item_id, interruption_start_time_phase1)
                         elapsed_time = self.env.now - start_time
                         remaining_phase1_time -= elapsed_time
                         
-                        print(f"T={self.env.now:.2f} Move process Phase 1 for item {item_id} interrupted: {interrupt.cause}")
-                        print(f"T={self.env.now:.2f} Remaining Phase 1 time for item {item_id}: {remaining_phase1_time:.2f}")
+                        if self.trace:
+                            self.trace.debug("Move process Phase 1 for item %s interrupted: %s", item_id, interrupt.cause)
+                        if self.trace:
+                            self.trace.debug("Remaining Phase 1 time for item %s: %.2f", item_id, remaining_phase1_time)
                         
                         # Wait for resume signal
-                        print(f"T={self.env.now:.2f} Item {item_id} waiting for resume signal with {remaining_phase1_time:.2f} time left to complete(Phase 1)...")
+                        if self.trace:
+                            self.trace.debug("Item %s waiting for resume signal with %.2f time left to complete(Phase 1)...", item_id, remaining_phase1_time)
                         yield self.resume_event
                         total_interruption_time += self.env.now - interruption_start_time_phase1
                         item[0].interruption_start_time=None
                         item[0].total_interruption_time= total_interruption_time
-                        print(f"T={self.env.now:.2f} Item {item_id} resuming Phase 1 movement with {remaining_phase1_time:.2f} time remaining")
+                        if self.trace:
+                            self.trace.debug("Item %s resuming Phase 1 movement with %.2f time remaining", item_id, remaining_phase1_time)
                 
-                print(f"T={self.env.now:.2f} Item {item_id} completed Phase 1 (fully entered belt)")
+                if self.trace:
+                    self.trace.debug("Item %s completed Phase 1 (fully entered belt)", item_id)
                 
                 # Phase 2: Item moving through the belt to exit
                 remaining_phase2_time = phase2_time
-                print(f"T={self.env.now:.2f} Item {item_id} starting Phase 2 (moving to exit): {phase2_time:.2f} time")
+                if self.trace:
+                    self.trace.debug("Item %s starting Phase 2 (moving to exit): %.2f time", item_id, phase2_time)
                 
                 while remaining_phase2_time > 0:
                     try:
@@ -703,22 +733,28 @@ class BeltStore(Store):
                         # Calculate how much time has passed
                         interruption_start_time_phase2 = self.env.now
                         item[0].interruption_start_time= interruption_start_time_phase2
-                        print(f"{self.env.now} for item {item_id} Phase 2 started interruption at {interruption_start_time_phase2}")
+                        if self.trace:
+                            self.trace.debug("for item %s Phase 2 started interruption at %s", item_id, interruption_start_time_phase2)
                         elapsed_time = self.env.now - start_time
                         remaining_phase2_time -= elapsed_time
                         
-                        print(f"T={self.env.now:.2f} Move process Phase 2 for item {item_id} interrupted: {interrupt.cause}")
-                        print(f"T={self.env.now:.2f} Remaining Phase 2 time for item {item_id}: {remaining_phase2_time:.2f}")
+                        if self.trace:
+                            self.trace.debug("Move process Phase 2 for item %s interrupted: %s", item_id, interrupt.cause)
+                        if self.trace:
+                            self.trace.debug("Remaining Phase 2 time for item %s: %.2f", item_id, remaining_phase2_time)
                         
                         # Wait for resume signal
-                        print(f"T={self.env.now:.2f} Item {item_id} waiting for resume signal (Phase 2) time left- {remaining_phase2_time:.2f}...")
+                        if self.trace:
+                            self.trace.debug("Item %s waiting for resume signal (Phase 2) time left- %.2f...", item_id, remaining_phase2_time)
                         yield self.resume_event
                         item[0].interruption_start_time = None
                         total_interruption_time += self.env.now - interruption_start_time_phase2
                         item[0].total_interruption_time= total_interruption_time
-                        print(f"T={self.env.now:.2f} Item {item_id} resuming Phase 2 movement with {remaining_phase2_time:.2f} time remaining")
+                        if self.trace:
+                            self.trace.debug("Item %s resuming Phase 2 movement with %.2f time remaining", item_id, remaining_phase2_time)
                 
-                print(f"T={self.env.now:.2f} Item {item_id} completed Phase 2 (reached exit)")
+                if self.trace:
+                    self.trace.debug("Item %s completed Phase 2 (reached exit)", item_id)
                 #print(f"T={self.env.now:.2f} bufferstore finished moving item {item[0].id, item[1]} going to ready_items")
                 
                 item_index = self.items.index(item)
@@ -727,12 +763,14 @@ class BeltStore(Store):
                 if len(self.ready_items) + len(self.items) < self.capacity:
                     self.ready_items.append(item_to_put[0])
                     item_to_put[0].conveyor_ready_item_entry_time = self.env.now
-                    print("Total items on belt",len(self.ready_items)+len(self.items))
+                    if self.trace:
+                        self.trace.debug("Total items on belt %s", len(self.ready_items) + len(self.items))
                    
                     if not self.ready_item_event.triggered:
                         self.ready_item_event.succeed()
                         
-                    print(f"T={self.env.now:.2f} bufferstore finished moving item {item[0].id, item[1]} moved to ready_items")
+                    if self.trace:
+                        self.trace.debug("bufferstore finished moving item %s moved to ready_items", (item[0].id, item[1]))
                     self._trigger_reserve_get(None)
                     self._trigger_reserve_put(None)
                 else:
@@ -741,17 +779,35 @@ class BeltStore(Store):
             
         except simpy.Interrupt as interrupt:
             # Handle any uncaught interrupts
-            print(f"T={self.env.now:.2f} Item {item_id} move process was interrupted: {interrupt.cause}")   
+            if self.trace:
+                self.trace.debug("Item %s move process was interrupted: %s", item_id, interrupt.cause)
             
         finally:
             # Clean up the process tracking when done
             if item_id in self.active_move_processes:
                 del self.active_move_processes[item_id]
-                print(f"T={self.env.now:.2f} Removed tracking for completed move process of item {item_id}")
+                if self.trace:
+                    self.trace.debug("Removed tracking for completed move process of item %s", item_id)
   
      
     
     
+    def stall(self, reason="Stall"):
+        """
+        Stop the items on the belt when the conveyor stalls (see `selective_interrupt`).
+
+        Args:
+            reason (str): Reason for the stall
+        """
+        self.selective_interrupt(reason)
+
+    def resume(self):
+        """
+        Resume the items on the belt when the conveyor starts moving again.
+        """
+        self.resume_all_move_processes()
+        self.interrupt_and_resume_all_delayed_interrupt_processes()
+
     def interrupt_all_move_processes(self, reason="External interrupt"):
         """
         Interrupt all active move_to_ready_items processes.
@@ -759,14 +815,16 @@ class BeltStore(Store):
         Args:
             reason (str): Reason for the interrupt
         """
-        print(f"T={self.env.now:.2f} Belt_Store interrupting {len(self.active_move_processes)} move processes - {reason}")
+        if self.trace:
+            self.trace.debug("Belt_Store interrupting %s move processes - %s", len(self.active_move_processes), reason)
         
         for item_id, process_info in self.active_move_processes.items():
             process = process_info['process']
             if process and not process.processed:
                 try:
                     process.interrupt(reason)
-                    print(f"T={self.env.now:.2f} Interrupted move process for item {item_id}")
+                    if self.trace:
+                        self.trace.debug("Interrupted move process for item %s", item_id)
                 except RuntimeError:
                     # Process might already be finished
                     pass
@@ -775,7 +833,8 @@ class BeltStore(Store):
         """
         Resume all interrupted move_to_ready_items processes.
         """
-        print(f"T={self.env.now:.2f} Belt_Store resuming move processes")
+        if self.trace:
+            self.trace.debug("Belt_Store resuming move processes")
         
         # Create a new resume event and trigger it
         old_resume_event = self.resume_event
@@ -786,148 +845,115 @@ class BeltStore(Store):
    
 
 
-    def _get_belt_pattern(self):
+    def _place_item(self, occupancy, belt_item_rep, item_obj, pos):
         """
-        Generate a pattern string representing the conveyor occupancy.
-        '*' represents an item, '_' represents empty space.
+        Place an item in the highest free slot at or below `pos`.
+
+        Args:
+            occupancy (int): Occupancy bitset of the belt.
+            belt_item_rep (dict): Maps occupied slots to (item id, slot).
+            item_obj (object): The item to place.
+            pos (int): Preferred slot of the item.
 
         Returns:
-            tuple: (belt_pattern: str, belt_item_rep: list[str])
+            int: The updated occupancy bitset.
+
+        Raises:
+            RuntimeError: If there is no free slot at or below `pos`.
         """
+        slot = belt_occupancy.highest_free_slot(occupancy, pos)
+        if slot < 0:
+            raise RuntimeError(f"Belt on-belt placement logic error: no space found when shifting left {belt_item_rep}, for item {getattr(item_obj, 'id', str(id(item_obj)))}.")
+        belt_item_rep[slot] = (getattr(item_obj, "id", str(id(item_obj))), slot)
+        return belt_occupancy.occupy(occupancy, slot)
 
-        belt_positions = ['_'] * self.capacity
-        belt_item_rep = ['-'] * self.capacity
+    def _get_belt_occupancy(self):
+        """
+        Compute the slot occupancy of the conveyor as a bitset.
 
-        
+        Bit i of the occupancy is set when slot i (counted from the entry of the belt) holds an item.
+        Items are placed at the slot given by the distance they travelled; ready items are placed at the
+        exit. When a slot is already taken the item is shifted to the nearest free slot behind it.
 
-        for item in self.ready_items:
-            print(self.env.now, "ready_items in belt", item.id)
-            item_obj = item  #( item object)
-            
+        Returns:
+            tuple: (occupancy: int, belt_item_rep: dict mapping slot to (item id, slot))
+        """
+        occupancy = 0
+        belt_item_rep = {}
+
+        for item_obj in self.ready_items:
             if not hasattr(item_obj, 'conveyor_entry_time') or not hasattr(item_obj, 'length'):
                 raise AttributeError("Item must have 'conveyor_entry_time' and 'length' attributes.")
             time_on_belt = self.env.now - item_obj.conveyor_entry_time
-            print("time_onbelt", time_on_belt)
-            #print(item_obj.id, " item on belt_inspect", time_on_belt, "item_obj.total_interruption_time", item_obj.total_interruption_time)
-            #print(item_obj.id, item_obj " item on 66666661 belt_inspect", time_on_belt)
-            #(item_obj.id, item_obj.total_interruption_time, " item on 6666666 belt_inspect", time_on_belt)
             if getattr(item_obj, "total_interruption_time", None) is not None:
                 if item_obj.total_interruption_time > 0:
                     time_on_belt -= item_obj.total_interruption_time
-                    print("adjusted time on belt", time_on_belt)
             else:
-                print(f"T={self.env.now:.2f} Warning: item {getattr(item_obj, 'id', str(id(item_obj)))} missing 'total_interruption_time' attribute. Assuming 0.")
-
-        
+                if self.trace:
+                    self.trace.debug("Warning: item %s missing 'total_interruption_time' attribute. Assuming 0.", getattr(item_obj, 'id', str(id(item_obj))))
             if item_obj.interruption_start_time is not None:
                 time_on_belt -= (self.env.now - item_obj.interruption_start_time)
-
-                print(item_obj.id, " item on belt adjusted for ongoing interruption", time_on_belt)
-
             if getattr(item_obj, "conveyor_ready_item_entry_time", None) is not None:
                 if self.env.now - item_obj.conveyor_ready_item_entry_time > 0:
                     time_on_belt -= (self.env.now - item_obj.conveyor_ready_item_entry_time)
-                    print("item has entered ready_items, adjusted time on belt", time_on_belt)
-            
-            travel_distance = time_on_belt * self.speed
-                
 
             # Position is integer number of slots travelled
-            #position = np.round(travel_distance / item_obj.length)
-            position = math.ceil(travel_distance / item_obj.length)
-            pos = int(position)
-
-            print(self.env.now, item_obj.id, " item on belt_inspect final pos1", pos)
-
+            pos = int(math.ceil(time_on_belt * self.speed / item_obj.length))
             if pos <= self.capacity:
-                
-                
-                pos= self.capacity -1
-                print(self.env.now, item_obj.id, " item on belt_inspect final pos", pos)
-                if belt_positions[pos] == '_':
-                    belt_positions[pos] = '*'
-                    belt_item_rep[pos] = (getattr(item_obj, "id", str(id(item_obj))), pos)
-                    
-                    #print([i[0].id for i in self.items] , "items in belt")
-                    print( item_obj.id, " item placed at pos", pos, "belt_item_rep is", belt_item_rep)
-                else:
-                    ( item_obj.id, " position already occupied at pos", pos, "belt_item_rep is", belt_item_rep)
-                    #raise RuntimeError( item_obj.id, " position already occupied at pos", pos, "belt_item_rep is", belt_item_rep, item[0].conveyor_entry_time, item[0].interruption_start_time, item[0].total_interruption_time)
-                    while True:
-                        pos -= 1
-                        if pos < 0:
-                            raise RuntimeError(f"Belt on-belt placement logic error: no space found when shifting left {belt_item_rep}, for item {getattr(item_obj, 'id', str(id(item_obj)))}.")
-                        if belt_positions[pos] == '_':
-                            belt_positions[pos] = '*'
-                            belt_item_rep[pos] = (getattr(item_obj, "id", str(id(item_obj))), pos)
-                            break
-        
-            print(f"T={self.env.now:.2f}::put58585858585: item {item_obj.id} placed at pos {pos} {belt_item_rep}")
+                occupancy = self._place_item(occupancy, belt_item_rep, item_obj, self.capacity - 1)
+            if self.trace:
+                self.trace.debug("ready item %s placed, belt_item_rep is %s", item_obj.id, belt_item_rep)
+
         for item in self.items:
             item_obj = item[0] #( item object, time delay to exit)
-            
             if not hasattr(item_obj, 'conveyor_entry_time') or not hasattr(item_obj, 'length'):
                 raise AttributeError("Item must have 'conveyor_entry_time' and 'length' attributes.")
             time_on_belt = self.env.now - item_obj.conveyor_entry_time
-            #print(self.env.now, item_obj.id, " item on belt_inspect", time_on_belt, "item_obj.total_interruption_time", item_obj.total_interruption_time)
-            #print(item_obj.id, item_obj " item on 66666661 belt_inspect", time_on_belt)
-            #(item_obj.id, item_obj.total_interruption_time, " item on 6666666 belt_inspect", time_on_belt)
             if getattr(item_obj, "total_interruption_time", None) is not None:
-                print(self.env.now, item_obj.id, " item on belt_inspect", time_on_belt, "item_obj.total_interruption_time", item_obj.total_interruption_time)
-            
                 if item_obj.total_interruption_time > 0:
                     time_on_belt -= item_obj.total_interruption_time
             else:
-                print(f"T={self.env.now:.2f} Warning: item {getattr(item_obj, 'id', str(id(item_obj)))} missing 'total_interruption_time' attribute. Assuming 0.")
-
+                if self.trace:
+                    self.trace.debug("Warning: item %s missing 'total_interruption_time' attribute. Assuming 0.", getattr(item_obj, 'id', str(id(item_obj))))
             if getattr(item_obj, "interruption_start_time", None) is not None:
                 time_on_belt -= (self.env.now - item_obj.interruption_start_time)
-                print(item_obj.id,"111start_time",item_obj.interruption_start_time, " item on belt adjusted for ongoing interruption", time_on_belt)
-            
-        
-            travel_distance = time_on_belt * self.speed
-                
 
             # Position is integer number of slots travelled
-            position = math.ceil(travel_distance / item_obj.length)
-            pos = int(position)
-
+            pos = int(math.ceil(time_on_belt * self.speed / item_obj.length))
             if pos < self.capacity:
-           
-                
-                if belt_positions[pos] == '_':
-                    belt_positions[pos] = '*'
-                    belt_item_rep[pos] = (getattr(item_obj, "id", str(id(item_obj))), pos)
-                    #print([i[0].id for i in self.items] , "items in belt")
-                    #print( item_obj.id, " item placed at pos", pos, "belt_item_rep is", belt_item_rep)
-                else:
-                    print( item_obj.id, " position already occupied at pos", pos, "belt_item_rep is", belt_item_rep, item[0].conveyor_entry_time)
-                    while True:
-                        print("pushing items for item", item_obj.id)
-                        pos -= 1
-                        if pos < 0:
-                            raise RuntimeError(f"Belt on-belt placement logic error: no space found when shifting left {belt_item_rep}, for item {getattr(item_obj, 'id', str(id(item_obj)))}.")
-                        if belt_positions[pos] == '_':
-                            belt_positions[pos] = '*'
-                            belt_item_rep[pos] = (getattr(item_obj, "id", str(id(item_obj))), pos)
-                            break
-                          
+                if self.trace and belt_occupancy.is_occupied(occupancy, pos):
+                    self.trace.debug("%s  position already occupied at pos %s belt_item_rep is %s %s", item_obj.id, pos, belt_item_rep, item_obj.conveyor_entry_time)
+                occupancy = self._place_item(occupancy, belt_item_rep, item_obj, pos)
+
+        return occupancy, belt_item_rep
+
+    def _get_belt_pattern(self):
+        """
+        Generate a pattern string representing the conveyor occupancy.
+        '*' represents an item, '_' represents empty space.
 
-        return ''.join(belt_positions), belt_item_rep
+        Returns:
+            tuple: (belt_pattern: str, belt_item_rep: list[str])
+        """
+        occupancy, item_rep = self._get_belt_occupancy()
+        belt_item_rep = ['-'] * self.capacity
+        for slot, rep in item_rep.items():
+            belt_item_rep[slot] = rep
+        return belt_occupancy.to_pattern(occupancy, self.capacity), belt_item_rep
 
 
 
     def selective_interrupt(self, reason="Selective interrupt"):
         """
-        Perform selective interruption based on belt occupancy patterns and mode.
+        Perform selective interruption based on belt occupancy and mode.
         
         When noaccumulation_mode_on=True (STALLED_NONACCUMULATING_STATE):
         - Interrupt all items immediately
         
         When noaccumulation_mode_on=False (STALLED_ACCUMULATING_STATE):
-        - Use pattern-based interruption with delays based on item positions
+        - Use occupancy-based interruption with delays based on item positions
         
-        Pattern-based rules for accumulating mode:
+        Occupancy rules for accumulating mode (shown as patterns, '*' for an item and '_' for a free slot):
         - For patterns like '_****', interrupt all items.
         - For patterns like '_*_*_', interrupt item in second last position after 1 delay,
           and second item after 2 delays.
@@ -939,46 +965,49 @@ class BeltStore(Store):
             reason (str): Reason for the interrupt
         """
         if not self.items:
-            print(f"T={self.env.now:.2f} No items on belt to interrupt")
+            if self.trace:
+                self.trace.debug("No items on belt to interrupt")
             return
         
         # If noaccumulation_mode_on is True (STALLED_NONACCUMULATING_STATE), interrupt all items immediately
         if self.noaccumulation_mode_on == True:
-            print(f"T={self.env.now:.2f} Noaccumulation_mode_on: interrupting all items immediately")
+            if self.trace:
+                self.trace.debug("Noaccumulation_mode_on: interrupting all items immediately")
             for i, item in enumerate(self.items):
                 item_id = item[0].id if hasattr(item[0], 'id') else str(id(item))
                 self._interrupt_specific_item(item_id, f"{reason} - immediate (no accumulation)")
             return
         
-        # For accumulating mode (STALLED_ACCUMULATING_STATE), use pattern-based interruption
+        # For accumulating mode (STALLED_ACCUMULATING_STATE), use occupancy-based interruption
         if self.accumulation_mode_indicator == True:
-        #if self.noaccumulation_mode_on == False:
-            print(f"T={self.env.now:.2f} Accumulating mode: using pattern-based interruption")
+            if self.trace:
+                self.trace.debug("Accumulating mode: using occupancy-based interruption")
         
-            # Get current belt pattern
-            all_patterns = self._get_belt_pattern()
-            pattern = all_patterns[0]
-            beltitems = all_patterns[1]
-            print(f"T={self.env.now:.2f} Current belt pattern: {pattern} and items {beltitems}")
+            # Get current belt occupancy
+            occupancy = self._get_belt_occupancy()
+            if self.trace and self.trace.level >= DEBUG:
+                self.trace.debug("Current belt pattern: %s and items %s", belt_occupancy.to_pattern(occupancy[0], self.capacity), occupancy[1])
             
-            # Analyze pattern and determine interruption strategy
-            interruption_plan = self._analyze_pattern_for_interruption(all_patterns)
+            # Analyze occupancy and determine interruption strategy
+            interruption_plan = self._analyze_pattern_for_interruption(occupancy)
             
             if not interruption_plan:
-                print(f"T={self.env.now:.2f} No interruption needed for current pattern")
+                if self.trace:
+                    self.trace.debug("No interruption needed for current pattern")
                 return
             
-            print(f"T={self.env.now:.2f} Executing selective interruption plan: {interruption_plan}")
+            if self.trace:
+                self.trace.debug("Executing selective interruption plan: %s", interruption_plan)
             
             # Execute the interruption plan
             self._execute_interruption_plan(interruption_plan, reason)
 
-    def _analyze_pattern_for_interruption(self, pattern):
+    def _analyze_pattern_for_interruption(self, occupancy):
         """
-        Analyze the belt pattern and determine which items to interrupt and when.
+        Analyze the belt occupancy and determine which items to interrupt and when.
         
         Args:
-            pattern (str): Belt pattern string with '*' for items and '_' for empty spaces
+            occupancy (tuple): (occupancy bitset, belt_item_rep) as returned by `_get_belt_occupancy`
             
         Returns:
             list: List of dictionaries with interruption instructions
@@ -987,88 +1016,55 @@ class BeltStore(Store):
         interruption_plan = []
         
         # Find all item positions
-        item_positions = [i for i, char in enumerate(pattern[0]) if char == '*']
-        print("item_positions", item_positions)
+        item_positions = belt_occupancy.occupied_slots(occupancy[0])
+        if self.trace:
+            self.trace.debug("item_positions %s", item_positions)
 
         if not item_positions:
             return interruption_plan
         
-        # Check for consecutive items pattern (like '_****' or '**__*')
-        if self._has_consecutive_items(pattern[0]):
+        # Check for consecutive items (like '_****')
+        if self._has_consecutive_items(occupancy[0]):
             # Rule: Interrupt all items in consecutive blocks
             for i, pos in enumerate(item_positions):
-                interruption_plan.append({'item_index': i, 'delay': 0, 'item_id': pattern[1][pos][0]})
+                interruption_plan.append({'item_index': i, 'delay': 0, 'item_id': occupancy[1][pos][0]})
         else:
             # Rule: Interrupt items with delays based on gaps
-            interruption_plan = self._calculate_gap_based_interruptions(pattern[0], item_positions, pattern[1])
+            interruption_plan = self._calculate_gap_based_interruptions(occupancy[0], item_positions, occupancy[1])
         
         return interruption_plan
 
-    def _has_consecutive_items(self, pattern):
+    def _has_consecutive_items(self, occupancy):
         """
-        Check if the pattern has consecutive items (no gaps between items).
+        Check if the occupancy bitset has consecutive items (no gaps between items).
         """
-        item_positions = [i for i, char in enumerate(pattern) if char == '*']
-        
-        if len(item_positions) <= 1:
-            return True
-        
-        # Check if positions are consecutive
-        for i in range(1, len(item_positions)):
-            if item_positions[i] - item_positions[i-1] > 1:
-                return False
-        
-        return True
+        return belt_occupancy.is_contiguous(occupancy)
     
-    def _calculate_gap_based_interruptions(self, pattern, item_positions, belt_rep):
+    def _calculate_gap_based_interruptions(self, occupancy, item_positions, belt_rep):
         """
         Compute delays for each item in the conveyor based on its
         actual position and available space ahead.
 
         Args:
-            pattern (str): Belt pattern, e.g., '__**_*'
-            item_positions (list[int]): indices of '*' in pattern
-            belt_rep (BeltStore): The belt store object for context
+            occupancy (int): Occupancy bitset of the belt, bit i set for an item in slot i
+            item_positions (list[int]): indices of the occupied slots
+            belt_rep (dict): Maps occupied slots to (item id, slot)
 
         Returns:
             List[dict]: [{'item_index': i, 'delay': int}, ...]
         """
-        interruption_plan = []
-
-        cap = len(pattern)
         if not item_positions:
-            return interruption_plan
+            return []
 
         # Special case: full belt
-        if '_' not in pattern:
+        if belt_occupancy.is_full(occupancy, self.capacity):
             return [{'item_index': i, 'delay': 0} for i in range(len(item_positions))]
-    
-        items_on_real_belt = [i[0].id for i in self.items]
+
+        interruption_plan = []
         for i, pos in enumerate(item_positions):
-            # Rightmost item always stalls at exit
-            #print(pos, max(item_positions))
-
-            #print(pos, item, " item on belt_inspect in gap based interruption", pattern, [i[0].id for i in self.items], [i.id for i in self.ready_items])
-            # if pos == max(item_positions):
-            #     delay = 0
-            # else:
-            # Count contiguous empties until blocked
-            delay = 0
-            #print(self.env.now, "counting empties for item at pos", pos, "pattern:", pattern[pos+1:cap])
-            for j in range(pos + 1, cap):
-                #print(self.env.now, "checking position", j, "char:", pattern[j], delay)
-                if pattern[j] == '_':
-                    
-                    delay += 1
-                    #print(self.env.now, "found empty space at", j)
-                #else:
-                    #break
-        #print("total delay for item at pos", pos, "is", delay)
-            item=belt_rep[pos][0]
-            #delay = delay *( 0.5 / self.speed)
-            #print("holahola",items_on_real_belt,item, delay)
-            #index = items_on_real_belt.index(item)
-            interruption_plan.append({'item_index': i, 'delay': delay, "item_index_on_pattern": pos, "item_id": item})
+            # Each item can still move by the number of free slots ahead of it
+            delay = belt_occupancy.count_free_after(occupancy, pos, self.capacity)
+            interruption_plan.append({'item_index': i, 'delay': delay, "item_index_on_pattern": pos, "item_id": belt_rep[pos][0]})
 
         return interruption_plan
 
@@ -1091,13 +1087,15 @@ class BeltStore(Store):
             item_index = instruction['item_index']
             item_id = instruction.get('item_id', None)
             delay = instruction['delay']
-            print(f"T={self.env.now:.2f} Scheduling interruption for item {item_id} at index {item_index} with delay {delay}")
+            if self.trace:
+                self.trace.debug("Scheduling interruption for item %s at index %s with delay %s", item_id, item_index, delay)
             all_items = [i[0].id if hasattr(i[0], 'id') else str(id(i)) for i in self.items]
 
             if item_id in all_items:
                 item_index = all_items.index(item_id)
                 if item_index < self.capacity:
-                    print(f"T={self.env.now:.2f} Found item at index {item_index} for interruption")
+                    if self.trace:
+                        self.trace.debug("Found item at index %s for interruption", item_index)
                     item = self.items[item_index]
                     item_id = item[0].id if hasattr(item[0], 'id') else str(id(item))
                     item_length = item[0].length if hasattr(item[0], 'length') else 1.0
@@ -1112,13 +1110,16 @@ class BeltStore(Store):
                         self.active_delayed_interrupt_processes[item_id] = delayed_process
                     else:
                         # Immediate interruption
-                        print(f"T={self.env.now:.2f} Immediate interrupt for item {item_id}")
+                        if self.trace:
+                            self.trace.debug("Immediate interrupt for item %s", item_id)
                         self._interrupt_specific_item(item_id, reason)
             
-                else: print (f"T={self.env.now:.2f} item_index {item_index} exceeds capacity {self.capacity}, skipping interruption")
+                elif self.trace:
+                    self.trace.debug("item_index %s exceeds capacity %s, skipping interruption", item_index, self.capacity)
             else:
                 if item_id in self.ready_items:
-                    print(f"T={self.env.now:.2f} Item {item_id} already in ready_items, skipping interruption")
+                    if self.trace:
+                        self.trace.debug("Item %s already in ready_items, skipping interruption", item_id)
                     continue
     
     
@@ -1134,10 +1135,12 @@ class BeltStore(Store):
         
         try:
             yield self.env.timeout(delay)
-            print(f"T={self.env.now:.2f} Delayed interrupt for item {item_id} after {delay} time units")
+            if self.trace:
+                self.trace.debug("Delayed interrupt for item %s after %s time units", item_id, delay)
             self._interrupt_specific_item(item_id, reason)
         except simpy.Interrupt as interrupt:
-            print(f"Interruption cancelled for item {item_id}: {interrupt.cause}")
+            if self.trace:
+                self.trace.debug("Interruption cancelled for item %s: %s", item_id, interrupt.cause)
         finally:
             self.active_delayed_interrupt_processes.pop(item_id, None)
 
@@ -1158,13 +1161,17 @@ class BeltStore(Store):
             if process and not process.processed:
                 try:
                     process.interrupt(reason)
-                    print(f"T={self.env.now:.2f} Selectively interrupted item {item_id}: {reason}")
+                    if self.trace:
+                        self.trace.debug("Selectively interrupted item %s: %s", item_id, reason)
                 except RuntimeError:
-                    print(f"T={self.env.now:.2f} Could not interrupt item {item_id} - process may be finished")
+                    if self.trace:
+                        self.trace.debug("Could not interrupt item %s - process may be finished", item_id)
             else:
-                print(f"T={self.env.now:.2f} Item {item_id} process already finished")
+                if self.trace:
+                    self.trace.debug("Item %s process already finished", item_id)
         else:
-            print(f"T={self.env.now:.2f} Item {item_id} not found in active processes")
+            if self.trace:
+                self.trace.debug("Item %s not found in active processes", item_id)
             
     def handle_new_item_during_interruption(self, item):
         """
@@ -1174,34 +1181,30 @@ class BeltStore(Store):
         """
         
 
-        # Build the updated belt pattern with new item
-        current_pattern = self._get_belt_pattern()
-        print(f"T={self.env.now:.2f} Current belt pattern after adding new item: {current_pattern[0]} and items {current_pattern[1]}")
-        updated_pattern = list(current_pattern[0])
-        
-
-        
+        # Occupancy of the belt including the new item
+        occupancy, belt_item_rep = self._get_belt_occupancy()
+        if self.trace and self.trace.level >= DEBUG:
+            self.trace.debug("Current belt pattern after adding new item: %s and items %s", belt_occupancy.to_pattern(occupancy, self.capacity), belt_item_rep)
 
-        # Recompute item positions
-        item_positions = [i for i, c in enumerate(updated_pattern) if c == '*']
-        print("item_positions with new item", item_positions)
-        # Get interruption plan
-        interruption_plan = self._calculate_gap_based_interruptions(''.join(updated_pattern), item_positions, current_pattern[1])
-        print(f"T={self.env.now:.2f} Interruption plan with new item: {interruption_plan}")
-        # The new item is the last one added in pattern
-        delay_for_new_item = interruption_plan[0]['delay']
+        # The new item is the one nearest to the entry; it can move by the number of free slots ahead of it
+        first_slot = belt_occupancy.lowest_occupied_slot(occupancy)
+        delay_for_new_item = belt_occupancy.count_free_after(occupancy, first_slot, self.capacity) if occupancy else 0
+        if self.trace:
+            self.trace.debug("New item at slot %s can move %s slots", first_slot, delay_for_new_item)
 
         item_id = item[0].id if hasattr(item[0], 'id') else str(id(item))
         item_id = item[0].id if hasattr(item[0], 'id') else str(id(item))
         item_length = item[0].length if hasattr(item[0], 'length') else 1.0
         delay_for_new_item = delay_for_new_item * (item_length / self.speed)
         if delay_for_new_item > 0:
-            print(f"T={self.env.now:.2f} New item {item_id} will be interrupted after {delay_for_new_item} time units")
+            if self.trace:
+                self.trace.debug("New item %s will be interrupted after %s time units", item_id, delay_for_new_item)
             interrupt_process= self.env.process(self._delayed_interrupt(item_id, delay_for_new_item, "New item during interruption"))
             item_id = item[0].id if hasattr(item[0], 'id') else str(id(item))
             self.active_delayed_interrupt_processes[item_id] = interrupt_process
         else:
-            print(f"T={self.env.now:.2f} New item {item_id} {interruption_plan[0]['item_index']} {interruption_plan[-1]['delay']} interrupted immediately")
+            if self.trace:
+                self.trace.debug("New item %s interrupted immediately", item_id)
             self._interrupt_specific_item(item_id, "New item during interruption")
 
 
@@ -1212,13 +1215,15 @@ class BeltStore(Store):
         Args:
             reason (str): Reason for the interrupt
         """
-        print(f"T={self.env.now:.2f} Belt_Store interrupting {len(self.active_delayed_interrupt_processes)} delayed interrupt processes - {reason}")
+        if self.trace:
+            self.trace.debug("Belt_Store interrupting %s delayed interrupt processes - %s", len(self.active_delayed_interrupt_processes), reason)
         
         for item_id, process in list(self.active_delayed_interrupt_processes.items()):
             if process and not process.processed:
                 try:
                     process.interrupt(reason)
-                    print(f"T={self.env.now:.2f} Interrupted delayed interrupt process for item {item_id}")
+                    if self.trace:
+                        self.trace.debug("Interrupted delayed interrupt process for item %s", item_id)
                 except RuntimeError:
                     # Process might already be finished
                     pass
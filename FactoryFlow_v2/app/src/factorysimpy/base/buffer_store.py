@@ -2,7 +2,10 @@
 
 
 import simpy
+from collections import deque
 from simpy.resources.store import Store
+from factorysimpy.base.reservation_queue import ReservationQueue
+from factorysimpy.base.batch_reservation import batch_event, grant_batch, take_batch
 
 class BufferStore(Store):
     """
@@ -28,13 +31,20 @@ class BufferStore(Store):
 
         An item that is added into the BufferStore using put(), it is associated with a delay representing the time it takes for the item
         to be available for retrieval. The delay can also be 0. The items can be retrieved in FIFO or LIFO manner based on the mode of operation of the BufferStore.
+        Items with zero delay are made available immediately. Delayed items that become ready in the order in which they were put
+        (always the case for a constant delay) are released by a single timer process per store; any other item gets its own process.
+
+        reserve_put_many(k) and reserve_get_many(k) reserve k units of space or k items with a single event, which is granted
+        only when all k are available. put_many and get_many then transfer the k items in one call, updating the level and
+        triggering the pending reservations once instead of k times.
 
         Attributes:
-           reserved_events (list):  Maintains events corresponding to reserved items to preserve item order by index
-           reserve_put_queue (list): Queue for managing reserve_put reservations
+           ready_items (dict): Items that are ready to be taken out, in the order in which they became ready (used as an ordered set)
+           unreserved_items (collections.deque): Ready items that are not yet associated with a reserve_get event
+           reserve_put_queue (ReservationQueue): Queue for managing reserve_put reservations
            reservations_put (list): List of successful put reservations
-           reserve_get_queue (list): Queue for managing reserve_get reservations
-           reservations_get (list):List of successful get reservations
+           reserve_get_queue (ReservationQueue): Queue for managing reserve_get reservations
+           reservations_get (dict): Successful get reservations, mapping each reserve_get event to the item reserved for it
         """
 
     def __init__(self, env, capacity=float('inf'),mode='FIFO'):
@@ -47,14 +57,17 @@ class BufferStore(Store):
         """
         super().__init__(env, capacity)
         self.env = env
+        self.trace = None # Trace handle installed by utils.tracer.Tracer; None when tracing is off.
         self.mode=mode
-        self.reserve_put_queue = []  # Queue for managing reserve_put reservations
+        self.reserve_put_queue = ReservationQueue()  # Queue for managing reserve_put reservations
         self.reservations_put = []   # List of successful put reservations
-        self.reserve_get_queue = []  # Queue for managing reserve_get reservations
-        self.reservations_get = []   # List of successful get reservations
-        self.reserved_events = []     # Maintains events corresponding to reserved items to preserve item order
-        self.ready_items=[]  #Maintains the items ready to be taken out
-        self.reserved_items   = []   # parallel list of the exact items reserved
+        self.reserve_get_queue = ReservationQueue()  # Queue for managing reserve_get reservations
+        self.reservations_get = {}   # Successful get reservations, reserve_get event -> reserved item
+        self.ready_items = {}        # Ordered set of the items ready to be taken out
+        self.unreserved_items = deque()  # Ready items not yet reserved, in the order in which they became ready
+        self._timer_queue = deque()  # (ready_time, put_time, item) of delayed items, in the order they become ready
+        self._timer_running = False  # True while the process releasing the timer queue is active
+        self._stats_start_time = self.env.now  # Start of the period the time-averaged level is computed over
         self._last_level_change_time = self.env.now
         self._last_num_items = 0
         self._weighted_sum = 0.0
@@ -67,11 +80,21 @@ class BufferStore(Store):
         self._last_level_change_time = now
         self._last_num_items = len(self.items)+len(self.ready_items)
         
-        total_time = now
+        total_time = now - self._stats_start_time
         self.time_averaged_num_of_items_in_store = (
             self._weighted_sum / total_time if total_time > 0 else 0.0
         )
 
+    def reset_statistics(self):
+        """
+        Restart the time-averaged level at the current time. The items in the store are kept and
+        count from now on.
+        """
+        self._update_time_averaged_level()
+        self._stats_start_time = self.env.now
+        self._weighted_sum = 0.0
+        self.time_averaged_num_of_items_in_store = 0.0
+
     def reserve_put(self):
         """
         Create a reservation request to put an item into the store.
@@ -93,7 +116,7 @@ class BufferStore(Store):
         event.resourcename = self  # Store reference
         event.requesting_process = self.env.active_process  # Process making the reservation
             
-        self.reserve_put_queue.append(event)
+        self.reserve_put_queue.push(event)
         
 
         # Attempt to process reservations
@@ -101,7 +124,26 @@ class BufferStore(Store):
 
         return event
 
+    def reserve_put_many(self, quantity):
+        """
+        Create a reservation request to put `quantity` items into the store at once.
+
+        The request is queued like a `reserve_put` request and succeeds when space for all the items is available.
+        The items are then put with `put_many`.
+
+        Args:
+            quantity (int): Number of items to reserve space for.
+
+        Returns:
+            event (simpy.Event): A reservation event that will succeed when space for all the items is available.
 
+        Raises:
+            ValueError: If quantity is not a positive integer or exceeds the capacity of the store.
+        """
+        event = batch_event(self, quantity)
+        self.reserve_put_queue.push(event)
+        self._trigger_reserve_put(event)
+        return event
 
     def _trigger_reserve_put(self, event):
         """
@@ -117,15 +159,12 @@ class BufferStore(Store):
             RuntimeError: If an event expected to be in `reserve_put_queue` is not found
                           when attempting to remove it after successful processing.
         """
-        idx=0
-
-        while idx < len(self.reserve_put_queue):
-
-          reserve_put_event = self.reserve_put_queue[idx]
+        while self.reserve_put_queue:
+          reserve_put_event = self.reserve_put_queue.peek()
           proceed = self._do_reserve_put(reserve_put_event)
           if not reserve_put_event.triggered:
-            idx += 1
-          elif self.reserve_put_queue.pop(idx) != reserve_put_event:
+            break
+          if self.reserve_put_queue.pop() is not reserve_put_event:
             raise RuntimeError('Reserve put queue invariant violated')
 
           if not proceed:
@@ -152,7 +191,12 @@ class BufferStore(Store):
 
         """
         # Check if there's enough space to reserve
-        if len(self.reservations_put) + len(self.items) +len(self.ready_items) < self.capacity:
+        quantity = getattr(event, "quantity", None)
+        if quantity is not None:
+            # batch reservation: granted only when space for all its items is available
+            if len(self.reservations_put) + len(self.items) + len(self.ready_items) + quantity <= self.capacity:
+                self.reservations_put.extend(grant_batch(event))
+        elif len(self.reservations_put) + len(self.items) +len(self.ready_items) < self.capacity:
             self.reservations_put.append(event)  # Add reservation
             event.succeed()
             # Log the success of the reservation
@@ -193,6 +237,12 @@ class BufferStore(Store):
         self.reserve_put_queue.remove(put_event_to_cancel)
         self._trigger_reserve_put(None)#if t is removed, then a waiting event can be succeeded, if any
         proceed = True
+      #releasing all the space held by a granted batch reservation
+      elif getattr(put_event_to_cancel, "slots", None) is not None:
+        slots = set(take_batch(put_event_to_cancel, self.env))
+        self.reservations_put = [event for event in self.reservations_put if event not in slots]
+        self._trigger_reserve_put(None)
+        proceed = True
       #checking and removing the event if it is already yielded and is present in the reservations_put
       elif put_event_to_cancel in self.reservations_put:
         self.reservations_put.remove(put_event_to_cancel)
@@ -213,37 +263,33 @@ class BufferStore(Store):
             self._trigger_reserve_get(None)
             return True
 
-        # Case 2: already yielded reservation
-        if get_event_to_cancel in self.reservations_get:
-            # 1) Remove from active reservations
-            self.reservations_get.remove(get_event_to_cancel)
-
-            # 2) Find its index in the parallel lists
-            ev_idx = self.reserved_events.index(get_event_to_cancel)
+        # Case 2: granted batch reservation, its items are handed out next again in their order
+        if getattr(get_event_to_cancel, "slots", None) is not None:
+            items = [self.reservations_get.pop(slot) for slot in take_batch(get_event_to_cancel, self.env)]
+            if self.mode == "FIFO":
+                self.unreserved_items.extendleft(reversed(items))
+            else:  # LIFO
+                self.unreserved_items.extend(reversed(items))
+            self._trigger_reserve_get(None)
+            return True
 
-            # 3) Pop out the exact item reference
-            item = self.reserved_items.pop(ev_idx)
-            # 4) Drop the event token
-            self.reserved_events.pop(ev_idx)
+        # Case 3: already yielded reservation
+        if get_event_to_cancel in self.reservations_get:
+            # 1) Remove from active reservations and get the item that was reserved for it
+            item = self.reservations_get.pop(get_event_to_cancel)
 
-            # 5) Remove it from ready_items wherever it currently is
-            try:
-                self.ready_items.remove(item)
-            except ValueError:
+            if item not in self.ready_items:
                 raise RuntimeError(f"Item {item} not found in ready_items during cancel.")
 
-            # 6) Compute new insertion index as a get call is cancelled and item that is reserved and associated to an event is now freely available to be assigned to a new incoming event
+            # 2) The item is now freely available to be assigned to a new incoming event.
             if self.mode == "FIFO":
-                # one slot before the remaining reserved block
-                insert_idx = len(self.ready_items) - len(self.reserved_events) - 1
+                # it is older than every unreserved item, so it is handed out next
+                self.unreserved_items.appendleft(item)
             else:  # LIFO
                 # top of stack
-                insert_idx = len(self.ready_items)
-
-            # 7) Re‑insert it
-            self.ready_items.insert(insert_idx, item)
+                self.unreserved_items.append(item)
 
-            # 8) Trigger any other pending reservations
+            # 3) Trigger any other pending reservations
             self._trigger_reserve_get(None)
             return True
 
@@ -276,12 +322,32 @@ class BufferStore(Store):
         event.requesting_process = self.env.active_process  # Associate event with the current process
        
         
-        self.reserve_get_queue.append(event)
+        self.reserve_get_queue.push(event)
        
 
         self._trigger_reserve_get(event)
         return event
 
+    def reserve_get_many(self, quantity):
+        """
+        Create a reservation request to retrieve `quantity` items from the store at once.
+
+        The request is queued like a `reserve_get` request and succeeds when `quantity` unreserved items are ready.
+        The items are reserved in the FIFO or LIFO order of the store and retrieved with `get_many`.
+
+        Args:
+            quantity (int): Number of items to reserve.
+
+        Returns:
+            event (simpy.Event): A reservation event that will succeed when all the items are available.
+
+        Raises:
+            ValueError: If quantity is not a positive integer or exceeds the capacity of the store.
+        """
+        event = batch_event(self, quantity)
+        self.reserve_get_queue.push(event)
+        self._trigger_reserve_get(event)
+        return event
 
     def _trigger_reserve_get(self, event):
         """
@@ -298,13 +364,12 @@ class BufferStore(Store):
             RuntimeError: If an event expected to be in `reserve_get_queue` is not
                           found when attempting to remove it after successful processing.
         """
-        idx=0
-        while idx < len(self.reserve_get_queue):
-          reserve_get_event = self.reserve_get_queue[idx]
+        while self.reserve_get_queue:
+          reserve_get_event = self.reserve_get_queue.peek()
           proceed = self._do_reserve_get(reserve_get_event)
           if not reserve_get_event.triggered:
-            idx += 1
-          elif self.reserve_get_queue.pop(idx) != reserve_get_event:
+            break
+          if self.reserve_get_queue.pop() is not reserve_get_event:
             raise RuntimeError('Reserve get queue invariant violated')
 
           if not proceed:
@@ -316,8 +381,8 @@ class BufferStore(Store):
 
         This method checks if there are available items in the store. If so,
         it grants the reservation request by adding the event to `reservations_get`
-        and marking the reservation as successful. The event is also added
-        to `reserved_events` to maintain item order. If a request is
+        and marking the reservation as successful. The oldest (FIFO) or newest (LIFO)
+        unreserved item is associated with the event. If a request is
         successfully processed, it is removed from the queue.
 
         Args:
@@ -325,29 +390,25 @@ class BufferStore(Store):
 
 
         """
+        quantity = getattr(event, "quantity", None)
+        if quantity is not None:
+            # batch reservation: granted only when enough unreserved items are ready
+            if len(self.unreserved_items) >= quantity:
+                take = self.unreserved_items.popleft if self.mode == "FIFO" else self.unreserved_items.pop
+                for slot in grant_batch(event):
+                    self.reservations_get[slot] = take()
         #if there are items that are unreserved, the create a reservation by adding that event to the reservations_get list
-        if len(self.reservations_get) < len(self.ready_items):
-            # Successful reservation; add to reservations list
-            self.reservations_get.append(event)
-            event.succeed()  # Immediately succeed the event
-
-            #reserving the item to preserved item order by adding the reserve_get event to a list(the index position of event= index position of reserved item)
-            
-
-            """
-            Called when a process reserves an item.
-            We pick the j-th from top (for LIFO) or bottom (for FIFO)
-            but do NOT remove it yet—we just record the exact item.
-            """
-            j = len(self.reserved_events)
+        elif self.unreserved_items:
+            # Pick the item from the bottom (FIFO) or top (LIFO) of the unreserved items
+            # but do NOT remove it from ready_items yet—we just record the exact item.
             if self.mode == "FIFO":
-                item = self.ready_items[j]
+                item = self.unreserved_items.popleft()
             else:  # LIFO
-                item = self.ready_items[-1 - j]
+                item = self.unreserved_items.pop()
 
-            # record the reservation
-            self.reserved_events.append(event)
-            self.reserved_items .append(item)
+            # Successful reservation; record the reserved item against the event
+            self.reservations_get[event] = item
+            event.succeed()  # Immediately succeed the event
 
 
 
@@ -415,37 +476,42 @@ class BufferStore(Store):
         Removes the reservation and takes out that exact item from ready_items.
         """
         # 1) validate reservation exists for this process
-        reserved_event = next(
-            (ev for ev in self.reservations_get
-             if ev == get_event and ev.requesting_process == self.env.active_process),
-            None
-        )
-        if reserved_event is None:
+        if get_event not in self.reservations_get or get_event.requesting_process != self.env.active_process:
             raise RuntimeError(
                 f"Time {self.env.now:.2f}, no matching reservation for process {self.env.active_process}."
             )
 
-        # 2) find its index in the reservation lists
-        ev_idx = self.reserved_events.index(reserved_event)
-
-        # 3) remove from reservations
-        self.reservations_get.remove(reserved_event)
-        self.reserved_events.remove(reserved_event)
-
-        # 4) pop out the exact item reference
-        try:
-            assigned_item = self.reserved_items.pop(ev_idx)
-        except IndexError:
-            raise ValueError(f"Reserved item for {get_event} not found in store.")
+        # 2) remove from reservations and take the exact item reference
+        assigned_item = self.reservations_get.pop(get_event)
 
-        # 5) remove that object from ready_items by value
+        # 3) remove that object from ready_items
         try:
-            self.ready_items.remove(assigned_item)
-        except ValueError:
+            del self.ready_items[assigned_item]
+        except KeyError:
             raise ValueError(f"Item {assigned_item} not in ready_items.")
         self._update_time_averaged_level()
         return assigned_item
 
+    def get_many(self, get_event):
+        """
+        Retrieve all the items of a batch reservation made with `reserve_get_many`.
+
+        Args:
+            get_event (simpy.Event): The batch reservation event.
+
+        Returns:
+            items (list): The retrieved items, in the order they were reserved.
+
+        Raises:
+            RuntimeError: If the event is not a granted batch reservation of the active process.
+        """
+        items = [self.reservations_get.pop(slot) for slot in take_batch(get_event, self.env)]
+        for item in items:
+            del self.ready_items[item]
+        self._update_time_averaged_level()
+        self._trigger_reserve_put(None)
+        return items
+
     def put(self,put_event,item):
         """
         Perform a `put` operation on the store and trigger any pending `reserve_get` requests.
@@ -545,35 +611,107 @@ class BufferStore(Store):
 
         # Add the item if space is available
         if len(self.items)+len(self.ready_items) < self.capacity:
+            delay = item[1]
+            if delay == 0:
+                # the item is ready at once, no process or timeout is needed
+                self._add_to_ready_items(item[0])
+                self._update_time_averaged_level()
+                return True  # Successfully added item
+
             self.items.append(item)
             self._update_time_averaged_level()
-            self.env.process(self.move_to_ready_items(item))
+            self._start_delay(item)
             return True  # Successfully added item
-        
+
+    def put_many(self, put_event, items):
+        """
+        Put all the items of a batch reservation made with `reserve_put_many` into the store.
+
+        The level is updated and the pending `reserve_get` requests are processed once for the whole batch.
+
+        Args:
+            put_event (simpy.Event): The batch reservation event.
+            items (list): (item, delay) tuples, one per reserved unit.
+
+        Returns:
+            proceed (bool): True once the items are added.
+
+        Raises:
+            RuntimeError: If the event is not a granted batch reservation of the active process.
+            ValueError: If the number of items differs from the reserved quantity.
+        """
+        quantity = getattr(put_event, "quantity", None)
+        if quantity is not None and len(items) != quantity:
+            raise ValueError(f"put_many expects {quantity} items, got {len(items)}")
+        slots = set(take_batch(put_event, self.env))
+        self.reservations_put = [event for event in self.reservations_put if event not in slots]
+
+        for item in items:
+            if item[1] == 0:
+                self.ready_items[item[0]] = None
+                self.unreserved_items.append(item[0])
+            else:
+                self.items.append(item)
+                self._start_delay(item)
+        self._update_time_averaged_level()
+        self._trigger_reserve_get(None)
+        return True
+
+    def _start_delay(self, item):
+        """
+        Schedule the release of a delayed item into `ready_items`.
+        """
+        ready_time = self.env.now + item[1]
+        if not self._timer_queue or ready_time >= self._timer_queue[-1][0]:
+            # items with a constant delay become ready in the order they were put,
+            # so a single timer process can release them one after the other
+            self._timer_queue.append((ready_time, self.env.now, item))
+            if not self._timer_running:
+                self._timer_running = True
+                self.env.process(self._release_timer_queue())
+        else:
+            self.env.process(self.move_to_ready_items(item))
+
+    def _release_timer_queue(self):
+        """
+        Move the items in `_timer_queue` to `ready_items` as their delays expire.
+        This process is started when an item is added to an empty timer queue and ends when the queue is empty.
+        """
+        queue = self._timer_queue
+        while queue:
+            ready_time, put_time, item = queue[0]
+            if ready_time > self.env.now:
+                # use the delay itself when possible so that the ready time is exactly put_time + delay
+                yield self.env.timeout(item[1] if put_time == self.env.now else ready_time - self.env.now)
+            queue.popleft()
+            self._move_item(item)
+        self._timer_running = False
+
     def move_to_ready_items(self,item):
         """
         Move items from the store to the ready_items list after a put operation.
-        This method is called as a process to ensure that items are moved asynchronously.
+        This method is called as a process for items that cannot be released by the timer queue,
+        ie, when the delay of the item would make it ready before an item that was put earlier.
         """
 
         # Move items to the ready_items list
         if self.items:
-            #print(f"T={self.env.now:.2f} beltstore received an item {item[0].id, item[1]} . Item started moving in belt")
             yield self.env.timeout(item[1])
-            #print(f"T={self.env.now:.2f} bufferstore finished moving item {item[0].id, item[1]} going to ready_items")
-            
-            item_index = self.items.index(item)
-            item_to_put = self.items.pop(item_index)  # Remove the first item
-            #print(item_to_put, item)
-            if len(self.ready_items)+ len(self.items) < self.capacity:
-                self.ready_items.append(item_to_put[0])
-                #print(f"T={self.env.now:.2f} bufferstore finished moving item {item[0].id, item[1]} moved to ready_items")
-                self._trigger_reserve_get(None)
-                self._trigger_reserve_put(None)
-                #print(f"T={self.env.now:.2f} bufferstore is moving item {item[0].id, item[1]} to ready_items. Total items in buffer is {len(self.items)+len(self.ready_items)}"   )
-            else:
-                raise RuntimeError("Total number of items in the store exceeds capacity. Cannot move item to ready_items.")
-            
+            self._move_item(item)
 
+    def _move_item(self, item):
+        # items are usually released in the order they were put, so check the head first
+        if self.items[0] is item:
+            self.items.pop(0)
+        else:
+            self.items.remove(item)
+        self._add_to_ready_items(item[0])
 
-        
\ No newline at end of file
+    def _add_to_ready_items(self, item):
+        if len(self.ready_items)+ len(self.items) < self.capacity:
+            self.ready_items[item] = None
+            self.unreserved_items.append(item)
+            self._trigger_reserve_get(None)
+            self._trigger_reserve_put(None)
+        else:
+            raise RuntimeError("Total number of items in the store exceeds capacity. Cannot move item to ready_items.")
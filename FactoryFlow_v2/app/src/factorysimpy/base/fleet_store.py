@@ -4,6 +4,8 @@
 
 import simpy
 from simpy.resources.store import Store
+from factorysimpy.base.reservation_queue import ReservationQueue
+from factorysimpy.base.batch_reservation import batch_event, grant_batch, take_batch
 
 class FleetStore(Store):
     """
@@ -28,11 +30,14 @@ class FleetStore(Store):
         It also handles the dissociation of the event and item done at the time of reservation when an already yielded
         event is canceled.
 
+        reserve_put_many(k) and reserve_get_many(k) reserve k units of space or k items with a single event, which is granted
+        only when all k are available. put_many and get_many then transfer the k items in one call.
+
         Attributes:
            reserved_events (list):  Maintains events corresponding to reserved items to preserve item order by index
-           reserve_put_queue (list): Queue for managing reserve_put reservations
+           reserve_put_queue (ReservationQueue): Queue for managing reserve_put reservations
            reservations_put (list): List of successful put reservations
-           reserve_get_queue (list): Queue for managing reserve_get reservations
+           reserve_get_queue (ReservationQueue): Queue for managing reserve_get reservations
            reservations_get (list):List of successful get reservations
         """
 
@@ -50,22 +55,24 @@ class FleetStore(Store):
         """
         super().__init__(env, capacity)
         self.env = env
+        self.trace = None # Trace handle installed by utils.tracer.Tracer; None when tracing is off.
         self.delay = delay
         self.transit_delay = transit_delay
-        self.reserve_put_queue = []  # Queue for managing reserve_put reservations
+        self.reserve_put_queue = ReservationQueue()  # Queue for managing reserve_put reservations
         self.reservations_put = []   # List of successful put reservations
-        self.reserve_get_queue = []  # Queue for managing reserve_get reservations
+        self.reserve_get_queue = ReservationQueue()  # Queue for managing reserve_get reservations
         self.reservations_get = []   # List of successful get reservations
         self.reserved_events = []     # Maintains events corresponding to reserved items to preserve item order
         self.ready_items=[]  #Maintains the items ready to be taken out
         self.reserved_items   = []   # parallel list of the exact items reserved
+        self._stats_start_time = self.env.now  # Start of the period the time-averaged level is computed over
         self._last_level_change_time = self.env.now
         self._last_num_items = 0
         self._weighted_sum = 0.0
         self.time_averaged_num_of_items_in_store = 0.0  # Time-averaged number of items in the store
-        self.activate_fleet= self.env.event()  # Event to activate the fleet when items are available
-        
-        self.env.process(self.fleet_activation_process())  # Start the fleet activation process
+        self._waiting_items = []  # Items put into the store that are waiting for the fleet to be activated
+        self._activation_timer = None  # Timeout that activates the fleet at the next instant of the activation schedule
+        self._next_activation = self.env.now + self.delay  # Next instant of the activation schedule
 
     def _update_time_averaged_level(self):
         now = self.env.now
@@ -74,30 +81,67 @@ class FleetStore(Store):
         self._last_level_change_time = now
         self._last_num_items = len(self.items)+len(self.ready_items)
         
-        total_time = now
+        total_time = now - self._stats_start_time
         self.time_averaged_num_of_items_in_store = (
             self._weighted_sum / total_time if total_time > 0 else 0.0
         )
 
-    def fleet_activation_process(self,):
+    def reset_statistics(self):
         """
-        Process to activate the fleet when items are available but not equivalent to self.capacity(level not achieved).
-        This process waits for the activate_fleet event to be triggered.
+        Restart the time-averaged level at the current time. The items in the store are kept and
+        count from now on.
         """
-        while True:
-            timeout_event = self.env.timeout(self.delay)
-            event_list= [timeout_event, self.activate_fleet]
-            yield self.env.any_of(event_list)
-            
-            print(f"T={self.env.now:.2f}: Fleet activation process triggered.")
-            
-            if self.items:
-                print(f"T={self.env.now:.2f}: Fleet activated with {len(self.items)} items ready.")
-                self.env.process(self.move_to_ready_items(self.items))
-                #self.env.process(self.move_to_ready_items(self.items))
-                if self.activate_fleet.triggered:
-                    #print("yes")
-                    self.activate_fleet = self.env.event()  # Reset the event for next activation
+        self._update_time_averaged_level()
+        self._stats_start_time = self.env.now
+        self._weighted_sum = 0.0
+        self.time_averaged_num_of_items_in_store = 0.0
+
+    def _arm_activation_timer(self):
+        """
+        Arm the timer that activates the fleet at the next instant of the activation schedule. It is armed
+        when the first item arrives at an idle fleet, so an empty fleet does not schedule any event.
+
+        The schedule is the one of the periodic activation process the store used to run: an instant every
+        `delay` time units from the creation of the store, restarted whenever the fleet is activated by
+        reaching its capacity. The instants that passed while the fleet was idle are skipped here instead
+        of being scheduled as events.
+        """
+        now = self.env.now
+        # advance by repeated additions, as the periodic process did, so the instants are the same floats
+        while self._next_activation < now:
+            self._next_activation += self.delay
+        self._activation_timer = self.env.timeout(self._next_activation - now)
+        self._activation_timer.callbacks.append(self._on_activation_timer)
+
+    def _cancel_activation_timer(self):
+        if self._activation_timer is not None:
+            # the timeout stays in the event queue but no longer activates the fleet
+            self._activation_timer.callbacks.remove(self._on_activation_timer)
+            self._activation_timer = None
+
+    def _on_activation_timer(self, event):
+        self._activation_timer = None
+        self._activate_fleet()
+
+    def _activate_fleet(self):
+        """
+        Activate the fleet to move all the items waiting in the store. This happens when the target
+        capacity is reached or at the next instant of the activation schedule, whichever is first. Either
+        way the schedule restarts: its next instant is `delay` time units from now.
+
+        Each activation moves exactly the items that were waiting when it happened, in the order they were
+        put. The periodic process the store used to run handed its move the list of items of the store
+        itself, so a move could skip items of its batch, which were then delivered by another move, and
+        also took the items put during its transit. This changes which items a move delivers, and so the
+        order items leave a fleet that moves batches of several items.
+        """
+        self._cancel_activation_timer()
+        self._next_activation = self.env.now + self.delay
+        items = self._waiting_items
+        self._waiting_items = []
+        if self.trace:
+            self.trace.info("Fleet activated with %s items ready.", len(items))
+        self.env.process(self.move_to_ready_items(items))
 
     def reserve_put(self, priority=0):
         """
@@ -123,16 +167,36 @@ class FleetStore(Store):
         event.requesting_process = self.env.active_process  # Process making the reservation
         event.priority_to_put = priority  # Priority for sorting reservations
 
-        # Add the event to the reservation queue and sort by priority
-        self.reserve_put_queue.append(event)
-        self.reserve_put_queue.sort(key=lambda e: e.priority_to_put)
+        # Add the event to the reservation queue (ordered by priority)
+        self.reserve_put_queue.push(event, event.priority_to_put)
 
         # Attempt to process reservations
         self._trigger_reserve_put(event)
 
         return event
 
+    def reserve_put_many(self, quantity, priority=0):
+        """
+        Create a reservation request to put `quantity` items into the store at once.
+
+        The request is queued like a `reserve_put` request and succeeds when space for all the items is available.
+        The items are then put with `put_many`.
+
+        Args:
+            quantity (int): Number of items to reserve space for.
+            priority (int, optional): The priority level of the reservation request.
+                                      Lower values indicate higher priority. Defaults to 0.
+
+        Returns:
+            event (simpy.Event): A reservation event that will succeed when space for all the items is available.
 
+        Raises:
+            ValueError: If quantity is not a positive integer or exceeds the capacity of the store.
+        """
+        event = batch_event(self, quantity, priority)
+        self.reserve_put_queue.push(event, event.priority_to_put)
+        self._trigger_reserve_put(event)
+        return event
 
     def _trigger_reserve_put(self, event):
         """
@@ -148,15 +212,12 @@ class FleetStore(Store):
             RuntimeError: If an event expected to be in `reserve_put_queue` is not found
                           when attempting to remove it after successful processing.
         """
-        idx=0
-
-        while idx < len(self.reserve_put_queue):
-
-          reserve_put_event = self.reserve_put_queue[idx]
+        while self.reserve_put_queue:
+          reserve_put_event = self.reserve_put_queue.peek()
           proceed = self._do_reserve_put(reserve_put_event)
           if not reserve_put_event.triggered:
-            idx += 1
-          elif self.reserve_put_queue.pop(idx) != reserve_put_event:
+            break
+          if self.reserve_put_queue.pop() is not reserve_put_event:
             raise RuntimeError('Reserve put queue invariant violated')
 
           if not proceed:
@@ -183,7 +244,12 @@ class FleetStore(Store):
 
         """
         # Check if there's enough space to reserve
-        if len(self.reservations_put) + len(self.items) +len(self.ready_items) < self.capacity:
+        quantity = getattr(event, "quantity", None)
+        if quantity is not None:
+            # batch reservation: granted only when space for all its items is available
+            if len(self.reservations_put) + len(self.items) + len(self.ready_items) + quantity <= self.capacity:
+                self.reservations_put.extend(grant_batch(event))
+        elif len(self.reservations_put) + len(self.items) +len(self.ready_items) < self.capacity:
             self.reservations_put.append(event)  # Add reservation
             event.succeed()
             # Log the success of the reservation
@@ -224,6 +290,12 @@ class FleetStore(Store):
         self.reserve_put_queue.remove(put_event_to_cancel)
         self._trigger_reserve_put(None)#if t is removed, then a waiting event can be succeeded, if any
         proceed = True
+      #releasing all the space held by a granted batch reservation
+      elif getattr(put_event_to_cancel, "slots", None) is not None:
+        slots = set(take_batch(put_event_to_cancel, self.env))
+        self.reservations_put = [event for event in self.reservations_put if event not in slots]
+        self._trigger_reserve_put(None)
+        proceed = True
       #checking and removing the event if it is already yielded and is present in the reservations_put
       elif put_event_to_cancel in self.reservations_put:
         self.reservations_put.remove(put_event_to_cancel)
@@ -244,7 +316,19 @@ class FleetStore(Store):
             self._trigger_reserve_get(None)
             return True
 
-        # Case 2: already yielded reservation
+        # Case 2: granted batch reservation
+        if getattr(get_event_to_cancel, "slots", None) is not None:
+            slots = set(take_batch(get_event_to_cancel, self.env))
+            items = self._release_slots(slots)
+            # the reserved items are the first items of ready_items; put the released ones right after
+            # the remaining reserved block, so they are handed out next again in their order
+            released = {id(item) for item in items}
+            self.ready_items = [item for item in self.ready_items if id(item) not in released]
+            self.ready_items[len(self.reserved_events):len(self.reserved_events)] = items
+            self._trigger_reserve_get(None)
+            return True
+
+        # Case 3: already yielded reservation
         if get_event_to_cancel in self.reservations_get:
             # 1) Remove from active reservations
             self.reservations_get.remove(get_event_to_cancel)
@@ -362,13 +446,33 @@ class FleetStore(Store):
         #event.priority_to_get = (priority, self._env.now)
         event.priority_to_get = priority
 
-        #sorting the list based on priority after appending the new event
-        self.reserve_get_queue.append(event)
-        self.reserve_get_queue.sort(key=lambda e: e.priority_to_get)
+        self.reserve_get_queue.push(event, event.priority_to_get)
 
         self._trigger_reserve_get(event)
         return event
 
+    def reserve_get_many(self, quantity, priority=0):
+        """
+        Create a reservation request to retrieve `quantity` items from the store at once.
+
+        The request is queued like a `reserve_get` request and succeeds when `quantity` unreserved items are ready.
+        The items are retrieved with `get_many`.
+
+        Args:
+            quantity (int): Number of items to reserve.
+            priority (int, optional): The priority level of the reservation request.
+                                      Lower values indicate higher priority. Defaults to 0.
+
+        Returns:
+            event (simpy.Event): A reservation event that will succeed when all the items are available.
+
+        Raises:
+            ValueError: If quantity is not a positive integer or exceeds the capacity of the store.
+        """
+        event = batch_event(self, quantity, priority)
+        self.reserve_get_queue.push(event, event.priority_to_get)
+        self._trigger_reserve_get(event)
+        return event
 
     def _trigger_reserve_get(self, event):
         """
@@ -385,13 +489,12 @@ class FleetStore(Store):
             RuntimeError: If an event expected to be in `reserve_get_queue` is not
                           found when attempting to remove it after successful processing.
         """
-        idx=0
-        while idx < len(self.reserve_get_queue):
-          reserve_get_event = self.reserve_get_queue[idx]
+        while self.reserve_get_queue:
+          reserve_get_event = self.reserve_get_queue.peek()
           proceed = self._do_reserve_get(reserve_get_event)
           if not reserve_get_event.triggered:
-            idx += 1
-          elif self.reserve_get_queue.pop(idx) != reserve_get_event:
+            break
+          if self.reserve_get_queue.pop() is not reserve_get_event:
             raise RuntimeError('Reserve get queue invariant violated')
 
           if not proceed:
@@ -412,8 +515,17 @@ class FleetStore(Store):
 
 
         """
+        quantity = getattr(event, "quantity", None)
+        if quantity is not None:
+            # batch reservation: granted only when enough unreserved items are ready
+            if len(self.reservations_get) + quantity <= len(self.ready_items):
+                slots = grant_batch(event)
+                j = len(self.reserved_events)
+                self.reservations_get.extend(slots)
+                self.reserved_events.extend(slots)
+                self.reserved_items.extend(self.ready_items[j:j + quantity])
         #if there are items that are unreserved, the create a reservation by adding that event to the reservations_get list
-        if len(self.reservations_get) < len(self.ready_items):
+        elif len(self.reservations_get) < len(self.ready_items):
             # Successful reservation; add to reservations list
             self.reservations_get.append(event)
             event.succeed()  # Immediately succeed the event
@@ -535,6 +647,40 @@ class FleetStore(Store):
         #yield self.env.timeout(self.transit_delay)  # Simulate delay for the fleet to transport the item to the destination node
         return assigned_item
 
+    def get_many(self, get_event):
+        """
+        Retrieve all the items of a batch reservation made with `reserve_get_many`.
+
+        Args:
+            get_event (simpy.Event): The batch reservation event.
+
+        Returns:
+            items (list): The retrieved items, in the order they were reserved.
+
+        Raises:
+            RuntimeError: If the event is not a granted batch reservation of the active process.
+        """
+        items = self._release_slots(set(take_batch(get_event, self.env)))
+        taken = {id(item) for item in items}
+        self.ready_items = [item for item in self.ready_items if id(item) not in taken]
+        self._update_time_averaged_level()
+        self._trigger_reserve_put(None)
+        return items
+
+    def _release_slots(self, slots):
+        """
+        Remove the slots of a batch get reservation from the reservation lists in one pass.
+
+        Returns:
+            list: The items reserved for the slots, in order.
+        """
+        items = [item for event, item in zip(self.reserved_events, self.reserved_items) if event in slots]
+        kept = [(event, item) for event, item in zip(self.reserved_events, self.reserved_items) if event not in slots]
+        self.reserved_events = [event for event, _ in kept]
+        self.reserved_items = [item for _, item in kept]
+        self.reservations_get = [event for event in self.reservations_get if event not in slots]
+        return items
+
     def _do_get1(self, get_event):
         """
         Execute a `get` operation from the store while ensuring valid reservations.
@@ -685,14 +831,48 @@ class FleetStore(Store):
         if len(self.items) + len(self.ready_items) < self.capacity:
            
             self.items.append(item)
+            self._waiting_items.append(item)
             self._update_time_averaged_level()
             self._trigger_reserve_get(None)
             if len(self.items) + len(self.ready_items) == self.capacity:
-                #self.activate_fleet = self.env.event()
-                if not self.activate_fleet.triggered:
-                    self.activate_fleet.succeed()  # Trigger fleet activation if capacity is reached
+                self._activate_fleet()  # Activate the fleet as the capacity is reached
+            elif self._activation_timer is None:
+                self._arm_activation_timer()
             return True  # Successfully added item
 
+    def put_many(self, put_event, items):
+        """
+        Put all the items of a batch reservation made with `reserve_put_many` into the store.
+
+        The level is updated once for the whole batch, and the fleet is activated if the batch fills it.
+
+        Args:
+            put_event (simpy.Event): The batch reservation event.
+            items (list): The items, one per reserved unit.
+
+        Returns:
+            proceed (bool): True once the items are added.
+
+        Raises:
+            RuntimeError: If the event is not a granted batch reservation of the active process.
+            ValueError: If the number of items differs from the reserved quantity.
+        """
+        quantity = getattr(put_event, "quantity", None)
+        if quantity is not None and len(items) != quantity:
+            raise ValueError(f"put_many expects {quantity} items, got {len(items)}")
+        slots = set(take_batch(put_event, self.env))
+        self.reservations_put = [event for event in self.reservations_put if event not in slots]
+
+        self.items.extend(items)
+        self._waiting_items.extend(items)
+        self._update_time_averaged_level()
+        self._trigger_reserve_get(None)
+        if len(self.items) + len(self.ready_items) == self.capacity:
+            self._activate_fleet()  # Activate the fleet as the capacity is reached
+        elif self._activation_timer is None:
+            self._arm_activation_timer()
+        return True
+
     def move_to_ready_items(self, items):
         """
         Move items from the store to the ready_items list after a put operation.
@@ -702,7 +882,8 @@ class FleetStore(Store):
         # Move items to the ready_items list
         if items:
             
-            print(f"T={self.env.now:.2f}: Moving items to ready_items.")
+            if self.trace:
+                self.trace.info("Moving items to ready_items.")
             #START=self.env.now
             yield self.env.timeout(self.transit_delay)
             #print("WAITED FOR TRANSIT_DELAY BEFORE MOVING", self.env.now-START)
@@ -710,8 +891,12 @@ class FleetStore(Store):
             
             for item in items:
                 
-                item_index = self.items.index(item)
-                item_to_put = self.items.pop(item_index)  # Remove the first item
+                # items are moved in the order they were put, so check the head first
+                if self.items[0] is item:
+                    item_to_put = self.items.pop(0)
+                else:
+                    self.items.remove(item)
+                    item_to_put = item
                
                 if len(self.ready_items) < self.capacity:
                     self.ready_items.append(item_to_put)
@@ -722,7 +907,8 @@ class FleetStore(Store):
                 else:
                     raise RuntimeError("Total number of items in the store exceeds capacity. Cannot move item to ready_items.")
             
-            print(f"T={self.env.now:.2f}: Fleetstore moved items to ready_items.")
+            if self.trace:
+                self.trace.info("Fleetstore moved items to ready_items.")
                 
 
 # import simpy
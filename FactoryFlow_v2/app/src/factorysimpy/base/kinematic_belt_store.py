@@ -0,0 +1,513 @@
+import math
+from collections import deque
+
+from simpy.resources.store import Store
+from factorysimpy.base.reservation_queue import ReservationQueue
+from factorysimpy.base import belt_occupancy
+
+
+class KinematicBeltStore(Store):
+    """
+        A reservable conveyor belt store that moves items analytically instead of running a process per item.
+
+        It offers the same reserve_put/put/reserve_get/get interface as `BeltStore` and can be used by
+        `ConveyorBelt` in its place. Items enter the belt at position 0 and become ready when they reach the
+        end of the belt at position `belt_length`.
+
+        The belt keeps an odometer, the distance the belt surface has travelled since the start of the
+        simulation. It advances at `speed` while the belt runs. Every item stores the odometer reading at
+        the time it entered the belt (its entry offset), so the position of an item is the difference between
+        the odometer and its offset. Since items enter and leave in FIFO order, the offsets form a sorted array
+        and only the exit of the head item has to be scheduled. The exit time is computed in closed form and
+        a single timeout is kept pending for it.
+
+        When the belt stalls in non-accumulating mode the odometer is frozen and when it resumes the odometer
+        continues from the frozen value, so a stall or resume is an O(1) time shift for all the items on the belt.
+
+        When the belt stalls in accumulating mode the odometer keeps running and the items move until they
+        reach the item ahead of them. The k-th item from the head is limited to the position
+        `belt_length - (r + k) * item_length`, where r is the number of ready items at the time of the stall.
+        On resume, the items that reached their limit form a prefix of the belt (a train). Their offsets are
+        re-based lazily by recording the train as (first item, last item, base offset) instead of updating
+        every item, so a resume costs O(log n).
+
+        In non-accumulating mode the puts and gets happen at the same times and in the same order as with
+        `BeltStore`. In accumulating mode `BeltStore` interrupts the items of a stalled belt at slot boundaries,
+        so an item that has only partly advanced into a slot stops there instead of moving up to the item ahead.
+        Here items close the gap continuously, so the entry of the belt can clear and a put can be granted
+        earlier, by less than the time an item needs to travel one item length. Throughput is the same in
+        practice and the time-averaged number of items on the belt differs by a fraction of a percent.
+
+        Attributes:
+           reserve_put_queue (ReservationQueue): Queue for managing reserve_put reservations
+           reservations_put (list): List of successful put reservations
+           reserve_get_queue (ReservationQueue): Queue for managing reserve_get reservations
+           reservations_get (dict): Maps each successful get reservation to the ready item reserved for it
+           ready_items (list): Items that reached the end of the belt and are waiting to be taken out
+           unreserved_items (deque): Ready items that are not yet associated with a get reservation
+           belt_length (float): Length of the belt, capacity * item_length
+        """
+
+    _EPSILON = 1e-9
+
+    def __init__(self, env, capacity=float('inf'), speed=1, accumulation_mode_indicator=True, item_length=1):
+        """
+        Initializes a kinematic belt store with reservations.
+
+        Args:
+         env (simpy.Environment): The simulation environment.
+         capacity (int, optional): The maximum number of items the store can hold.
+                                    Defaults to infinity.
+         speed (float, optional): The speed of the conveyor belt. Defaults to 1.
+         accumulation_mode_indicator (bool, optional): Indicates if the belt is in accumulation mode.
+                                                       Defaults to True.
+         item_length (float, optional): The length of an item on the belt. Defaults to 1.
+
+        Raises:
+            ValueError: If speed or item_length is not positive or if capacity is not finite.
+        """
+        if speed <= 0:
+            raise ValueError("speed must be greater than 0")
+        if item_length <= 0:
+            raise ValueError("item_length must be greater than 0")
+        if capacity == float('inf'):
+            raise ValueError("capacity of a kinematic belt must be finite")
+        super().__init__(env, capacity)
+        self.env = env
+        self.trace = None # Trace handle installed by utils.tracer.Tracer; None when tracing is off.
+
+        self.speed = speed
+        self.item_length = item_length
+        self.belt_length = capacity * item_length
+        self.reserve_put_queue = ReservationQueue()  # Queue for managing reserve_put reservations
+        self.reservations_put = []   # List of successful put reservations
+        self.reserve_get_queue = ReservationQueue()  # Queue for managing reserve_get reservations
+        self.reservations_get = {}   # Successful get reservations mapped to their reserved item
+        self.ready_items = []  # Maintains the items ready to be taken out
+        self.unreserved_items = deque()  # Ready items that are not reserved yet
+        self._stats_start_time = self.env.now  # Start of the period the time-averaged level is computed over
+        self._last_level_change_time = self.env.now
+        self._last_num_items = 0
+        self._weighted_sum = 0.0
+        self.time_averaged_num_of_items_in_store = 0.0  # Time-averaged number of items in the store
+        self.noaccumulation_mode_on = False # to control if the belt is in noaccumulation mode
+        self.accumulation_mode_indicator = accumulation_mode_indicator # to indicate if the belt is in accumulation mode or not
+        self.ready_item_event = self.env.event()
+
+        # Kinematic state of the belt
+        self._odometer = 0.0  # distance travelled by the belt surface until _odometer_time
+        self._odometer_time = self.env.now
+        self._offsets = []  # odometer reading at entry, parallel to self.items
+        self._departed = 0  # number of items that left the belt, the sequence number of the head item
+        self._trains = []  # [first_seq, end_seq, base_offset] of re-based items, end_seq decreasing
+        self._stalled = False
+        self._frozen = False  # True while the belt is stopped in non-accumulating mode
+        self._stall_ready = 0  # number of ready items when the belt stalled
+        self._exit_timer = None
+        self._entry_timer = None
+
+    def _update_time_averaged_level(self):
+        now = self.env.now
+        interval = now - self._last_level_change_time
+        self._weighted_sum += self._last_num_items * interval
+        self._last_level_change_time = now
+        self._last_num_items = len(self.items)+len(self.ready_items)
+
+        total_time = now - self._stats_start_time
+        self.time_averaged_num_of_items_in_store = (
+            self._weighted_sum / total_time if total_time > 0 else 0.0
+        )
+
+    def reset_statistics(self):
+        """
+        Restart the time-averaged level at the current time. The items in the store are kept and
+        count from now on.
+        """
+        self._update_time_averaged_level()
+        self._stats_start_time = self.env.now
+        self._weighted_sum = 0.0
+        self.time_averaged_num_of_items_in_store = 0.0
+
+    def _odometer_now(self):
+        """Return the distance travelled by the belt surface until now."""
+        if self._frozen:
+            return self._odometer
+        return self._odometer + self.speed * (self.env.now - self._odometer_time)
+
+    def _offset(self, k):
+        """Return the effective entry offset of the k-th item from the head of the belt."""
+        seq = self._departed + k
+        trains = self._trains
+        for i in range(len(trains) - 1, -1, -1):
+            first_seq, end_seq, base = trains[i]
+            if seq < end_seq:
+                return base + (seq - first_seq) * self.item_length
+        return self._offsets[k]
+
+    def _limit(self, k):
+        """Return the farthest position the k-th item can reach during an accumulating stall."""
+        return self.belt_length - (self._stall_ready + k) * self.item_length
+
+    def _position(self, k, odometer=None):
+        """
+        Return the position of the k-th item from the head of the belt.
+
+        Args:
+            k (int): Index of the item in `items`.
+            odometer (float, optional): Odometer reading to use. Defaults to the current reading.
+
+        Returns:
+            float: Distance of the item from the entry of the belt.
+        """
+        if odometer is None:
+            odometer = self._odometer_now()
+        position = odometer - self._offset(k)
+        if self._stalled and not self._frozen:
+            position = min(position, self._limit(k))
+        return position
+
+    def _schedule_exit(self):
+        """Schedule the exit of the head item, replacing any pending exit."""
+        self._cancel_timer(self._exit_timer, self._on_exit)
+        self._exit_timer = None
+        if not self.items or self._stalled:
+            return
+        remaining = self.belt_length - self._position(0)
+        delay = remaining / self.speed if remaining > self._EPSILON else 0
+        self._exit_timer = self.env.timeout(delay)
+        self._exit_timer.callbacks.append(self._on_exit)
+
+    def _arm_entry_timer(self):
+        """Schedule a retry of the pending reserve_put requests for when the tail item clears the entry."""
+        if self._entry_timer is not None or not self.reserve_put_queue or not self.items or self._frozen:
+            return
+        if self._stalled and self._limit(len(self.items) - 1) < self.item_length - self._EPSILON:
+            return
+        remaining = self.item_length - self._position(len(self.items) - 1)
+        if remaining <= self._EPSILON:
+            return
+        self._entry_timer = self.env.timeout(remaining / self.speed)
+        self._entry_timer.callbacks.append(self._on_entry_timer)
+
+    def _cancel_timer(self, timer, callback):
+        if timer is not None and not timer.processed and callback in timer.callbacks:
+            timer.callbacks.remove(callback)
+
+    def _on_entry_timer(self, event):
+        if event is not self._entry_timer:
+            return
+        self._entry_timer = None
+        self._trigger_reserve_put(None)
+
+    def _on_exit(self, event):
+        """Move the head item to ready_items when it reaches the end of the belt."""
+        if event is not self._exit_timer:
+            return
+        self._exit_timer = None
+        item = self.items.pop(0)
+        self._offsets.pop(0)
+        self._departed += 1
+        while self._trains and self._trains[-1][1] <= self._departed:
+            self._trains.pop()
+
+        self.ready_items.append(item[0])
+        self.unreserved_items.append(item[0])
+        item[0].conveyor_ready_item_entry_time = self.env.now
+        if self.trace:
+            self.trace.debug("KinematicBeltStore: item %s moved to ready_items", item[0].id)
+        if not self.ready_item_event.triggered:
+            self.ready_item_event.succeed()
+        self._trigger_reserve_get(None)
+        self._trigger_reserve_put(None)
+        self._schedule_exit()
+
+    def stall(self, reason="Stall"):
+        """
+        Stop the belt. In non-accumulating mode all items stop where they are; in accumulating mode the
+        items keep moving until they reach the item ahead of them.
+
+        Args:
+            reason (str): Reason for the stall, used for tracing.
+        """
+        if self._stalled:
+            return
+        if self.trace:
+            self.trace.debug("KinematicBeltStore stalled - %s", reason)
+        self._stalled = True
+        self._stall_ready = len(self.ready_items)
+        self._cancel_timer(self._exit_timer, self._on_exit)
+        self._exit_timer = None
+        if self.noaccumulation_mode_on or not self.accumulation_mode_indicator:
+            self._odometer = self._odometer_now()
+            self._odometer_time = self.env.now
+            self._frozen = True
+            self._cancel_timer(self._entry_timer, self._on_entry_timer)
+            self._entry_timer = None
+
+    def resume(self):
+        """Restart the belt after a stall and reschedule the exit of the head item."""
+        if not self._stalled:
+            return
+        if self.trace:
+            self.trace.debug("KinematicBeltStore resumed")
+        odometer = self._odometer_now()
+        if self._frozen:
+            self._odometer_time = self.env.now
+            self._frozen = False
+        else:
+            # Items that reached their limit form a prefix; find it and re-base it as one train.
+            lo, hi = 0, len(self.items)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if odometer - self._offset(mid) >= self._limit(mid) - self._EPSILON:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            capped = lo
+            if capped:
+                end_seq = self._departed + capped
+                base = odometer - self._limit(0)
+                while self._trains and self._trains[-1][1] <= end_seq:
+                    self._trains.pop()
+                self._trains.append([self._departed, end_seq, base])
+        self._stalled = False
+        self._schedule_exit()
+        self._trigger_reserve_put(None)
+
+    def handle_new_item_during_interruption(self, item):
+        """
+        Kept for interface compatibility with `BeltStore`. Items put on a stalled belt follow the same
+        kinematics as the other items, so nothing has to be done.
+        """
+        return None
+
+    def reserve_put(self):
+        """
+        Create a reservation request to put an item into the store.
+
+        Returns:
+            event (simpy.Event): A reservation event that will succeed when space is available at the entry.
+        """
+        event = self.env.event()
+        event.resourcename = self  # Store reference
+        event.requesting_process = self.env.active_process  # Process making the reservation
+
+        self.reserve_put_queue.push(event)
+        self._trigger_reserve_put(event)
+        return event
+
+    def _trigger_reserve_put(self, event):
+        """
+        Process pending reservation requests for putting items into the store.
+
+        Raises:
+            RuntimeError: If the queue head changes while a reservation is processed.
+        """
+        while self.reserve_put_queue:
+          reserve_put_event = self.reserve_put_queue.peek()
+          proceed = self._do_reserve_put(reserve_put_event)
+          if not reserve_put_event.triggered:
+            break
+          if self.reserve_put_queue.pop() is not reserve_put_event:
+            raise RuntimeError('Reserve put queue invariant violated')
+
+          if not proceed:
+            break
+        self._arm_entry_timer()
+
+    def _do_reserve_put(self, event):
+        """
+        Grants a `reserve_put` request if there is capacity and the entry of the belt is clear.
+
+        The entry is clear when no other put is pending and the last item on the belt has moved at least one
+        item length. A non-accumulating belt also requires the exit to be clear. A put is not granted while
+        the head item is at the exit but has not been moved to ready_items yet.
+
+        Args:
+            event (simpy.Event): The event associated with the reservation request.
+        """
+        if len(self.reservations_put) + len(self.items) + len(self.ready_items) >= self.capacity:
+            return
+        if self.items:
+            if self.reservations_put:
+                return
+            if not self.accumulation_mode_indicator and self.ready_items:
+                return
+            odometer = self._odometer_now()
+            if self._position(len(self.items) - 1, odometer) < self.item_length - self._EPSILON:
+                return
+            if self._exit_timer is not None and self._position(0, odometer) >= self.belt_length - self._EPSILON:
+                return
+        self.reservations_put.append(event)
+        event.succeed()
+
+    def reserve_put_cancel(self, put_event_to_cancel):
+      """
+        Cancel a previously made `reserve_put` request.
+
+        Args:
+            put_event_to_cancel (simpy.Event): The reservation event that needs to be canceled.
+
+        Returns:
+           proceed (bool): True if the reservation was successfully canceled.
+
+        Raises:
+            RuntimeError: If the specified event does not exist in `reserve_put_queue`
+                          or `reservations_put`.
+        """
+      if put_event_to_cancel in self.reserve_put_queue:
+        self.reserve_put_queue.remove(put_event_to_cancel)
+      elif put_event_to_cancel in self.reservations_put:
+        self.reservations_put.remove(put_event_to_cancel)
+      else:
+        raise RuntimeError("No matching event in reserve_put_queue or reservations_put for this process")
+      self._trigger_reserve_put(None)
+      return True
+
+    def reserve_get(self):
+        """
+        Create a reservation request to retrieve an item from the store.
+
+        Returns:
+           event (simpy.Event): A reservation event that will succeed when an item becomes ready.
+        """
+        event = self.env.event()
+        event.resourcename = self
+        event.requesting_process = self.env.active_process  # Associate event with the current process
+
+        self.reserve_get_queue.push(event)
+        self._trigger_reserve_get(event)
+        return event
+
+    def _trigger_reserve_get(self, event):
+        """
+        Process pending `reserve_get` requests to fulfill reservations.
+
+        Raises:
+            RuntimeError: If the queue head changes while a reservation is processed.
+        """
+        while self.reserve_get_queue:
+          reserve_get_event = self.reserve_get_queue.peek()
+          proceed = self._do_reserve_get(reserve_get_event)
+          if not reserve_get_event.triggered:
+            break
+          if self.reserve_get_queue.pop() is not reserve_get_event:
+            raise RuntimeError('Reserve get queue invariant violated')
+
+          if not proceed:
+            break
+
+    def _do_reserve_get(self, event):
+        """
+        Reserve the oldest unreserved ready item for a `reserve_get` request, if there is one.
+
+        Args:
+            event (simpy.Event): The event associated with the reservation request.
+        """
+        if self.unreserved_items:
+            self.reservations_get[event] = self.unreserved_items.popleft()
+            event.succeed()
+
+    def reserve_get_cancel(self, get_event_to_cancel):
+        """
+        Cancel a previously made `reserve_get` request.
+
+        Args:
+            get_event_to_cancel (simpy.Event): The reservation event that needs to be canceled.
+
+        Returns:
+           proceed (bool): True if the reservation was successfully canceled.
+
+        Raises:
+            RuntimeError: If the specified event does not exist in `reserve_get_queue`
+                          or `reservations_get`.
+        """
+        if get_event_to_cancel in self.reserve_get_queue:
+            self.reserve_get_queue.remove(get_event_to_cancel)
+        elif get_event_to_cancel in self.reservations_get:
+            self.unreserved_items.appendleft(self.reservations_get.pop(get_event_to_cancel))
+        else:
+            raise RuntimeError("No matching event in reserve_get_queue or reservations_get")
+        self._trigger_reserve_get(None)
+        return True
+
+    def get(self, get_event):
+        """
+        Retrieve the item reserved by a `reserve_get` request.
+
+        Args:
+            get_event (simpy.Event): The reservation event associated with the request.
+
+        Returns:
+            item (Object): The retrieved item.
+
+        Raises:
+            RuntimeError: If there is no matching reservation for the active process.
+        """
+        if get_event not in self.reservations_get or get_event.requesting_process != self.env.active_process:
+            raise RuntimeError(
+                f"Time {self.env.now:.2f}, no matching reservation for process {self.env.active_process}."
+            )
+        item = self.reservations_get.pop(get_event)
+        self.ready_items.remove(item)
+        self._update_time_averaged_level()
+        self._trigger_reserve_put(None)
+        return item
+
+    def put(self, put_event, item):
+        """
+        Put an item at the entry of the belt after a successful `reserve_put`.
+
+        Args:
+            put_event (simpy.Event): The event corresponding to the reservation.
+            item (tuple): The (item, delay) pair to be added to the belt. The delay is not used since
+                          the exit time follows from the position of the item.
+
+        Returns:
+            proceed (bool): True if the put operation succeeded.
+
+        Raises:
+            RuntimeError: If there is no matching reservation for the active process or the belt is full.
+        """
+        if put_event not in self.reservations_put or put_event.requesting_process != self.env.active_process:
+            raise RuntimeError(
+                f"Time {self.env.now:.2f}, No matching reservation found "
+                f"for process {self.env.active_process} in reservations_put."
+            )
+        self.reservations_put.remove(put_event)
+        if len(self.items) + len(self.ready_items) >= self.capacity:
+            raise RuntimeError(f"No space on the belt for {item}")
+
+        item[0].total_interruption_time = 0
+        item[0].interruption_start_time = None
+        self.items.append(item)
+        self._offsets.append(self._odometer_now())
+        self._update_time_averaged_level()
+        if self.trace:
+            self.trace.debug("KinematicBeltStore: putting item on belt %s", item[0].id)
+        if len(self.items) == 1:
+            self._schedule_exit()
+        self._trigger_reserve_get(None)
+        self._arm_entry_timer()
+        return True
+
+    def _get_belt_pattern(self):
+        """
+        Generate a pattern string representing the conveyor occupancy.
+        '*' represents an item, '_' represents empty space.
+
+        Returns:
+            tuple: (belt_pattern: str, belt_item_rep: list)
+        """
+        occupancy = 0
+        belt_item_rep = ['-'] * self.capacity
+        placed = [(item, self.capacity - 1) for item in self.ready_items]
+        odometer = self._odometer_now()
+        for k, item in enumerate(self.items):
+            placed.append((item[0], math.ceil(self._position(k, odometer) / self.item_length) - 1))
+        for item, pos in placed:
+            slot = belt_occupancy.highest_free_slot(occupancy, min(pos, self.capacity - 1))
+            if slot >= 0:
+                occupancy = belt_occupancy.occupy(occupancy, slot)
+                belt_item_rep[slot] = (getattr(item, "id", str(id(item))), slot)
+        return belt_occupancy.to_pattern(occupancy, self.capacity), belt_item_rep
@@ -1,5 +1,6 @@
 import simpy
 from simpy.resources.store import FilterStore
+from factorysimpy.base.reservation_queue import ReservationQueue
 
 class ReservablePriorityReqFilterStore(FilterStore):
     """
@@ -29,9 +30,9 @@ class ReservablePriorityReqFilterStore(FilterStore):
 
         Attributes:
            reserved_events (list):  Maintains events corresponding to reserved items to preserve item order by index
-           reserve_put_queue (list): Queue for managing reserve_put reservations
+           reserve_put_queue (ReservationQueue): Queue for managing reserve_put reservations
            reservations_put (list): List of successful put reservations
-           reserve_get_queue (list): Queue for managing reserve_get reservations
+           reserve_get_queue (ReservationQueue): Queue for managing reserve_get reservations
            reservations_get (list):List of successful get reservations 
            trigger_delay (int): Delay time after which a trigger_reserve_get is called to allow waiting get calls to succeed. """
 
@@ -46,11 +47,12 @@ class ReservablePriorityReqFilterStore(FilterStore):
         """
         super().__init__(env, capacity)
         self.env = env
+        self.trace = None # Trace handle installed by utils.tracer.Tracer; None when tracing is off.
 
         self.trigger_delay = trigger_delay
-        self.reserve_put_queue = []  # Queue for managing reserve_put reservations
+        self.reserve_put_queue = ReservationQueue()  # Queue for managing reserve_put reservations
         self.reservations_put = []   # List of successful put reservations
-        self.reserve_get_queue = []  # Queue for managing reserve_get reservations
+        self.reserve_get_queue = ReservationQueue()  # Queue for managing reserve_get reservations
         self.reservations_get = []   # List of successful get reservations
         self.reserved_events = []     # Maintains events corresponding to reserved items to preserve item order
 
@@ -78,9 +80,8 @@ class ReservablePriorityReqFilterStore(FilterStore):
         event.requesting_process = self.env.active_process  # Process making the reservation
         event.priority_to_put = priority  # Priority for sorting reservations
 
-        # Add the event to the reservation queue and sort by priority
-        self.reserve_put_queue.append(event)
-        self.reserve_put_queue.sort(key=lambda e: e.priority_to_put)
+        # Add the event to the reservation queue (ordered by priority)
+        self.reserve_put_queue.push(event, event.priority_to_put)
 
         # Attempt to process reservations
         self._trigger_reserve_put(event)
@@ -103,15 +104,12 @@ class ReservablePriorityReqFilterStore(FilterStore):
             RuntimeError: If an event expected to be in `reserve_put_queue` is not found
                           when attempting to remove it after successful processing.
         """
-        idx=0
-
-        while idx < len(self.reserve_put_queue):
-
-          reserve_put_event = self.reserve_put_queue[idx]
+        while self.reserve_put_queue:
+          reserve_put_event = self.reserve_put_queue.peek()
           proceed = self._do_reserve_put(reserve_put_event)
           if not reserve_put_event.triggered:
-            idx += 1
-          elif self.reserve_put_queue.pop(idx) != reserve_put_event:
+            break
+          if self.reserve_put_queue.pop() is not reserve_put_event:
             raise RuntimeError('Reserve put queue invariant violated')
 
           if not proceed:
@@ -281,9 +279,7 @@ class ReservablePriorityReqFilterStore(FilterStore):
             #print(f"T={self.env.now} filter is not None ")
             event.filter = filter
 
-        #sorting the list based on priority after appending the new event
-        self.reserve_get_queue.append(event)
-        self.reserve_get_queue.sort(key=lambda e: e.priority_to_get)
+        self.reserve_get_queue.push(event, event.priority_to_get)
 
         self._trigger_reserve_get(event)
         return event
@@ -304,13 +300,12 @@ class ReservablePriorityReqFilterStore(FilterStore):
             RuntimeError: If an event expected to be in `reserve_get_queue` is not
                           found when attempting to remove it after successful processing.
         """
-        idx=0
-        while idx < len(self.reserve_get_queue):
-          reserve_get_event = self.reserve_get_queue[idx]
+        while self.reserve_get_queue:
+          reserve_get_event = self.reserve_get_queue.peek()
           proceed = self._do_reserve_get(reserve_get_event)
           if not reserve_get_event.triggered:
-            idx += 1
-          elif self.reserve_get_queue.pop(idx) != reserve_get_event:
+            break
+          if self.reserve_get_queue.pop() is not reserve_get_event:
             raise RuntimeError('Reserve get queue invariant violated')
 
           if not proceed:
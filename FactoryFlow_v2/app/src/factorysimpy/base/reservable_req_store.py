@@ -4,6 +4,7 @@
 
 import simpy
 from simpy.resources.store import Store
+from factorysimpy.base.reservation_queue import ReservationQueue
 
 class ReservableReqStore(Store):
     """
@@ -29,9 +30,9 @@ class ReservableReqStore(Store):
 
         Attributes:
            reserved_events (list):  Maintains events corresponding to reserved items to preserve item order by index
-           reserve_put_queue (list): Queue for managing reserve_put reservations
+           reserve_put_queue (ReservationQueue): Queue for managing reserve_put reservations
            reservations_put (list): List of successful put reservations
-           reserve_get_queue (list): Queue for managing reserve_get reservations
+           reserve_get_queue (ReservationQueue): Queue for managing reserve_get reservations
            reservations_get (list):List of successful get reservations
         """
 
@@ -46,11 +47,13 @@ class ReservableReqStore(Store):
         """
         super().__init__(env, capacity)
         self.env = env
-        self.reserve_put_queue = []  # Queue for managing reserve_put reservations
+        self.trace = None # Trace handle installed by utils.tracer.Tracer; None when tracing is off.
+        self.reserve_put_queue = ReservationQueue()  # Queue for managing reserve_put reservations
         self.reservations_put = []   # List of successful put reservations
-        self.reserve_get_queue = []  # Queue for managing reserve_get reservations
+        self.reserve_get_queue = ReservationQueue()  # Queue for managing reserve_get reservations
         self.reservations_get = []   # List of successful get reservations
         self.reserved_events = []     # Maintains events corresponding to reserved items to preserve item order
+        self._stats_start_time = self.env.now  # Start of the period the time-averaged level is computed over
         self._last_level_change_time = self.env.now
         self._last_num_items = 0
         self._weighted_sum = 0.0
@@ -63,11 +66,21 @@ class ReservableReqStore(Store):
         self._last_level_change_time = now
         self._last_num_items = len(self.items)
         # Optionally, update stats in real time
-        total_time = now
+        total_time = now - self._stats_start_time
         self.time_averaged_num_of_items_in_store = (
             self._weighted_sum / total_time if total_time > 0 else 0.0
         )
 
+    def reset_statistics(self):
+        """
+        Restart the time-averaged level at the current time. The items in the store are kept and
+        count from now on.
+        """
+        self._update_time_averaged_level()
+        self._stats_start_time = self.env.now
+        self._weighted_sum = 0.0
+        self.time_averaged_num_of_items_in_store = 0.0
+
     def reserve_put(self):
         """
         Create a reservation request to put an item into the store.
@@ -90,7 +103,7 @@ class ReservableReqStore(Store):
         event.resourcename = self  # Store reference
         event.requesting_process = self.env.active_process  # Process making the reservation
       
-        self.reserve_put_queue.append(event)
+        self.reserve_put_queue.push(event)
         
 
         # Attempt to process reservations
@@ -114,15 +127,12 @@ class ReservableReqStore(Store):
             RuntimeError: If an event expected to be in `reserve_put_queue` is not found
                           when attempting to remove it after successful processing.
         """
-        idx=0
-
-        while idx < len(self.reserve_put_queue):
-
-          reserve_put_event = self.reserve_put_queue[idx]
+        while self.reserve_put_queue:
+          reserve_put_event = self.reserve_put_queue.peek()
           proceed = self._do_reserve_put(reserve_put_event)
           if not reserve_put_event.triggered:
-            idx += 1
-          elif self.reserve_put_queue.pop(idx) != reserve_put_event:
+            break
+          if self.reserve_put_queue.pop() is not reserve_put_event:
             raise RuntimeError('Reserve put queue invariant violated')
 
           if not proceed:
@@ -278,7 +288,7 @@ class ReservableReqStore(Store):
         
 
         
-        self.reserve_get_queue.append(event)
+        self.reserve_get_queue.push(event)
         
 
         self._trigger_reserve_get(event)
@@ -300,13 +310,12 @@ class ReservableReqStore(Store):
             RuntimeError: If an event expected to be in `reserve_get_queue` is not
                           found when attempting to remove it after successful processing.
         """
-        idx=0
-        while idx < len(self.reserve_get_queue):
-          reserve_get_event = self.reserve_get_queue[idx]
+        while self.reserve_get_queue:
+          reserve_get_event = self.reserve_get_queue.peek()
           proceed = self._do_reserve_get(reserve_get_event)
           if not reserve_get_event.triggered:
-            idx += 1
-          elif self.reserve_get_queue.pop(idx) != reserve_get_event:
+            break
+          if self.reserve_get_queue.pop() is not reserve_get_event:
             raise RuntimeError('Reserve get queue invariant violated')
 
           if not proceed:
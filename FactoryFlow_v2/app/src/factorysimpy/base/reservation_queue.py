@@ -0,0 +1,117 @@
+import heapq
+from itertools import count
+
+
+class ReservationQueue:
+    """
+        Priority queue of pending reservation events used by the reservable stores for their
+        `reserve_put_queue` and `reserve_get_queue`.
+
+        Events are kept in a binary heap ordered by (priority, arrival order), so requests with equal
+        priority are served in the order in which they were made, exactly as with the previous
+        append-and-sort list. Lower values of priority indicate higher priority.
+
+        The queue is indexed by event: membership tests are O(1), `push` and `pop` are O(log n)
+        and `remove` is a lazy O(1) cancel that only marks the heap entry as removed. Removed entries
+        are discarded when they reach the top of the heap, and the heap is rebuilt when they outnumber
+        the pending events.
+
+        Attributes:
+           _heap (list): Heap of [priority, sequence number, event] entries. The event of a removed entry is None.
+           _entries (dict): Maps each pending event to its heap entry.
+           _removed (int): Number of removed entries still held in the heap.
+        """
+
+    _REMOVED = None
+
+    def __init__(self):
+        self._heap = []
+        self._entries = {}
+        self._removed = 0
+        self._counter = count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, event):
+        return event in self._entries
+
+    def __iter__(self):
+        """Iterate over the pending events in the order in which they will be served."""
+        return iter([entry[2] for entry in sorted(self._entries.values())])
+
+    def __repr__(self):
+        return f"ReservationQueue({list(self)})"
+
+    def push(self, event, priority=0):
+        """
+        Add a reservation event to the queue.
+
+        Args:
+            event (simpy.Event): The reservation event.
+            priority (int, optional): The priority of the reservation request. Defaults to 0.
+
+        Raises:
+            ValueError: If the event is already in the queue.
+        """
+        if event in self._entries:
+            raise ValueError("Reservation event is already in the queue")
+        entry = [priority, next(self._counter), event]
+        self._entries[event] = entry
+        heapq.heappush(self._heap, entry)
+
+    def peek(self):
+        """
+        Return the event that will be served next without removing it.
+
+        Returns:
+            event (simpy.Event): The pending event with the highest priority.
+
+        Raises:
+            IndexError: If the queue is empty.
+        """
+        heap = self._heap
+        while heap and heap[0][2] is self._REMOVED:
+            heapq.heappop(heap)
+            self._removed -= 1
+        if not heap:
+            raise IndexError("peek from an empty ReservationQueue")
+        return heap[0][2]
+
+    def pop(self):
+        """
+        Remove and return the event that will be served next.
+
+        Returns:
+            event (simpy.Event): The pending event with the highest priority.
+
+        Raises:
+            IndexError: If the queue is empty.
+        """
+        self.peek()
+        event = heapq.heappop(self._heap)[2]
+        del self._entries[event]
+        return event
+
+    def remove(self, event):
+        """
+        Cancel a pending reservation event.
+
+        Args:
+            event (simpy.Event): The reservation event to remove.
+
+        Raises:
+            ValueError: If the event is not in the queue.
+        """
+        entry = self._entries.pop(event, None)
+        if entry is None:
+            raise ValueError("Reservation event is not in the queue")
+        entry[2] = self._REMOVED
+        self._removed += 1
+        if self._removed > len(self._entries):
+            self._compact()
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if entry[2] is not self._REMOVED]
+        heapq.heapify(self._heap)
+        self._removed = 0
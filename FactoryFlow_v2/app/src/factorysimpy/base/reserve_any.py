@@ -0,0 +1,122 @@
+from simpy.events import Event
+
+
+class ReservationToken:
+    """
+    Lightweight reservation request placed by a `ReserveAnyOf` event in the queue of one store.
+
+    The stores treat it like the event returned by their own reserve_put/reserve_get: it is queued in
+    `reserve_put_queue`/`reserve_get_queue`, granted with `succeed()` and afterwards passed to put/get.
+    It is not a SimPy event, so granting it schedules nothing; it only notifies its `ReserveAnyOf`.
+    """
+
+    __slots__ = ("group", "index", "resourcename", "requesting_process", "triggered", "priority_to_put", "priority_to_get")
+
+    def __init__(self, group, index, store, priority=0):
+        self.group = group
+        self.index = index
+        self.resourcename = store
+        self.requesting_process = group.requesting_process
+        self.triggered = False
+        self.priority_to_put = priority
+        self.priority_to_get = priority
+
+    def succeed(self, value=None):
+        self.triggered = True
+        self.group._claim(self)
+        return self
+
+    def __repr__(self):
+        return f"ReservationToken({self.index}, {self.resourcename})"
+
+
+class ReserveAnyOf(Event):
+    """
+    A single event that reserves space in (kind "PUT") or an item from (kind "GET") the first of several
+    stores that can grant it.
+
+    One `ReservationToken` is queued per store, in the order of `stores`, and stores are tried in that order
+    when the event is created, so if several stores can grant at once, the one with the lowest index wins.
+    The first store that grants its token wins: the event succeeds with the index of that store and the
+    tokens waiting in the other stores are removed from their queues. Only the winning store ever grants,
+    so no reservation has to be cancelled.
+
+    The winning token is the reservation to pass to the put/get of the store (or of its edge).
+
+    Parameters:
+        env (simpy.Environment): The simulation environment.
+        stores (list): Reservable stores (e.g. `edge.inbuiltstore` or `edge.belt`) with `reserve_put_queue`
+            and `reserve_get_queue`.
+        kind (str): "PUT" or "GET".
+        priority (int, optional): Priority of the reservation in every store. Defaults to 0.
+
+    Attributes:
+        index (int): Index of the winning store in `stores`, None until the event succeeds.
+        reservation (ReservationToken): The winning token, None until the event succeeds.
+
+    Example:
+        event = ReserveAnyOf(env, [edge.inbuiltstore for edge in out_edges], "PUT")
+        index = yield event
+        out_edges[index].put(event.reservation, item)
+
+    Raises:
+        ValueError: If kind is not "PUT" or "GET", or if stores is empty.
+    """
+
+    def __init__(self, env, stores, kind, priority=0):
+        if kind not in ("PUT", "GET"):
+            raise ValueError("kind must be 'PUT' or 'GET'")
+        if not stores:
+            raise ValueError("stores must not be empty")
+        super().__init__(env)
+        self.kind = kind
+        self.requesting_process = env.active_process
+        self.index = None
+        self.reservation = None
+        self._tokens = []
+        for index, store in enumerate(stores):
+            token = ReservationToken(self, index, store, priority)
+            self._tokens.append(token)
+            if kind == "PUT":
+                store.reserve_put_queue.push(token, priority)
+                store._trigger_reserve_put(token)
+            else:
+                store.reserve_get_queue.push(token, priority)
+                store._trigger_reserve_get(token)
+            if self.reservation is not None:
+                break
+
+    def _claim(self, token):
+        # called by the store that grants `token`; withdraw the tokens queued in the other stores
+        if self.reservation is not None:
+            raise RuntimeError("ReserveAnyOf granted twice")
+        self.index = token.index
+        self.reservation = token
+        for other in self._tokens:
+            if other is not token:
+                queue = other.resourcename.reserve_put_queue if self.kind == "PUT" else other.resourcename.reserve_get_queue
+                queue.remove(other)
+        self._tokens = None
+        self.succeed(token.index)
+
+    def cancel(self):
+        """
+        Withdraw the request. Waiting tokens are removed from their queues; if a store already granted,
+        its reservation is cancelled with reserve_put_cancel/reserve_get_cancel.
+        """
+        if self.reservation is not None:
+            store = self.reservation.resourcename
+            if self.kind == "PUT":
+                store.reserve_put_cancel(self.reservation)
+            else:
+                store.reserve_get_cancel(self.reservation)
+            return
+        for token in self._tokens:
+            store = token.resourcename
+            if self.kind == "PUT":
+                store.reserve_put_queue.remove(token)
+                store._trigger_reserve_put(None)
+            else:
+                store.reserve_get_queue.remove(token)
+                store._trigger_reserve_get(None)
+        self._tokens = []
@@ -4,6 +4,9 @@
 
 import simpy
 from simpy.resources.store import Store
+from factorysimpy.base.reservation_queue import ReservationQueue
+from factorysimpy.base import belt_occupancy
+from factorysimpy.utils.tracer import DEBUG
 
 class BeltStore(Store):
     """
@@ -30,9 +33,9 @@ class BeltStore(Store):
 
         Attributes:
            reserved_events (list):  Maintains events corresponding to reserved items to preserve item order by index
-           reserve_put_queue (list): Queue for managing reserve_put reservations
+           reserve_put_queue (ReservationQueue): Queue for managing reserve_put reservations
            reservations_put (list): List of successful put reservations
-           reserve_get_queue (list): Queue for managing reserve_get reservations
+           reserve_get_queue (ReservationQueue): Queue for managing reserve_get reservations
            reservations_get (list):List of successful get reservations
         """
 
@@ -47,15 +50,17 @@ class BeltStore(Store):
         """
         super().__init__(env, capacity)
         self.env = env
+        self.trace = None # Trace handle installed by utils.tracer.Tracer; None when tracing is off.
         self.mode=mode
         self.delay = delay  # Speed of the conveyor belt (units per time)
-        self.reserve_put_queue = []  # Queue for managing reserve_put reservations
+        self.reserve_put_queue = ReservationQueue()  # Queue for managing reserve_put reservations
         self.reservations_put = []   # List of successful put reservations
-        self.reserve_get_queue = []  # Queue for managing reserve_get reservations
+        self.reserve_get_queue = ReservationQueue()  # Queue for managing reserve_get reservations
         self.reservations_get = []   # List of successful get reservations
         self.reserved_events = []     # Maintains events corresponding to reserved items to preserve item order
         self.ready_items=[]  #Maintains the items ready to be taken out
         self.reserved_items   = []   # parallel list of the exact items reserved
+        self._stats_start_time = self.env.now  # Start of the period the time-averaged level is computed over
         self._last_level_change_time = self.env.now
         self._last_num_items = 0
         self._weighted_sum = 0.0
@@ -74,11 +79,21 @@ class BeltStore(Store):
         self._last_level_change_time = now
         self._last_num_items = len(self.items)+len(self.ready_items)
         
-        total_time = now
+        total_time = now - self._stats_start_time
         self.time_averaged_num_of_items_in_store = (
             self._weighted_sum / total_time if total_time > 0 else 0.0
         )
 
+    def reset_statistics(self):
+        """
+        Restart the time-averaged level at the current time. The items in the store are kept and
+        count from now on.
+        """
+        self._update_time_averaged_level()
+        self._stats_start_time = self.env.now
+        self._weighted_sum = 0.0
+        self.time_averaged_num_of_items_in_store = 0.0
+
     def reserve_put(self, priority=0):
         """
         Create a reservation request to put an item into the store.
@@ -103,9 +118,8 @@ class BeltStore(Store):
         event.requesting_process = self.env.active_process  # Process making the reservation
         event.priority_to_put = priority  # Priority for sorting reservations
 
-        # Add the event to the reservation queue and sort by priority
-        self.reserve_put_queue.append(event)
-        self.reserve_put_queue.sort(key=lambda e: e.priority_to_put)
+        # Add the event to the reservation queue (ordered by priority)
+        self.reserve_put_queue.push(event, event.priority_to_put)
 
         # Attempt to process reservations
         self._trigger_reserve_put(event)
@@ -128,15 +142,12 @@ class BeltStore(Store):
             RuntimeError: If an event expected to be in `reserve_put_queue` is not found
                           when attempting to remove it after successful processing.
         """
-        idx=0
-
-        while idx < len(self.reserve_put_queue):
-
-          reserve_put_event = self.reserve_put_queue[idx]
+        while self.reserve_put_queue:
+          reserve_put_event = self.reserve_put_queue.peek()
           proceed = self._do_reserve_put(reserve_put_event)
           if not reserve_put_event.triggered:
-            idx += 1
-          elif self.reserve_put_queue.pop(idx) != reserve_put_event:
+            break
+          if self.reserve_put_queue.pop() is not reserve_put_event:
             raise RuntimeError('Reserve put queue invariant violated')
 
           if not proceed:
@@ -311,9 +322,7 @@ class BeltStore(Store):
         #event.priority_to_get = (priority, self._env.now)
         event.priority_to_get = priority
 
-        #sorting the list based on priority after appending the new event
-        self.reserve_get_queue.append(event)
-        self.reserve_get_queue.sort(key=lambda e: e.priority_to_get)
+        self.reserve_get_queue.push(event, event.priority_to_get)
 
         self._trigger_reserve_get(event)
         return event
@@ -334,13 +343,12 @@ class BeltStore(Store):
             RuntimeError: If an event expected to be in `reserve_get_queue` is not
                           found when attempting to remove it after successful processing.
         """
-        idx=0
-        while idx < len(self.reserve_get_queue):
-          reserve_get_event = self.reserve_get_queue[idx]
+        while self.reserve_get_queue:
+          reserve_get_event = self.reserve_get_queue.peek()
           proceed = self._do_reserve_get(reserve_get_event)
           if not reserve_get_event.triggered:
-            idx += 1
-          elif self.reserve_get_queue.pop(idx) != reserve_get_event:
+            break
+          if self.reserve_get_queue.pop() is not reserve_get_event:
             raise RuntimeError('Reserve get queue invariant violated')
 
           if not proceed:
@@ -631,11 +639,13 @@ class BeltStore(Store):
         try:
             # Move items to the ready_items list
             if self.items:
-                print(f"T={self.env.now:.2f} beltstore received an item {item[0].id, item[1]} . Item started moving in belt")
+                if self.trace:
+                    self.trace.debug("beltstore received an item %s . Item started moving in belt", (item[0].id, item[1]))
                 
                 # Phase 1: Item entering the belt (length/speed time)
                 remaining_phase1_time = phase1_time
-                print(f"T={self.env.now:.2f} Item {item_id} starting Phase 1 (entering belt): {phase1_time:.2f} time")
+                if self.trace:
+                    self.trace.debug("Item %s starting Phase 1 (entering belt): %.2f time", item_id, phase1_time)
                 
                 while remaining_phase1_time > 0:
                     try:
@@ -650,19 +660,25 @@ class BeltStore(Store):
                         elapsed_time = self.env.now - start_time
                         remaining_phase1_time -= elapsed_time
                         
-                        print(f"T={self.env.now:.2f} Move process Phase 1 for item {item_id} interrupted: {interrupt.cause}")
-                        print(f"T={self.env.now:.2f} Remaining Phase 1 time for item {item_id}: {remaining_phase1_time:.2f}")
+                        if self.trace:
+                            self.trace.debug("Move process Phase 1 for item %s interrupted: %s", item_id, interrupt.cause)
+                        if self.trace:
+                            self.trace.debug("Remaining Phase 1 time for item %s: %.2f", item_id, remaining_phase1_time)
                         
                         # Wait for resume signal
-                        print(f"T={self.env.now:.2f} Item {item_id} waiting for resume signal (Phase 1)...")
+                        if self.trace:
+                            self.trace.debug("Item %s waiting for resume signal (Phase 1)...", item_id)
                         yield self.resume_event
-                        print(f"T={self.env.now:.2f} Item {item_id} resuming Phase 1 movement with {remaining_phase1_time:.2f} time remaining")
+                        if self.trace:
+                            self.trace.debug("Item %s resuming Phase 1 movement with %.2f time remaining", item_id, remaining_phase1_time)
                 
-                print(f"T={self.env.now:.2f} Item {item_id} completed Phase 1 (fully entered belt)")
+                if self.trace:
+                    self.trace.debug("Item %s completed Phase 1 (fully entered belt)", item_id)
                 
                 # Phase 2: Item moving through the belt to exit
                 remaining_phase2_time = phase2_time
-                print(f"T={self.env.now:.2f} Item {item_id} starting Phase 2 (moving to exit): {phase2_time:.2f} time")
+                if self.trace:
+                    self.trace.debug("Item %s starting Phase 2 (moving to exit): %.2f time", item_id, phase2_time)
                 
                 while remaining_phase2_time > 0:
                     try:
@@ -676,16 +692,22 @@ class BeltStore(Store):
                         elapsed_time = self.env.now - start_time
                         remaining_phase2_time -= elapsed_time
                         
-                        print(f"T={self.env.now:.2f} Move process Phase 2 for item {item_id} interrupted: {interrupt.cause}")
-                        print(f"T={self.env.now:.2f} Remaining Phase 2 time for item {item_id}: {remaining_phase2_time:.2f}")
+                        if self.trace:
+                            self.trace.debug("Move process Phase 2 for item %s interrupted: %s", item_id, interrupt.cause)
+                        if self.trace:
+                            self.trace.debug("Remaining Phase 2 time for item %s: %.2f", item_id, remaining_phase2_time)
                         
                         # Wait for resume signal
-                        print(f"T={self.env.now:.2f} Item {item_id} waiting for resume signal (Phase 2)...")
+                        if self.trace:
+                            self.trace.debug("Item %s waiting for resume signal (Phase 2)...", item_id)
                         yield self.resume_event
-                        print(f"T={self.env.now:.2f} Item {item_id} resuming Phase 2 movement with {remaining_phase2_time:.2f} time remaining")
+                        if self.trace:
+                            self.trace.debug("Item %s resuming Phase 2 movement with %.2f time remaining", item_id, remaining_phase2_time)
                 
-                print(f"T={self.env.now:.2f} Item {item_id} completed Phase 2 (reached exit)")
-                print(f"T={self.env.now:.2f} bufferstore finished moving item {item[0].id, item[1]} going to ready_items")
+                if self.trace:
+                    self.trace.debug("Item %s completed Phase 2 (reached exit)", item_id)
+                if self.trace:
+                    self.trace.debug("bufferstore finished moving item %s going to ready_items", (item[0].id, item[1]))
                 
                 item_index = self.items.index(item)
                 item_to_put = self.items.pop(item_index)  # Remove the item
@@ -694,7 +716,8 @@ class BeltStore(Store):
                     self.ready_items.append(item_to_put[0])
                     if not self.ready_item_event.triggered:
                         self.ready_item_event.succeed()  # Notify that a new item is ready
-                    print(f"T={self.env.now:.2f} bufferstore finished moving item {item[0].id, item[1]} moved to ready_items")
+                    if self.trace:
+                        self.trace.debug("bufferstore finished moving item %s moved to ready_items", (item[0].id, item[1]))
                     self._trigger_reserve_get(None)
                     self._trigger_reserve_put(None)
                 else:
@@ -707,7 +730,8 @@ class BeltStore(Store):
             # Clean up the process tracking when done
             if item_id in self.active_move_processes:
                 del self.active_move_processes[item_id]
-                print(f"T={self.env.now:.2f} Removed tracking for completed move process of item {item_id}")
+                if self.trace:
+                    self.trace.debug("Removed tracking for completed move process of item %s", item_id)
 
     def interrupt_all_move_processes(self, reason="External interrupt"):
         """
@@ -716,14 +740,16 @@ class BeltStore(Store):
         Args:
             reason (str): Reason for the interrupt
         """
-        print(f"T={self.env.now:.2f} BufferStore interrupting {len(self.active_move_processes)} move processes - {reason}")
+        if self.trace:
+            self.trace.debug("BufferStore interrupting %s move processes - %s", len(self.active_move_processes), reason)
         
         for item_id, process_info in self.active_move_processes.items():
             process = process_info['process']
             if process and not process.processed:
                 try:
                     process.interrupt(reason)
-                    print(f"T={self.env.now:.2f} Interrupted move process for item {item_id}")
+                    if self.trace:
+                        self.trace.debug("Interrupted move process for item %s", item_id)
                 except RuntimeError:
                     # Process might already be finished
                     pass
@@ -732,27 +758,22 @@ class BeltStore(Store):
         """
         Resume all interrupted move_to_ready_items processes.
         """
-        print(f"T={self.env.now:.2f} BufferStore resuming move processes")
+        if self.trace:
+            self.trace.debug("BufferStore resuming move processes")
         
         # Create a new resume event and trigger it
         old_resume_event = self.resume_event
         self.resume_event = self.env.event()
         old_resume_event.succeed()
     
-    def _get_belt_pattern(self):
+    def _get_belt_occupancy(self):
         """
-        Generate a pattern string representing the current belt occupancy.
-        Returns a string where '*' represents an item and '_' represents empty space.
+        Compute the current belt occupancy as a bitset.
+        Bit i is set when slot i (counted from the entry of the belt) holds an item.
         """
-        # Create a representation of the belt with capacity positions
-        belt_positions = ['_'] * self.capacity
+        occupancy = 0
         
-        # Mark positions with items
         # Items in self.items are still moving, items in ready_items are at the end
-        num_moving_items = len(self.items)
-        num_ready_items = len(self.ready_items)
-        
-        # Place moving items based on their current position on the belt
         for i, item in enumerate(self.items):
             if i < self.capacity:
                 # Calculate position based on time since entry and belt speed
@@ -761,17 +782,24 @@ class BeltStore(Store):
                     # Assuming each position takes 1 time unit to traverse
                     position = int(time_on_belt / self.delay)
                     if 0 <= position < self.capacity:
-                        belt_positions[position] = '*'
+                        occupancy = belt_occupancy.occupy(occupancy, position)
                 else:
                     raise AttributeError("Item does not have 'conveyor_entry_time' attribute.")
         
         # Place ready items at the end of the belt
-        for i in range(num_ready_items):
+        for i in range(len(self.ready_items)):
             pos = self.capacity - 1 - i
             if pos >= 0:
-                belt_positions[pos] = '*'
+                occupancy = belt_occupancy.occupy(occupancy, pos)
         
-        return ''.join(belt_positions)
+        return occupancy
+
+    def _get_belt_pattern(self):
+        """
+        Generate a pattern string representing the current belt occupancy.
+        Returns a string where '*' represents an item and '_' represents empty space.
+        """
+        return belt_occupancy.to_pattern(self._get_belt_occupancy(), self.capacity)
     
     def selective_interrupt(self, reason="Selective interrupt"):
         """
@@ -795,42 +823,48 @@ class BeltStore(Store):
             reason (str): Reason for the interrupt
         """
         if not self.items:
-            print(f"T={self.env.now:.2f} No items on belt to interrupt")
+            if self.trace:
+                self.trace.debug("No items on belt to interrupt")
             return
         
         # If noaccumulation_mode_on is True (STALLED_NONACCUMULATING_STATE), interrupt all items immediately
         if self.noaccumulation_mode_on:
-            print(f"T={self.env.now:.2f} No accumulation mode: interrupting all items immediately")
+            if self.trace:
+                self.trace.debug("No accumulation mode: interrupting all items immediately")
             for i, item in enumerate(self.items):
                 item_id = item[0].id if hasattr(item[0], 'id') else str(id(item))
                 self._interrupt_specific_item(item_id, f"{reason} - immediate (no accumulation)")
             return
         
         # For accumulating mode (STALLED_ACCUMULATING_STATE), use pattern-based interruption
-        print(f"T={self.env.now:.2f} Accumulating mode: using pattern-based interruption")
+        if self.trace:
+            self.trace.debug("Accumulating mode: using pattern-based interruption")
         
-        # Get current belt pattern
-        pattern = self._get_belt_pattern()
-        print(f"T={self.env.now:.2f} Current belt pattern: {pattern}")
+        # Get current belt occupancy
+        occupancy = self._get_belt_occupancy()
+        if self.trace and self.trace.level >= DEBUG:
+            self.trace.debug("Current belt pattern: %s", belt_occupancy.to_pattern(occupancy, self.capacity))
         
-        # Analyze pattern and determine interruption strategy
-        interruption_plan = self._analyze_pattern_for_interruption(pattern)
+        # Analyze occupancy and determine interruption strategy
+        interruption_plan = self._analyze_pattern_for_interruption(occupancy)
         
         if not interruption_plan:
-            print(f"T={self.env.now:.2f} No interruption needed for current pattern")
+            if self.trace:
+                self.trace.debug("No interruption needed for current pattern")
             return
         
-        print(f"T={self.env.now:.2f} Executing selective interruption plan: {interruption_plan}")
+        if self.trace:
+            self.trace.debug("Executing selective interruption plan: %s", interruption_plan)
         
         # Execute the interruption plan
         self._execute_interruption_plan(interruption_plan, reason)
 
-    def _analyze_pattern_for_interruption(self, pattern):
+    def _analyze_pattern_for_interruption(self, occupancy):
         """
-        Analyze the belt pattern and determine which items to interrupt and when.
+        Analyze the belt occupancy and determine which items to interrupt and when.
         
         Args:
-            pattern (str): Belt pattern string with '*' for items and '_' for empty spaces
+            occupancy (int): Occupancy bitset with bit i set for an item in slot i
             
         Returns:
             list: List of dictionaries with interruption instructions
@@ -839,43 +873,33 @@ class BeltStore(Store):
         interruption_plan = []
         
         # Find all item positions
-        item_positions = [i for i, char in enumerate(pattern) if char == '*']
+        item_positions = belt_occupancy.occupied_slots(occupancy)
         
         if not item_positions:
             return interruption_plan
         
-        # Check for consecutive items pattern (like '_****' or '**__*')
-        if self._has_consecutive_items(pattern):
+        # Check for consecutive items (like '_****')
+        if self._has_consecutive_items(occupancy):
             # Rule: Interrupt all items in consecutive blocks
             for i, pos in enumerate(item_positions):
                 interruption_plan.append({'item_index': i, 'delay': 0})
         else:
             # Rule: Interrupt items with delays based on gaps
-            interruption_plan = self._calculate_gap_based_interruptions(pattern, item_positions)
+            interruption_plan = self._calculate_gap_based_interruptions(occupancy, item_positions)
         
         return interruption_plan
 
-    def _has_consecutive_items(self, pattern):
+    def _has_consecutive_items(self, occupancy):
         """
-        Check if the pattern has consecutive items (no gaps between items).
+        Check if the occupancy bitset has consecutive items (no gaps between items).
         """
-        item_positions = [i for i, char in enumerate(pattern) if char == '*']
-        
-        if len(item_positions) <= 1:
-            return True
-        
-        # Check if positions are consecutive
-        for i in range(1, len(item_positions)):
-            if item_positions[i] - item_positions[i-1] > 1:
-                return False
-        
-        return True
+        return belt_occupancy.is_contiguous(occupancy)
 
-    def _calculate_gap_based_interruptions(self, pattern, item_positions):
+    def _calculate_gap_based_interruptions(self, occupancy, item_positions):
         """
         Calculate interruption delays based on gaps between items.
         
-        For patterns with gaps:
+        For occupancies with gaps:
         - First item: interrupt immediately
         - Subsequent items: delay = number of empty spaces before this item from the previous item
         """
@@ -889,9 +913,7 @@ class BeltStore(Store):
         
         # Calculate delays for subsequent items
         for i in range(1, len(item_positions)):
-            prev_pos = item_positions[i-1]
-            curr_pos = item_positions[i]
-            gap_size = curr_pos - prev_pos - 1  # Number of empty spaces between items
+            gap_size = item_positions[i] - item_positions[i-1] - 1  # Number of empty spaces between items
             
             # Delay is based on gap size
             delay = max(gap_size, 1)  # Minimum delay of 1
@@ -935,7 +957,8 @@ class BeltStore(Store):
             yield self.env.timeout(delay)
             self._interrupt_specific_item(item_id, f"{reason} (delayed by {delay})")
         except simpy.Interrupt:
-            print(f"T={self.env.now:.2f} Delayed interrupt process for item {item_id} was itself interrupted")
+            if self.trace:
+                self.trace.debug("Delayed interrupt process for item %s was itself interrupted", item_id)
 
     def _interrupt_specific_item(self, item_id, reason):
         """
@@ -952,13 +975,17 @@ class BeltStore(Store):
             if process and not process.processed:
                 try:
                     process.interrupt(reason)
-                    print(f"T={self.env.now:.2f} Selectively interrupted item {item_id}: {reason}")
+                    if self.trace:
+                        self.trace.debug("Selectively interrupted item %s: %s", item_id, reason)
                 except RuntimeError:
-                    print(f"T={self.env.now:.2f} Could not interrupt item {item_id} - process may be finished")
+                    if self.trace:
+                        self.trace.debug("Could not interrupt item %s - process may be finished", item_id)
             else:
-                print(f"T={self.env.now:.2f} Item {item_id} process already finished")
+                if self.trace:
+                    self.trace.debug("Item %s process already finished", item_id)
         else:
-            print(f"T={self.env.now:.2f} Item {item_id} not found in active processes")
+            if self.trace:
+                self.trace.debug("Item %s not found in active processes", item_id)
 
     def handle_new_item_during_interruption(self, item):
         """
@@ -976,8 +1003,10 @@ class BeltStore(Store):
             item_id = item[0].id if hasattr(item[0], 'id') else str(id(item))
             
             if delay_before_interrupt > 0:
-                print(f"T={self.env.now:.2f} New item {item_id} will be interrupted after {delay_before_interrupt} time units")
+                if self.trace:
+                    self.trace.debug("New item %s will be interrupted after %s time units", item_id, delay_before_interrupt)
                 self.env.process(self._delayed_interrupt(item_id, delay_before_interrupt, "New item during interruption"))
             else:
-                print(f"T={self.env.now:.2f} New item {item_id} interrupted immediately")
+                if self.trace:
+                    self.trace.debug("New item %s interrupted immediately", item_id)
                 self._interrupt_specific_item(item_id, "New item during interruption")
\ No newline at end of file
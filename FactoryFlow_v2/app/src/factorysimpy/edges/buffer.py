@@ -25,6 +25,8 @@ class Buffer(Edge):
             2. `LIFO`: It prioritizes items in the reverse order of their arrival, items that newly added are available to use by the destination node first
             Incoming edges can use reserve_get and reserve_put calls on the store in the buffer to reserve an item or space and after yielding 
             the requests, an item can be put and obtained by using put and get methods.
+            In batch mode, reserve_put_many(k) and reserve_get_many(k) reserve space for k items or k items with one event, and
+            put_many and get_many transfer the k items in a single step.
 
     
 
@@ -66,11 +68,11 @@ class Buffer(Edge):
          
           
 
-          if callable(delay) or hasattr(delay, '__next__') or isinstance(delay, (int, float)) or delay is None:
+          if callable(delay) or hasattr(delay, '__next__') or hasattr(delay, 'rvs') or isinstance(delay, (int, float)) or delay is None:
             self.delay = delay
     
           else:
-            raise ValueError("delay must be None, int, float, generator, or callable.")
+            raise ValueError("delay must be None, int, float, generator, callable, or a frozen scipy.stats distribution.")
             
           #self.behavior =  self.env.process(self.behaviour())
           #self.stats_collector = self.env.process(self._stats_collector(sample_interval=0.4))
@@ -111,12 +113,16 @@ class Buffer(Edge):
         self.inbuiltstore._last_level_change_time = now
         self.inbuiltstore._last_num_items = len(self.inbuiltstore.items)+len(self.inbuiltstore.ready_items)
         
-        total_time = now
+        total_time = now - self.inbuiltstore._stats_start_time
         self.inbuiltstore.time_averaged_num_of_items_in_store = (
             self.inbuiltstore._weighted_sum / total_time if total_time > 0 else 0.0
         )
         self._buffer_stats_collector()
 
+    def reset_statistics(self):
+        super().reset_statistics()
+        self.inbuiltstore.reset_statistics()
+
     def can_put(self):
         """
         Check if the buffer can accept an item.
@@ -159,12 +165,54 @@ class Buffer(Edge):
     
     def put(self, event, item):
        delay=self.get_delay(self.delay)
-       print(f"T={self.env.now:.2f}: {self.id} is putting item {item.id} with delay {delay} at time {self.env.now}, total item in buffer is {len(self.inbuiltstore.items)+len(self.inbuiltstore.ready_items)}")
+       if self.trace:
+           self.trace.info("is putting item %s with delay %s at time %s, total item in buffer is %s", item.id, delay, self.env.now, len(self.inbuiltstore.items) + len(self.inbuiltstore.ready_items))
        
        proceed=self.inbuiltstore.put(event, (item,delay))
        self._buffer_stats_collector()
        return proceed
     
+    def reserve_put_many(self, quantity):
+        return self.inbuiltstore.reserve_put_many(quantity)
+
+    def reserve_get_many(self, quantity):
+        return self.inbuiltstore.reserve_get_many(quantity)
+
+    def put_many(self, event, items):
+        """
+        Put a batch of items reserved with `reserve_put_many` into the buffer. Each item gets its own delay.
+
+        Parameters
+        ----------
+        event : simpy.Event
+            The event that was reserved for putting the items.
+        items : list
+            The items to put, one per reserved unit.
+        """
+        if self.trace:
+            self.trace.info("is putting %s items at time %s, total item in buffer is %s", len(items), self.env.now, len(self.inbuiltstore.items) + len(self.inbuiltstore.ready_items))
+        proceed = self.inbuiltstore.put_many(event, [(item, self.get_delay(self.delay)) for item in items])
+        self._buffer_stats_collector()
+        return proceed
+
+    def get_many(self, event):
+        """
+        Get the batch of items reserved with `reserve_get_many` from the buffer.
+
+        Parameters
+        ----------
+        event : simpy.Event
+            The event that was reserved for getting the items.
+
+        Returns
+        -------
+        items : list
+            The items retrieved from the buffer.
+        """
+        items = self.inbuiltstore.get_many(event)
+        self._buffer_stats_collector()
+        return items
+
     def get(self, event):
         """
         Get an item from the buffer.
@@ -208,10 +256,10 @@ class Buffer(Edge):
        return len(self.inbuiltstore.items) + len(self.inbuiltstore.ready_items)
 
     def ready_items(self):
-       return self.inbuiltstore.ready_items
+       return list(self.inbuiltstore.ready_items)
     
     def items(self):
-         items = [i[0] for i in self.inbuiltstore.items] + self.inbuiltstore.ready_items
+         items = [i[0] for i in self.inbuiltstore.items] + list(self.inbuiltstore.ready_items)
          return items
          
 
@@ -226,12 +274,14 @@ class Buffer(Edge):
       while True: 
         if self.inbuiltstore.ready_items or self.inbuiltstore.items: 
           self.update_state("RELEASING_STATE", self.env.now)
-          print(f"T={self.env.now:.2f}: {self.id } is releasing an item from its in store")
+          if self.trace:
+              self.trace.info("is releasing an item from its in store")
 
         else:
           
           self.update_state("EMPTY_STATE", self.env.now)
-          print(f"T={self.env.now:.2f}: {self.id } is waiting to get an item ")
+          if self.trace:
+              self.trace.info("is waiting to get an item")
 
         
         
@@ -11,6 +11,8 @@ import numpy as np
 from factorysimpy.helper.item import Item
 from factorysimpy.edges.edge import Edge
 from factorysimpy.base.belt_store import BeltStore
+from factorysimpy.base.kinematic_belt_store import KinematicBeltStore
+from factorysimpy.utils.tracer import DEBUG
 
 
 
@@ -29,9 +31,20 @@ class ConveyorBelt(Edge):
         length (float): Length of the item.
         speed (float): Speed of the conveyor belt.
         accumulating (bool): Whether the belt supports accumulation (1 for yes, 0 for no).
-        belt (BeltStore): The belt store object.
+        belt_engine (str): Engine that moves the items on the belt. "PROCESS" (default) runs one process per
+                           item in a BeltStore. "KINEMATIC" uses a KinematicBeltStore that computes exit times
+                           in closed form and schedules only the next exit, so stalls and resumes do not
+                           interrupt every item.
+        belt (BeltStore or KinematicBeltStore): The belt store object.
+
+    Raises:
+        ValueError: If belt_engine is not "PROCESS" or "KINEMATIC".
     """
-    def __init__(self, env, id, conveyor_length, speed,item_length,accumulating):
+
+    # Constructor parameters stored under another attribute name, used by utils.model_snapshot
+    constructor_param_attributes = {"item_length": "length"}
+
+    def __init__(self, env, id, conveyor_length, speed,item_length,accumulating, belt_engine="PROCESS"):
         capacity = int(np.ceil(conveyor_length)/item_length)
         super().__init__(env, id, capacity)
        
@@ -43,7 +56,13 @@ class ConveyorBelt(Edge):
         self.speed=speed
         self.delay = int(self.conveyor_length/self.speed)*capacity
         #self.delay = (self.length*self.speed)/capacity
-        self.belt = BeltStore(env, capacity, self.speed, self.accumulating)
+        self.belt_engine = belt_engine
+        if belt_engine == "PROCESS":
+            self.belt = BeltStore(env, capacity, self.speed, self.accumulating)
+        elif belt_engine == "KINEMATIC":
+            self.belt = KinematicBeltStore(env, capacity, self.speed, self.accumulating, item_length)
+        else:
+            raise ValueError("belt_engine must be either 'PROCESS' or 'KINEMATIC'")
       
         
         
@@ -94,12 +113,16 @@ class ConveyorBelt(Edge):
         self.belt._last_level_change_time = now
         self.belt._last_num_items = len(self.belt.items)+len(self.belt.ready_items)
         
-        total_time = now
+        total_time = now - self.belt._stats_start_time
         self.belt.time_averaged_num_of_items_in_store = (
             self.belt._weighted_sum / total_time if total_time > 0 else 0.0
         )
         self._conveyor_stats_collector()
 
+    def reset_statistics(self):
+        super().reset_statistics()
+        self.belt.reset_statistics()
+
 
 
     def is_empty(self):
@@ -145,9 +168,8 @@ class ConveyorBelt(Edge):
     def reserve_put(self):
     
        if self.accumulating==0 and self.noaccumulation_mode_on==True:
-         print(f"T={self.env.now:.2f}: {self.id }: attempting to reserve_put an item while non accumulating mode on and {self.state} and {self.belt.noaccumulation_mode_on}")
-       else:
-        print(f"T={self.env.now} will reserve_put yield?!?!?!!? ")
+         if self.trace:
+             self.trace.debug("attempting to reserve_put an item while non accumulating mode on and %s and %s", self.state, self.belt.noaccumulation_mode_on)
        return self.belt.reserve_put()
     
     def put(self, event, item):
@@ -167,25 +189,31 @@ class ConveyorBelt(Edge):
             An event that will be triggered when the item is successfully put on the belt.
         """
         #delay=self.get_delay(self.delay)
-        print(f"T={self.env.now:.2f}: Conveyor:put: putting item {item.id} ")
+        if self.trace:
+            self.trace.debug("Conveyor:put: putting item %s", item.id)
         delay = self.length * self.capacity/self.speed
         item.conveyor_entry_time = self.env.now
         item_to_put = (item, delay)
-        print(f"T={self.env.now:.2f}: {self.id }:put: putting item {item_to_put[0].id} on belt with delay {item_to_put[1]} {self.state}")
+        if self.trace:
+            self.trace.debug("put: putting item %s on belt with delay %s %s", item_to_put[0].id, item_to_put[1], self.state)
         return_val = self.belt.put(event, item_to_put)
         self._conveyor_stats_collector()
         if len(self.belt.items)==1 and self.state=="IDLE_STATE":
             self.item_arrival_event.succeed()
-            print(f"T={self.env.now:.2f}: {self.id }:put: item arrival event succeeded")
+            if self.trace:
+                self.trace.debug("put: item arrival event succeeded")
         else: 
             event= self.env.event()
             self.put_events_available.succeed()
             if self.accumulating==0:
-                print(f"T={self.env.now:.2f}: {self.id }: attempting to put an item while non accumulating mode on and {self.state} and {self.belt.noaccumulation_mode_on}")
-            print(f"T={self.env.now:.2f}: {self.id }:put: item arrival event else succeeded")
+                if self.trace:
+                    self.trace.debug("attempting to put an item while non accumulating mode on and %s and %s", self.state, self.belt.noaccumulation_mode_on)
+            if self.trace:
+                self.trace.debug("put: item arrival event else succeeded")
         
         if self.state=="STALLED_ACCUMULATING_STATE" and self.accumulating==1 or self.state=="STALLED_NONACCUMULATING_STATE" and self.accumulating==0:
-            print(f"T={self.env.now:.2f}: {self.id }:put: handling new item during interruption {item_to_put[0].id} on belt")
+            if self.trace:
+                self.trace.debug("put: handling new item during interruption %s on belt", item_to_put[0].id)
             self.belt.handle_new_item_during_interruption(item_to_put)
             
             
@@ -212,13 +240,15 @@ class ConveyorBelt(Edge):
         Item
             The item retrieved from the belt.
         """
-        print(f"T={self.env.now:.2f}: {self.id }:get: getting item from belt")
+        if self.trace:
+            self.trace.debug("get: getting item from belt")
         item = self.belt.get(event)
         item.conveyor_exit_time = self.env.now
         self._conveyor_stats_collector()
         event= self.env.event()
         self.get_events_available.succeed()
-        print(f"{self.env.now} {item.id} time in conveyor {item.conveyor_entry_time} and {item.conveyor_exit_time} - time spend in conveyor {item.conveyor_exit_time - item.conveyor_entry_time if item.conveyor_exit_time and item.conveyor_entry_time else 'N/A'}")
+        if self.trace:
+            self.trace.debug("%s time in conveyor %s and %s - time spend in conveyor %s", item.id, item.conveyor_entry_time, item.conveyor_exit_time, item.conveyor_exit_time - item.conveyor_entry_time if item.conveyor_exit_time and item.conveyor_entry_time else 'N/A')
         return item
 
    
@@ -243,8 +273,10 @@ class ConveyorBelt(Edge):
        event_list=[self.belt.ready_item_event, self.get_events_available, self.put_events_available]
        
        while True:
-          print(f"T={self.env.now:.2f}: {self.id } is in {self.state}")
-          print(f"T={self.env.now:.2f}: {self.id } belt pattern: {self.belt._get_belt_pattern()[1]}, {[i[0].id for i in reversed(self.belt.items)]}, ready items: {[i.id for i in self.belt.ready_items]} ")
+          if self.trace:
+              self.trace.debug("is in %s", self.state)
+          if self.trace and self.trace.level >= DEBUG:
+              self.trace.debug("belt pattern: %s, %s, ready items: %s", self.belt._get_belt_pattern()[1], [i[0].id for i in reversed(self.belt.items)], [i.id for i in self.belt.ready_items])
           
 
 
@@ -255,7 +287,8 @@ class ConveyorBelt(Edge):
              yield self.item_arrival_event
              if self.item_arrival_event.triggered:
                  self.item_arrival_event = self.env.event()
-                 print(f"T={self.env.now:.2f}: {self.id }item_arrival  event triggered")
+                 if self.trace:
+                     self.trace.debug("item_arrival  event triggered")
 
           elif not self.is_empty() and not self.is_stalled():
             #  print(len(self.belt.ready_items), len(self.belt.reservations_get))
@@ -279,7 +312,8 @@ class ConveyorBelt(Edge):
                
         
           else:
-            print(self.belt.items, self.belt.ready_items, self.is_stalled())
+            if self.trace and self.trace.level >= DEBUG:
+                self.trace.debug("%s %s %s", self.belt.items, self.belt.ready_items, self.is_stalled())
             raise ValueError(f"Conveyor {self.id} in unknown state {self.state}")
           
           
@@ -287,7 +321,8 @@ class ConveyorBelt(Edge):
           yield triggered_events_list
           #print(f"T={self.env.now:.2f}: {self.id } event triggered")
           if self.belt.ready_item_event.triggered:
-              print(f"T={self.env.now:.2f}: {self.id } ready item event triggered")
+              if self.trace:
+                  self.trace.debug("ready item event triggered")
               if self.is_stalled():
                 if self.accumulating:
                     self.set_conveyor_state("STALLED_ACCUMULATING_STATE")
@@ -304,12 +339,14 @@ class ConveyorBelt(Edge):
           #if self.chosen_triggered_event is not None:
           if self.chosen_triggered_event:
              if self.chosen_triggered_event is self.get_events_available:
-                print(f"T={self.env.now:.2f}: {self.id } get event triggered")
+                if self.trace:
+                    self.trace.debug("get event triggered")
                 self.get_events_available = self.env.event()
                 event_list=[self.belt.ready_item_event, self.get_events_available, self.put_events_available]
              elif self.chosen_triggered_event is self.put_events_available:
                 self.put_events_available = self.env.event()
-                print(f"T={self.env.now:.2f}: {self.id } put event triggered")
+                if self.trace:
+                    self.trace.debug("put event triggered")
                 event_list=[self.belt.ready_item_event, self.get_events_available, self.put_events_available]
              else:
                   self.belt.ready_item_event = self.env.event()
@@ -327,7 +364,8 @@ class ConveyorBelt(Edge):
         old_state = self.state
         self.state = new_state
         
-        print(f"T={self.env.now:.2f}: {self.id} state changed from {old_state} to {new_state}")
+        if self.trace:
+            self.trace.debug("state changed from %s to %s", old_state, new_state)
         
         # Control belt store based on conveyor state changes
         if old_state in ["MOVING_STATE", "IDLE_STATE"] and new_state in ["STALLED_ACCUMULATING_STATE", "STALLED_NONACCUMULATING_STATE"]:
@@ -335,16 +373,16 @@ class ConveyorBelt(Edge):
             if not self.accumulating:
                 self.belt.noaccumulation_mode_on = True
 
-            self.belt.selective_interrupt(f"Conveyor {self.id} selective interruption - {new_state}")
+            self.belt.stall(f"Conveyor {self.id} selective interruption - {new_state}")
         elif old_state in ["STALLED_ACCUMULATING_STATE", "STALLED_NONACCUMULATING_STATE"] and new_state in ["MOVING_STATE", "IDLE_STATE"]:
             # When conveyor resumes to moving or becomes idle, resume all belt store processes
             #self.belt.interrupt_and_resume_all_delayed_interrupt_processes()
             if not self.accumulating:
                 self.belt.noaccumulation_mode_on = False
-            self.belt.resume_all_move_processes()
-            self.belt.interrupt_and_resume_all_delayed_interrupt_processes()
+            self.belt.resume()
         else:
-            print("state changes from",old_state,"to",  new_state)
+            if self.trace:
+                self.trace.debug("state changes from %s to %s", old_state, new_state)
 
 
 
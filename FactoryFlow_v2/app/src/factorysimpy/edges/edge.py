@@ -2,7 +2,10 @@
 
 
 import simpy
+import numpy as np
 from factorysimpy.nodes.node import Node
+from factorysimpy.utils.delay_sampler import make_sampler
+from factorysimpy.utils.stream_stats import reset_stats
 
 
 class Edge:
@@ -37,6 +40,10 @@ class Edge:
         self.src_node = None
         self.dest_node = None
         self.capacity = capacity
+        self.trace = None # Trace handle installed by utils.tracer.Tracer; None when tracing is off.
+        self.index = None # Dense integer index assigned by Node.compile_model().
+        self.rng = None # numpy.random.Generator used by the delay samplers of the edge. Set by seed().
+        self._delay_samplers = {} # Samplers resolved by get_delay(), keyed by id() of the delay parameter.
         
          # Type checks
         if not isinstance(env, simpy.Environment):
@@ -77,29 +84,53 @@ class Edge:
         """
         Returns value based on the type of parameter `delay` provided.
 
+        The type of `delay` is resolved only on the first call (see Node.get_delay). Block samplers and frozen
+        scipy distributions draw their values in blocks from the generator of the edge (`self.rng`).
+
         Args:
-             delay (int, float, generator, or callable): The delay time, which can be:
+             delay (int, float, generator, callable, BlockSampler or frozen scipy distribution): The delay time, which can be:
              
                 - int or float: Used as a constant delay.
                 - generator: A generator instance yielding delay values.
                 - callable: A function that returns a delay values.
+                - BlockSampler or frozen scipy.stats distribution: Values drawn in blocks from `self.rng`.
 
         Returns:
                Returns a constant delay if `delay` is an int or float, a value yielded  if `delay` is a generator, or the value returned from a Callable function if `delay` is callable.
         """
-        if hasattr(delay, '__next__'):
-            # Generator instance
-            val = next(delay)
-        elif callable(delay):
-            # Function
-            val = delay()
-        else:
-            # int or float
-            val = delay
-
-        assert val >= 0, "Delay must be non-negative"
-        return val
+        entry = self._delay_samplers.get(id(delay))
+        if entry is None or entry[0] is not delay:
+            if self.rng is None:
+                self.rng = np.random.default_rng()
+            try:
+                entry = (delay, make_sampler(delay, self.rng))
+            except ValueError as e:
+                raise ValueError(f"{self.id}- {e}")
+            self._delay_samplers[id(delay)] = entry
+        try:
+            return entry[1]()
+        except AssertionError:
+            raise AssertionError(f"{self.id}- Delay must be non-negative")
+
+    def seed(self, seed=None):
+        """
+        Give the edge its own random generator for the delay samplers and discard the samplers resolved so far.
+
+        Args:
+            seed (int, numpy.random.SeedSequence or None): Seed of the generator. None seeds from fresh entropy.
+        """
+        self.rng = np.random.default_rng(seed)
+        self._delay_samplers = {}
+
 
+    def reset_statistics(self):
+        """
+        Clear the statistics of the edge at the current simulation time. Subclasses also restart the
+        time-averaged level of their store. The items on the edge are kept.
+        """
+        stats = getattr(self, "stats", None)
+        if isinstance(stats, dict):
+            reset_stats(stats, self.env.now)
 
     def update_state(self, new_state: str, current_time: float):
         """
@@ -23,6 +23,8 @@ class Fleet(Edge):
             User can specify a parameter `capacity` to specify how many items can be moved at once.
             Incoming edges can use reserve_get and reserve_put calls on the store in the fleet to reserve an item or space and after yielding
             the requests, an item can be put and obtained by using put and get methods.
+            In batch mode, reserve_put_many(k) and reserve_get_many(k) reserve space for k items or k items with one event, and
+            put_many and get_many transfer the k items in a single step.
 
     
 
@@ -64,11 +66,11 @@ class Fleet(Edge):
          
           
 
-          if callable(delay) or hasattr(delay, '__next__') or isinstance(delay, (int, float)) or delay is None:
+          if callable(delay) or hasattr(delay, '__next__') or hasattr(delay, 'rvs') or isinstance(delay, (int, float)) or delay is None:
             self.delay = delay
     
           else:
-            raise ValueError("delay must be None, int, float, generator, or callable.")
+            raise ValueError("delay must be None, int, float, generator, callable, or a frozen scipy.stats distribution.")
             
           #self.behavior =  self.env.process(self.behaviour())
           #self.stats_collector = self.env.process(self._stats_collector(sample_interval=0.4))
@@ -94,12 +96,16 @@ class Fleet(Edge):
         self.inbuiltstore._last_level_change_time = now
         self.inbuiltstore._last_num_items = len(self.inbuiltstore.items)+len(self.inbuiltstore.ready_items)
         
-        total_time = now
+        total_time = now - self.inbuiltstore._stats_start_time
         self.inbuiltstore.time_averaged_num_of_items_in_store = (
             self.inbuiltstore._weighted_sum / total_time if total_time > 0 else 0.0
         )
         self._fleet_stats_collector()
 
+    def reset_statistics(self):
+        super().reset_statistics()
+        self.inbuiltstore.reset_statistics()
+
     def can_put(self):
         """
         Check if the fleet can accept an item.
@@ -142,13 +148,59 @@ class Fleet(Edge):
     
     def put(self, event, item):
        delay=self.get_delay(self.delay)
-       print(f"T={self.env.now:.2f}: {self.id} is putting item {item.id} with delay {delay} at time {self.env.now}, total item in fleet is {len(self.inbuiltstore.items)+len(self.inbuiltstore.ready_items)}")
+       if self.trace:
+           self.trace.info("is putting item %s with delay %s at time %s, total item in fleet is %s", item.id, delay, self.env.now, len(self.inbuiltstore.items) + len(self.inbuiltstore.ready_items))
        
        proceed=self.inbuiltstore.put(event,item)
        self._fleet_stats_collector()
        item.fleet_entry_time = self.env.now
        return proceed
     
+    def reserve_put_many(self, quantity):
+        return self.inbuiltstore.reserve_put_many(quantity)
+
+    def reserve_get_many(self, quantity):
+        return self.inbuiltstore.reserve_get_many(quantity)
+
+    def put_many(self, event, items):
+        """
+        Put a batch of items reserved with `reserve_put_many` into the fleet.
+
+        Parameters
+        ----------
+        event : simpy.Event
+            The event that was reserved for putting the items.
+        items : list
+            The items to put, one per reserved unit.
+        """
+        if self.trace:
+            self.trace.info("is putting %s items at time %s, total item in fleet is %s", len(items), self.env.now, len(self.inbuiltstore.items) + len(self.inbuiltstore.ready_items))
+        proceed = self.inbuiltstore.put_many(event, items)
+        self._fleet_stats_collector()
+        for item in items:
+            item.fleet_entry_time = self.env.now
+        return proceed
+
+    def get_many(self, event):
+        """
+        Get the batch of items reserved with `reserve_get_many` from the fleet.
+
+        Parameters
+        ----------
+        event : simpy.Event
+            The event that was reserved for getting the items.
+
+        Returns
+        -------
+        items : list
+            The items retrieved from the fleet.
+        """
+        items = self.inbuiltstore.get_many(event)
+        self._fleet_stats_collector()
+        for item in items:
+            item.fleet_exit_time = self.env.now
+        return items
+
     def get(self, event):
         """
         Get an item from the fleet.
@@ -211,12 +263,14 @@ class Fleet(Edge):
       while True: 
         if self.inbuiltstore.ready_items or self.inbuiltstore.items: 
           self.update_state("RELEASING_STATE", self.env.now)
-          print(f"T={self.env.now:.2f}: {self.id } is releasing an item from its in store")
+          if self.trace:
+              self.trace.info("is releasing an item from its in store")
 
         else:
           
           self.update_state("EMPTY_STATE", self.env.now)
-          print(f"T={self.env.now:.2f}: {self.id } is waiting to get an item ")
+          if self.trace:
+              self.trace.info("is waiting to get an item")
 
         
         
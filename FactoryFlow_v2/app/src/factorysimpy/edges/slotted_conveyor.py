@@ -12,6 +12,7 @@ from factorysimpy.edges.edge import Edge
 from factorysimpy.base.slotted_belt_store import BeltStore
 from factorysimpy.base.reservable_priority_req_filter_store import ReservablePriorityReqFilterStore
 from factorysimpy.base.reservable_priority_req_store import ReservablePriorityReqStore
+from factorysimpy.utils.tracer import DEBUG
 
 
 
@@ -41,7 +42,8 @@ class BeltStore(BeltStore):
     def _do_put(self, event, item):
         """Override to handle the put operation with conveyor-specific logging."""
         returnval = super()._do_put(event, item)
-        print(f"T={self.env.now:.2f}: BeltStore:_do_put: putting item on belt {item[0].id} and belt items are {[(i[0].id) for i in self.items]}")
+        if self.trace and self.trace.level >= DEBUG:
+            self.trace.debug("BeltStore:_do_put: putting item on belt %s and belt items are %s", item[0].id, [i[0].id for i in self.items])
         return returnval
 class ConveyorBelt(Edge):
     """
@@ -116,12 +118,16 @@ class ConveyorBelt(Edge):
         self.belt._last_level_change_time = now
         self.belt._last_num_items = len(self.belt.items)+len(self.belt.ready_items)
         
-        total_time = now
+        total_time = now - self.belt._stats_start_time
         self.belt.time_averaged_num_of_items_in_store = (
             self.belt._weighted_sum / total_time if total_time > 0 else 0.0
         )
         self._conveyor_stats_collector()
 
+    def reset_statistics(self):
+        super().reset_statistics()
+        self.belt.reset_statistics()
+
 
 
     def is_empty(self):
@@ -177,11 +183,13 @@ class ConveyorBelt(Edge):
             An event that will be triggered when the item is successfully put on the belt.
         """
         #delay=self.get_delay(self.delay)
-        print(f"T={self.env.now:.2f}: Conveyor:put: putting item {item.id} ")
+        if self.trace:
+            self.trace.debug("Conveyor:put: putting item %s", item.id)
         delay = self.capacity * self.delay
         item.conveyor_entry_time = self.env.now
         item_to_put = (item, delay)
-        print(f"T={self.env.now:.2f}: {self.id }:put: putting item {item_to_put[0].id} on belt with delay {item_to_put[1]}")
+        if self.trace:
+            self.trace.debug("put: putting item %s on belt with delay %s", item_to_put[0].id, item_to_put[1])
         return_val = self.belt.put(event, item_to_put)
         self._conveyor_stats_collector()
         # if len(self.belt.items)==1:
@@ -210,7 +218,8 @@ class ConveyorBelt(Edge):
         Item
             The item retrieved from the belt.
         """
-        print(f"T={self.env.now:.2f}: {self.id }:get: getting item from belt")
+        if self.trace:
+            self.trace.debug("get: getting item from belt")
         item = self.belt.get(event)
         item.conveyor_exit_time = self.env.now
         self._conveyor_stats_collector()
@@ -238,7 +247,8 @@ class ConveyorBelt(Edge):
        #event_list=[self.belt.ready_item_event, self.get_events_available, self.put_events_available]
        
        while True:
-          print(f"T={self.env.now:.2f}: {self.id } is in {self.state}")
+          if self.trace:
+              self.trace.debug("is in %s", self.state)
           
           
           
@@ -247,7 +257,8 @@ class ConveyorBelt(Edge):
              self.set_conveyor_state("IDLE_STATE")
              yield self.item_arrival_event
              self.item_arrival_event = self.env.event()
-             print(f"T={self.env.now:.2f}: {self.id }item_arrival  event triggered")
+             if self.trace:
+                 self.trace.debug("item_arrival  event triggered")
              
              
           elif not self.is_empty() and not self.is_stalled():
@@ -267,7 +278,8 @@ class ConveyorBelt(Edge):
                
         
           else:
-            print(self.belt.items, self.belt.ready_items, self.is_stalled())
+            if self.trace and self.trace.level >= DEBUG:
+                self.trace.debug("%s %s %s", self.belt.items, self.belt.ready_items, self.is_stalled())
             raise ValueError(f"Conveyor {self.id} in unknown state {self.state}")
           
           yield self.env.timeout(self.delay)
@@ -282,7 +294,8 @@ class ConveyorBelt(Edge):
         old_state = self.state
         self.state = new_state
         
-        print(f"T={self.env.now:.2f}: {self.id} state changed from {old_state} to {new_state}")
+        if self.trace:
+            self.trace.debug("state changed from %s to %s", old_state, new_state)
         
         # Control belt store based on conveyor state changes
         if old_state in ["MOVING_STATE", "IDLE_STATE"] and new_state in ["STALLED_ACCUMULATING_STATE", "STALLED_NONACCUMULATING_STATE"]:
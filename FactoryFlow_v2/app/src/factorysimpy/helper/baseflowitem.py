@@ -1,5 +1,46 @@
 class BaseFlowItem:
-    """A class representing an item ."""
+    """
+    A class representing an item .
+
+    Flow items use `__slots__` so that they do not carry a per-instance `__dict__`. The attributes that
+    nodes and edges set while an item moves through the model (for example `conveyor_entry_time` or
+    `fleet_entry_time`) have their own slots and are left unset until they are assigned, so `hasattr`
+    checks behave as before. With its 21 slots an item takes about 200 bytes (`sys.getsizeof`, not counting
+    the objects it refers to), against about 400 bytes for the instance, its `__dict__` and an empty `stats`
+    dictionary without slots.
+
+    The time spent at each node is accumulated in the `stats` dictionary. The dictionary is created on the
+    first node exit, and the accounting can be turned off for all items by setting the class attribute
+    `record_node_stats` to False, e.g. when an `ItemHistoryRecorder` (utils.item_history) is used instead.
+    """
+
+    __slots__ = (
+        "id",
+        "flow_item_type",
+        "length",
+        "payload",
+        "timestamp_creation",
+        "timestamp_destruction",
+        "timestamp_node_entry",
+        "timestamp_node_exit",
+        "current_node_id",
+        "source_id",
+        "destructed_in_node",
+        "_stats",
+        "history_index",
+        # set by edges and stores while the item is in transit
+        "conveyor_entry_time",
+        "conveyor_exit_time",
+        "conveyor_ready_item_entry_time",
+        "total_interruption_time",
+        "interruption_start_time",
+        "fleet_entry_time",
+        "fleet_exit_time",
+        "put_time",
+    )
+
+    record_node_stats = True  # Set to False to skip the per-node time accounting in `stats`
+
     def __init__(self, id):
         self.id = id
         self.timestamp_creation = None
@@ -10,19 +51,27 @@ class BaseFlowItem:
         self.source_id = None      # Track the source node
         self.payload = None
         self.destructed_in_node = None  # Node where item was destructed
-        self.stats = {}  # Dictionary to store time spent at each node
+        self._stats = None  # Dictionary to store time spent at each node, created on first use
+        self.history_index = None  # Index of the item in an ItemHistoryRecorder, if any
+
+    @property
+    def stats(self):
+        """Dictionary with the time spent at each node, keyed by node ID."""
+        if self._stats is None:
+            self._stats = {}
+        return self._stats
 
     def set_creation(self, source_id, env):
         """Set creation time and source node ID."""
         self.timestamp_creation = env.now
         self.source_id = source_id
-    
+
     def set_destruction(self, node_id,  env):
         """set the destruction time and node of the item."""
         self.timestamp_destruction = env.now
         self.destructed_in_node = node_id
 
-    def update_node_event(self, node_id, env, event_type="entry"):
+    def update_node_event(self, node_id, env, event_type="entry", history=None, node_index=None):
         """
         Update item details and stats when entering or exiting a node.
 
@@ -30,6 +79,9 @@ class BaseFlowItem:
             node_id (str): The ID of the node.
             env (simpy.Environment): The simulation environment (for current time).
             event_type (str): "entry" or "exit" to specify the event.
+            history (ItemHistoryRecorder, optional): Recorder that receives the visit on exit. Defaults to None.
+            node_index (int, optional): Compiled index of the node (`Node.index`), required with `history`.
+                Defaults to None.
         """
         if event_type == "entry":
             self.timestamp_node_entry = env.now
@@ -39,14 +91,18 @@ class BaseFlowItem:
             self.timestamp_node_exit = env.now
             # Calculate time spent at the node and update stats
             if self.current_node_id is not None and self.timestamp_node_entry is not None:
-                time_spent = self.timestamp_node_exit - self.timestamp_node_entry
-                if self.current_node_id in self.stats:
-                    self.stats[self.current_node_id] += time_spent
-                else:
-                    self.stats[self.current_node_id] = time_spent
+                if self.record_node_stats:
+                    time_spent = self.timestamp_node_exit - self.timestamp_node_entry
+                    stats = self.stats
+                    if self.current_node_id in stats:
+                        stats[self.current_node_id] += time_spent
+                    else:
+                        stats[self.current_node_id] = time_spent
+                if history is not None:
+                    history.record(self, node_index, self.timestamp_node_entry, self.timestamp_node_exit)
             #self.current_node_id = None
             #self.timestamp_node_entry = None
-            
+
 
     def __repr__(self):
-        return f"Item({self.id})"
\ No newline at end of file
+        return f"Item({self.id})"
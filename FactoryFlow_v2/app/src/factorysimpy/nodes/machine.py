@@ -29,6 +29,7 @@ class Machine(Node):
                 - int or float: Used as a constant delay.
                 - Generator: A generator function yielding delay values over time.
                 - Callable: A function that returns a delay (int or float).
+                - BlockSampler or frozen scipy.stats distribution: Delays drawn in blocks from the generator of the node (see utils.delay_sampler).
             in_edge_selection (None or str or callable): Criterion or function for selecting the edge.
                                               Options include "RANDOM", "ROUND_ROBIN", "FIRST_AVAILABLE".
 
@@ -70,6 +71,20 @@ class Machine(Node):
                 
     """
 
+    supported_edge_types = ("Buffer", "Fleet", "ConveyorBelt")
+
+    statistic_attributes = (
+        "per_thread_total_time_in_blocked_state",
+        "per_thread_total_time_in_processing_state",
+        "time_per_work_occupancy",
+        "total_time_all_blocked",
+        "total_time_all_processing",
+        "total_time_atleast_one_blocked",
+        "total_time_atleast_one_processing",
+        "total_time_idle",
+        "total_time_setup",
+    )
+
     def __init__(self, env, id, in_edges=None, out_edges=None,node_setup_time=0, work_capacity=1,processing_delay=0,blocking=True,in_edge_selection="FIRST_AVAILABLE",out_edge_selection="ROUND_ROBIN"):
         super().__init__(env, id,in_edges, out_edges, node_setup_time)
         
@@ -82,7 +97,8 @@ class Machine(Node):
         self.per_thread_total_time_in_blocked_state = 0.0
         self.per_thread_total_time_in_processing_state = 0.0
         
-        self.worker_thread_list = []  # List to keep track of worker threads
+        self.worker_thread_list = {}  # Worker threads (processes) in start order; a dict so that removal is O(1)
+        self._thread_state_count = {"PROCESSING_STATE": 0, "BLOCKED_STATE": 0}  # Number of worker threads in each state
         
         self.item_in_process= None
         self.num_workers = 0  # Number of worker threads currently processing
@@ -110,12 +126,12 @@ class Machine(Node):
         # Initialize processing delay 
         # If processing_delay is a generator, callable, int, float or None, it is accepted.
         
-        if callable(processing_delay) or hasattr(processing_delay, '__next__') or isinstance(processing_delay, (int, float)) or processing_delay is None:
+        if callable(processing_delay) or hasattr(processing_delay, '__next__') or hasattr(processing_delay, 'rvs') or isinstance(processing_delay, (int, float)) or processing_delay is None:
             self.processing_delay = processing_delay
     
         else:
             raise ValueError(
-                "processing_delay must be None, int, float, generator, or callable."
+                "processing_delay must be None, int, float, generator, callable, or a frozen scipy.stats distribution."
             )
         
         self.behave = self.env.process(self.behaviour())  # Start the machine behavior process
@@ -256,6 +272,10 @@ class Machine(Node):
         else:
             raise ValueError(f"Edge already exists in Machine '{self.id}' in_edges.")
         
+    def reset_statistics(self):
+        super().reset_statistics()
+        self.time_last_occupancy_change = self.env.now
+
     def update_final_state_time(self, simulation_end_time):
         duration = simulation_end_time- self.stats["last_state_change_time"]
         # updating the time of per thread statescld
@@ -353,16 +373,15 @@ class Machine(Node):
         """
        
         
-        if out_edge.__class__.__name__ in ["Buffer", "Fleet", "ConveyorBelt"]:
-                outstore = out_edge
-                put_token = outstore.reserve_put()
-                yield put_token
-                item_to_push.update_node_event(self.id, self.env, "exit")
-                y=outstore.put(put_token, item_to_push)
-                if y:
-                    print(f"T={self.env.now:.2f}: {self.id} puts item into {out_edge.id}")
-        else:
-                raise ValueError(f"Unsupported edge type: {out_edge.__class__.__name__}")
+        # edge types are checked once by compile_dispatch()
+        outstore = out_edge
+        put_token = outstore.reserve_put()
+        yield put_token
+        item_to_push.update_node_event(self.id, self.env, "exit", self.history, self.index)
+        y=outstore.put(put_token, item_to_push)
+        if y:
+            if self.trace:
+                self.trace.info("puts item into %s", out_edge.id)
         
     def _pull_item(self, in_edge):
         """
@@ -374,19 +393,18 @@ class Machine(Node):
         """
 
         
-        if in_edge.__class__.__name__ in ["Buffer", "Fleet", "ConveyorBelt"]:
-                outstore = in_edge
-                get_token = outstore.reserve_get()
-                yield get_token
-                pulled_item =outstore.get(get_token)
-                pulled_item.update_node_event(self.id, self.env, "entry")
-                if pulled_item is not None:
-                    print(f"T={self.env.now:.2f}: {self.id} gets item {pulled_item.id} from {in_edge.id} ")
-                    self.item_in_process= pulled_item  # Assign the pulled item to the item_in_process attribute
-                else:
-                    raise ValueError(f"T={self.env.now:.2f}: {self.id} - No item pulled from in_edge {in_edge.id}!")
+        # edge types are checked once by compile_dispatch()
+        outstore = in_edge
+        get_token = outstore.reserve_get()
+        yield get_token
+        pulled_item =outstore.get(get_token)
+        pulled_item.update_node_event(self.id, self.env, "entry")
+        if pulled_item is not None:
+            if self.trace:
+                self.trace.info("gets item %s from %s", pulled_item.id, in_edge.id)
+            self.item_in_process= pulled_item  # Assign the pulled item to the item_in_process attribute
         else:
-                raise ValueError(f"Unsupported edge type: {in_edge.__class__.__name__}")
+            raise ValueError(f"T={self.env.now:.2f}: {self.id} - No item pulled from in_edge {in_edge.id}!")
               
             
     
@@ -453,29 +471,53 @@ class Machine(Node):
     
     def _count_worker_state(self):
         """
-        Counts and returns the number of threads in "PROCESSING_STATE" and "BLOCKED_STATE"
-        using self.worker_thread_list.
+        Returns the number of threads in "PROCESSING_STATE" and "BLOCKED_STATE".
+
+        The counts are kept up to date by `_add_worker_thread`, `_set_thread_state` and `_remove_worker_thread`,
+        so this is O(1). With `self.debug` set, they are checked against a recount of self.worker_thread_list.
     
         Returns:
             num_threads_PROCESSING (int): Number of threads in "PROCESSING_STATE"
             num_threads_BLOCKED (int): Number of threads in "BLOCKED_STATE"
         """
-        if not self.worker_thread_list:
-            num_threads_PROCESSING = 0
-            num_threads_BLOCKED = 0
-        else:
-            num_threads_PROCESSING = sum(
-                proc.thread_state == "PROCESSING_STATE" for proc in self.worker_thread_list
-            )
-            num_threads_BLOCKED = sum(
-                proc.thread_state == "BLOCKED_STATE" for proc in self.worker_thread_list
-            )
-    
+        num_threads_PROCESSING = self._thread_state_count["PROCESSING_STATE"]
+        num_threads_BLOCKED = self._thread_state_count["BLOCKED_STATE"]
+        if self.debug:
+            self._check_worker_state(num_threads_PROCESSING, num_threads_BLOCKED)
+        return num_threads_PROCESSING, num_threads_BLOCKED
+
+    def _check_worker_state(self, num_threads_PROCESSING, num_threads_BLOCKED):
+        # Debug check: recount the thread states and validate them against work_capacity
+        recount_PROCESSING = sum(
+            proc.thread_state == "PROCESSING_STATE" for proc in self.worker_thread_list
+        )
+        recount_BLOCKED = sum(
+            proc.thread_state == "BLOCKED_STATE" for proc in self.worker_thread_list
+        )
+        assert (num_threads_PROCESSING, num_threads_BLOCKED) == (recount_PROCESSING, recount_BLOCKED), \
+            f"T={self.env.now:.2f} {self.id} thread counters out of sync. counters=({num_threads_PROCESSING}, {num_threads_BLOCKED}), recount=({recount_PROCESSING}, {recount_BLOCKED})"
         assert 0 <= num_threads_BLOCKED <= self.work_capacity \
             and 0 <= num_threads_PROCESSING <= self.work_capacity \
             and 0 <= num_threads_BLOCKED + num_threads_PROCESSING <= self.work_capacity, \
             f"T={self.env.now:.2f} {self.id} has more threads than work_capacity is created. num_threads_PROCESSING={num_threads_PROCESSING}, num_threads_BLOCKED={num_threads_BLOCKED}, work_capacity={self.work_capacity}"
-        return num_threads_PROCESSING, num_threads_BLOCKED
+
+    def _add_worker_thread(self, proc):
+        # Register a new worker thread; its thread_state must already be set
+        self.worker_thread_list[proc] = None
+        self._thread_state_count[proc.thread_state] += 1
+
+    def _set_thread_state(self, proc, new_state):
+        # Move a worker thread to new_state and update the thread counters
+        if proc in self.worker_thread_list:
+            self._thread_state_count[proc.thread_state] -= 1
+            self._thread_state_count[new_state] += 1
+        proc.thread_state = new_state
+
+    def _remove_worker_thread(self, proc):
+        # Unregister a finished worker thread
+        if proc in self.worker_thread_list:
+            del self.worker_thread_list[proc]
+            self._thread_state_count[proc.thread_state] -= 1
     
     
 
@@ -504,45 +546,26 @@ class Machine(Node):
                 if self.blocking:
                     #self.check_thread_state_and_update_machine_state()
                     self.update_state_rep(self.env.now)
-                    self.env.active_process.thread_state = "BLOCKED_STATE"  # Update the thread state to PROCESSING_STATE BLOCKING
+                    self._set_thread_state(self.env.active_process, "BLOCKED_STATE")  # Update the thread state to PROCESSING_STATE BLOCKING
                     #self.check_thread_state_and_update_machine_state()
                     self.update_state_rep(self.env.now)
                     blocking_start_time = self.env.now
                 
                    
-                    #out_edge_events = [self.out_edges[i].inbuiltstore.reserve_put() for i in range(len(self.out_edges)-1,-1,-1)]
-                    out_edge_events= [edge.reserve_put() for edge in self.out_edges]  # Filter out None events
-                    #print(self.env.now,len(self.out_edge_events),self.out_edges)
-                    triggered_out_edge_events = self.env.any_of(out_edge_events)
-                    yield triggered_out_edge_events  # Wait for any in_edge to be available
-                    
-                    chosen_put_event = next((event for event in out_edge_events if event.triggered), None)
-                    
-                    
-                    #self.out_edge_events.remove(chosen_put_event)  # Remove the chosen event from the list
-                    if chosen_put_event is None:
-                        raise ValueError(f"{self.env.now},{self.id} - No out_edge available for processing{[edge.id for edge in self.out_edges]}!")
-                    edge_index = out_edge_events.index(chosen_put_event)
+                    # one ReserveAnyOf event for all out_edges: it succeeds with the index of the first edge that
+                    # grants a reservation and withdraws the requests at the other edges, so nothing has to be cancelled
+                    reserve_any = self._reserve_any_out_edge()
+                    edge_index = yield reserve_any  # Wait for any out_edge to be available
+                    chosen_put_event = reserve_any.reservation
                     self.stats["out_edge_selection"].append(edge_index)  # Store the index of the chosen out_edge
-                    #out_edge_events.remove(chosen_put_event)  # Remove the chosen event from the list
-                    #cancelling already triggered out_edge events
-                    for event in out_edge_events:
-                        #if event.triggered and event is not chosen_put_event:
-                        if event is not chosen_put_event:
-                            event.resourcename.reserve_put_cancel(event)
-                    #out_edge_events=[]
 
                     #putting the item in the chosen out_edge
                     
-                    item.update_node_event(self.id, self.env, "exit")
-                    if self.out_edges[edge_index].__class__.__name__  in [ "Buffer", "ConveyorBelt", "Fleet"]:
-                        self.stats["num_item_processed"] += 1
-                        itemput=self.out_edges[edge_index].put(chosen_put_event, item)
-                        #itemput = chosen_put_event.resourcename.put(chosen_put_event, item)  # Get the item from the chosen in_edge
-
-                    else:
-                        raise ValueError(f"Unsupported edge type: {self.out_edges[edge_index].__class__.__name__}")
-                    print(f"T={self.env.now:.2f}: {self.id} puts item {item.id} into {self.out_edges[edge_index].id} ")
+                    item.update_node_event(self.id, self.env, "exit", self.history, self.index)
+                    self.stats["num_item_processed"] += 1
+                    itemput=self._out_edge_put[edge_index](chosen_put_event, item)
+                    if self.trace:
+                        self.trace.info("puts item %s into %s", item.id, self.out_edges[edge_index].id)
                     
                     self._update_avg_time_spent_in_blocked(self.env.now - blocking_start_time)
                     #self.env.active_process.thread_state = "PROCESSING_STATE"  # Update the thread state to PROCESSING_STATE BLOCKING
@@ -565,12 +588,13 @@ class Machine(Node):
                          blocking_start_time = self.env.now
                          #self.check_thread_state_and_update_machine_state()
                          self.update_state_rep(self.env.now)
-                         self.env.active_process.thread_state = "BLOCKED_STATE"  # Update the thread state to PROCESSING_STATE BLOCKING
+                         self._set_thread_state(self.env.active_process, "BLOCKED_STATE")  # Update the thread state to PROCESSING_STATE BLOCKING
                          #self.check_thread_state_and_update_machine_state()
                          self.update_state_rep(self.env.now)
                          yield self.env.process(self._push_item(item, out_edge_index_to_put)) 
                          self.stats["num_item_processed"] += 1 
-                         print(f"T={self.env.now:.2f}: {self.id} worker puts item {item.id} into {out_edge_index_to_put.id} ")
+                         if self.trace:
+                             self.trace.info("worker puts item %s into %s", item.id, out_edge_index_to_put.id)
                          #self.check_thread_state_and_update_machine_state()
                          #self.env.active_process.thread_state = "PROCESSING_STATE"  # Update the thread state to PROCESSING_STATE BLOCKING
                          
@@ -579,7 +603,8 @@ class Machine(Node):
                          self.update_state_rep(self.env.now)
 
                     else:
-                        print(f"T={ self.env.now:.2f}: {self.id} worker is discarding item {item.id} because out_edge {edge.id} is full.")
+                        if self.trace:
+                            self.trace.info("worker is discarding item %s because out_edge %s is full.", item.id, edge.id)
                         self.stats["num_item_discarded"] += 1  # Decrement processed count if item is discarded
 
 
@@ -589,28 +614,31 @@ class Machine(Node):
 
             #out_edge_selection is not "FIRST_AVAILABLE" ---> get index value and push the item if not blocking
             else:
-                print(f"T={self.env.now:.2f}: {self.id} worker processed item: {item.id}")
+                if self.trace:
+                    self.trace.info("worker processed item: %s", item.id)
                 out_edge_index_to_put = self._get_out_edge_index()
-                print("!!!!!!!",self.env.now,self.id, out_edge_index_to_put)
                 #print("OUT",out_edge_index_to_put)
                 assert 0<=out_edge_index_to_put < len(self.out_edges), f"{self.id} - Invalid edge index. {out_edge_index_to_put} is not in range. Range must be between {0} and  {len(self.out_edges)-1} for in_edges."
                 outedge_to_put = self.out_edges[out_edge_index_to_put]
                 #push the item if not blocking
-                self.env.active_process.thread_state = "BLOCKED_STATE"  # Update the thread state to PROCESSING_STATE BLOCKING
+                self._set_thread_state(self.env.active_process, "BLOCKED_STATE")  # Update the thread state to PROCESSING_STATE BLOCKING
                 #5self.check_thread_state_and_update_machine_state()
                 self.update_state_rep(self.env.now)
                 if self.blocking:
                     blocking_start_time = self.env.now
-                    print(f"T={self.env.now:.2f}: {self.id} worker is in BLOCKED_STATE")
+                    if self.trace:
+                        self.trace.info("worker is in BLOCKED_STATE")
                     #yield self.env.process(self._push_item(item, outedge_to_put))
-                    put_event=outedge_to_put.reserve_put()
+                    put_event=self._out_edge_reserve_put[out_edge_index_to_put]()
                     yield put_event
-                    print(f"T={self.env.now:.2f}: {self.id} yielded and worker is putting item {item.id} into {outedge_to_put.id} " )
-                    item.update_node_event(self.id, self.env, "exit")
+                    if self.trace:
+                        self.trace.info("yielded and worker is putting item %s into %s", item.id, outedge_to_put.id)
+                    item.update_node_event(self.id, self.env, "exit", self.history, self.index)
                     self.stats["num_item_processed"] += 1
-                    y=outedge_to_put.put(put_event, item)
+                    y=self._out_edge_put[out_edge_index_to_put](put_event, item)
                     if y:
-                     print(f"T={self.env.now:.2f}: {self.id} worker puts item {item.id} into {outedge_to_put.id} ")
+                     if self.trace:
+                         self.trace.info("worker puts item %s into %s", item.id, outedge_to_put.id)
                     self._update_avg_time_spent_in_blocked(self.env.now - blocking_start_time)
                     #self.check_thread_state_and_update_machine_state()  # Check and update the machine state after blocking
                 #check can_put and only if it succeeds push the item if not blocking
@@ -620,10 +648,12 @@ class Machine(Node):
                         blocking_start_time = self.env.now
                         yield self.env.process(self._push_item(item, outedge_to_put))
                         self.stats["num_item_processed"] += 1
-                        print(f"T={self.env.now:.2f}: {self.id} worker puts item {item.id} into {outedge_to_put.id} ")
+                        if self.trace:
+                            self.trace.info("worker puts item %s into %s", item.id, outedge_to_put.id)
                         self._update_avg_time_spent_in_blocked(self.env.now - blocking_start_time)
                     else:
-                        print(f"T={self.env.now:.2f}: {self.id} worker is discarding item {item.id} because out_edge {outedge_to_put.id} is full.")
+                        if self.trace:
+                            self.trace.info("worker is discarding item %s because out_edge %s is full.", item.id, outedge_to_put.id)
                         self.stats["num_item_discarded"] += 1
             # Release the worker thread after processing
             #self.env.active_process.thread_state = "PROCESSING_STATE"  # Update the thread state to PROCESSING_STATE BLOCKING
@@ -631,8 +661,7 @@ class Machine(Node):
             yield self.worker_thread.release(req_token)  # Release the worker thread
       
             #delete the worker thread from the worker_thread_list
-            if self.env.active_process in self.worker_thread_list:
-                self.worker_thread_list.remove(self.env.active_process)
+            self._remove_worker_thread(self.env.active_process)
             self._update_worker_occupancy(action="REMOVE")  # Update worker occupancy after processing
             #2self.check_thread_state_and_update_machine_state()  
             self.update_state_rep(self.env.now)  
@@ -651,6 +680,8 @@ class Machine(Node):
         #checking of the machine has atleast 1 in_edge and 1 out_edge
         assert self.in_edges is not None and len(self.in_edges) >= 1, f"Machine '{self.id}' must have atleast 1 in_edge."
         assert self.out_edges is not None and len(self.out_edges) >= 1, f"Machine '{self.id}' must have atleast 1 out_edge."
+        if not self._dispatch_compiled:
+            self.compile_dispatch()
         
         while True:
             #print(f"T={self.env.now:.2f}: {self.id} worker{i} started processing")
@@ -658,12 +689,14 @@ class Machine(Node):
             
             if self.state_rep == (-1, -1):
                 
-                print(f"T={self.env.now:.2f}: {self.id} is in SETUP_STATE")
+                if self.trace:
+                    self.trace.info("is in SETUP_STATE")
                 yield self.env.timeout(self.node_setup_time)# always an int or float
                 self.stats["total_time_spent_in_states"]["SETUP_STATE"] += self.node_setup_time
                 self.total_time_setup += self.node_setup_time
                 self.state_rep = (0, 0) # changing the state_rep to (0,0) to indicate that the machine is ready for processing
-                print(f"T={self.env.now:.2f}: {self.id} completed setup")
+                if self.trace:
+                    self.trace.info("completed setup")
                 self.update_state_rep(self.env.now)
                 #self.update_state("IDLE_STATE", self.env.now)
 
@@ -685,74 +718,18 @@ class Machine(Node):
                 if self.in_edge_selection == "FIRST_AVAILABLE":
                     
                     #if not self.in_edge_events:
-                    self.in_edge_events=  [edge.reserve_get() for edge in self.in_edges]
-
-                    # for i in self.in_edges:
-                    #     if len(i.inbuiltstore.items):
-
-                    #        print( f"T={self.env.now:.2f}: {self.id} in {i.id} item entry time - {[item.timestamp_node_exit for item in i.inbuiltstore.items] } and no. of reservations {len(i.inbuiltstore.reservations_get)} ") # Update the timestamp of items in the inbuilt store 
-                    #        #if len(i.inbuiltstore.reservations_get):
-                                                     
-                    #     else:
-                    #         print(f"T={self.env.now:.2f}: {self.id} in {i.id} is empty")
-                    #self.in_edge_events = [self.in_edges[i].inbuiltstore.reserve_get() for i in range(len(self.in_edges)-1,-1,-1)]
-                    print(f"T={self.env.now:.2f}: {self.id} waiting for in_edge events to be triggered")
-                    #print(f"T={self.env.now:.2f}: {self.id} in_edge_events: {[event.resourcename for event in self.in_edge_events]}")  # Debugging line to check in_edge_events
-                    triggered_in_edge_events = self.env.any_of(self.in_edge_events)
-                    
-                    yield triggered_in_edge_events  # Wait for any in_edge to be available
-                    trig_count = [1 if event.triggered else 0 for event in self.in_edge_events]
-                    #print(f"T={self.env.now:.2f}: {self.id} no of trigerred events {sum(trig_count)} , {trig_count}, in_edge_events triggered")
-                    # Find the first triggered event           
-                    self.chosen_event = next((event for event in self.in_edge_events if event.triggered), None)
-                    if self.chosen_event is None:
-                        raise ValueError(f"{self.id} - No in_edge available for processing!")
-                    # Find the index of the chosen event in the in_edge_events list
-                    edge_index_to_print = None
-                    for i in range(len(self.in_edges)):
-                        #print(self.chosen_event.resourcename, self.in_edges[i])
-                        if self.in_edges[i].__class__.__name__ in ["Buffer", "Fleet"]:
-                            if self.chosen_event.resourcename == self.in_edges[i].inbuiltstore :
-                        
-                                edge_index_to_print=i
-                        elif self.in_edges[i].__class__.__name__ == "ConveyorBelt":
-
-                            print(self.chosen_event.resourcename, self.in_edges[i].belt)
-                            #if self.chosen_event.resourcename == self.in_edges[i].out_buf:
-                            if self.chosen_event.resourcename == self.in_edges[i].belt:
-                                
-                                edge_index_to_print=i
-                        else:
-                            raise ValueError(f"Unsupported edge type: {self.in_edges[i].__class__.__name__}")
-
-                            
-                    edge_index = self.in_edge_events.index(self.chosen_event)  # Get the index of the chosen event
-                    #print(len(self.in_edge_events), edge_index, edge_index_to_print, len(self.in_edges), [i.id for i in self.in_edges])
-                    assert edge_index == edge_index_to_print, f"{self.id} - Edge index mismatch. {edge_index} != {edge_index_to_print}. Check the in_edge_events and in_edges."
-                    
-                    #print("!!!!!!",edge_index)
+                    if self.trace:
+                        self.trace.info("waiting for in_edge events to be triggered")
+                    # one ReserveAnyOf event for all in_edges: it succeeds with the index of the first edge that
+                    # grants a reservation and withdraws the requests at the other edges, so nothing has to be cancelled
+                    reserve_any = self._reserve_any_in_edge()
+                    edge_index = yield reserve_any  # Wait for any in_edge to be available
+                    self.chosen_event = reserve_any.reservation
                     self.stats["in_edge_selection"].append(edge_index)
                     
-                    print(f"T={self.env.now:.2f}: {self.id} yielded from {self.in_edges[edge_index].id} ")
-                    
+                    if self.trace:
+                        self.trace.info("yielded from %s", self.in_edges[edge_index].id)
                     
-                    #self.in_edge_events.remove(self.chosen_event)  #
-                    #  Remove the chosen event from the list
-                    #cancelling already triggered in_edge events other than chosen events
-                    
-                    for event in self.in_edge_events:
-                        event_cancelled = False
-                        #if event.triggered and event is not self.chosen_event:
-                        if  event is not self.chosen_event:
-                            #print(f"T={self.env.now:.2f}: {self.id} cancelling  in_edge events  ")
-                            event_cancelled = event.resourcename.reserve_get_cancel(event)
-                            if not event_cancelled:
-                                raise ValueError(f"{self.id} - Failed to cancel reserve_get for event {event}.")
-                            
-                        #self.in_edge_events=[]
-
-                    
-
                     ####---3/9 Create workers based on work_capacity
                     # worker_thread_req = self.worker_thread.request()  # Request a worker thread
                     # print(f"T={self.env.now:.2f}: {self.id} requested worker thread for processing item from {self.in_edges[edge_index].id} ")
@@ -763,13 +740,8 @@ class Machine(Node):
                     #update occupancy
                     #self._update_worker_occupancy(action="ADD")
 
-                    if self.in_edges[edge_index].__class__.__name__ in ["Buffer", "Fleet", "ConveyorBelt"]:
-                        self.item_in_process=self.in_edges[edge_index].get(self.chosen_event)  # Get the item from the chosen in_edge
-                        #print("getting getting getting getting  item from in_edge", self.chosen_event.resourcename)
-                        #self.item_in_process = self.chosen_event.resourcename.get(self.chosen_event)  # Get the item from the chosen in_edge
-                        self.item_in_process.update_node_event(self.id, self.env, "entry")
-                    else:
-                        raise ValueError(f"Unsupported edge type: {self.in_edges[edge_index].__class__.__name__}")
+                    self.item_in_process=self._in_edge_get[edge_index](self.chosen_event)  # Get the item from the chosen in_edge
+                    self.item_in_process.update_node_event(self.id, self.env, "entry")
                     #print(f"T={self.env.now:.2f}: {self.id} received item {item.id} from {self.in_edges[edge_index].id} ")
                     
                     
@@ -790,29 +762,28 @@ class Machine(Node):
                     
                     
 
-                    if in_edge_to_get.__class__.__name__ in ["Buffer", "Fleet", "ConveyorBelt"]:
-                        print(f"T={self.env.now:.2f}: {self.id} is pulling item from {in_edge_to_get.id} ")
-                        outstore = in_edge_to_get
-                        get_token = outstore.reserve_get()
-                        yield get_token
-                        print(f"T={self.env.now:.2f}: {self.id} yielded from {in_edge_to_get.id} ")
-                         # Create workers based on work_capacity
-                        #worker_thread_req = self.worker_thread.request()  # Request a worker thread
-                        #yield worker_thread_req
-                        #update occupancy
-                        #self._update_worker_occupancy(action="ADD")
-                        
-                        
-                        self.item_in_process =outstore.get(get_token)
-                        
-                        if self.item_in_process  is not None:
-                            #print(self.item_in_process)
-                            self.item_in_process .update_node_event(self.id, self.env, "entry")
-                            print(f"T={self.env.now:.2f}: {self.id} gets item {self.item_in_process .id} from {in_edge_to_get.id} ")
-                        else:
-                            raise ValueError(f"T={self.env.now:.2f}: {self.id} - No item pulled from in_edge {in_edge_to_get.id}!")
+                    if self.trace:
+                        self.trace.info("is pulling item from %s", in_edge_to_get.id)
+                    get_token = self._in_edge_reserve_get[in_edge_index]()
+                    yield get_token
+                    if self.trace:
+                        self.trace.info("yielded from %s", in_edge_to_get.id)
+                     # Create workers based on work_capacity
+                    #worker_thread_req = self.worker_thread.request()  # Request a worker thread
+                    #yield worker_thread_req
+                    #update occupancy
+                    #self._update_worker_occupancy(action="ADD")
+                    
+                    
+                    self.item_in_process =self._in_edge_get[in_edge_index](get_token)
+                    
+                    if self.item_in_process  is not None:
+                        #print(self.item_in_process)
+                        self.item_in_process .update_node_event(self.id, self.env, "entry")
+                        if self.trace:
+                            self.trace.info("gets item %s from %s", self.item_in_process.id, in_edge_to_get.id)
                     else:
-                        raise ValueError(f"Unsupported edge type: {in_edge_to_get.__class__.__name__}")
+                        raise ValueError(f"T={self.env.now:.2f}: {self.id} - No item pulled from in_edge {in_edge_to_get.id}!")
 
 
 
@@ -835,12 +806,13 @@ class Machine(Node):
                 #print("!!!!!!!!!!!!!!!!!!EGKEKHRTUOYO!!!!!!!!!!!!!!!!!!!!!!!!!", next_processing_time)
 
                 self.stats["processing_delay"].append(next_processing_time)  # Update the processing delay in stats
-                print(f"T={self.env.now:.2f}: {self.id} worker started processing item {self.item_in_process.id} ")
+                if self.trace:
+                    self.trace.info("worker started processing item %s", self.item_in_process.id)
                 #spawn a worker process
                 proc = self.env.process(self.worker(self.item_in_process, next_processing_time, worker_thread_req))  # Start the worker process
                 proc.thread_state="PROCESSING_STATE" # Set the thread state to PROCESSING_STATE
                 proc.item_to_put = self.item_in_process # Set the item to be put by the worker process
-                self.worker_thread_list.append(proc)  # Add the worker process to the worker_thread_list
+                self._add_worker_thread(proc)  # Add the worker process to the worker_thread_list
                 #4self.check_thread_state_and_update_machine_state()  # Check and update the machine state based on worker states
                 self.update_state_rep(self.env.now)
                 #initialise item into none
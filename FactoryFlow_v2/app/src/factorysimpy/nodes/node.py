@@ -1,6 +1,10 @@
 import simpy
+import numpy as np
 from collections import OrderedDict
 from graphviz import Digraph
+from factorysimpy.utils.delay_sampler import make_sampler
+from factorysimpy.utils.stream_stats import make_metric, reset_stats
+from factorysimpy.base.reserve_any import ReserveAnyOf
 
 
 
@@ -38,6 +42,13 @@ class Node:
         self.node_setup_time = node_setup_time # Time taken to set up the node.
         self.in_edges = in_edges # List of input edges connected to the node.
         self.out_edges = out_edges #List of output edges connected to the node.
+        self.trace = None # Trace handle installed by utils.tracer.Tracer; None when tracing is off.
+        self.history = None # Item history recorder installed by utils.item_history.ItemHistoryRecorder; None when off.
+        self.index = None # Dense integer index assigned by compile_model().
+        self._dispatch_compiled = False # True once compile_dispatch() has built the edge dispatch tables.
+        self.rng = None # numpy.random.Generator used by the delay samplers of the node. Set by seed().
+        self._delay_samplers = {} # Samplers resolved by get_delay(), keyed by id() of the delay parameter.
+        self._flat_index = None # (nodes, edges) cached by get_all_nodes_edges(); reset when the hierarchy changes.
 
        
         if isinstance(node_setup_time, (int, float)):
@@ -52,29 +63,93 @@ class Node:
         """
         Returns value based on the type of parameter `delay` provided.
 
+        The type of `delay` is resolved only on the first call; later calls go straight to the sampler
+        that was built for it (see utils.delay_sampler). Block samplers and frozen scipy distributions
+        draw their values in blocks from the generator of the node (`self.rng`).
+
         Args:
-             delay (int, float, generator, or callable): The delay time, which can be:
+             delay (int, float, generator, callable, BlockSampler or frozen scipy distribution): The delay time, which can be:
              
                 - int or float: Used as a constant delay.
                 - generator: A generator instance yielding delay values.
                 - callable: A function that returns a delay values.
+                - BlockSampler or frozen scipy.stats distribution: Values drawn in blocks from `self.rng`.
 
         Returns:
                Returns a constant delay if `delay` is an int or float, a value yielded  if `delay` is a generator, or the value returned from a Callable function if `delay` is callable.
         """
-        if hasattr(delay, '__next__'):
-            # Generator instance
-            val = next(delay)
-        elif callable(delay):
-            # Function
-            val = delay()
-        else:
-            # int or float
-            val = delay
-        #print(self.id)
-        assert val >= 0, f"{self.id}- Delay must be non-negative"
-        return val
+        entry = self._delay_samplers.get(id(delay))
+        if entry is None or entry[0] is not delay:
+            if self.rng is None:
+                self.rng = np.random.default_rng()
+            try:
+                entry = (delay, make_sampler(delay, self.rng))
+            except ValueError as e:
+                raise ValueError(f"{self.id}- {e}")
+            self._delay_samplers[id(delay)] = entry
+        try:
+            return entry[1]()
+        except AssertionError:
+            raise AssertionError(f"{self.id}- Delay must be non-negative")
+
+    def seed(self, seed=None):
+        """
+        Give the node its own random generator for the delay samplers and discard the samplers resolved so far.
+
+        Args:
+            seed (int, numpy.random.SeedSequence or None): Seed of the generator. None seeds from fresh entropy.
+        """
+        self.rng = np.random.default_rng(seed)
+        self._delay_samplers = {}
     
+    # Per-item metrics that a node records only after a retention has been set for them (see set_stats_retention).
+    optional_stats = ()
+
+    # Accumulators kept as attributes outside `stats`, cleared by reset_statistics.
+    statistic_attributes = ()
+
+    def reset_statistics(self):
+        """
+        Clear the statistics of the node at the current simulation time (see utils.stream_stats.reset_stats).
+        The state of the node and the items it holds are kept. Use utils.stream_stats.reset_statistics to
+        reset a whole model.
+        """
+        stats = getattr(self, "stats", None)
+        if isinstance(stats, dict):
+            reset_stats(stats, self.env.now)
+        for name in self.statistic_attributes:
+            value = getattr(self, name)
+            if isinstance(value, list):
+                setattr(self, name, [0.0] * len(value))
+            else:
+                setattr(self, name, 0.0)
+
+    def set_stats_retention(self, **policy):
+        """
+        Choose how the per-item metrics in `self.stats` are kept. By default every value is appended to a list;
+        a retention replaces the list with a bounded recorder from utils.stream_stats. Metrics the node does
+        not record are ignored.
+
+        Args:
+            **policy: Maps a metric name (e.g. "processing_delay" or "out_edge_selection") to a retention,
+                one of "ALL", "AGGREGATE", "RESERVOIR", "COUNTS", "QUANTILES" or a function returning a recorder.
+
+        Returns:
+            list: Names of the metrics whose retention was set.
+
+        Raises:
+            ValueError: If a retention is invalid.
+        """
+        stats = getattr(self, "stats", None)
+        applied = []
+        if stats is None:
+            return applied
+        for metric, retention in policy.items():
+            if metric in self.optional_stats or hasattr(stats.get(metric), "append"):
+                stats[metric] = make_metric(retention, self)
+                applied.append(metric)
+        return applied
+
     def update_state(self, new_state: str, current_time: float):
         """
         Update node state and track the time spent in the previous state.
@@ -109,6 +184,98 @@ class Node:
         
         raise NotImplementedError("behaviour must be implemented in a subclass.")
 
+    # Class names of the edges this node can exchange items with. None accepts any edge.
+    supported_edge_types = None
+
+    # Set to True (on a node or on the class) to cross-check incremental bookkeeping, such as the worker
+    # thread counters, against a full recount on every update. Off by default as the checks are O(n).
+    debug = False
+
+    @staticmethod
+    def _reservation_store(edge):
+        """Return the store that owns the reservation events returned by the reserve_put/reserve_get of `edge`."""
+        store = getattr(edge, "inbuiltstore", None)
+        if store is None:
+            store = getattr(edge, "belt", None)
+        return store
+
+    def compile_dispatch(self):
+        """
+        Build the edge dispatch tables used on the hot path of the node, so that per-item work is done with
+        list indexing and bound methods instead of class-name checks on the edges.
+
+        Tables built:
+            _in_edge_reserve_get, _in_edge_get (list): bound reserve_get/get methods of the in_edges.
+            _out_edge_reserve_put, _out_edge_put (list): bound reserve_put/put methods of the out_edges.
+            _in_edge_index_by_store, _out_edge_index_by_store (dict): Map the store that owns a reservation
+                event (its `resourcename`) to the index of the edge in in_edges/out_edges.
+            _in_edge_stores, _out_edge_stores (list): Stores of the in_edges/out_edges, used by
+                _reserve_any_in_edge/_reserve_any_out_edge.
+
+        Raises:
+            ValueError: If an edge connected to the node is not one of `supported_edge_types`.
+        """
+        in_edges = self.in_edges or []
+        out_edges = self.out_edges or []
+        if self.supported_edge_types is not None:
+            for edge in in_edges + out_edges:
+                if edge.__class__.__name__ not in self.supported_edge_types:
+                    raise ValueError(f"Unsupported edge type: {edge.__class__.__name__}")
+        self._in_edge_reserve_get = [edge.reserve_get for edge in in_edges]
+        self._in_edge_get = [edge.get for edge in in_edges]
+        self._out_edge_reserve_put = [edge.reserve_put for edge in out_edges]
+        self._out_edge_put = [edge.put for edge in out_edges]
+        self._in_edge_index_by_store = {self._reservation_store(edge): i for i, edge in enumerate(in_edges)}
+        self._out_edge_index_by_store = {self._reservation_store(edge): i for i, edge in enumerate(out_edges)}
+        self._in_edge_stores = [self._reservation_store(edge) for edge in in_edges]
+        self._out_edge_stores = [self._reservation_store(edge) for edge in out_edges]
+        self._dispatch_compiled = True
+
+    def _reserve_any_in_edge(self):
+        """
+        Reserve an item from the first in_edge that has one ("FIRST_AVAILABLE"), with a single
+        ReserveAnyOf event instead of one reserve_get per edge. The event succeeds with the index of
+        the edge; its `reservation` is passed to the get of that edge.
+        """
+        return ReserveAnyOf(self.env, self._in_edge_stores, "GET")
+
+    def _reserve_any_out_edge(self):
+        """
+        Reserve space in the first out_edge that has some ("FIRST_AVAILABLE"), with a single
+        ReserveAnyOf event instead of one reserve_put per edge. The event succeeds with the index of
+        the edge; its `reservation` is passed to the put of that edge.
+        """
+        return ReserveAnyOf(self.env, self._out_edge_stores, "PUT")
+
+    def compile_model(self, seed=None):
+        """
+        Compile the model under this node before a run. Every node and edge is interned into a dense integer
+        index (stored in its `index` attribute) and every node builds its edge dispatch tables.
+
+        If `seed` is given, every node and edge gets its own random generator spawned from it, so the
+        delays drawn by a component do not depend on the other components of the model.
+
+        Args:
+            seed (int, optional): Seed of the model. Defaults to None, which keeps the current generators.
+
+        Returns:
+            tuple: (nodes, edges) lists, where the position of a component is its index.
+        """
+        nodes, edges = self.get_all_nodes_edges()
+        self._compiled_nodes = list(nodes.values())
+        self._compiled_edges = list(edges.values())
+        for index, node in enumerate(self._compiled_nodes):
+            node.index = index
+        for index, edge in enumerate(self._compiled_edges):
+            edge.index = index
+        for node in self._compiled_nodes:
+            node.compile_dispatch()
+        if seed is not None:
+            children = np.random.SeedSequence(seed).spawn(len(self._compiled_nodes) + len(self._compiled_edges))
+            for component, child in zip(self._compiled_nodes + self._compiled_edges, children):
+                component.seed(child)
+        return self._compiled_nodes, self._compiled_edges
+
     
     def add_child_node(self, child_node):
         """
@@ -149,6 +316,8 @@ class Node:
             # Store
             self.child_nodes[n.id] = n
 
+        self._invalidate_flat_index()
+
         # Case 1: single node-like object
         if not isinstance(child_node, list):
             add_single_node(child_node, is_from_list=False)
@@ -198,6 +367,8 @@ class Node:
             # store edge
             self.child_edges[e.id] = e
 
+        self._invalidate_flat_index()
+
         # Case 1: single edge object
         if not isinstance(child_edge, list):
             add_single_edge(child_edge)
@@ -231,36 +402,72 @@ class Node:
             tn_id = tn.id if tn is not None else "?"
             print(f"{indent}  Edge ID: {child_edge.id} (from {fn_id} to {tn_id})")
 
+    def iter_nodes(self):
+        """
+        Walk the nodes under this node, this node first, in the order of get_all_nodes_edges(),
+        without building any dictionary.
+
+        Yields:
+            Node: The nodes of the subtree.
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(list(node.child_nodes.values())))
+
+    def iter_edges(self):
+        """
+        Walk the child edges of all nodes under this node, in the order of get_all_nodes_edges():
+        the edges of each child subtree, then the direct child edges of the node.
+
+        Yields:
+            Edge: The edges of the subtree.
+        """
+        stack = [(self, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                yield from node.child_edges.values()
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(list(node.child_nodes.values())))
+
+    def _invalidate_flat_index(self):
+        # the flat index of every ancestor includes this subtree
+        node = self
+        while node is not None:
+            node._flat_index = None
+            parent = node.parent
+            node = parent if parent is not node else None
+
     def get_all_nodes_edges(self):
         """
         Return flattened (deterministic) dictionaries of all nodes and edges under this node.
+
+        The dictionaries are built once and cached until the hierarchy changes (add_child_node,
+        add_child_edge or fill_hierarchical_id), so they are shared between callers and must not be
+        modified. Use iter_nodes() and iter_edges() to walk the tree without building them.
+
         Returns:
             nodes: OrderedDict[node_id -> Node]
             edges: OrderedDict[edge_id -> Edge]
         """
+        flat_index = getattr(self, "_flat_index", None)
+        if flat_index is not None:
+            return flat_index
+
         nodes = OrderedDict()
         edges = OrderedDict()
-
-        # include self first
-        nodes[self.hierarchical_id] = self
-
-        # collect recursively from child nodes
-        for child in self.child_nodes.values():
-            cnodes, cedges = child.get_all_nodes_edges()
-            # update in deterministic order
-            for nid, nobj in cnodes.items():
-                if nid not in nodes:
-                    nodes[nid] = nobj
-            for eid, eobj in cedges.items():
-                if eid not in edges:
-                    edges[eid] = eobj
-
-        # collect direct child edges (avoid duplicates)
-        for edge in self.child_edges.values():
-            if edge.id not in edges:
+        for node in self.iter_nodes():
+            if node.hierarchical_id not in nodes:
+                nodes[node.hierarchical_id] = node
+        for edge in self.iter_edges():
+            if edge.hierarchical_id not in edges:
                 edges[edge.hierarchical_id] = edge
 
-        return nodes, edges
+        self._flat_index = (nodes, edges)
+        return self._flat_index
     
     def extract_model_data(self):
         """
@@ -346,10 +553,16 @@ class Node:
         return s
 
     def fill_hierarchical_id(self, parent_hierarchical_id=""):
+        # the ids are the keys of the flat indices of this node and of its ancestors
+        self._invalidate_flat_index()
+        self._fill_hierarchical_id(parent_hierarchical_id)
+
+    def _fill_hierarchical_id(self, parent_hierarchical_id):
         self.hierarchical_id = f"{parent_hierarchical_id}.{self.id}" if parent_hierarchical_id else str(self.id)
+        self._flat_index = None
         for child in self.child_nodes.values():
             #print(child.id)
-            child.fill_hierarchical_id(self.hierarchical_id)
+            child._fill_hierarchical_id(self.hierarchical_id)
         for edge in self.child_edges.values():
             #print(edge.id)
             edge.hierarchical_id = f"{self.hierarchical_id}.{edge.id}"
@@ -578,24 +791,35 @@ class Node:
         """Run the environment for short time as a smoke test (used by validate/run_simulation)."""
         self.env.run(until=t)
 
-    def validate_and_test_run(self, run_time: float = 1.0):
+    def validate_and_test_run(self, run_time: float = 1.0, seed=None):
         """
         Combined check: validate structure (duplicates) and then perform a very short env.run to ensure nothing crashes.
+        `seed` is passed to compile_model().
         """
         val = self.validate(verbose=True)
         if not val["ok"]:
             raise RuntimeError("Validation failed due to duplicate IDs.")
         # run a short smoke-run; user subclasses should ensure their processes are well-behaved
+        self.compile_model(seed)
         self._test_run(run_time)
         return True
 
-    def run_simulation(self, time: float):
+    def run_simulation(self, time: float, seed=None, stop_rule=None):
         """
         Validate and then run the simulation up to `time`. After run, attempt to call finalization hooks
-        if provided on nodes/edges (for bookkeeping).
+        if provided on nodes/edges (for bookkeeping). If `seed` is given, the random generators of all
+        nodes and edges are seeded from it (see compile_model()).
+
+        If `stop_rule` is given (e.g. a `utils.steady_state.SteadyStateStop`), the run is handed to
+        `stop_rule.run(self, time)`, which may stop it before `time`; the finalization then uses the
+        time the run stopped at.
         """
         self.validate(verbose=True)
-        self.env.run(until=time)
+        self.compile_model(seed)
+        if stop_rule is None:
+            self.env.run(until=time)
+        else:
+            time = stop_rule.run(self, time)
 
         nodes, edges = self.get_all_nodes_edges()
         for node in nodes.values():
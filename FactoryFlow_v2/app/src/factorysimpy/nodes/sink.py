@@ -16,15 +16,21 @@ class Sink(Node):
 
     
 
+    The cycle time of every item (time from creation to arrival at the sink) is added to
+    `stats["total_cycle_time"]`. To also get its distribution, set a retention for "cycle_time", e.g.
+    `sink.set_stats_retention(cycle_time="QUANTILES")`. The conveyor times kept in `item_list` can be
+    turned off with `sink.set_stats_retention(item_list="NONE")`.
+
     Raises :
         AssertionError: If the sink does not have at least 1 input edge or has an output edge.  
     """
 
+    optional_stats = ("cycle_time",)
+
     def __init__(self, env, id,in_edges=None,  node_setup_time=0):
         
           super().__init__( env, id, in_edges, None,   node_setup_time)
           self.state = "COLLECTING_STATE"
-          self.in_edge_events=[]
           self.stats={"num_item_received": 0, "last_state_change_time":0.0, "total_time_spent_in_states":{"COLLECTING_STATE":0.0}, "total_cycle_time":0.0}
           self.item_in_process = None
           self.buffertime=0
@@ -34,7 +40,29 @@ class Sink(Node):
 
     def reset(self):
         self.state = "COLLECTING_STATE"
+
+    def set_stats_retention(self, **policy):
+        """
+        Set the retention of the per-item metrics (see Node.set_stats_retention). "item_list" takes
+        "ALL" to keep the conveyor times of every item or "NONE" to not keep them.
+        """
+        applied = []
+        if "item_list" in policy:
+            retention = policy.pop("item_list")
+            if retention == "ALL":
+                self.item_list = {}
+            elif retention == "NONE":
+                self.item_list = None
+            else:
+                raise ValueError("item_list retention must be 'ALL' or 'NONE'")
+            applied.append("item_list")
+        return applied + super().set_stats_retention(**policy)
             
+    def reset_statistics(self):
+        super().reset_statistics()
+        if self.item_list is not None:
+            self.item_list.clear()
+
     def update_final_state_time(self, simulation_end_time):
         duration = simulation_end_time- self.stats["last_state_change_time"]
         
@@ -73,6 +101,8 @@ class Sink(Node):
 
       assert self.in_edges is not None and len(self.in_edges) >= 1, f"Sink '{self.id}' must have atleast 1 in_edge."
       assert self.out_edges is None , f"Sink '{self.id}' must not have an out_edge."
+      if not self._dispatch_compiled:
+          self.compile_dispatch()
 
       self.reset()
       while True:
@@ -84,26 +114,16 @@ class Sink(Node):
 
         
 
-        self.in_edge_events = [edge.inbuiltstore.reserve_get() for edge in self.in_edges]
-        
-        triggered_in_edge_events = self.env.any_of(self.in_edge_events)
-        yield triggered_in_edge_events  # Wait for any in_edge to be available
-
-
-
-        self.chosen_event = next((event for event in self.in_edge_events if event.triggered), None)
-        if self.chosen_event is None:
-            raise ValueError(f"{self.id} - No in_edge available for processing!")
-        
-        self.in_edge_events.remove(self.chosen_event)  # Remove the chosen event from the list
-        #cancelling already triggered out_edge events
-        for event in self.in_edge_events:
-        #     if event.triggered:
-               event.resourcename.reserve_get_cancel(event)
+        # one ReserveAnyOf event for all in_edges: it succeeds with the index of the first edge that
+        # grants a reservation and withdraws the requests at the other edges, so nothing has to be cancelled
+        reserve_any = self._reserve_any_in_edge()
+        yield reserve_any  # Wait for any in_edge to be available
+        self.chosen_event = reserve_any.reservation
         
         
         
-        item = self.chosen_event.resourcename.get(self.chosen_event)  # Get the item from the chosen in_edge
+        # get through the edge, not its store: conveyors record the exit time of the item in their get
+        item = self._in_edge_get[reserve_any.index](self.chosen_event)  # Get the item from the chosen in_edge
         if isinstance(item, simpy.events.Process):
             self.item_in_process = item
             yield self.item_in_process # Wait for the item to be available
@@ -120,16 +140,23 @@ class Sink(Node):
         
                 
         self.stats["num_item_received"] += 1
-        self.stats["total_cycle_time"] += self.env.now - self.item_in_process.timestamp_creation
+        cycle_time = self.env.now - self.item_in_process.timestamp_creation
+        self.stats["total_cycle_time"] += cycle_time
+        cycle_time_metric = self.stats.get("cycle_time")
+        if cycle_time_metric is not None:
+            cycle_time_metric.append(cycle_time)
         
         #print("fromsink", self.env.now - item.timestamp_creation)
         #print(self.item_in_process.timestamp_node_entry)
         #self.buffertime+=(self.item_in_process.timestamp_node_entry- self.item_in_process.timestamp_creation)
         #print(f"buffertime={item.timestamp_node_entry- item.timestamp_creation}")
-        print(f"T={self.env.now:.2f}: {self.id } got an {self.item_in_process} ")
+        if self.trace:
+            self.trace.info("got an %s", self.item_in_process)
         if hasattr(self.item_in_process, 'conveyor_entry_time'):
-            self.item_list[self.item_in_process.id] = (self.item_in_process.conveyor_entry_time, self.item_in_process.conveyor_exit_time, self.item_in_process.conveyor_exit_time - self.item_in_process.conveyor_entry_time if self.item_in_process.conveyor_exit_time and self.item_in_process.conveyor_entry_time else 'N/A')
-            print(f"item{self.item_in_process.id} conveyortime {self.item_in_process.conveyor_entry_time} and {self.item_in_process.conveyor_exit_time} - time spend in conveyor {self.item_in_process.conveyor_exit_time - self.item_in_process.conveyor_entry_time if self.item_in_process.conveyor_exit_time and self.item_in_process.conveyor_entry_time else 'N/A'}")
+            if self.item_list is not None:
+                self.item_list[self.item_in_process.id] = (self.item_in_process.conveyor_entry_time, self.item_in_process.conveyor_exit_time, self.item_in_process.conveyor_exit_time - self.item_in_process.conveyor_entry_time if self.item_in_process.conveyor_exit_time and self.item_in_process.conveyor_entry_time else 'N/A')
+            if self.trace:
+                self.trace.info("item%s conveyortime %s and %s - time spend in conveyor %s", self.item_in_process.id, self.item_in_process.conveyor_entry_time, self.item_in_process.conveyor_exit_time, self.item_in_process.conveyor_exit_time - self.item_in_process.conveyor_entry_time if self.item_in_process.conveyor_exit_time and self.item_in_process.conveyor_entry_time else 'N/A')
         #print(f"item{self.item_in_process.id} fleettime {self.item_in_process.fleet_entry_time} and {self.item_in_process.fleet_exit_time} - time spend in fleet {self.item_in_process.fleet_exit_time - self.item_in_process.fleet_entry_time if self.item_in_process.fleet_exit_time and self.item_in_process.fleet_entry_time else 'N/A'}")
         self.item_in_process=None
        
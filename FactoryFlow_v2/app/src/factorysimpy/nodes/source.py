@@ -24,6 +24,7 @@ class Source(Node):
             - int or float: Used as a constant delay.
             - Callable: A function that returns a delay (int or float).
             - Generator: A generator function yielding delay values over time.  
+            - BlockSampler or frozen scipy.stats distribution: Delays drawn in blocks from the generator of the node (see utils.delay_sampler).
         
         flow_item_type (str): Type of item to be generated. Default is "item". Can be 
             
@@ -82,6 +83,8 @@ class Source(Node):
 
     """
 
+    supported_edge_types = ("Buffer", "Fleet", "ConveyorBelt")
+
     def __init__(self, env, id, in_edges=None, out_edges=None, item_length=1, flow_item_type = "item", inter_arrival_time=1, blocking=False, out_edge_selection="FIRST_AVAILABLE" ):
         super().__init__( env, id,in_edges , out_edges )
         
@@ -105,7 +108,7 @@ class Source(Node):
             raise ValueError("Non-blocking source must have a non-zero inter_arrival_time.")
         elif callable(inter_arrival_time):
             self.inter_arrival_time = inter_arrival_time  
-        elif hasattr(inter_arrival_time, '__next__'):
+        elif hasattr(inter_arrival_time, '__next__') or hasattr(inter_arrival_time, 'rvs'):
             self.inter_arrival_time = inter_arrival_time    
         elif isinstance(inter_arrival_time, (int, float)):      
             self.inter_arrival_time = inter_arrival_time
@@ -114,7 +117,7 @@ class Source(Node):
             self.inter_arrival_time = inter_arrival_time
         else:
             #print("GGG",inter_arrival_time)
-            raise ValueError("inter_arrival_time must be a None, int, float, generator, or callable.")
+            raise ValueError("inter_arrival_time must be a None, int, float, generator, callable, or a frozen scipy.stats distribution.")
          # Start behavior process
         self.behave = self.env.process(self.behaviour())
         
@@ -209,18 +212,17 @@ class Source(Node):
     
     def _push_item(self, item, out_edge):
         
-        if out_edge.__class__.__name__ in ["Buffer", "Fleet", "ConveyorBelt"]:
-                outstore = out_edge
-                put_token = outstore.reserve_put()
-                yield put_token
-                item.set_creation(self.id, self.env)
-                            
-                item.timestamp_node_exit = self.env.now
-                y=outstore.put(put_token, item)
-                if y:
-                    print(f"T={self.env.now:.2f}: {self.id} puts item into {out_edge.id} ")
-        else:
-                raise ValueError(f"Unsupported edge type: {out_edge.__class__.__name__}")
+        # edge types are checked once by compile_dispatch()
+        outstore = out_edge
+        put_token = outstore.reserve_put()
+        yield put_token
+        item.set_creation(self.id, self.env)
+                    
+        item.timestamp_node_exit = self.env.now
+        y=outstore.put(put_token, item)
+        if y:
+            if self.trace:
+                self.trace.info("puts item into %s", out_edge.id)
 
     def update_state(self, new_state: str, current_time: float):
         """
@@ -262,6 +264,8 @@ class Source(Node):
         
         assert self.in_edges is  None , f"Source '{self.id}' must not have an in_edge."
         assert self.out_edges is not None and len(self.out_edges) >= 1, f"Source '{self.id}' must have atleast 1 out_edge."
+        if not self._dispatch_compiled:
+            self.compile_dispatch()
         self.reset()
         i=0
         
@@ -269,14 +273,16 @@ class Source(Node):
         while True:
             self.update_state(self.state, self.env.now)
             if self.state == "SETUP_STATE":
-                print(f"T={self.env.now:.2f}: {self.id} is in SETUP_STATE. Waiting for setup time {self.node_setup_time} seconds")
+                if self.trace:
+                    self.trace.info("is in SETUP_STATE. Waiting for setup time %s seconds", self.node_setup_time)
                 
                 yield self.env.timeout(self.node_setup_time)
                 
                 self.update_state("GENERATING_STATE", self.env.now)
      
                 
-                print(f"T={self.env.now:.2f}: {self.id} is now {self.state}")
+                if self.trace:
+                    self.trace.info("is now %s", self.state)
             
             elif self.state== "GENERATING_STATE":
                 next_arrival_time = self.get_delay(self.inter_arrival_time)
@@ -304,28 +310,17 @@ class Source(Node):
                         blocking_start_time = self.env.now
                     
                         #self.out_edge_events = [edge.reserve_put() if edge.__class__.__name__ == "ConveyorBelt" else edge.inbuiltstore.reserve_put() for edge in self.out_edges]
-                        self.out_edge_events = [edge.reserve_put() for edge in self.out_edges]
-                        triggered_out_edge_events = self.env.any_of(self.out_edge_events)
-                        yield triggered_out_edge_events  # Wait for any in_edge to be available
-                        
-
-                        # Find the first triggered event
-                        chosen_put_event = next((event for event in self.out_edge_events if event.triggered), None)
-                        edge_index = self.out_edge_events.index(chosen_put_event)  # Get the index of the chosen event
-                        self.out_edge_events.remove(chosen_put_event)  # Remove the chosen event from the list
-                        if chosen_put_event is None:
-                            raise ValueError(f"{self.id} - No in_edge available for processing!")
-                        
-                        #cancelling already triggered out_edge events
-                        for event in self.out_edge_events:
-                            
-                            event.resourcename.reserve_put_cancel(event)
+                        # one ReserveAnyOf event for all out_edges: it succeeds with the index of the first edge that
+                        # grants a reservation and withdraws the requests at the other edges, so nothing has to be cancelled
+                        reserve_any = self._reserve_any_out_edge()
+                        edge_index = yield reserve_any  # Wait for any out_edge to be available
+                        chosen_put_event = reserve_any.reservation
                         #print(f"T={self.env.now:.2f}: {self.id} yielded 11111111from {self.out_edges[edge_index].id} ")
                         #putting the item in the chosen out_edge
                         item.set_creation(self.id, self.env)
                         item.timestamp_node_exit = self.env.now
                         #print(chosen_put_event.requesting_process, self)
-                        itemput=self.out_edges[edge_index].put(chosen_put_event, item)
+                        itemput=self._out_edge_put[edge_index](chosen_put_event, item)
                         #itemput = chosen_put_event.resourcename.put(chosen_put_event, item)  # put the item to the chosen out_edge
                         #print(f"T={self.env.now:.2f}: {self.id} placed 222222 from {self.out_edges[edge_index].id} ")
                         #print(f"T={self.env.now:.2f}: {self.id} puts item {item.id} into {chosen_put_event.resourcename} {item.timestamp_creation} ")
@@ -336,7 +331,8 @@ class Source(Node):
                             #print("yaay")
                         else:
                             item1 = itemput
-                            print(f"T={self.env.now:.2f}: {self.id} {item.id} pushed to buffer {self.out_edges[edge_index].id} ")
+                            if self.trace:
+                                self.trace.info("%s pushed to buffer %s", item.id, self.out_edges[edge_index].id)
                         
                         #print(f"T={self.env.now:.2f}: {self.id} BLOCKED to generated after {self.env.now - blocking_start_time:.2f} seconds")
                         self.update_state("GENERATING_STATE", self.env.now)  # Update state back to GENERATING_STATE
@@ -360,7 +356,8 @@ class Source(Node):
 
                             
                         else:               
-                            print(f"T={ self.env.now:.2f}: {self.id} is discarding item {item.id} because out_edge {edge.id} is full.")
+                            if self.trace:
+                                self.trace.info("is discarding item %s because out_edge %s is full.", item.id, edge.id)
                             self.stats["num_item_discarded"] += 1  # Decrement processed count if item is discarded
 
 
@@ -370,7 +367,8 @@ class Source(Node):
 
 
                 else:
-                    print(f"T={self.env.now:.2f}: {self.id} generated item: {item.id}")
+                    if self.trace:
+                        self.trace.info("generated item: %s", item.id)
                     out_edge_index_to_put = self._get_out_edge_index()
                     if out_edge_index_to_put is None:
                         raise ValueError(f"{self.id} - No out_edge available for processing!")
@@ -380,7 +378,8 @@ class Source(Node):
 
                     if self.blocking:
                         blocking_start_time = self.env.now
-                        print(f"T={self.env.now:.2f}: {self.id} is in BLOCKED_STATE")
+                        if self.trace:
+                            self.trace.info("is in BLOCKED_STATE")
                         self.update_state("BLOCKED_STATE", self.env.now)
                         
                         yield self.env.process(self._push_item(item, outedge_to_put))
@@ -395,7 +394,8 @@ class Source(Node):
                             yield self.env.process(self._push_item(item, outedge_to_put))
                             
                         else:
-                            print(f"T={self.env.now:.2f}: {self.id} is discarding item {item.id} because out_edge {outedge_to_put.id} is full.")
+                            if self.trace:
+                                self.trace.info("is discarding item %s because out_edge %s is full.", item.id, outedge_to_put.id)
                             self.stats["num_item_discarded"] += 1
                
                     
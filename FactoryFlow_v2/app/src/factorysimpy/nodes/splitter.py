@@ -31,6 +31,7 @@ class Splitter(Node):
                 - int or float: Used as a constant delay.
                 - Generator: A generator function yielding delay values over time.
                 - Callable: A function that returns a delay (int or float).
+                - BlockSampler or frozen scipy.stats distribution: Delays drawn in blocks from the generator of the node (see utils.delay_sampler).
             in_edge_selection (None or str or callable): Criterion or function for selecting the edge.
                                               Options include "RANDOM", "ROUND_ROBIN", "FIRST_AVAILABLE".
 
@@ -72,6 +73,12 @@ class Splitter(Node):
                 
     """
 
+    statistic_attributes = (
+        "per_thread_total_time_in_blocked_state",
+        "per_thread_total_time_in_processing_state",
+        "time_per_work_occupancy",
+    )
+
     def __init__(self, env, id, in_edges=None, out_edges=None,node_setup_time=0,processing_delay=0,blocking=True,mode= "UNPACK", split_quantity=None, in_edge_selection="FIRST_AVAILABLE",out_edge_selection="FIRST_AVAILABLE"):
         super().__init__(env, id,in_edges, out_edges, node_setup_time)
         
@@ -85,7 +92,8 @@ class Splitter(Node):
         self.per_thread_total_time_in_blocked_state = 0.0
         self.per_thread_total_time_in_processing_state = 0.0
         
-        self.worker_thread_list = []  # List to keep track of worker threads
+        self.worker_thread_list = {}  # Worker threads (processes) in start order; a dict so that removal is O(1)
+        self._thread_state_count = {"PROCESSING_STATE": 0, "BLOCKED_STATE": 0}  # Number of worker threads in each state
         
         self.item_in_process= None
         self.pallet_in_process= None
@@ -104,12 +112,12 @@ class Splitter(Node):
         # Initialize processing delay 
         # If processing_delay is a generator, callable, int, float or None, it is accepted.
         
-        if callable(processing_delay) or hasattr(processing_delay, '__next__') or isinstance(processing_delay, (int, float)) or processing_delay is None:
+        if callable(processing_delay) or hasattr(processing_delay, '__next__') or hasattr(processing_delay, 'rvs') or isinstance(processing_delay, (int, float)) or processing_delay is None:
             self.processing_delay = processing_delay
     
         else:
             raise ValueError(
-                "processing_delay must be None, int, float, generator, or callable."
+                "processing_delay must be None, int, float, generator, callable, or a frozen scipy.stats distribution."
             )
         
         self.env.process(self.behaviour())  # Start the Splitter behavior process
@@ -225,6 +233,10 @@ class Splitter(Node):
         else:
             raise ValueError(f"Edge already exists in Splitter '{self.id}' in_edges.")
         
+    def reset_statistics(self):
+        super().reset_statistics()
+        self.time_last_occupancy_change = self.env.now
+
     def update_final_state_time(self, simulation_end_time):
         duration = simulation_end_time- self.stats["last_state_change_time"]
         # updating the time of per thread states
@@ -323,19 +335,21 @@ class Splitter(Node):
         if out_edge.__class__.__name__ == "ConveyorBelt":                 
                 put_token = out_edge.reserve_put()
                 pe = yield put_token
-                item_to_push.update_node_event(self.id, self.env, "exit")
+                item_to_push.update_node_event(self.id, self.env, "exit", self.history, self.index)
                 
                 y=out_edge.put(pe, item_to_push)
                 if y:
-                    print(f"T={self.env.now:.2f}: {self.id} puts {item_to_push.id} item into {out_edge.id}  ")
+                    if self.trace:
+                        self.trace.info("puts %s item into %s", item_to_push.id, out_edge.id)
         elif out_edge.__class__.__name__ == "Buffer":
                 outstore = out_edge
                 put_token = outstore.reserve_put()
                 yield put_token
-                item_to_push.update_node_event(self.id, self.env, "exit")
+                item_to_push.update_node_event(self.id, self.env, "exit", self.history, self.index)
                 y=outstore.put(put_token, item_to_push)
                 if y:
-                    print(f"T={self.env.now:.2f}: {self.id} puts item into {out_edge.id}")
+                    if self.trace:
+                        self.trace.info("puts item into %s", out_edge.id)
         else:
                 raise ValueError(f"Unsupported edge type: {out_edge.__class__.__name__}")
         
@@ -358,7 +372,8 @@ class Splitter(Node):
                 pulled_item.update_node_event(self.id, self.env, "entry")
                               
                 if pulled_item is not None:
-                    print(f"T={self.env.now:.2f}: {self.id} gets item {pulled_item.id} from {in_edge.id} ")
+                    if self.trace:
+                        self.trace.info("gets item %s from %s", pulled_item.id, in_edge.id)
                     self.item_in_process= pulled_item  # Assign the pulled item to the item_in_process attribute
                     
                 else:
@@ -371,7 +386,8 @@ class Splitter(Node):
                 pulled_item =outstore.get(get_token)
                 pulled_item.update_node_event(self.id, self.env, "entry")
                 if pulled_item is not None:
-                    print(f"T={self.env.now:.2f}: {self.id} gets item {pulled_item.id} from {in_edge.id} ")
+                    if self.trace:
+                        self.trace.info("gets item %s from %s", pulled_item.id, in_edge.id)
                     self.item_in_process= pulled_item  # Assign the pulled item to the item_in_process attribute
                 else:
                     raise ValueError(f"T={self.env.now:.2f}: {self.id} - No item pulled from in_edge {in_edge.id}!")
@@ -443,34 +459,59 @@ class Splitter(Node):
     
     def _count_worker_state(self):
         """
-        Counts and returns the number of threads in "PROCESSING_STATE" and "BLOCKED_STATE"
-        using self.worker_thread_list.
+        Returns the number of threads in "PROCESSING_STATE" and "BLOCKED_STATE".
+
+        The counts are kept up to date by `_add_worker_thread`, `_set_thread_state` and `_remove_worker_thread`,
+        so this is O(1). With `self.debug` set, they are checked against a recount of self.worker_thread_list.
     
         Returns:
             num_threads_PROCESSING (int): Number of threads in "PROCESSING_STATE"
             num_threads_BLOCKED (int): Number of threads in "BLOCKED_STATE"
         """
-        if not self.worker_thread_list:
-            num_threads_PROCESSING = 0
-            num_threads_BLOCKED = 0
-        else:
-            num_threads_PROCESSING = sum(
-                proc.thread_state == "PROCESSING_STATE" for proc in self.worker_thread_list
-            )
-            num_threads_BLOCKED = sum(
-                proc.thread_state == "BLOCKED_STATE" for proc in self.worker_thread_list
-            )
-    
+        num_threads_PROCESSING = self._thread_state_count["PROCESSING_STATE"]
+        num_threads_BLOCKED = self._thread_state_count["BLOCKED_STATE"]
+        if self.debug:
+            self._check_worker_state(num_threads_PROCESSING, num_threads_BLOCKED)
+        return num_threads_PROCESSING, num_threads_BLOCKED
+
+    def _check_worker_state(self, num_threads_PROCESSING, num_threads_BLOCKED):
+        # Debug check: recount the thread states and validate them against work_capacity
+        recount_PROCESSING = sum(
+            proc.thread_state == "PROCESSING_STATE" for proc in self.worker_thread_list
+        )
+        recount_BLOCKED = sum(
+            proc.thread_state == "BLOCKED_STATE" for proc in self.worker_thread_list
+        )
+        assert (num_threads_PROCESSING, num_threads_BLOCKED) == (recount_PROCESSING, recount_BLOCKED), \
+            f"T={self.env.now:.2f} {self.id} thread counters out of sync. counters=({num_threads_PROCESSING}, {num_threads_BLOCKED}), recount=({recount_PROCESSING}, {recount_BLOCKED})"
         assert 0 <= num_threads_BLOCKED <= self.work_capacity \
             and 0 <= num_threads_PROCESSING <= self.work_capacity \
             and 0 <= num_threads_BLOCKED + num_threads_PROCESSING <= self.work_capacity, \
             f"T={self.env.now:.2f} {self.id} has more threads than work_capacity is created. num_threads_PROCESSING={num_threads_PROCESSING}, num_threads_BLOCKED={num_threads_BLOCKED}, work_capacity={self.work_capacity}"
-        return num_threads_PROCESSING, num_threads_BLOCKED
+
+    def _add_worker_thread(self, proc):
+        # Register a new worker thread; its thread_state must already be set
+        self.worker_thread_list[proc] = None
+        self._thread_state_count[proc.thread_state] += 1
+
+    def _set_thread_state(self, proc, new_state):
+        # Move a worker thread to new_state and update the thread counters
+        if proc in self.worker_thread_list:
+            self._thread_state_count[proc.thread_state] -= 1
+            self._thread_state_count[new_state] += 1
+        proc.thread_state = new_state
+
+    def _remove_worker_thread(self, proc):
+        # Unregister a finished worker thread
+        if proc in self.worker_thread_list:
+            del self.worker_thread_list[proc]
+            self._thread_state_count[proc.thread_state] -= 1
     
     # --- DEBUG TRACE ----------------------------------------------------------
     def _dbg(self, msg):
         # tiny helper so we can switch it off easily
-        print(f"{self.env.now:5.2f}  {self.id}: {msg}")
+        if self.trace:
+            self.trace.info("%s", msg)
     # -------------------------------------------------------------------------
 
     def check_thread_state_and_update_splitter_state_flexsim(self):
@@ -510,14 +551,17 @@ class Splitter(Node):
         elif numthreads_BLOCKED ==len(self.worker_thread_list):
         #elif numthreads_BLOCKED >=1:
             #print(self.env.now, numthreads_BLOCKED,len(self.worker_thread.users))
-            print(f"T={self.env.now:.2f}: {self.id} is in BLOCKED_STATE")
+            if self.trace:
+                self.trace.info("is in BLOCKED_STATE")
             self.update_state("BLOCKED_STATE", self.env.now)
 
      
         
         else:
-            print("goingtofail")
-            print(numthreads_BLOCKED, numthreads_PROCESSING, self.work_capacity, len(self.worker_thread.users), len(self.worker_thread_list) )
+            if self.trace:
+                self.trace.info("goingtofail")
+            if self.trace:
+                self.trace.debug("%s %s %s %s %s", numthreads_BLOCKED, numthreads_PROCESSING, self.work_capacity, len(self.worker_thread.users), len(self.worker_thread_list))
             raise ValueError(f"{self.id} - Invalid worker thread state. numthreads_PROCESSING={numthreads_PROCESSING}, numthreads_BLOCKED={numthreads_BLOCKED}, work_capacity={self.work_capacity}")
     def check_thread_state_and_update_splitter_state1(self):
         
@@ -550,7 +594,8 @@ class Splitter(Node):
             while len(pallet.items) > 0:
                 #print("!!!!!!!!!", len(pallet.items))
                 item = pallet.items.pop(0)
-                print(f"T={self.env.now:.2f}: {self.id} worker processed item: {item.id}")
+                if self.trace:
+                    self.trace.info("worker processed item: %s", item.id)
                 # pushing the item to the out_edge based on the out_edge_selection method
                 
 
@@ -559,7 +604,7 @@ class Splitter(Node):
                     # if blocking yield reserve_put on all out_edges and take the one with min index and cancel others and push item
                     if self.blocking:
                         self.check_thread_state_and_update_splitter_state()
-                        self.env.active_process.thread_state = "BLOCKED_STATE"  # Update the thread state to PROCESSING_STATE BLOCKING
+                        self._set_thread_state(self.env.active_process, "BLOCKED_STATE")  # Update the thread state to PROCESSING_STATE BLOCKING
                         self.check_thread_state_and_update_splitter_state()
                         blocking_start_time = self.env.now
                     
@@ -588,7 +633,7 @@ class Splitter(Node):
 
                         #putting the item in the chosen out_edge
                         
-                        item.update_node_event(self.id, self.env, "exit")
+                        item.update_node_event(self.id, self.env, "exit", self.history, self.index)
                         if self.out_edges[edge_index].__class__.__name__ == "Buffer":
                             self.stats["num_item_processed"] += 1
                             itemput=self.out_edges[edge_index].put(chosen_put_event, item)
@@ -596,7 +641,8 @@ class Splitter(Node):
 
                         else:
                             raise ValueError(f"Unsupported edge type: {self.out_edges[edge_index].__class__.__name__}")
-                        print(f"T={self.env.now:.2f}: {self.id} puts item {item.id} into {self.out_edges[edge_index].id} ")
+                        if self.trace:
+                            self.trace.info("puts item %s into %s", item.id, self.out_edges[edge_index].id)
                         
                         self._update_avg_time_spent_in_blocked(self.env.now - blocking_start_time)
                         #self.env.active_process.thread_state = "PROCESSING_STATE"  # Update the thread state to PROCESSING_STATE BLOCKING
@@ -617,11 +663,12 @@ class Splitter(Node):
                         if out_edge_index_to_put is not None:
                             blocking_start_time = self.env.now
                             self.check_thread_state_and_update_splitter_state()
-                            self.env.active_process.thread_state = "BLOCKED_STATE"  # Update the thread state to PROCESSING_STATE BLOCKING
+                            self._set_thread_state(self.env.active_process, "BLOCKED_STATE")  # Update the thread state to PROCESSING_STATE BLOCKING
                             self.check_thread_state_and_update_splitter_state()
                             yield self.env.process(self._push_item(item, out_edge_index_to_put)) 
                             self.stats["num_item_processed"] += 1 
-                            print(f"T={self.env.now:.2f}: {self.id} worker puts item {item.id} into {out_edge_index_to_put.id} ")
+                            if self.trace:
+                                self.trace.info("worker puts item %s into %s", item.id, out_edge_index_to_put.id)
                             #self.check_thread_state_and_update_splitter_state()
                             #self.env.active_process.thread_state = "PROCESSING_STATE"  # Update the thread state to PROCESSING_STATE BLOCKING
                             
@@ -630,7 +677,8 @@ class Splitter(Node):
 
                             
                         else:               
-                            print(f"T={ self.env.now:.2f}: {self.id} worker is discarding item {item.id} because out_edge {edge.id} is full.")
+                            if self.trace:
+                                self.trace.info("worker is discarding item %s because out_edge %s is full.", item.id, edge.id)
                             self.stats["num_item_discarded"] += 1  # Decrement processed count if item is discarded
 
 
@@ -640,26 +688,30 @@ class Splitter(Node):
 
                 #out_edge_selection is not "FIRST_AVAILABLE" ---> get index value and push the item if not blocking
                 else:
-                    print(f"T={self.env.now:.2f}: {self.id} worker processed item: {item.id}")
+                    if self.trace:
+                        self.trace.info("worker processed item: %s", item.id)
                     out_edge_index_to_put = self._get_out_edge_index()
                     #print("OUT",out_edge_index_to_put)
                     assert 0<=out_edge_index_to_put < len(self.out_edges), f"{self.id} - Invalid edge index. {out_edge_index_to_put} is not in range. Range must be between {0} and  {len(self.out_edges)-1} for in_edges."
                     outedge_to_put = self.out_edges[out_edge_index_to_put]
                     #push the item if not blocking
-                    self.env.active_process.thread_state = "BLOCKED_STATE"  # Update the thread state to PROCESSING_STATE BLOCKING
+                    self._set_thread_state(self.env.active_process, "BLOCKED_STATE")  # Update the thread state to PROCESSING_STATE BLOCKING
                     self.check_thread_state_and_update_splitter_state()
                     if self.blocking:
                         blocking_start_time = self.env.now
-                        print(f"T={self.env.now:.2f}: {self.id} worker is in BLOCKED_STATE")
+                        if self.trace:
+                            self.trace.info("worker is in BLOCKED_STATE")
                         #yield self.env.process(self._push_item(item, outedge_to_put))
                         put_event=outedge_to_put.reserve_put()
                         yield put_event
-                        print(f"T={self.env.now:.2f}: {self.id} yielded and worker is putting item {item.id} into {outedge_to_put.id} " )
-                        item.update_node_event(self.id, self.env, "exit")
+                        if self.trace:
+                            self.trace.info("yielded and worker is putting item %s into %s", item.id, outedge_to_put.id)
+                        item.update_node_event(self.id, self.env, "exit", self.history, self.index)
                         self.stats["num_item_processed"] += 1
                         y=outedge_to_put.put(put_event, item)
                         if y:
-                            print(f"T={self.env.now:.2f}: {self.id} worker puts item {item.id} into {outedge_to_put.id} ")
+                            if self.trace:
+                                self.trace.info("worker puts item %s into %s", item.id, outedge_to_put.id)
                         self._update_avg_time_spent_in_blocked(self.env.now - blocking_start_time)
                         #self.check_thread_state_and_update_splitter_state()  # Check and update the splitter state after blocking
                     #check can_put and only if it succeeds push the item if not blocking
@@ -669,14 +721,17 @@ class Splitter(Node):
                             blocking_start_time = self.env.now
                             yield self.env.process(self._push_item(item, outedge_to_put))
                             self.stats["num_item_processed"] += 1
-                            print(f"T={self.env.now:.2f}: {self.id} worker puts item {item.id} into {outedge_to_put.id} ")
+                            if self.trace:
+                                self.trace.info("worker puts item %s into %s", item.id, outedge_to_put.id)
                             self._update_avg_time_spent_in_blocked(self.env.now - blocking_start_time)
                         else:
-                            print(f"T={self.env.now:.2f}: {self.id} worker is discarding item {item.id} because out_edge {outedge_to_put.id} is full.")
+                            if self.trace:
+                                self.trace.info("worker is discarding item %s because out_edge %s is full.", item.id, outedge_to_put.id)
                             self.stats["num_item_discarded"] += 1
             
             # After all items are processed, handle the empty pallet
-            print(f"T={self.env.now:.2f}: {self.id} worker processing empty pallet: {pallet.id}")
+            if self.trace:
+                self.trace.info("worker processing empty pallet: %s", pallet.id)
             item = pallet  # The empty pallet becomes the item to process
             
             #out_edge_selection is "FIRST_AVAILABLE"---> 
@@ -684,7 +739,7 @@ class Splitter(Node):
                 # if blocking yield reserve_put on all out_edges and take the one with min index and cancel others and push item
                 if self.blocking:
                     self.check_thread_state_and_update_splitter_state()
-                    self.env.active_process.thread_state = "BLOCKED_STATE"  # Update the thread state to PROCESSING_STATE BLOCKING
+                    self._set_thread_state(self.env.active_process, "BLOCKED_STATE")  # Update the thread state to PROCESSING_STATE BLOCKING
                     self.check_thread_state_and_update_splitter_state()
                     blocking_start_time = self.env.now
                 
@@ -705,13 +760,14 @@ class Splitter(Node):
                             event.resourcename.reserve_put_cancel(event)
 
                     #putting the item in the chosen out_edge
-                    item.update_node_event(self.id, self.env, "exit")
+                    item.update_node_event(self.id, self.env, "exit", self.history, self.index)
                     if self.out_edges[edge_index].__class__.__name__ == "Buffer":
                         self.stats["num_item_processed"] += 1
                         itemput=self.out_edges[edge_index].put(chosen_put_event, item)
                     else:
                         raise ValueError(f"Unsupported edge type: {self.out_edges[edge_index].__class__.__name__}")
-                    print(f"T={self.env.now:.2f}: {self.id} puts empty pallet {item.id} into {self.out_edges[edge_index].id} ")
+                    if self.trace:
+                        self.trace.info("puts empty pallet %s into %s", item.id, self.out_edges[edge_index].id)
                     
                     self._update_avg_time_spent_in_blocked(self.env.now - blocking_start_time)
                     
@@ -726,36 +782,42 @@ class Splitter(Node):
                     if out_edge_index_to_put is not None:
                         blocking_start_time = self.env.now
                         self.check_thread_state_and_update_splitter_state()
-                        self.env.active_process.thread_state = "BLOCKED_STATE"  # Update the thread state to PROCESSING_STATE BLOCKING
+                        self._set_thread_state(self.env.active_process, "BLOCKED_STATE")  # Update the thread state to PROCESSING_STATE BLOCKING
                         self.check_thread_state_and_update_splitter_state()
                         yield self.env.process(self._push_item(item, out_edge_index_to_put)) 
                         self.stats["num_item_processed"] += 1 
-                        print(f"T={self.env.now:.2f}: {self.id} worker puts empty pallet {item.id} into {out_edge_index_to_put.id} ")
+                        if self.trace:
+                            self.trace.info("worker puts empty pallet %s into %s", item.id, out_edge_index_to_put.id)
                         self._update_avg_time_spent_in_blocked(self.env.now - blocking_start_time)
                     else:               
-                        print(f"T={ self.env.now:.2f}: {self.id} worker is discarding empty pallet {item.id} because out_edge {edge.id} is full.")
+                        if self.trace:
+                            self.trace.info("worker is discarding empty pallet %s because out_edge %s is full.", item.id, edge.id)
                         self.stats["num_item_discarded"] += 1
 
             #out_edge_selection is not "FIRST_AVAILABLE" ---> get index value and push the item if not blocking
             else:
-                print(f"T={self.env.now:.2f}: {self.id} worker processed empty pallet: {item.id}")
+                if self.trace:
+                    self.trace.info("worker processed empty pallet: %s", item.id)
                 out_edge_index_to_put = self._get_out_edge_index()
                 assert 0<=out_edge_index_to_put < len(self.out_edges), f"{self.id} - Invalid edge index. {out_edge_index_to_put} is not in range. Range must be between {0} and  {len(self.out_edges)-1} for in_edges."
                 outedge_to_put = self.out_edges[out_edge_index_to_put]
                 #push the item if not blocking
-                self.env.active_process.thread_state = "BLOCKED_STATE"  # Update the thread state to PROCESSING_STATE BLOCKING
+                self._set_thread_state(self.env.active_process, "BLOCKED_STATE")  # Update the thread state to PROCESSING_STATE BLOCKING
                 self.check_thread_state_and_update_splitter_state()
                 if self.blocking:
                     blocking_start_time = self.env.now
-                    print(f"T={self.env.now:.2f}: {self.id} worker is in BLOCKED_STATE")
+                    if self.trace:
+                        self.trace.info("worker is in BLOCKED_STATE")
                     put_event=outedge_to_put.reserve_put()
                     yield put_event
-                    print(f"T={self.env.now:.2f}: {self.id} yielded and worker is putting empty pallet {item.id} into {outedge_to_put.id} " )
-                    item.update_node_event(self.id, self.env, "exit")
+                    if self.trace:
+                        self.trace.info("yielded and worker is putting empty pallet %s into %s", item.id, outedge_to_put.id)
+                    item.update_node_event(self.id, self.env, "exit", self.history, self.index)
                     self.stats["num_item_processed"] += 1
                     y=outedge_to_put.put(put_event, item)
                     if y:
-                        print(f"T={self.env.now:.2f}: {self.id} worker puts empty pallet {item.id} into {outedge_to_put.id} ")
+                        if self.trace:
+                            self.trace.info("worker puts empty pallet %s into %s", item.id, outedge_to_put.id)
                     self._update_avg_time_spent_in_blocked(self.env.now - blocking_start_time)
                 #check can_put and only if it succeeds push the item if not blocking
                 else:
@@ -764,10 +826,12 @@ class Splitter(Node):
                         blocking_start_time = self.env.now
                         yield self.env.process(self._push_item(item, outedge_to_put))
                         self.stats["num_item_processed"] += 1
-                        print(f"T={self.env.now:.2f}: {self.id} worker puts empty pallet {item.id} into {outedge_to_put.id} ")
+                        if self.trace:
+                            self.trace.info("worker puts empty pallet %s into %s", item.id, outedge_to_put.id)
                         self._update_avg_time_spent_in_blocked(self.env.now - blocking_start_time)
                     else:
-                        print(f"T={self.env.now:.2f}: {self.id} worker is discarding empty pallet {item.id} because out_edge {outedge_to_put.id} is full.")
+                        if self.trace:
+                            self.trace.info("worker is discarding empty pallet %s because out_edge %s is full.", item.id, outedge_to_put.id)
                         self.stats["num_item_discarded"] += 1
                         
                 # Release the worker thread after processing
@@ -776,8 +840,7 @@ class Splitter(Node):
             yield self.worker_thread.release(req_token)  # Release the worker thread
       
             #delete the worker thread from the worker_thread_list
-            if self.env.active_process in self.worker_thread_list:
-                self.worker_thread_list.remove(self.env.active_process)
+            self._remove_worker_thread(self.env.active_process)
             self._update_worker_occupancy(action="REMOVE")  # Update worker occupancy after processing
             self.check_thread_state_and_update_splitter_state()    
 
@@ -798,7 +861,8 @@ class Splitter(Node):
             #print(f"T={self.env.now:.2f}: {self.id} worker{i} started processing")
             if self.state == "SETUP_STATE":
                 
-                print(f"T={self.env.now:.2f}: {self.id} is in SETUP_STATE")
+                if self.trace:
+                    self.trace.info("is in SETUP_STATE")
                 yield self.env.timeout(self.node_setup_time)# always an int or float
                 self.update_state("IDLE_STATE", self.env.now)
 
@@ -810,7 +874,8 @@ class Splitter(Node):
             
                 #self._update_worker_occupancy(action="UPDATE")
                 self.check_thread_state_and_update_splitter_state()               
-                print(f"T={self.env.now:.2f}: {self.id} is in {self.state}")
+                if self.trace:
+                    self.trace.info("is in %s", self.state)
                 
                 #in_edge_selection is "FIRST_AVAILABLE"--->     yield in a list, select one with min. index value and cancel other and pull item
                 if self.in_edge_selection == "FIRST_AVAILABLE":
@@ -827,7 +892,8 @@ class Splitter(Node):
                     #     else:
                     #         print(f"T={self.env.now:.2f}: {self.id} in {i.id} is empty")
                     #self.in_edge_events = [self.in_edges[i].inbuiltstore.reserve_get() for i in range(len(self.in_edges)-1,-1,-1)]
-                    print(f"T={self.env.now:.2f}: {self.id} waiting for in_edge events to be triggered")
+                    if self.trace:
+                        self.trace.info("waiting for in_edge events to be triggered")
                     #print(f"T={self.env.now:.2f}: {self.id} in_edge_events: {[event.resourcename for event in self.in_edge_events]}")  # Debugging line to check in_edge_events
                     triggered_in_edge_events = self.env.any_of(self.in_edge_events)
                     
@@ -863,7 +929,8 @@ class Splitter(Node):
                     #print("!!!!!!",edge_index)
                     self.stats["in_edge_selection"].append(edge_index)
                     
-                    print(f"T={self.env.now:.2f}: {self.id} yielded from {self.in_edges[edge_index].id} ")
+                    if self.trace:
+                        self.trace.info("yielded from %s", self.in_edges[edge_index].id)
                     
                     
                     #self.in_edge_events.remove(self.chosen_event)  # Remove the chosen event from the list
@@ -884,9 +951,11 @@ class Splitter(Node):
 
                     # Create workers based on work_capacity
                     worker_thread_req = self.worker_thread.request()  # Request a worker thread
-                    print(f"T={self.env.now:.2f}: {self.id} requested worker thread for processing item from {self.in_edges[edge_index].id} ")
+                    if self.trace:
+                        self.trace.info("requested worker thread for processing item from %s", self.in_edges[edge_index].id)
                     yield worker_thread_req
-                    print(f"T={self.env.now:.2f}: {self.id} got worker thread for processing item from {self.in_edges[edge_index].id} ")
+                    if self.trace:
+                        self.trace.info("got worker thread for processing item from %s", self.in_edges[edge_index].id)
                     
                     
                     #update occupancy
@@ -935,7 +1004,8 @@ class Splitter(Node):
                         if self.pallet_in_process  is not None:
                             #print(self.pallet_in_process)
                             self.pallet_in_process .update_node_event(self.id, self.env, "entry")
-                            print(f"T={self.env.now:.2f}: {self.id} gets item {self.pallet_in_process .id} from {in_edge_to_get.id} ")
+                            if self.trace:
+                                self.trace.info("gets item %s from %s", self.pallet_in_process.id, in_edge_to_get.id)
                         else:
                             raise ValueError(f"T={self.env.now:.2f}: {self.id} - No item pulled from in_edge {in_edge_to_get.id}!")
                     else:
@@ -961,12 +1031,13 @@ class Splitter(Node):
                 #print("!!!!!!!!!!!!!!!!!!EGKEKHRTUOYO!!!!!!!!!!!!!!!!!!!!!!!!!", next_processing_time)
 
                 self.stats["processing_delay"].append(next_processing_time)  # Update the processing delay in stats
-                print(f"T={self.env.now:.2f}: {self.id} worker started processing item {self.pallet_in_process.id} ")
+                if self.trace:
+                    self.trace.info("worker started processing item %s", self.pallet_in_process.id)
                 #spawn a worker process
                 proc = self.env.process(self.worker(self.pallet_in_process, next_processing_time, worker_thread_req))  # Start the worker process
                 proc.thread_state="PROCESSING_STATE" # Set the thread state to PROCESSING_STATE
                 #proc.item_to_put = self.item_in_process # Set the item to be put by the worker process
-                self.worker_thread_list.append(proc)  # Add the worker process to the worker_thread_list
+                self._add_worker_thread(proc)  # Add the worker process to the worker_thread_list
                 self.check_thread_state_and_update_splitter_state()  # Check and update the splitter state based on worker states
                 #initialise item into none
                 self.pallet_in_process=None
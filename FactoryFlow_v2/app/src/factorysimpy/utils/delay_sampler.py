@@ -0,0 +1,199 @@
+import numpy as np
+
+
+class ConstantSampler:
+    """
+    Sampler that always returns the same delay.
+
+    Parameters:
+        value (int or float): The constant delay.
+
+    Raises:
+        ValueError: If value is negative.
+    """
+
+    def __init__(self, value):
+        if value < 0:
+            raise ValueError("Delay must be non-negative")
+        self.value = value
+
+    def __call__(self):
+        return self.value
+
+
+class GeneratorSampler:
+    """
+    Sampler that pulls delays from a generator instance, one value per call.
+
+    Parameters:
+        generator (generator): A generator yielding delay values.
+    """
+
+    def __init__(self, generator):
+        self.generator = generator
+
+    def __call__(self):
+        val = next(self.generator)
+        assert val >= 0, "Delay must be non-negative"
+        return val
+
+
+class CallableSampler:
+    """
+    Sampler that calls a function for every delay.
+
+    Parameters:
+        func (callable): A function without arguments that returns a delay value.
+    """
+
+    def __init__(self, func):
+        self.func = func
+
+    def __call__(self):
+        val = self.func()
+        assert val >= 0, "Delay must be non-negative"
+        return val
+
+
+class BlockSampler:
+    """
+    Sampler that draws delays in blocks from a NumPy random `Generator` and hands them out one by one.
+
+    `draw(rng, size)` is called with the generator of the owning node and must return `size` variates. The block
+    is converted to a list of Python floats once, so a sample costs a list index. A new block is drawn when the
+    current one is used up. The same `BlockSampler` can be passed to several nodes; each node binds its own copy
+    to its own generator (see `bind()`), so the streams stay independent.
+
+    Parameters:
+        draw (callable): Function `draw(rng, size)` returning an array of `size` variates.
+        block_size (int, optional): Number of variates drawn per refill. Defaults to 1024.
+        rng (numpy.random.Generator, optional): Generator to draw from. Defaults to a freshly seeded generator.
+
+    Example:
+        exp_delay = BlockSampler(lambda rng, size: rng.exponential(2.0, size))
+        M1 = Machine(env, "M1", processing_delay=exp_delay)
+
+    Raises:
+        ValueError: If block_size is not a positive integer, or if a drawn block has negative values.
+    """
+
+    def __init__(self, draw, block_size=1024, rng=None):
+        if not isinstance(block_size, int) or block_size <= 0:
+            raise ValueError("block_size must be a positive integer")
+        self.draw = draw
+        self.block_size = block_size
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self._block = []
+        self._pos = 0
+
+    def bind(self, rng):
+        """Return a copy of the sampler that draws from `rng`."""
+        return BlockSampler(self.draw, self.block_size, rng)
+
+    def _refill(self):
+        block = np.asarray(self.draw(self.rng, self.block_size), dtype=np.float64)
+        if block.size == 0:
+            raise ValueError("draw returned an empty block")
+        if block.min() < 0:
+            raise ValueError("Delay must be non-negative")
+        self._block = block.tolist()
+        self._pos = 0
+
+    def __call__(self):
+        pos = self._pos
+        if pos == len(self._block):
+            self._refill()
+            pos = 0
+        self._pos = pos + 1
+        return self._block[pos]
+
+
+class _ScipyDraw:
+    # draw function of from_scipy(); a class rather than a lambda so that samplers can be pickled
+    def __init__(self, dist):
+        self.dist = dist
+
+    def __call__(self, rng, size):
+        return self.dist.rvs(size=size, random_state=rng)
+
+
+class _NumpyDraw:
+    # draw function of from_numpy(); a class rather than a lambda so that samplers can be pickled
+    def __init__(self, method, args, kwargs):
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+
+    def __call__(self, rng, size):
+        return getattr(rng, self.method)(*self.args, size=size, **self.kwargs)
+
+
+def from_scipy(dist, block_size=1024):
+    """
+    Return a `BlockSampler` for a frozen scipy.stats distribution, e.g. `scipy.stats.gamma(2.0, scale=1.5)`.
+
+    Args:
+        dist (scipy.stats frozen distribution): Distribution with an `rvs(size, random_state)` method.
+        block_size (int, optional): Number of variates drawn per refill. Defaults to 1024.
+
+    Returns:
+        BlockSampler: The sampler.
+    """
+    return BlockSampler(_ScipyDraw(dist), block_size)
+
+
+def from_numpy(method, *args, block_size=1024, **kwargs):
+    """
+    Return a `BlockSampler` that calls a method of `numpy.random.Generator`, e.g. `from_numpy("exponential", 2.0)`.
+
+    Args:
+        method (str): Name of the Generator method, such as "exponential", "normal", "triangular" or "gamma".
+        *args: Positional arguments of the method.
+        block_size (int, optional): Number of variates drawn per refill. Defaults to 1024.
+        **kwargs: Keyword arguments of the method.
+
+    Returns:
+        BlockSampler: The sampler.
+
+    Raises:
+        ValueError: If `numpy.random.Generator` has no such method.
+    """
+    if not hasattr(np.random.Generator, method):
+        raise ValueError(f"numpy.random.Generator has no method '{method}'")
+    return BlockSampler(_NumpyDraw(method, args, kwargs), block_size)
+
+
+def make_sampler(delay, rng=None):
+    """
+    Resolve the type of `delay` once and return a sampler for it. The sampler is called without arguments
+    and returns the next delay.
+
+    Args:
+        delay (int, float, generator, callable, BlockSampler or frozen scipy distribution): The delay, which can be:
+
+            - int or float: Used as a constant delay.
+            - BlockSampler: Bound to `rng` and sampled in blocks.
+            - frozen scipy.stats distribution: Sampled in blocks from `rng`.
+            - generator: A generator instance yielding delay values.
+            - callable: A function that returns a delay value.
+        rng (numpy.random.Generator, optional): Generator used by block samplers. Defaults to a freshly seeded generator.
+
+    Returns:
+        callable: The sampler.
+
+    Raises:
+        ValueError: If `delay` is of none of the above types.
+    """
+    if isinstance(delay, BlockSampler):
+        return delay.bind(rng if rng is not None else np.random.default_rng())
+    if isinstance(delay, (ConstantSampler, GeneratorSampler, CallableSampler)):
+        return delay
+    if isinstance(delay, (int, float, np.integer, np.floating)):
+        return ConstantSampler(delay)
+    if hasattr(delay, "rvs") and hasattr(delay, "dist"):
+        return from_scipy(delay).bind(rng if rng is not None else np.random.default_rng())
+    if hasattr(delay, "__next__"):
+        return GeneratorSampler(delay)
+    if callable(delay):
+        return CallableSampler(delay)
+    raise ValueError("delay must be int, float, generator, callable, BlockSampler or a frozen scipy.stats distribution")
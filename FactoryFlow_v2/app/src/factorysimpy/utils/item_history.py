@@ -0,0 +1,175 @@
+import numpy as np
+
+
+class ItemHistoryRecorder:
+    """
+    Columnar recorder of the node visits of flow items.
+
+    Every time an item leaves a node, one row (item index, node index, entry time, exit time) is written
+    into preallocated NumPy arrays. Nodes are identified by the dense index compiled by `Node.compile_model()`
+    and items are interned into integer indices on first sight, so a row costs 24 bytes and an item only
+    keeps its index. The arrays double in size when they are full.
+    Per-node dwell-time analysis is done at the end with vectorized queries over the columns.
+
+    Recording is off unless a recorder is attached to a model. `attach()` compiles the model and installs the
+    recorder on every node of the model; the nodes pass it and their index to `BaseFlowItem.update_node_event`
+    when an item exits. The
+    per-item `stats` dictionaries can be turned off at the same time with `BaseFlowItem.record_node_stats = False`.
+
+    Parameters:
+        capacity (int, optional): Number of rows to preallocate. Defaults to 100000.
+
+    Example:
+        history = ItemHistoryRecorder(capacity=1_000_000)
+        history.attach(TOP)
+        TOP.run_simulation(1000)
+        summary = history.dwell_time_summary()
+
+    Raises:
+        ValueError: If capacity is not a positive integer.
+    """
+
+    def __init__(self, capacity=100000):
+        if not isinstance(capacity, int) or capacity <= 0:
+            raise ValueError("capacity must be a positive integer")
+        self.size = 0
+        self.item_index = np.empty(capacity, dtype=np.int32)
+        self.node_index = np.empty(capacity, dtype=np.int32)
+        self.entry_time = np.empty(capacity, dtype=np.float64)
+        self.exit_time = np.empty(capacity, dtype=np.float64)
+        self.item_ids = []  # item id for each item index
+        self.node_ids = []  # node id for each node index, filled by attach()
+
+    def __len__(self):
+        return self.size
+
+    def attach(self, model):
+        """
+        Compile `model` and install the recorder on all of its nodes. `model` is the node the simulation is
+        run on, so that the node indices match those compiled by `run_simulation()`.
+
+        Args:
+            model (Node): Top-level node of the model.
+        """
+        nodes, _ = model.compile_model()
+        self.node_ids = [node.id for node in nodes]
+        for node in nodes:
+            node.history = self
+
+    @staticmethod
+    def detach(model):
+        """Remove the recorder installed on `model`, turning recording off."""
+        for node in model.iter_nodes():
+            node.history = None
+
+    def _grow(self):
+        capacity = 2 * len(self.item_index)
+        for name in ("item_index", "node_index", "entry_time", "exit_time"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+
+    def record(self, item, node_index, entry_time, exit_time):
+        """
+        Record one visit of an item to a node.
+
+        Args:
+            item (BaseFlowItem): The item leaving the node.
+            node_index (int): Compiled index of the node (`Node.index`).
+            entry_time (float): Time at which the item entered the node.
+            exit_time (float): Time at which the item left the node.
+        """
+        index = item.history_index
+        if index is None:
+            index = len(self.item_ids)
+            item.history_index = index
+            self.item_ids.append(item.id)
+        row = self.size
+        if row == len(self.item_index):
+            self._grow()
+        self.item_index[row] = index
+        self.node_index[row] = node_index
+        self.entry_time[row] = entry_time
+        self.exit_time[row] = exit_time
+        self.size = row + 1
+
+    def to_arrays(self):
+        """
+        Return the recorded rows as a dictionary of NumPy arrays (views, not copies).
+
+        Returns:
+            dict: Arrays "item_index", "node_index", "entry_time", "exit_time" and "dwell_time".
+        """
+        n = self.size
+        return {
+            "item_index": self.item_index[:n],
+            "node_index": self.node_index[:n],
+            "entry_time": self.entry_time[:n],
+            "exit_time": self.exit_time[:n],
+            "dwell_time": self.exit_time[:n] - self.entry_time[:n],
+        }
+
+    def dwell_times(self, node_id):
+        """
+        Return the dwell times of all recorded visits to a node.
+
+        Args:
+            node_id (str): ID of the node.
+
+        Returns:
+            numpy.ndarray: Dwell times in the order of the visits. Empty if the node was never visited.
+        """
+        if node_id not in self.node_ids:
+            return np.empty(0, dtype=np.float64)
+        node = self.node_ids.index(node_id)
+        n = self.size
+        mask = self.node_index[:n] == node
+        return self.exit_time[:n][mask] - self.entry_time[:n][mask]
+
+    def dwell_time_summary(self):
+        """
+        Compute per-node dwell-time statistics over all recorded visits.
+
+        Returns:
+            dict: Maps each node ID to a dictionary with "visits", "total", "mean", "min" and "max".
+        """
+        n = self.size
+        num_nodes = len(self.node_ids)
+        if n == 0:
+            return {}
+        nodes = self.node_index[:n]
+        dwell = self.exit_time[:n] - self.entry_time[:n]
+        visits = np.bincount(nodes, minlength=num_nodes)
+        total = np.bincount(nodes, weights=dwell, minlength=num_nodes)
+        minimum = np.full(num_nodes, np.inf)
+        maximum = np.full(num_nodes, -np.inf)
+        np.minimum.at(minimum, nodes, dwell)
+        np.maximum.at(maximum, nodes, dwell)
+        summary = {}
+        for node, node_id in enumerate(self.node_ids):
+            if visits[node]:
+                summary[node_id] = {
+                    "visits": int(visits[node]),
+                    "total": float(total[node]),
+                    "mean": float(total[node] / visits[node]),
+                    "min": float(minimum[node]),
+                    "max": float(maximum[node]),
+                }
+        return summary
+
+    def time_per_item(self):
+        """
+        Compute the total time each item spent inside nodes.
+
+        Returns:
+            dict: Maps each item ID to its total dwell time.
+        """
+        n = self.size
+        totals = np.bincount(self.item_index[:n], weights=self.exit_time[:n] - self.entry_time[:n],
+                             minlength=len(self.item_ids))
+        return dict(zip(self.item_ids, totals.tolist()))
+
+    def clear(self):
+        """Discard all recorded rows, keeping the allocated arrays."""
+        self.size = 0
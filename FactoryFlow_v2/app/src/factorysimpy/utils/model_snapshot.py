@@ -0,0 +1,301 @@
+import importlib
+import inspect
+import pickle
+import zlib
+
+import simpy
+
+from factorysimpy.nodes.node import Node
+from factorysimpy.edges.edge import Edge
+
+
+SNAPSHOT_VERSION = 1
+
+# Arguments of the constructors that are not parameters of the component
+_WIRING_ARGS = ("self", "env", "id", "in_edges", "out_edges")
+
+# Attributes of composite nodes that are rebuilt by the model itself and not stored
+_RUNTIME_ATTRIBUTES = {"_compiled_nodes", "_compiled_edges"}
+
+_base_node_keys = None
+
+
+def _node_base_keys():
+    # names of the attributes created by Node.__init__
+    global _base_node_keys
+    if _base_node_keys is None:
+        _base_node_keys = set(Node(simpy.Environment(), "_").__dict__)
+    return _base_node_keys
+
+
+class _Ref:
+    """Reference to another component of the snapshot, by its index."""
+
+    __slots__ = ("index",)
+
+    def __init__(self, index):
+        self.index = index
+
+    def __reduce__(self):
+        return (_Ref, (self.index,))
+
+
+class ModelSnapshot:
+    """
+    Compact snapshot of a fully constructed model: the nodes and edges, their constructor parameters, the
+    hierarchy of child nodes and edges, and the wiring of the edges.
+
+    A snapshot is taken once from a model that was built the usual way (generated `SystemModel(Node)` class
+    or ModelBuilder), stored as bytes, and turned into a new model on a new `simpy.Environment` with `build()`.
+    Building from a snapshot calls the constructors of the leaf components (Machine, Buffer, ...) directly and
+    wires the edges without running the model classes or the builder again.
+
+    Composite nodes (nodes with child nodes or edges, e.g. a `SystemModel`) are rebuilt without calling their
+    own `__init__`: they are initialised as a plain Node and get back their attributes, so references such as
+    `TOP.M[4]` point to the new components.
+
+    Only the model structure is stored. Statistics, tracing and the state of a run are not, so a snapshot
+    should be taken before the model is run. Parameters must be picklable: constants, strings, frozen scipy
+    distributions, BlockSamplers made with `from_numpy`/`from_scipy` and module-level functions are; generator
+    instances and lambdas are not.
+
+    Example:
+        data = ModelSnapshot.capture(TOP).to_bytes()
+        for replication in range(100):
+            env = simpy.Environment()
+            TOP = ModelSnapshot.from_bytes(data).build(env)
+            TOP.run_simulation(1000, seed=replication)
+
+    Parameters:
+        data (dict): The snapshot data, as made by `capture()`.
+    """
+
+    def __init__(self, data):
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {data.get('version')}")
+        self.data = data
+
+    @classmethod
+    def capture(cls, model):
+        """
+        Take a snapshot of the model under `model`.
+
+        Args:
+            model (Node): Top-level node of the model.
+
+        Returns:
+            ModelSnapshot: The snapshot.
+
+        Raises:
+            ValueError: If a parameter of a component cannot be pickled.
+        """
+        components = []
+        index_of = {}
+
+        def collect(obj):
+            if id(obj) in index_of:
+                return
+            index_of[id(obj)] = len(components)
+            components.append(obj)
+            if isinstance(obj, Node):
+                for child in obj.child_nodes.values():
+                    collect(child)
+                for child in obj.child_edges.values():
+                    collect(child)
+
+        collect(model)
+        # edges wired to the model but not registered as children are stored as well
+        for obj in list(components):
+            if isinstance(obj, Node):
+                for edge in (obj.in_edges or []) + (obj.out_edges or []):
+                    collect(edge)
+
+        def ref(value):
+            return _Ref(index_of[id(value)]) if id(value) in index_of else None
+
+        records = []
+        for obj in components:
+            cls_ = obj.__class__
+            record = {
+                "class": (cls_.__module__, cls_.__qualname__),
+                "id": obj.id,
+                "hierarchical_id": obj.hierarchical_id,
+                "parent": ref(obj.parent) if obj.parent is not None else None,
+            }
+            if isinstance(obj, Node):
+                record["child_nodes"] = [index_of[id(child)] for child in obj.child_nodes.values()]
+                record["child_edges"] = [index_of[id(child)] for child in obj.child_edges.values()]
+                record["in_edges"] = None if obj.in_edges is None else [index_of[id(e)] for e in obj.in_edges]
+                record["out_edges"] = None if obj.out_edges is None else [index_of[id(e)] for e in obj.out_edges]
+            else:
+                record["src_node"] = ref(obj.src_node) if obj.src_node is not None else None
+                record["dest_node"] = ref(obj.dest_node) if obj.dest_node is not None else None
+
+            if isinstance(obj, Node) and (obj.child_nodes or obj.child_edges):
+                record["composite"] = True
+                record["node_setup_time"] = obj.node_setup_time
+                attributes = {}
+                base_keys = _node_base_keys()
+                for key, value in obj.__dict__.items():
+                    if key in base_keys or key in _RUNTIME_ATTRIBUTES:
+                        continue
+                    attributes[key] = _encode(value, index_of, obj.id, key)
+                record["attributes"] = attributes
+            else:
+                record["composite"] = False
+                record["params"] = _constructor_params(obj, index_of)
+            records.append(record)
+
+        return cls({"version": SNAPSHOT_VERSION, "components": records})
+
+    def build(self, env):
+        """
+        Build a new model from the snapshot.
+
+        Args:
+            env (simpy.Environment): Environment of the new model.
+
+        Returns:
+            Node: The top-level node of the new model.
+        """
+        if not isinstance(env, simpy.Environment):
+            raise TypeError("env must be a simpy.Environment instance")
+        records = self.data["components"]
+        classes = {}
+        objects = []
+        # 1) create the components; leaf constructors start the behaviour processes of the nodes
+        for record in records:
+            key = record["class"]
+            cls_ = classes.get(key)
+            if cls_ is None:
+                cls_ = _load_class(*key)
+                classes[key] = cls_
+            if record["composite"]:
+                obj = cls_.__new__(cls_)
+                Node.__init__(obj, env, record["id"], node_setup_time=record["node_setup_time"])
+            else:
+                params = {name: _decode(value, objects) for name, value in record["params"].items()}
+                obj = cls_(env, record["id"], **params)
+            objects.append(obj)
+        # 2) hierarchy and wiring
+        for obj, record in zip(objects, records):
+            obj.hierarchical_id = record["hierarchical_id"]
+            obj.parent = _decode(record["parent"], objects)
+            if isinstance(obj, Node):
+                for index in record["child_nodes"]:
+                    obj.child_nodes[objects[index].id] = objects[index]
+                for index in record["child_edges"]:
+                    obj.child_edges[objects[index].id] = objects[index]
+                obj.in_edges = None if record["in_edges"] is None else [objects[i] for i in record["in_edges"]]
+                obj.out_edges = None if record["out_edges"] is None else [objects[i] for i in record["out_edges"]]
+            else:
+                obj.src_node = _decode(record["src_node"], objects)
+                obj.dest_node = _decode(record["dest_node"], objects)
+        # 3) attributes of the composite nodes, which may refer to any component
+        for obj, record in zip(objects, records):
+            if record["composite"]:
+                for key, value in record["attributes"].items():
+                    setattr(obj, key, _decode(value, objects))
+        return objects[0]
+
+    def to_bytes(self, compress=True):
+        """
+        Serialize the snapshot.
+
+        Args:
+            compress (bool, optional): Compress the bytes with zlib. Defaults to True.
+
+        Returns:
+            bytes: The serialized snapshot.
+        """
+        data = pickle.dumps(self.data, protocol=pickle.HIGHEST_PROTOCOL)
+        return b"Z" + zlib.compress(data) if compress else b"P" + data
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Load a snapshot serialized with `to_bytes()`.
+
+        Args:
+            data (bytes): The serialized snapshot.
+
+        Returns:
+            ModelSnapshot: The snapshot.
+
+        Raises:
+            ValueError: If the bytes are not a serialized snapshot.
+        """
+        kind, payload = data[:1], data[1:]
+        if kind == b"Z":
+            payload = zlib.decompress(payload)
+        elif kind != b"P":
+            raise ValueError("data is not a serialized ModelSnapshot")
+        return cls(pickle.loads(payload))
+
+    def save(self, path, compress=True):
+        """Write the snapshot to the file `path`."""
+        with open(path, "wb") as f:
+            f.write(self.to_bytes(compress))
+
+    @classmethod
+    def load(cls, path):
+        """Read a snapshot written by `save()`."""
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def _load_class(module_name, qualname):
+    obj = importlib.import_module(module_name)
+    for part in qualname.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def _constructor_params(obj, index_of):
+    # read the constructor parameters of a leaf component back from its attributes
+    cls_ = obj.__class__
+    renamed = getattr(cls_, "constructor_param_attributes", {})
+    params = {}
+    for name, parameter in inspect.signature(cls_.__init__).parameters.items():
+        if name in _WIRING_ARGS or parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+            continue
+        attribute = renamed.get(name, name)
+        if hasattr(obj, attribute):
+            value = getattr(obj, attribute)
+        elif parameter.default is not parameter.empty:
+            value = parameter.default
+        else:
+            raise ValueError(f"{obj.id}: constructor parameter '{name}' is not stored as an attribute")
+        params[name] = _encode(value, index_of, obj.id, name)
+    return params
+
+
+def _encode(value, index_of, owner, name):
+    # replace references to components by _Ref and check that the rest can be pickled
+    if isinstance(value, (Node, Edge)):
+        if id(value) not in index_of:
+            raise ValueError(f"{owner}: '{name}' refers to '{value.id}', which is not part of the model")
+        return _Ref(index_of[id(value)])
+    if isinstance(value, list):
+        return [_encode(v, index_of, owner, name) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_encode(v, index_of, owner, name) for v in value)
+    if isinstance(value, dict):
+        return {k: _encode(v, index_of, owner, name) for k, v in value.items()}
+    try:
+        pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        raise ValueError(f"{owner}: '{name}' cannot be stored in a snapshot ({type(value).__name__}: {e})")
+    return value
+
+
+def _decode(value, objects):
+    if isinstance(value, _Ref):
+        return objects[value.index]
+    if isinstance(value, list):
+        return [_decode(v, objects) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_decode(v, objects) for v in value)
+    if isinstance(value, dict):
+        return {k: _decode(v, objects) for k, v in value.items()}
+    return value
@@ -0,0 +1,238 @@
+"""
+Independent replications of a model, run in parallel over the cores of one machine.
+
+Each replication builds a fresh model with a factory function `factory(env, **params)`, runs it with
+`Node.run_simulation(run_time, seed)` in a worker process and sends back only the flattened scalar statistics
+of its nodes and edges. The replications of each scenario are then merged into means and confidence intervals.
+
+Seeds are derived from one base seed with `numpy.random.SeedSequence`, so a set of replications is reproducible
+and independent of the number of workers. Replication `i` uses the same seed in every scenario (common random
+numbers), which makes differences between scenarios less noisy. Before the model is built, the seed of a
+replication also seeds the global `random` and `numpy.random` states, which models may draw from (e.g.
+`random.random()` in a delay function) instead of the generators of their components.
+
+Example:
+    def make_line(env, delay=1.0):
+        TOP = SystemModel(env, "TOP")
+        TOP.M[4].processing_delay = delay
+        TOP.fill_hierarchical_id()
+        return TOP
+
+    results = run_replications(make_line, run_time=1000, replications=30, base_seed=42,
+                               scenarios={"slow": {"delay": 2.3}, "fast": {"delay": 1.5}})
+    summary = summarize_replications(results)
+    print(summary["slow"]["TOP.sink.num_item_received"])
+
+The factory must be picklable, that is defined at module level, unless `max_workers=1`. To avoid running the
+model construction code in every replication, the factory can rebuild the model from a `ModelSnapshot`.
+"""
+import contextlib
+import io
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from statistics import NormalDist
+
+import numpy as np
+import simpy
+
+from factorysimpy.utils.stats_summary import flatten_stats
+
+try:
+    from scipy.stats import t as _student_t
+except ImportError:
+    _student_t = None
+
+
+def replication_seeds(replications, base_seed=None):
+    """
+    Derive the seeds of a set of replications from one base seed.
+
+    Args:
+        replications (int): Number of replications.
+        base_seed (int, optional): Base seed. Defaults to None, which draws fresh entropy.
+
+    Returns:
+        list: `replications` integer seeds.
+
+    Raises:
+        ValueError: If replications is not a positive integer.
+    """
+    if not isinstance(replications, int) or replications <= 0:
+        raise ValueError("replications must be a positive integer")
+    return np.random.SeedSequence(base_seed).generate_state(replications, dtype=np.uint64).tolist()
+
+
+def collect_stats(model):
+    """
+    Flatten the statistics of all nodes and edges of a model into scalar values.
+
+    Keys are "<hierarchical id>.<stat>", with nested dictionaries such as "total_time_spent_in_states" joined
+    by dots. Per-item lists are left out; recorders of `stream_stats` contribute their summary values.
+
+    Args:
+        model (Node): Top-level node of the model.
+
+    Returns:
+        dict: Maps each key to a float.
+    """
+    flat = {}
+    nodes, edges = model.get_all_nodes_edges()
+    for name, component in list(nodes.items()) + list(edges.items()):
+        stats = getattr(component, "stats", None)
+        if isinstance(stats, dict):
+            flatten_stats(stats, name, flat)
+    return flat
+
+
+def component_classes(model):
+    """
+    Returns:
+        dict: Maps the hierarchical id of every node and edge of the model to the name of its class.
+    """
+    nodes, edges = model.get_all_nodes_edges()
+    return {name: type(component).__name__ for name, component in list(nodes.items()) + list(edges.items())}
+
+
+def _run_replication(factory, params, run_time, seed, metrics, quiet):
+    env = simpy.Environment()
+    output = io.StringIO() if quiet else None
+    # models may also draw from the global generators; seed them so results do not depend on the worker
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+    with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+        model = factory(env, **params)
+        model.run_simulation(run_time, seed=seed)
+    result = collect_stats(model)
+    if metrics is not None:
+        for key, value in metrics(model, run_time).items():
+            result[key] = float(value)
+    return result, component_classes(model)
+
+
+def run_replications(factory, run_time, replications=30, base_seed=None, seeds=None, scenarios=None,
+                     max_workers=None, metrics=None, quiet=True):
+    """
+    Run independent replications of one or more scenarios of a model in parallel.
+
+    Args:
+        factory (callable): Function `factory(env, **params)` that builds the model on `env` and returns its top node.
+        run_time (float): Simulation time of each replication.
+        replications (int, optional): Number of replications per scenario. Defaults to 30.
+        base_seed (int, optional): Seed the replication seeds are derived from. Defaults to None.
+        seeds (list, optional): Explicit seeds, one per replication; overrides `replications` and `base_seed`.
+        scenarios (dict or list, optional): Maps a scenario name to the keyword arguments passed to `factory`.
+            A list of dictionaries is named by position. Defaults to one scenario "base" without arguments.
+        max_workers (int, optional): Number of worker processes. Defaults to the number of cores. With 1, the
+            replications run one after the other in this process.
+        metrics (callable, optional): Function `metrics(model, run_time)` returning extra scalar results
+            (a dict) computed in the worker, e.g. throughput. Must be picklable like `factory`.
+        quiet (bool, optional): Discard what the models print while they run. Defaults to True.
+
+    Returns:
+        list: One dictionary per replication with "scenario", "replication", "seed", "stats" (see
+            `collect_stats`) and "components" (see `component_classes`), ordered by scenario and replication.
+            `utils.stats_summary.stats_tables()` turns them into columnar tables.
+
+    Raises:
+        ValueError: If there are no seeds or no scenarios.
+    """
+    if seeds is None:
+        seeds = replication_seeds(replications, base_seed)
+    seeds = list(seeds)
+    if not seeds:
+        raise ValueError("seeds must not be empty")
+    if scenarios is None:
+        scenarios = {"base": {}}
+    elif isinstance(scenarios, (list, tuple)):
+        scenarios = dict(enumerate(scenarios))
+    if not scenarios:
+        raise ValueError("scenarios must not be empty")
+
+    runs = [(name, i, seed) for name in scenarios for i, seed in enumerate(seeds)]
+    results = {}
+    if max_workers == 1:
+        for name, i, seed in runs:
+            results[(name, i)] = _run_replication(factory, scenarios[name], run_time, seed, metrics, quiet)
+    else:
+        workers = min(max_workers or os.cpu_count() or 1, len(runs))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_run_replication, factory, scenarios[name], run_time, seed, metrics, quiet): (name, i)
+                for name, i, seed in runs
+            }
+            for future in as_completed(futures):
+                name, i = futures[future]
+                try:
+                    results[(name, i)] = future.result()
+                except Exception as e:
+                    raise RuntimeError(f"Replication {i} of scenario '{name}' failed: {e}") from e
+
+    return [
+        {"scenario": name, "replication": i, "seed": seed, "stats": results[(name, i)][0],
+         "components": results[(name, i)][1]}
+        for name, i, seed in runs
+    ]
+
+
+def _t_quantile(p, df):
+    if _student_t is not None:
+        return float(_student_t.ppf(p, df))
+    # Cornish-Fisher expansion of the t quantile around the normal quantile
+    z = NormalDist().inv_cdf(p)
+    return (z + (z ** 3 + z) / (4 * df) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3))
+
+
+def confidence_interval(values, confidence=0.95):
+    """
+    Student-t confidence interval of the mean of independent values.
+
+    Args:
+        values (list): The values, one per replication.
+        confidence (float, optional): Confidence level. Defaults to 0.95.
+
+    Returns:
+        dict: "n", "mean", "std", "half_width", "low" and "high". With fewer than two values the
+            half width is None.
+
+    Raises:
+        ValueError: If values is empty or confidence is not between 0 and 1.
+    """
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n == 0:
+        raise ValueError("values must not be empty")
+    mean = float(values.mean())
+    if n < 2:
+        return {"n": n, "mean": mean, "std": None, "half_width": None, "low": None, "high": None}
+    std = float(values.std(ddof=1))
+    half_width = _t_quantile(0.5 + confidence / 2, n - 1) * std / math.sqrt(n)
+    return {"n": n, "mean": mean, "std": std, "half_width": half_width,
+            "low": mean - half_width, "high": mean + half_width}
+
+
+def summarize_replications(results, confidence=0.95):
+    """
+    Merge the results of `run_replications` into confidence intervals per scenario and statistic.
+
+    Args:
+        results (list): Results returned by `run_replications`.
+        confidence (float, optional): Confidence level. Defaults to 0.95.
+
+    Returns:
+        dict: Maps each scenario to a dictionary mapping each statistic to its `confidence_interval`.
+            A statistic missing from some replications is summarized over the others.
+    """
+    grouped = {}
+    for result in results:
+        scenario = grouped.setdefault(result["scenario"], {})
+        for key, value in result["stats"].items():
+            scenario.setdefault(key, []).append(value)
+    return {
+        name: {key: confidence_interval(values, confidence) for key, values in stats.items()}
+        for name, stats in grouped.items()
+    }
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def compute_performance_metrics(stats, sim_time):
     """
     Compute cycle time, resource utilization, throughput, and % time spent in each state for each worker.
@@ -166,4 +169,245 @@ def aggregate_split_stats(stats, sim_time):
         "total_pallet_processed": total_pallet_processed,
         "num_item_discarded": num_item_discarded,
         "num_pallet_discarded": num_pallet_discarded,
-    }
\ No newline at end of file
+    }
+
+# statistics that are bookkeeping rather than results
+_IGNORED_STATS = {"last_state_change_time"}
+
+
+def flatten_stats(stats, prefix="", flat=None):
+    """
+    Flatten a stats dictionary into scalar values.
+
+    Nested dictionaries such as "total_time_spent_in_states" are joined with dots, e.g.
+    "total_time_spent_in_states.IDLE_STATE". Per-item lists are left out; recorders of `stream_stats`
+    contribute their summary values, e.g. "processing_delay.mean".
+
+    Args:
+        stats (dict): The stats dictionary of a node or edge.
+        prefix (str, optional): Prefix of the keys, e.g. the id of the component. Defaults to "".
+        flat (dict, optional): Dictionary to add the values to. Defaults to a new one.
+
+    Returns:
+        dict: Maps each key to a float.
+    """
+    if flat is None:
+        flat = {}
+    for key, value in stats.items():
+        if key not in _IGNORED_STATS:
+            _flatten_value(value, f"{prefix}.{key}" if prefix else str(key), flat)
+    return flat
+
+
+def _flatten_value(value, key, flat):
+    if isinstance(value, (bool, int, float, np.integer, np.floating)):
+        flat[key] = float(value)
+    elif isinstance(value, dict):
+        flatten_stats(value, key, flat)
+    elif hasattr(value, "summary"):
+        flatten_stats(value.summary(), key, flat)
+
+
+class StatsTable:
+    """
+    Columnar statistics of all components of one class, e.g. all Machines, over one or more replications.
+
+    Every row is one component in one replication. Every flattened statistic (see `flatten_stats`) is a
+    float64 column, with NaN where a component does not have it. State times are the columns
+    "total_time_spent_in_states.<STATE>".
+
+    Parameters:
+        component_class (str): Name of the class of the components.
+        ids (list): Ids of the components; `component` indexes into it.
+        component (numpy.ndarray): Index of the component of each row.
+        replication (numpy.ndarray): Replication of each row: the position of its model or result in the
+            list passed to `stats_tables`.
+        columns (dict): Maps each statistic to its column.
+    """
+
+    def __init__(self, component_class, ids, component, replication, columns):
+        self.component_class = component_class
+        self.ids = ids
+        self.component = component
+        self.replication = replication
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.component)
+
+    def __repr__(self):
+        return f"StatsTable({self.component_class}, {len(self.ids)} components, {len(self)} rows, {len(self.columns)} columns)"
+
+    def column(self, name, default=np.nan):
+        """
+        Return a column, or a column filled with `default` if no component has the statistic.
+        """
+        values = self.columns.get(name)
+        if values is None:
+            return np.full(len(self), default, dtype=np.float64)
+        return values
+
+    def state_columns(self):
+        """
+        Returns:
+            dict: Maps each state name to its column of total times.
+        """
+        prefix = "total_time_spent_in_states."
+        return {name[len(prefix):]: values for name, values in self.columns.items() if name.startswith(prefix)}
+
+    def mean_by_component(self, values):
+        """
+        Average a per-row array over the replications of each component, ignoring NaN.
+
+        Args:
+            values (numpy.ndarray): One value per row, e.g. a column or a KPI of `compute_kpis`.
+
+        Returns:
+            dict: Maps each component id to its mean, NaN if it has no value.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values)
+        counts = np.bincount(self.component[valid], minlength=len(self.ids))
+        sums = np.bincount(self.component[valid], weights=values[valid], minlength=len(self.ids))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = sums / counts
+        return dict(zip(self.ids, means.tolist()))
+
+    def to_frame(self):
+        """
+        Return the table as a pandas DataFrame with "component" and "replication" columns.
+
+        Raises:
+            ImportError: If pandas is not installed.
+        """
+        import pandas as pd
+        frame = pd.DataFrame(self.columns)
+        frame.insert(0, "replication", self.replication)
+        frame.insert(0, "component", np.asarray(self.ids, dtype=object)[self.component])
+        return frame
+
+
+def stats_tables(source):
+    """
+    Build one `StatsTable` per component class.
+
+    Args:
+        source: One of
+            - a model (its top-level Node), giving one replication,
+            - a list of models, one per replication,
+            - the results of `utils.replication.run_replications`, one replication per result.
+
+    Returns:
+        dict: Maps each class name (e.g. "Machine", "Buffer") to its StatsTable.
+    """
+    if hasattr(source, "get_all_nodes_edges"):
+        source = [source]
+    rows = {}  # class name -> list of (component id, replication, flat stats)
+    for replication, entry in enumerate(source):
+        if isinstance(entry, dict):
+            for component_id, component_class, flat in _split_result(entry):
+                rows.setdefault(component_class, []).append((component_id, replication, flat))
+        else:
+            nodes, edges = entry.get_all_nodes_edges()
+            for component_id, component in list(nodes.items()) + list(edges.items()):
+                stats = getattr(component, "stats", None)
+                if isinstance(stats, dict):
+                    rows.setdefault(type(component).__name__, []).append((component_id, replication, flatten_stats(stats)))
+    return {name: _build_table(name, class_rows) for name, class_rows in rows.items()}
+
+
+def _split_result(result):
+    # split the flat keys "<component id>.<stat>" of a replication result by component
+    classes = result["components"]
+    per_component = {}
+    for key, value in result["stats"].items():
+        # the component is the longest prefix of the key that is a component id
+        position = key.find(".")
+        component_id = None
+        while position != -1:
+            if key[:position] in classes:
+                component_id = key[:position]
+                stat = key[position + 1:]
+            position = key.find(".", position + 1)
+        if component_id is not None:
+            per_component.setdefault(component_id, {})[stat] = value
+    return [(component_id, classes[component_id], flat) for component_id, flat in per_component.items()]
+
+
+def _build_table(component_class, rows):
+    ids = []
+    id_index = {}
+    component = np.empty(len(rows), dtype=np.intp)
+    replication = np.empty(len(rows), dtype=np.intp)
+    columns = {}
+    for row, (component_id, rep, flat) in enumerate(rows):
+        index = id_index.get(component_id)
+        if index is None:
+            index = id_index[component_id] = len(ids)
+            ids.append(component_id)
+        component[row] = index
+        replication[row] = rep
+        for name, value in flat.items():
+            values = columns.get(name)
+            if values is None:
+                values = columns[name] = np.full(len(rows), np.nan)
+            values[row] = value
+    return StatsTable(component_class, ids, component, replication, columns)
+
+
+def compute_kpis(table, sim_time):
+    """
+    Compute the KPIs of all rows of a `StatsTable` in one vectorized pass. Only the KPIs the columns of the
+    table support are returned:
+
+        - utilization: time in "PROCESSING_STATE" (or "ATLEAST_ONE_PROCESSING_STATE" for Machines) / sim_time.
+        - throughput: items and pallets processed per unit time, or items received for a Sink.
+        - cycle_time: processing time per processed item, or mean cycle time of the items received by a Sink.
+        - num_processed, num_discarded: counts of items and pallets.
+        - percent_time_in_<STATE>: percentage of sim_time spent in each state.
+        - time_averaged_level: time-averaged number of items of an edge.
+
+    Args:
+        table (StatsTable): The table.
+        sim_time (float or numpy.ndarray): Simulation time, or one time per replication.
+
+    Returns:
+        dict: Maps each KPI to an array with one value per row; NaN where undefined.
+    """
+    sim_time = np.asarray(sim_time, dtype=np.float64)
+    if sim_time.ndim:
+        sim_time = sim_time[table.replication]
+    sim_time = np.maximum(sim_time, 1e-8)
+    columns = table.columns
+    kpis = {}
+
+    processing = columns.get("total_time_spent_in_states.PROCESSING_STATE")
+    if processing is None:
+        processing = columns.get("total_time_spent_in_states.ATLEAST_ONE_PROCESSING_STATE")
+    processed_columns = [columns[name] for name in ("num_item_processed", "num_pallet_processed") if name in columns]
+    if processed_columns:
+        processed = np.nansum(processed_columns, axis=0)
+        kpis["num_processed"] = processed
+        kpis["throughput"] = processed / sim_time
+        if processing is not None:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                kpis["cycle_time"] = np.where(processed > 0, processing / processed, np.nan)
+    if processing is not None:
+        kpis["utilization"] = processing / sim_time
+    discarded_columns = [columns[name] for name in ("num_item_discarded", "num_pallet_discarded") if name in columns]
+    if discarded_columns:
+        kpis["num_discarded"] = np.nansum(discarded_columns, axis=0)
+
+    received = columns.get("num_item_received")
+    if received is not None:
+        kpis["throughput"] = received / sim_time
+        if "total_cycle_time" in columns:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                kpis["cycle_time"] = np.where(received > 0, columns["total_cycle_time"] / received, np.nan)
+
+    for name, values in columns.items():
+        if name.startswith("time_averaged_num_of_items_in_"):
+            kpis["time_averaged_level"] = values
+    for state, values in table.state_columns().items():
+        kpis[f"percent_time_in_{state}"] = values / sim_time * 100
+    return kpis
@@ -0,0 +1,263 @@
+"""
+Steady-state run mode: detect the warm-up period of a run and stop it as soon as the KPIs are estimated
+precisely enough.
+
+The run is advanced in steps of `check_interval`. After every step, each KPI records the value it had over the
+step (e.g. the number of items the sink received divided by the step length). The warm-up period is found with
+MSER-5 on these series, and the steps after it are grouped into batches whose means give a confidence interval
+for each KPI (batch means). The run stops when every half width is below the requested precision, or at the
+time horizon otherwise.
+
+By default, when a warm-up period is first detected, the statistics of all nodes and edges are cleared with
+`utils.stream_stats.reset_statistics`, and the estimates are from then on computed over the steps after this
+reset only. The node and edge statistics at the end of the run then cover the same period as the estimates.
+
+KPIs are ratios of two cumulative quantities read from the existing statistics of the nodes:
+
+    - throughput(sink): items received by the sink per unit time.
+    - cycle_time(sink): mean cycle time of the items received by the sink.
+    - utilization(machine): fraction of time at least one worker of the machine is processing.
+
+Example:
+    rule = SteadyStateStop(check_interval=10, kpis=[throughput(TOP.sink), utilization(TOP.M[2])], precision=0.02)
+    TOP.run_simulation(10000, stop_rule=rule)
+    print(rule.end_time, rule.warmup_time, rule.estimates)
+"""
+import numpy as np
+
+from factorysimpy.utils.replication import confidence_interval
+from factorysimpy.utils.stream_stats import reset_statistics
+
+
+class KPI:
+    """
+    A KPI measured as the ratio of two cumulative quantities, `numerator(now) / denominator(now)`. Over a step
+    its value is the ratio of the increments of both quantities.
+
+    Parameters:
+        name (str): Name of the KPI.
+        numerator (callable): Function `numerator(now)` returning the cumulative numerator at time `now`.
+        denominator (callable, optional): Function `denominator(now)` returning the cumulative denominator.
+            Defaults to the simulation time, which makes the KPI a rate.
+    """
+
+    def __init__(self, name, numerator, denominator=None):
+        self.name = name
+        self.numerator = numerator
+        self.denominator = denominator if denominator is not None else (lambda now: now)
+
+
+def throughput(sink):
+    """Return the KPI "<sink id>.throughput": items received per unit time."""
+    return KPI(f"{sink.id}.throughput", lambda now: sink.stats["num_item_received"])
+
+
+def cycle_time(sink):
+    """Return the KPI "<sink id>.cycle_time": mean cycle time of the received items."""
+    return KPI(f"{sink.id}.cycle_time", lambda now: sink.stats["total_cycle_time"],
+               lambda now: sink.stats["num_item_received"])
+
+
+def utilization(machine):
+    """Return the KPI "<machine id>.utilization": fraction of time at least one worker is processing."""
+    def processing_time(now):
+        # time accounted up to the last state change, plus the current state if it is a processing one
+        total = machine.stats["total_time_spent_in_states"]["ATLEAST_ONE_PROCESSING_STATE"]
+        if machine.state_rep is not None and machine.state_rep[0] > 0:
+            total += now - machine.stats["last_state_change_time"]
+        return total
+    return KPI(f"{machine.id}.utilization", processing_time)
+
+
+def mser5(values):
+    """
+    Find the end of the warm-up period of a series with MSER-5.
+
+    The series is averaged in batches of 5, and the number of leading batches `d` to delete is the one that
+    minimizes the standard error of the mean of the remaining batches, `var(b[d:]) / (n - d)`. Only `d` in
+    the first half of the series is accepted.
+
+    Args:
+        values (list): Observations in time order. NaN observations are ignored.
+
+    Returns:
+        int: Number of leading observations to delete, or None if the minimum lies in the second half of the
+            series (the series is too short to detect the end of the warm-up).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    positions = np.flatnonzero(~np.isnan(values))
+    n = len(positions) // 5
+    if n < 2:
+        return None
+    batches = values[positions[:n * 5]].reshape(n, 5).mean(axis=1)
+    # sums over the batches d..n-1, for all d
+    tail_sum = np.cumsum(batches[::-1])[::-1]
+    tail_sq = np.cumsum((batches * batches)[::-1])[::-1]
+    count = np.arange(n, 0, -1, dtype=np.float64)
+    statistic = (tail_sq - tail_sum * tail_sum / count) / (count * count)
+    d = int(np.argmin(statistic[:n - 1]))
+    if d > n // 2:
+        return None
+    return int(positions[d * 5]) if d > 0 else 0
+
+
+class SteadyStateStop:
+    """
+    Stop rule for `Node.run_simulation(time, stop_rule=...)`: detect the warm-up with MSER-5 on the KPI series
+    and stop once the batch-means confidence half widths of all KPIs are below the precision.
+
+    Parameters:
+        check_interval (float): Length of the steps the run is advanced in, and the KPIs are observed over.
+        kpis (list, optional): KPI objects to estimate. Defaults to the throughput of every Sink of the model.
+        precision (float, optional): Maximum half width, relative to the estimate if `relative` is True.
+            Defaults to 0.05.
+        relative (bool, optional): Whether the precision is relative to the estimate. Defaults to True.
+        num_batches (int, optional): Number of batches of the batch-means method. Defaults to 20.
+        confidence (float, optional): Confidence level. Defaults to 0.95.
+        min_steps (int, optional): Number of steps observed before the rule is first evaluated. Defaults to 100.
+        reset_warmup (bool, optional): Whether to clear the statistics of the model when a warm-up period is
+            first detected, so that they exclude it. The reset happens at the time of the detection, which is
+            later than the end of the warm-up, and the run then goes on for at least `2 * num_batches` steps.
+            With False, the node and edge statistics include the warm-up and only the estimates exclude it.
+            Defaults to True.
+
+    Attributes:
+        converged (bool): Whether the run stopped because all KPIs reached the precision.
+        end_time (float): Time the run stopped at.
+        warmup_time (float): End of the warm-up period found by MSER-5, or None if it was not detected.
+        reset_time (float): Time the statistics of the model were reset at, or None if they were not reset.
+        estimates (dict): Maps each KPI name to its estimate: the `confidence_interval` of the batch means,
+            with "estimate" the ratio over all steps after the warm-up (after the reset, if there was one).
+
+    Raises:
+        ValueError: If check_interval, precision or num_batches is not positive, or confidence is not between 0 and 1.
+    """
+
+    def __init__(self, check_interval, kpis=None, precision=0.05, relative=True, num_batches=20, confidence=0.95, min_steps=100,
+                 reset_warmup=True):
+        if not check_interval > 0:
+            raise ValueError("check_interval must be positive")
+        if not precision > 0:
+            raise ValueError("precision must be positive")
+        if not isinstance(num_batches, int) or num_batches < 2:
+            raise ValueError("num_batches must be an integer of at least 2")
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be between 0 and 1")
+        self.check_interval = check_interval
+        self.kpis = kpis
+        self.precision = precision
+        self.relative = relative
+        self.num_batches = num_batches
+        self.confidence = confidence
+        self.min_steps = max(min_steps, 2 * num_batches)
+        self.reset_warmup = reset_warmup
+        self.converged = False
+        self.end_time = None
+        self.warmup_time = None
+        self.reset_time = None
+        self.estimates = {}
+
+    def run(self, model, time):
+        """
+        Run the model of `model` until the KPIs converge or up to `time`.
+
+        Args:
+            model (Node): Top-level node of the model. Its environment must not have been run past its start.
+            time (float): Time horizon.
+
+        Returns:
+            float: Time the run stopped at.
+
+        Raises:
+            ValueError: If no KPI is given and the model has no Sink.
+        """
+        kpis = self.kpis if self.kpis is not None else self._default_kpis(model)
+        if not kpis:
+            raise ValueError("SteadyStateStop needs at least one KPI; the model has no Sink")
+        env = model.env
+        start = env.now
+        # increments of numerator and denominator of every KPI per step
+        numerators = [[] for _ in kpis]
+        denominators = [[] for _ in kpis]
+        last = [(kpi.numerator(start), kpi.denominator(start)) for kpi in kpis]
+        self.converged = False
+        self.warmup_time = None
+        self.reset_time = None
+        self.estimates = {}
+
+        steps = 0
+        reset_step = None
+        now = start
+        while now < time:
+            now = min(now + self.check_interval, time)
+            env.run(until=now)
+            steps += 1
+            for i, kpi in enumerate(kpis):
+                current = (kpi.numerator(now), kpi.denominator(now))
+                numerators[i].append(current[0] - last[i][0])
+                denominators[i].append(current[1] - last[i][1])
+                last[i] = current
+            if steps < self.min_steps:
+                continue
+            done = self._evaluate(kpis, numerators, denominators, start, reset_step)
+            if self.reset_warmup and reset_step is None and self.warmup_time is not None and self.warmup_time > start:
+                # the steps up to now are dropped from the estimates, like the statistics
+                reset_statistics(model)
+                self.reset_time = now
+                self.estimates = {}
+                reset_step = steps
+                last = [(kpi.numerator(now), kpi.denominator(now)) for kpi in kpis]
+                continue
+            if done:
+                self.converged = True
+                break
+        self.end_time = now
+        return now
+
+    def _default_kpis(self, model):
+        from factorysimpy.nodes.sink import Sink
+        return [throughput(node) for node in model.iter_nodes() if isinstance(node, Sink)]
+
+    def _evaluate(self, kpis, numerators, denominators, start, reset_step=None):
+        steps = len(numerators[0])
+        if reset_step is not None:
+            # the statistics were reset at the end of this step; the warm-up found before is kept
+            if steps - reset_step < 2 * self.num_batches:
+                return False
+            return self._estimate(kpis, numerators, denominators, steps, reset_step)
+        # the warm-up ends where the slowest KPI settles
+        warmup = 0
+        for num, den in zip(numerators, denominators):
+            num = np.asarray(num)
+            den = np.asarray(den, dtype=np.float64)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                series = np.where(den > 0, num / den, np.nan)
+            d = mser5(series)
+            if d is None:
+                return False
+            warmup = max(warmup, d)
+        if steps - warmup < self.num_batches:
+            return False
+        self.warmup_time = start + warmup * self.check_interval
+        return self._estimate(kpis, numerators, denominators, steps, warmup)
+
+    def _estimate(self, kpis, numerators, denominators, steps, warmup):
+        batch_size = (steps - warmup) // self.num_batches
+        # drop the steps left over after the warm-up, so the batches end with the last step
+        first = steps - batch_size * self.num_batches
+
+        done = True
+        estimates = {}
+        for kpi, num, den in zip(kpis, numerators, denominators):
+            num = np.asarray(num[first:], dtype=np.float64).reshape(self.num_batches, batch_size).sum(axis=1)
+            den = np.asarray(den[first:], dtype=np.float64).reshape(self.num_batches, batch_size).sum(axis=1)
+            if np.any(den <= 0):
+                return False
+            interval = confidence_interval(num / den, self.confidence)
+            interval["estimate"] = float(num.sum() / den.sum())
+            estimates[kpi.name] = interval
+            limit = self.precision * abs(interval["estimate"]) if self.relative else self.precision
+            if not interval["half_width"] <= limit:
+                done = False
+        self.estimates = estimates
+        return done
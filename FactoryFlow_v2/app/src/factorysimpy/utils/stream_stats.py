@@ -0,0 +1,467 @@
+"""
+Bounded-memory recorders for per-item statistics.
+
+Nodes record per-item values such as `stats["processing_delay"]` or `stats["out_edge_selection"]` by calling
+`append()` on a list, which grows with every item. The recorders in this module have the same `append()`
+method but keep only what their retention policy needs:
+
+    - RunningStats: count, mean, variance, min and max (Welford's algorithm).
+    - ReservoirSample: running aggregates and a uniform random sample of fixed size.
+    - Histogram: running aggregates and counts over fixed-width bins.
+    - CategoryCounts: number of occurrences of each value, e.g. edge indices.
+    - StreamingQuantiles: running aggregates and P² estimates of a few quantiles.
+    - SpillToDisk: running aggregates; the raw values are appended to a binary file in chunks.
+
+The retention of a metric is chosen with `Node.set_stats_retention()` or, for all nodes of a model, with
+`set_stats_retention()` of this module. `reset_statistics()` clears the statistics of all nodes and edges of
+a model, e.g. after the warm-up period.
+
+Example:
+    set_stats_retention(TOP, processing_delay="AGGREGATE", out_edge_selection="COUNTS", cycle_time="QUANTILES")
+    TOP.run_simulation(100000)
+    print(TOP.sink.stats["cycle_time"].summary())
+"""
+import math
+import random
+
+import numpy as np
+
+
+class RunningStats:
+    """
+    Running count, mean, variance, minimum and maximum of a stream of values.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Discard all values."""
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def append(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def variance(self):
+        """Sample variance of the values, or 0.0 for fewer than two values."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        """Sample standard deviation of the values."""
+        return math.sqrt(self.variance)
+
+    def summary(self):
+        """
+        Returns:
+            dict: "count", "mean", "std", "min" and "max" of the values. Mean, std, min and max are None when empty.
+        """
+        if self.count == 0:
+            return {"count": 0, "mean": None, "std": None, "min": None, "max": None}
+        return {"count": self.count, "mean": self.mean, "std": self.std, "min": self.min, "max": self.max}
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({', '.join(f'{k}={v}' for k, v in self.summary().items())})"
+
+
+class ReservoirSample(RunningStats):
+    """
+    Running aggregates and a uniform random sample of at most `size` values (Algorithm R).
+
+    Parameters:
+        size (int, optional): Size of the sample. Defaults to 1000.
+        seed (int, optional): Seed of the random generator used to replace values in the sample. Defaults to None.
+
+    Raises:
+        ValueError: If size is not a positive integer.
+    """
+
+    def __init__(self, size=1000, seed=None):
+        if not isinstance(size, int) or size <= 0:
+            raise ValueError("size must be a positive integer")
+        self.size = size
+        self._random = random.Random(seed)
+        super().__init__()
+
+    def reset(self):
+        super().reset()
+        self.sample = []
+
+    def append(self, value):
+        super().append(value)
+        if len(self.sample) < self.size:
+            self.sample.append(value)
+        else:
+            slot = self._random.randrange(self.count)
+            if slot < self.size:
+                self.sample[slot] = value
+
+
+class Histogram(RunningStats):
+    """
+    Running aggregates and counts of the values over `bins` equal-width bins between `low` and `high`.
+    Values outside the range are counted in `underflow` and `overflow`.
+
+    Parameters:
+        low (float): Lower edge of the first bin.
+        high (float): Upper edge of the last bin.
+        bins (int, optional): Number of bins. Defaults to 50.
+
+    Raises:
+        ValueError: If high is not greater than low or bins is not a positive integer.
+    """
+
+    def __init__(self, low, high, bins=50):
+        if not high > low:
+            raise ValueError("high must be greater than low")
+        if not isinstance(bins, int) or bins <= 0:
+            raise ValueError("bins must be a positive integer")
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self._scale = bins / (high - low)
+        super().__init__()
+
+    def reset(self):
+        super().reset()
+        self.counts = [0] * self.bins
+        self.underflow = 0
+        self.overflow = 0
+
+    def append(self, value):
+        super().append(value)
+        if value < self.low:
+            self.underflow += 1
+        elif value >= self.high:
+            self.overflow += 1
+        else:
+            self.counts[int((value - self.low) * self._scale)] += 1
+
+    @property
+    def edges(self):
+        """numpy.ndarray: The bin edges, one more than the number of bins."""
+        return np.linspace(self.low, self.high, len(self.counts) + 1)
+
+
+class CategoryCounts:
+    """
+    Number of occurrences of each distinct value, e.g. of the edge indices chosen by a node.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Discard all values."""
+        self.counts = {}
+        self.count = 0
+
+    def append(self, value):
+        self.count += 1
+        self.counts[value] = self.counts.get(value, 0) + 1
+
+    def __len__(self):
+        return self.count
+
+    def summary(self):
+        """
+        Returns:
+            dict: "count" and "counts" (value to number of occurrences).
+        """
+        return {"count": self.count, "counts": dict(sorted(self.counts.items()))}
+
+    def __repr__(self):
+        return f"CategoryCounts({self.summary()['counts']})"
+
+
+class P2Quantile:
+    """
+    Streaming estimate of the `p` quantile with the P² algorithm (Jain and Chlamtac, 1985). Five markers are
+    kept, so memory and time per value are constant.
+
+    Parameters:
+        p (float): Quantile to estimate, between 0 and 1.
+
+    Raises:
+        ValueError: If p is not between 0 and 1.
+    """
+
+    def __init__(self, p):
+        if not 0 < p < 1:
+            raise ValueError("p must be between 0 and 1")
+        self.p = p
+        self._increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+        self.reset()
+
+    def reset(self):
+        """Discard all values."""
+        p = self.p
+        self.count = 0
+        self._heights = []
+        self._positions = [0, 1, 2, 3, 4]
+        self._desired = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+
+    def append(self, value):
+        self.count += 1
+        q = self._heights
+        if self.count <= 5:
+            q.append(value)
+            if self.count == 5:
+                q.sort()
+            return
+        n = self._positions
+        # find the cell of the value and update the extreme markers
+        if value < q[0]:
+            q[0] = value
+            k = 0
+        elif value >= q[4]:
+            q[4] = value
+            k = 3
+        else:
+            k = 0
+            while value >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        desired = self._desired
+        for i in range(5):
+            desired[i] += self._increments[i]
+        # adjust the middle markers
+        for i in range(1, 4):
+            d = desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = height
+                n[i] += d
+
+    def value(self):
+        """Return the current estimate, or None if no value was added."""
+        if self.count == 0:
+            return None
+        if self.count < 5:
+            values = sorted(self._heights)
+            return values[min(int(self.p * len(values)), len(values) - 1)]
+        return self._heights[2]
+
+
+class StreamingQuantiles(RunningStats):
+    """
+    Running aggregates and streaming estimates of a few quantiles (one `P2Quantile` each).
+
+    Parameters:
+        probabilities (tuple, optional): Quantiles to estimate. Defaults to (0.5, 0.9, 0.95, 0.99).
+    """
+
+    def __init__(self, probabilities=(0.5, 0.9, 0.95, 0.99)):
+        self.estimators = [P2Quantile(p) for p in probabilities]
+        super().__init__()
+
+    def reset(self):
+        super().reset()
+        for estimator in self.estimators:
+            estimator.reset()
+
+    def append(self, value):
+        super().append(value)
+        for estimator in self.estimators:
+            estimator.append(value)
+
+    def quantiles(self):
+        """
+        Returns:
+            dict: Maps each probability to the estimate of its quantile.
+        """
+        return {estimator.p: estimator.value() for estimator in self.estimators}
+
+    def summary(self):
+        summary = super().summary()
+        summary["quantiles"] = self.quantiles()
+        return summary
+
+
+class SpillToDisk(RunningStats):
+    """
+    Running aggregates, with the raw values written to a binary file of float64 values. Values are buffered in
+    memory and appended to the file `chunk_size` at a time.
+
+    Parameters:
+        path (str): File the values are written to. An existing file is overwritten.
+        chunk_size (int, optional): Number of values buffered before a write. Defaults to 65536.
+
+    Raises:
+        ValueError: If chunk_size is not a positive integer.
+    """
+
+    def __init__(self, path, chunk_size=65536):
+        if not isinstance(chunk_size, int) or chunk_size <= 0:
+            raise ValueError("chunk_size must be a positive integer")
+        self.path = path
+        self._buffer = np.empty(chunk_size, dtype=np.float64)
+        super().__init__()
+
+    def reset(self):
+        """Discard all values and truncate the file."""
+        super().reset()
+        self._buffered = 0
+        open(self.path, "wb").close()
+
+    def append(self, value):
+        super().append(value)
+        self._buffer[self._buffered] = value
+        self._buffered += 1
+        if self._buffered == len(self._buffer):
+            self.flush()
+
+    def flush(self):
+        """Write the buffered values to the file."""
+        if self._buffered:
+            with open(self.path, "ab") as f:
+                self._buffer[:self._buffered].tofile(f)
+            self._buffered = 0
+
+    def load(self):
+        """
+        Read back all the values written so far.
+
+        Returns:
+            numpy.ndarray: The values in the order they were added.
+        """
+        self.flush()
+        return np.fromfile(self.path, dtype=np.float64)
+
+
+RETENTION_POLICIES = {
+    "ALL": list,
+    "AGGREGATE": RunningStats,
+    "RESERVOIR": ReservoirSample,
+    "COUNTS": CategoryCounts,
+    "QUANTILES": StreamingQuantiles,
+}
+
+
+def make_metric(retention, node=None):
+    """
+    Create the recorder for a metric.
+
+    Args:
+        retention (str or callable): Either one of "ALL" (keep every value in a list), "AGGREGATE", "RESERVOIR",
+            "COUNTS" or "QUANTILES", or a function `retention(node)` returning a recorder with an `append()` method,
+            e.g. `lambda node: SpillToDisk(f"{node.id}_delay.bin")`.
+        node (Node, optional): Node the metric belongs to, passed to a retention function. Defaults to None.
+
+    Returns:
+        The recorder.
+
+    Raises:
+        ValueError: If retention is not one of the above.
+    """
+    if isinstance(retention, str):
+        if retention not in RETENTION_POLICIES:
+            raise ValueError(f"retention must be one of {list(RETENTION_POLICIES)} or a callable, got '{retention}'")
+        return RETENTION_POLICIES[retention]()
+    if callable(retention):
+        metric = retention(node)
+        if not hasattr(metric, "append"):
+            raise ValueError("retention function must return an object with an append() method")
+        return metric
+    raise ValueError("retention must be a string or a callable")
+
+
+def set_stats_retention(model, **policy):
+    """
+    Set the retention of per-item metrics on all nodes of a model. Nodes that do not record a metric ignore it.
+
+    Args:
+        model (Node): Top-level node of the model.
+        **policy: Maps a metric name (e.g. "processing_delay") to its retention (see `make_metric`).
+    """
+    for node in model.iter_nodes():
+        node.set_stats_retention(**policy)
+
+
+def reset_stats(stats, now):
+    """
+    Clear a `stats` dictionary in place: counters and accumulated times are set to zero, per-item lists and
+    recorders are emptied, and "last_state_change_time" is moved to `now` so that the current state is
+    accounted from `now` on.
+
+    Args:
+        stats (dict): The stats dictionary of a node or edge.
+        now (float): The current simulation time.
+    """
+    for key, value in stats.items():
+        if key == "last_state_change_time":
+            if value is not None:
+                stats[key] = now
+        elif isinstance(value, bool):
+            continue
+        elif isinstance(value, int):
+            stats[key] = 0
+        elif isinstance(value, float):
+            stats[key] = 0.0
+        elif isinstance(value, dict):
+            reset_stats(value, now)
+        elif isinstance(value, list):
+            value.clear()
+        elif hasattr(value, "reset"):
+            value.reset()
+
+
+def reset_statistics(model, at_time=None):
+    """
+    Clear the statistics of all nodes and edges of a model, e.g. at the end of the warm-up period, without
+    rebuilding the model. Items in the model and the state of the components are kept.
+
+    Time-based results such as utilization or throughput must then be computed over the time since the reset.
+
+    Args:
+        model (Node): Top-level node of the model.
+        at_time (float, optional): Simulation time of the reset. Defaults to None, which resets now. A later
+            time schedules the reset, so it can be set before the run.
+
+    Returns:
+        simpy.Process: The process doing a scheduled reset, or None for an immediate reset.
+
+    Raises:
+        ValueError: If at_time is earlier than the current simulation time.
+    """
+    env = model.env
+    if at_time is None or at_time == env.now:
+        _reset_components(model)
+        return None
+    if at_time < env.now:
+        raise ValueError(f"at_time {at_time} is earlier than the current time {env.now}")
+
+    def reset_at():
+        yield env.timeout(at_time - env.now)
+        _reset_components(model)
+
+    return env.process(reset_at())
+
+
+def _reset_components(model):
+    for node in model.iter_nodes():
+        node.reset_statistics()
+    for edge in model.iter_edges():
+        edge.reset_statistics()
@@ -0,0 +1,313 @@
+import pickle
+import struct
+import sys
+from collections import deque
+
+from simpy.resources.store import Store
+
+# Verbosity levels. A component traced at a given level emits every message
+# whose level is less than or equal to it.
+OFF = 0
+INFO = 1
+DEBUG = 2
+
+_LEVEL_NAMES = {OFF: "OFF", INFO: "INFO", DEBUG: "DEBUG"}
+
+
+def format_record(time, component, level, fmt, args):
+    """
+    Format a single trace record into the text line that used to be printed by the components.
+
+    Args:
+        time (float): Simulation time at which the record was emitted.
+        component (str): Identifier of the component that emitted the record.
+        level (int): Verbosity level of the record.
+        fmt (str): %-style format string of the message.
+        args (tuple): Arguments for `fmt`.
+
+    Returns:
+        str: The formatted trace line.
+    """
+    msg = fmt % args if args else fmt
+    return f"T={time:.2f}: {component} {msg}"
+
+
+class PrintSink:
+    """
+    Trace sink that formats every record and writes it to a text stream (stdout by default).
+    This reproduces the console output of the components before tracing was introduced.
+
+    Parameters:
+        stream (file-like, optional): Stream to write to. Defaults to `sys.stdout`.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def write(self, time, component, level, fmt, args):
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.write(format_record(time, component, level, fmt, args) + "\n")
+
+    def close(self):
+        pass
+
+
+class RingBufferSink:
+    """
+    Trace sink that keeps the last `maxlen` records in memory without formatting them.
+    Records are only formatted when they are read back using `lines()` or `dump()`.
+
+    Parameters:
+        maxlen (int, optional): Maximum number of records retained. Older records are dropped. Defaults to 10000.
+    """
+
+    def __init__(self, maxlen=10000):
+        if not isinstance(maxlen, int) or maxlen <= 0:
+            raise ValueError("maxlen must be a positive integer")
+        self.records = deque(maxlen=maxlen)
+
+    def write(self, time, component, level, fmt, args):
+        self.records.append((time, component, level, fmt, args))
+
+    def lines(self):
+        """Return the retained records as formatted text lines (oldest first)."""
+        return [format_record(*record) for record in self.records]
+
+    def dump(self, stream=None):
+        """Write the retained records as formatted text lines to `stream` (stdout by default)."""
+        stream = stream if stream is not None else sys.stdout
+        for line in self.lines():
+            stream.write(line + "\n")
+
+    def clear(self):
+        self.records.clear()
+
+    def close(self):
+        pass
+
+
+class BinaryTraceSink:
+    """
+    Trace sink that appends records to a compact binary file.
+
+    Component identifiers and format strings are interned: each distinct string is written once
+    as a definition record and later records refer to it by index. Message arguments are stored
+    unformatted (objects that are not plain scalars are stored as their `str()`), so the cost of
+    formatting is paid only when the file is read back with `read_binary_trace`.
+
+    Parameters:
+        path (str): Path of the trace file. An existing file is overwritten.
+    """
+
+    _DEFINE = 0
+    _RECORD = 1
+    _HEADER = struct.Struct("<BI")
+    _RECORD_HEAD = struct.Struct("<dBII")
+    _SCALARS = (int, float, str, bool, type(None))
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "wb")
+        self._strings = {}
+
+    def _intern(self, text):
+        idx = self._strings.get(text)
+        if idx is None:
+            idx = len(self._strings)
+            self._strings[text] = idx
+            data = text.encode("utf-8")
+            self._file.write(self._HEADER.pack(self._DEFINE, len(data)))
+            self._file.write(data)
+        return idx
+
+    def write(self, time, component, level, fmt, args):
+        comp_idx = self._intern(component)
+        fmt_idx = self._intern(fmt)
+        payload = pickle.dumps(
+            tuple(a if isinstance(a, self._SCALARS) else str(a) for a in args),
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        self._file.write(self._HEADER.pack(self._RECORD, self._RECORD_HEAD.size + len(payload)))
+        self._file.write(self._RECORD_HEAD.pack(time, level, comp_idx, fmt_idx))
+        self._file.write(payload)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+def read_binary_trace(path):
+    """
+    Read a trace file written by `BinaryTraceSink`.
+
+    Args:
+        path (str): Path of the trace file.
+
+    Returns:
+        generator: Yields records as tuples (time, component, level, fmt, args). Use `format_record(*record)`
+        to obtain the text line.
+    """
+    header = BinaryTraceSink._HEADER
+    record_head = BinaryTraceSink._RECORD_HEAD
+    strings = []
+    with open(path, "rb") as f:
+        while True:
+            raw = f.read(header.size)
+            if not raw:
+                return
+            if len(raw) < header.size:
+                raise ValueError(f"Truncated trace file {path}")
+            kind, size = header.unpack(raw)
+            data = f.read(size)
+            if kind == BinaryTraceSink._DEFINE:
+                strings.append(data.decode("utf-8"))
+            elif kind == BinaryTraceSink._RECORD:
+                time, level, comp_idx, fmt_idx = record_head.unpack_from(data)
+                args = pickle.loads(data[record_head.size:])
+                yield (time, strings[comp_idx], level, strings[fmt_idx], args)
+            else:
+                raise ValueError(f"Unknown record kind {kind} in trace file {path}")
+
+
+class ComponentTrace:
+    """
+    Per-component trace handle installed as the `trace` attribute of nodes, edges and stores.
+
+    Components only hold a handle while they are traced at a level above `OFF`; otherwise
+    their `trace` attribute is None, so the hot path pays a single attribute check::
+
+        if self.trace:
+            self.trace.info("puts item %s into %s", item.id, edge.id)
+
+    Messages are %-style format strings with separate arguments so that formatting happens in the
+    sink, and only for messages whose level is enabled for the component. The arguments themselves are
+    evaluated by the caller, so debug messages whose arguments are costly to build (belt patterns, lists of
+    item ids) also check the level::
+
+        if self.trace and self.trace.level >= DEBUG:
+            self.trace.debug("belt pattern: %s", self.belt._get_belt_pattern()[1])
+    """
+
+    __slots__ = ("env", "component", "level", "sink")
+
+    def __init__(self, env, component, level, sink):
+        self.env = env
+        self.component = component
+        self.level = level
+        self.sink = sink
+
+    def info(self, fmt, *args):
+        if self.level >= INFO:
+            self.sink.write(self.env.now, self.component, INFO, fmt, args)
+
+    def debug(self, fmt, *args):
+        if self.level >= DEBUG:
+            self.sink.write(self.env.now, self.component, DEBUG, fmt, args)
+
+    def __repr__(self):
+        return f"ComponentTrace({self.component}, {_LEVEL_NAMES.get(self.level, self.level)})"
+
+
+class Tracer:
+    """
+    Structured event tracer for a simulation model.
+
+    A tracer holds a sink and a table of per-component verbosity levels. Calling `attach()` on a model
+    installs a `ComponentTrace` handle on every node, edge and edge store whose level is above `OFF`
+    and clears the handle on all others. Tracing is off unless a tracer is attached.
+
+    Parameters:
+        sink (PrintSink, RingBufferSink, BinaryTraceSink or any object with a `write` method, optional):
+            Destination of the trace records. Defaults to a `PrintSink`.
+        level (int, optional): Default verbosity level (`OFF`, `INFO` or `DEBUG`) for components without
+            an explicit level. Defaults to `INFO`.
+
+    Example:
+        tracer = Tracer(RingBufferSink(5000), level=OFF)
+        tracer.set_level("Machine", INFO)      # all machines
+        tracer.set_level("TOP.M[4]", DEBUG)    # one component by hierarchical id
+        tracer.attach(TOP)
+    """
+
+    def __init__(self, sink=None, level=INFO):
+        self._check_level(level)
+        self.sink = sink if sink is not None else PrintSink()
+        self.default_level = level
+        self.levels = {}
+
+    @staticmethod
+    def _check_level(level):
+        if level not in _LEVEL_NAMES:
+            raise ValueError(f"Invalid trace level {level}. Must be one of OFF, INFO or DEBUG.")
+
+    def set_level(self, key, level):
+        """
+        Set the verbosity level for a group of components.
+
+        Args:
+            key (str): A hierarchical id, a component id or a class name (e.g. "Machine", "Buffer").
+                       The most specific match wins: hierarchical id, then id, then class name.
+            level (int): `OFF`, `INFO` or `DEBUG`.
+        """
+        self._check_level(level)
+        self.levels[key] = level
+
+    def level_for(self, component):
+        """Return the verbosity level that applies to `component`."""
+        levels = self.levels
+        for key in (getattr(component, "hierarchical_id", None), getattr(component, "id", None),
+                    component.__class__.__name__):
+            if key and key in levels:
+                return levels[key]
+        return self.default_level
+
+    def handle_for(self, component, label=None, level=None):
+        """
+        Return the trace handle for `component`, or None if it is not traced.
+
+        Args:
+            component (object): Node, edge or store.
+            label (str, optional): Name used in the records. Defaults to the component id.
+            level (int, optional): Level to use instead of looking it up.
+        """
+        level = self.level_for(component) if level is None else level
+        if level <= OFF:
+            return None
+        if label is None:
+            label = getattr(component, "id", None) or component.__class__.__name__
+        return ComponentTrace(component.env, label, level, self.sink)
+
+    def attach(self, model):
+        """
+        Install trace handles on all nodes and edges of `model` (a Node), including the stores inside edges.
+
+        Args:
+            model (Node): Top-level node of the model.
+        """
+        nodes, edges = model.get_all_nodes_edges()
+        for node in nodes.values():
+            node.trace = self.handle_for(node)
+        for edge in edges.values():
+            level = self.level_for(edge)
+            edge.trace = self.handle_for(edge, level=level)
+            for store in _edge_stores(edge):
+                store.trace = self.handle_for(store, label=edge.id, level=level)
+
+    @staticmethod
+    def detach(model):
+        """Remove the trace handles installed on `model`, turning tracing off."""
+        nodes, edges = model.get_all_nodes_edges()
+        for node in nodes.values():
+            node.trace = None
+        for edge in edges.values():
+            edge.trace = None
+            for store in _edge_stores(edge):
+                store.trace = None
+
+    def close(self):
+        """Close the sink."""
+        self.sink.close()
+
+
+def _edge_stores(edge):
+    return [value for value in vars(edge).values() if isinstance(value, Store)]
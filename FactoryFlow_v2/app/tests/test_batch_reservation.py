@@ -0,0 +1,73 @@
+# tests/test_batch_reservation.py
+
+import os
+import sys
+import unittest
+
+import simpy
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from factorysimpy.base.buffer_store import BufferStore
+
+
+class TestBufferStoreBatches(unittest.TestCase):
+    def setUp(self):
+        self.env = simpy.Environment()
+        self.store = BufferStore(self.env, capacity=4)
+        self.log = []
+
+    def producer(self, name, items, start=0):
+        yield self.env.timeout(start)
+        event = self.store.reserve_put_many(len(items))
+        yield event
+        self.log.append((self.env.now, name, "put"))
+        self.store.put_many(event, [(item, 0) for item in items])
+
+    def consumer(self, name, quantity, start=0):
+        yield self.env.timeout(start)
+        event = self.store.reserve_get_many(quantity)
+        yield event
+        self.log.append((self.env.now, name, self.store.get_many(event)))
+
+    def test_batch_waits_for_space_for_all_its_items(self):
+        self.env.process(self.producer("p1", ["a", "b", "c"]))
+        self.env.process(self.producer("p2", ["d", "e", "f"], start=1))
+        self.env.process(self.consumer("c1", 2, start=5))
+        self.env.run()
+        # p2 needs 3 units and only 1 is free until c1 takes two items
+        self.assertEqual(self.log, [(0, "p1", "put"), (5, "c1", ["a", "b"]), (5, "p2", "put")])
+        self.assertEqual(list(self.store.ready_items), ["c", "d", "e", "f"])
+        self.assertEqual(len(self.store.reservations_put), 0)
+
+    def test_batch_get_waits_for_all_its_items(self):
+        self.env.process(self.consumer("c1", 3))
+        self.env.process(self.producer("p1", ["a", "b"], start=1))
+        self.env.process(self.producer("p2", ["c"], start=2))
+        self.env.run()
+        self.assertEqual(self.log, [(1, "p1", "put"), (2, "p2", "put"), (2, "c1", ["a", "b", "c"])])
+
+    def test_cancelled_batch_returns_its_items_in_order(self):
+        def cancelling_consumer():
+            event = self.store.reserve_get_many(2)
+            yield event
+            self.store.reserve_get_cancel(event)
+            event = self.store.reserve_get()
+            yield event
+            self.log.append(self.store.get(event))
+
+        self.env.process(self.producer("p1", ["a", "b", "c"]))
+        self.env.process(cancelling_consumer())
+        self.env.run()
+        self.assertEqual(self.log[-1], "a")
+        self.assertEqual(len(self.store.reservations_get), 0)
+
+    def test_quantity_above_capacity(self):
+        with self.assertRaises(ValueError):
+            self.store.reserve_put_many(5)
+        with self.assertRaises(ValueError):
+            self.store.reserve_get_many(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
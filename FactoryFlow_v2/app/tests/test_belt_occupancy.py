@@ -0,0 +1,54 @@
+# tests/test_belt_occupancy.py
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from factorysimpy.base import belt_occupancy as occ
+
+
+def random_pattern(rng, capacity):
+    return "".join(rng.choice("*_") for _ in range(capacity))
+
+
+def from_pattern(pattern):
+    occupancy = 0
+    for slot, symbol in enumerate(pattern):
+        if symbol == "*":
+            occupancy = occ.occupy(occupancy, slot)
+    return occupancy
+
+
+class TestBeltOccupancy(unittest.TestCase):
+    def test_helpers_match_the_pattern_string(self):
+        rng = random.Random(0)
+        for capacity in (1, 5, 64, 65, 300):
+            for _ in range(50):
+                pattern = random_pattern(rng, capacity)
+                occupancy = from_pattern(pattern)
+                occupied = [slot for slot, symbol in enumerate(pattern) if symbol == "*"]
+                self.assertEqual(occ.to_pattern(occupancy, capacity), pattern)
+                self.assertEqual(occ.occupied_slots(occupancy), occupied)
+                self.assertEqual(occ.count_occupied(occupancy), len(occupied))
+                self.assertEqual(occ.lowest_occupied_slot(occupancy), occupied[0] if occupied else -1)
+                self.assertEqual(occ.is_full(occupancy, capacity), "_" not in pattern)
+                runs = [run for run in pattern.split("_") if run]
+                self.assertEqual(occ.is_contiguous(occupancy), len(runs) <= 1)
+                slot = rng.randrange(capacity)
+                self.assertEqual(occ.is_occupied(occupancy, slot), pattern[slot] == "*")
+                self.assertEqual(occ.count_free_after(occupancy, slot, capacity), pattern[slot + 1:].count("_"))
+                self.assertEqual(occ.highest_free_slot(occupancy, slot), pattern[:slot + 1].rfind("_"))
+
+    def test_contiguous_runs(self):
+        self.assertTrue(occ.is_contiguous(from_pattern("")))
+        self.assertTrue(occ.is_contiguous(from_pattern("__***_")))
+        self.assertFalse(occ.is_contiguous(from_pattern("*_*")))
+        self.assertEqual(occ.highest_free_slot(from_pattern("***"), 2), -1)
+        self.assertEqual(occ.highest_free_slot(0, -1), -1)
+
+
+if __name__ == '__main__':
+    unittest.main()
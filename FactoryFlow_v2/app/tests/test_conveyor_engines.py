@@ -0,0 +1,102 @@
+# tests/test_conveyor_engines.py
+
+import io
+import contextlib
+import os
+import sys
+import unittest
+
+import simpy
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from factorysimpy.nodes.node import Node
+from factorysimpy.nodes.source import Source
+from factorysimpy.nodes.machine import Machine
+from factorysimpy.nodes.sink import Sink
+from factorysimpy.edges.buffer import Buffer
+from factorysimpy.edges.continuous_conveyor import ConveyorBelt
+
+
+class ConveyorLine(Node):
+    """Source -> Buffer -> Machine -> ConveyorBelt -> Machine -> Buffer -> Sink."""
+    def __init__(self, env, id, belt_engine, accumulating, m2_delay, iat=0.5, m1_delay=0.6, length=6, speed=2):
+        super().__init__(env, id)
+        self.src = Source(env, id="src", inter_arrival_time=iat, blocking=True)
+        self.m1 = Machine(env, id="m1", processing_delay=m1_delay)
+        self.m2 = Machine(env, id="m2", processing_delay=m2_delay)
+        self.sink = Sink(env, id="sink")
+        self.add_child_node([self.src, self.m1, self.m2, self.sink])
+        self.b0 = Buffer(env, id="b0", capacity=2)
+        self.b2 = Buffer(env, id="b2", capacity=2)
+        self.add_child_edge([self.b0, self.b2])
+        self.belt = ConveyorBelt(env, id="belt", conveyor_length=length, speed=speed, item_length=1,
+                                 accumulating=accumulating, belt_engine=belt_engine)
+        self.b0.connect(self.src, self.m1)
+        self.belt.connect(self.m1, self.m2)
+        self.b2.connect(self.m2, self.sink)
+
+
+def run_line(belt_engine, accumulating, m2_delay, run_time=150, **kwargs):
+    """Run the line and return it with the (operation, time, item id) log of the belt store."""
+    env = simpy.Environment()
+    TOP = ConveyorLine(env, "TOP", belt_engine, accumulating, m2_delay, **kwargs)
+    TOP.fill_hierarchical_id()
+    store = TOP.belt.belt
+    store_put, store_get = type(store).put, type(store).get
+    log = []
+
+    def put(event, item):
+        log.append(("put", round(env.now, 6), item[0].id))
+        return store_put(store, event, item)
+
+    def get(event):
+        item = store_get(store, event)
+        log.append(("get", round(env.now, 6), item.id))
+        return item
+
+    store.put, store.get = put, get
+    with contextlib.redirect_stdout(io.StringIO()):
+        TOP.run_simulation(run_time)
+    return TOP, log
+
+
+class TestConveyorEngines(unittest.TestCase):
+    def test_non_accumulating_engines_are_equivalent(self):
+        # (m2 delay, inter-arrival time, m1 delay, speed, length); the first one stalls the belt with the
+        # head item exactly at the exit
+        configs = [(2.0, 0.5, 0.6, 2, 6), (1.3, 0.3, 0.2, 1, 3), (0.7, 0.9, 0.6, 2, 6), (2.5, 0.5, 0.2, 1, 6)]
+        for m2, iat, m1, speed, length in configs:
+            with self.subTest(m2=m2, iat=iat, m1=m1, speed=speed, length=length):
+                process, process_log = run_line("PROCESS", 0, m2, iat=iat, m1_delay=m1, speed=speed, length=length)
+                kinematic, kinematic_log = run_line("KINEMATIC", 0, m2, iat=iat, m1_delay=m1, speed=speed,
+                                                    length=length)
+                self.assertGreater(len(process_log), 50)
+                self.assertEqual(process_log, kinematic_log)
+                self.assertEqual(process.sink.stats["num_item_received"], kinematic.sink.stats["num_item_received"])
+                self.assertAlmostEqual(process.belt.belt.time_averaged_num_of_items_in_store,
+                                       kinematic.belt.belt.time_averaged_num_of_items_in_store, places=6)
+
+    def test_accumulating_engines_are_equivalent_on_a_full_belt(self):
+        # the belt stays full and every stall starts with the items closed up, so slots make no difference
+        for m2, iat, m1, speed, length in [(2.0, 0.3, 0.2, 2, 6), (0.7, 0.5, 0.6, 1, 3)]:
+            with self.subTest(m2=m2, iat=iat, m1=m1, speed=speed, length=length):
+                _, process_log = run_line("PROCESS", 1, m2, iat=iat, m1_delay=m1, speed=speed, length=length)
+                _, kinematic_log = run_line("KINEMATIC", 1, m2, iat=iat, m1_delay=m1, speed=speed, length=length)
+                self.assertEqual(process_log, kinematic_log)
+
+    def test_accumulating_engines_agree_on_the_statistics(self):
+        # items stop at slot boundaries in BeltStore and close the gap continuously in KinematicBeltStore
+        for m2, iat, m1, speed, length in [(2.0, 0.5, 0.6, 2, 3), (0.7, 0.5, 0.6, 2, 6), (2.0, 0.5, 0.6, 2, 6)]:
+            with self.subTest(m2=m2, iat=iat, m1=m1, speed=speed, length=length):
+                process, _ = run_line("PROCESS", 1, m2, iat=iat, m1_delay=m1, speed=speed, length=length)
+                kinematic, _ = run_line("KINEMATIC", 1, m2, iat=iat, m1_delay=m1, speed=speed, length=length)
+                self.assertLessEqual(abs(process.sink.stats["num_item_received"]
+                                         - kinematic.sink.stats["num_item_received"]), 1)
+                process_level = process.belt.belt.time_averaged_num_of_items_in_store
+                kinematic_level = kinematic.belt.belt.time_averaged_num_of_items_in_store
+                self.assertLess(abs(process_level - kinematic_level), 0.01 * process_level)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+# tests/test_delay_sampler.py
+
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+import numpy as np
+import simpy
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from factorysimpy.nodes.node import Node
+from factorysimpy.nodes.source import Source
+from factorysimpy.nodes.machine import Machine
+from factorysimpy.nodes.sink import Sink
+from factorysimpy.edges.buffer import Buffer
+from factorysimpy.utils.delay_sampler import (BlockSampler, CallableSampler, ConstantSampler, GeneratorSampler,
+                                              from_numpy, make_sampler)
+
+
+class SampledLine(Node):
+    """Source -> M[0] -> M[1] -> Sink with block-sampled delays."""
+    def __init__(self, env, id, second_delay):
+        super().__init__(env, id)
+        self.src = Source(env, id="src", inter_arrival_time=from_numpy("exponential", 1.0))
+        self.M = [Machine(env, id="M[0]", processing_delay=from_numpy("exponential", 0.5)),
+                  Machine(env, id="M[1]", processing_delay=second_delay)]
+        self.sink = Sink(env, id="sink")
+        self.add_child_node([self.src] + self.M + [self.sink])
+        self.e = [Buffer(env, id=f"e[{i}]", capacity=50) for i in range(3)]
+        self.add_child_edge(self.e)
+        self.e[0].connect(self.src, self.M[0])
+        self.e[1].connect(self.M[0], self.M[1])
+        self.e[2].connect(self.M[1], self.sink)
+
+
+def first_machine_delays(seed, second_delay):
+    TOP = SampledLine(simpy.Environment(), "TOP", second_delay)
+    TOP.fill_hierarchical_id()
+    with contextlib.redirect_stdout(io.StringIO()):
+        TOP.run_simulation(200, seed=seed)
+    return TOP.M[0].stats["processing_delay"]
+
+
+class TestSamplers(unittest.TestCase):
+    def test_make_sampler_resolves_each_kind(self):
+        self.assertIsInstance(make_sampler(2), ConstantSampler)
+        self.assertIsInstance(make_sampler(np.float64(0.5)), ConstantSampler)
+        self.assertIsInstance(make_sampler(iter([1, 2])), GeneratorSampler)
+        self.assertIsInstance(make_sampler(lambda: 1.0), CallableSampler)
+        self.assertIsInstance(make_sampler(from_numpy("exponential", 1.0)), BlockSampler)
+        with self.assertRaises(ValueError):
+            make_sampler("fast")
+        with self.assertRaises(ValueError):
+            make_sampler(-1)
+
+    def test_block_sampler_stream(self):
+        sampler = make_sampler(from_numpy("exponential", 2.0, block_size=100), np.random.default_rng(4))
+        values = [sampler() for _ in range(250)]
+        rng = np.random.default_rng(4)
+        expected = np.concatenate([rng.exponential(2.0, 100) for _ in range(3)])[:250]
+        np.testing.assert_array_equal(values, expected)
+
+    def test_bound_copies_are_independent(self):
+        template = from_numpy("normal", 5.0, 1.0, block_size=8)
+        first = template.bind(np.random.default_rng(1))
+        second = template.bind(np.random.default_rng(1))
+        self.assertEqual([first() for _ in range(20)], [second() for _ in range(20)])
+        self.assertEqual(template._block, [])
+
+    def test_negative_block_is_rejected(self):
+        sampler = make_sampler(BlockSampler(lambda rng, size: rng.normal(0.0, 1.0, size)), np.random.default_rng(0))
+        with self.assertRaises(ValueError):
+            sampler()
+
+
+class TestSeededComponents(unittest.TestCase):
+    def test_runs_are_reproducible(self):
+        delays = first_machine_delays(11, from_numpy("exponential", 0.5))
+        self.assertGreater(len(delays), 100)
+        self.assertEqual(first_machine_delays(11, from_numpy("exponential", 0.5)), delays)
+        self.assertNotEqual(first_machine_delays(12, from_numpy("exponential", 0.5)), delays)
+
+    def test_streams_do_not_depend_on_other_components(self):
+        # changing the delay distribution of M[1] leaves the delays drawn by M[0] unchanged
+        delays = first_machine_delays(11, from_numpy("exponential", 0.5))
+        self.assertEqual(first_machine_delays(11, from_numpy("gamma", 2.0, 0.2)), delays)
+
+
+if __name__ == '__main__':
+    unittest.main()
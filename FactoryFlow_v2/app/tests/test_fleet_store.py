@@ -0,0 +1,59 @@
+# tests/test_fleet_store.py
+
+import os
+import sys
+import unittest
+
+import simpy
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from factorysimpy.base.fleet_store import FleetStore
+
+
+class Item:
+    def __init__(self, id):
+        self.id = id
+
+
+class TestFleetDispatch(unittest.TestCase):
+    def setUp(self):
+        self.env = simpy.Environment()
+        self.store = FleetStore(self.env, capacity=4, delay=3, transit_delay=0.5)
+        self.log = []
+        self.env.process(self.consumer())
+
+    def producer(self, times):
+        for i, t in enumerate(times):
+            yield self.env.timeout(t - self.env.now)
+            event = self.store.reserve_put()
+            yield event
+            self.store.put(event, Item(i))
+
+    def consumer(self):
+        while True:
+            event = self.store.reserve_get()
+            yield event
+            self.log.append((round(self.env.now, 2), self.store.get(event).id))
+
+    def test_activation_instants_follow_the_schedule(self):
+        # the schedule has an instant every 3 time units from 0; an item arriving at an idle fleet
+        # waits for the next instant, then 2 x transit_delay
+        self.env.process(self.producer([7.5, 8.0, 13.0]))
+        self.env.run(until=30)
+        self.assertEqual(self.log, [(10.0, 0), (10.0, 1), (16.0, 2)])
+
+    def test_capacity_activates_and_restarts_the_schedule(self):
+        self.env.process(self.producer([0, 1, 2, 3, 4, 5, 6, 6.1, 6.2, 6.3]))
+        self.env.run(until=30)
+        self.assertEqual(self.log, [(4.0, 0), (4.0, 1), (4.0, 2), (4.0, 3), (5.0, 4),
+                                    (7.2, 5), (7.2, 6), (7.2, 7), (7.2, 8), (8.2, 9)])
+
+    def test_idle_fleet_schedules_no_event(self):
+        # without a time limit the run ends when no event is left
+        self.env.run()
+        self.assertEqual(self.env.now, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+# tests/test_item_history.py
+
+import os
+import sys
+import unittest
+
+import simpy
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from factorysimpy.nodes.node import Node
+from factorysimpy.nodes.source import Source
+from factorysimpy.nodes.machine import Machine
+from factorysimpy.nodes.sink import Sink
+from factorysimpy.edges.buffer import Buffer
+from factorysimpy.utils.item_history import ItemHistoryRecorder
+
+
+class TwoMachineLine(Node):
+    """Source -> M1 -> M2 -> Sink."""
+    def __init__(self, env, id):
+        super().__init__(env, id)
+        self.src = Source(env, id="src", inter_arrival_time=1)
+        self.M1 = Machine(env, id="M1", processing_delay=0.5)
+        self.M2 = Machine(env, id="M2", processing_delay=0.25)
+        self.sink = Sink(env, id="sink")
+        self.add_child_node([self.src, self.M1, self.M2, self.sink])
+        self.e = [Buffer(env, id=f"e[{i}]", capacity=2) for i in range(3)]
+        self.add_child_edge(self.e)
+        self.e[0].connect(self.src, self.M1)
+        self.e[1].connect(self.M1, self.M2)
+        self.e[2].connect(self.M2, self.sink)
+
+
+class TestItemHistoryRecorder(unittest.TestCase):
+    def setUp(self):
+        self.env = simpy.Environment()
+        self.TOP = TwoMachineLine(self.env, "TOP")
+        self.TOP.fill_hierarchical_id()
+        self.history = ItemHistoryRecorder(capacity=4)
+        self.history.attach(self.TOP)
+        self.TOP.run_simulation(50)
+
+    def test_rows_use_the_compiled_node_index(self):
+        self.assertEqual(self.history.node_ids[self.TOP.M1.index], "M1")
+        self.assertEqual(self.history.node_ids[self.TOP.M2.index], "M2")
+        rows = self.history.to_arrays()
+        self.assertEqual(set(rows["node_index"].tolist()), {self.TOP.M1.index, self.TOP.M2.index})
+        # the columns grew past the preallocated capacity
+        self.assertGreater(len(self.history), 4)
+
+    def test_dwell_times_match_the_processing_delays(self):
+        summary = self.history.dwell_time_summary()
+        self.assertEqual(set(summary), {"M1", "M2"})
+        self.assertAlmostEqual(summary["M1"]["mean"], 0.5)
+        self.assertAlmostEqual(summary["M2"]["max"], 0.25)
+        self.assertEqual(len(self.history.dwell_times("M2")), summary["M2"]["visits"])
+        self.assertEqual(len(self.history.dwell_times("sink")), 0)
+        self.assertGreaterEqual(summary["M2"]["visits"], self.TOP.sink.stats["num_item_received"])
+        for total in self.history.time_per_item().values():
+            self.assertLessEqual(total, 0.75 + 1e-9)
+
+    def test_detach_turns_recording_off(self):
+        ItemHistoryRecorder.detach(self.TOP)
+        self.assertTrue(all(node.history is None for node in self.TOP.iter_nodes()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+# tests/test_model_snapshot.py
+
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+import simpy
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from factorysimpy.nodes.node import Node
+from factorysimpy.nodes.source import Source
+from factorysimpy.nodes.machine import Machine
+from factorysimpy.nodes.sink import Sink
+from factorysimpy.edges.buffer import Buffer
+from factorysimpy.utils.delay_sampler import from_numpy
+from factorysimpy.utils.model_snapshot import ModelSnapshot
+from factorysimpy.utils.replication import collect_stats
+
+
+class SnapshotLine(Node):
+    """Source -> M[0] -> M[1] -> Sink with random delays."""
+    def __init__(self, env, id):
+        super().__init__(env, id)
+        self.src = Source(env, id="src", inter_arrival_time=from_numpy("exponential", 1.0))
+        self.M = [Machine(env, id=f"M[{i}]", processing_delay=from_numpy("exponential", 0.8)) for i in range(2)]
+        self.sink = Sink(env, id="sink")
+        self.add_child_node([self.src] + self.M + [self.sink])
+        self.e = [Buffer(env, id=f"e[{i}]", capacity=3, delay=0.5) for i in range(3)]
+        self.add_child_edge(self.e)
+        self.e[0].connect(self.src, self.M[0])
+        self.e[1].connect(self.M[0], self.M[1])
+        self.e[2].connect(self.M[1], self.sink)
+
+
+def run(TOP, seed):
+    with contextlib.redirect_stdout(io.StringIO()):
+        TOP.run_simulation(200, seed=seed)
+    return collect_stats(TOP)
+
+
+class TestModelSnapshot(unittest.TestCase):
+    def setUp(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.TOP = SnapshotLine(simpy.Environment(), "TOP")
+            self.TOP.fill_hierarchical_id()
+        self.data = ModelSnapshot.capture(self.TOP).to_bytes()
+
+    def test_rebuilt_model_gives_the_same_results(self):
+        env = simpy.Environment()
+        with contextlib.redirect_stdout(io.StringIO()):
+            rebuilt = ModelSnapshot.from_bytes(self.data).build(env)
+        self.assertIs(rebuilt.env, env)
+        self.assertIsNot(rebuilt.M[1], self.TOP.M[1])
+        self.assertIs(rebuilt.M[1], rebuilt.child_nodes["M[1]"])
+        self.assertIs(rebuilt.e[1].src_node, rebuilt.M[0])
+        self.assertEqual(rebuilt.M[1].hierarchical_id, self.TOP.M[1].hierarchical_id)
+        expected = run(self.TOP, seed=5)
+        self.assertGreater(expected["TOP.sink.num_item_received"], 100)
+        self.assertEqual(run(rebuilt, seed=5), expected)
+
+    def test_uncompressed_round_trip(self):
+        raw = ModelSnapshot.from_bytes(self.data).to_bytes(compress=False)
+        self.assertEqual(ModelSnapshot.from_bytes(raw).to_bytes(compress=False), raw)
+        self.assertLess(len(self.data), len(raw))
+        with self.assertRaises(ValueError):
+            ModelSnapshot.from_bytes(b"X" + self.data[1:])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+# tests/test_replication.py
+
+import os
+import random
+import sys
+import unittest
+
+import numpy as np
+import simpy
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from factorysimpy.nodes.node import Node
+from factorysimpy.nodes.source import Source
+from factorysimpy.nodes.machine import Machine
+from factorysimpy.nodes.sink import Sink
+from factorysimpy.edges.buffer import Buffer
+from factorysimpy.utils.replication import run_replications, summarize_replications
+
+
+class LineModel(Node):
+    """Source -> Machine -> Sink whose delays are drawn from the global `random` and `numpy.random` states."""
+    def __init__(self, env, id, delay=0.8):
+        super().__init__(env, id)
+        self.src = Source(env, id="src", inter_arrival_time=lambda: random.expovariate(1.0))
+        self.M = Machine(env, id="M", processing_delay=lambda: float(np.random.exponential(delay)))
+        self.sink = Sink(env, id="sink")
+        self.add_child_node([self.src, self.M, self.sink])
+        self.e = [Buffer(env, id=f"e[{i}]", capacity=2) for i in range(2)]
+        self.add_child_edge(self.e)
+        self.e[0].connect(self.src, self.M)
+        self.e[1].connect(self.M, self.sink)
+
+
+def make_line(env, delay=0.8):
+    TOP = LineModel(env, "TOP", delay)
+    TOP.fill_hierarchical_id()
+    return TOP
+
+
+def received(results):
+    return [r["stats"]["TOP.sink.num_item_received"] for r in results]
+
+
+class TestReplications(unittest.TestCase):
+    def test_same_results_with_one_and_several_workers(self):
+        serial = run_replications(make_line, run_time=200, replications=4, base_seed=7, max_workers=1)
+        parallel = run_replications(make_line, run_time=200, replications=4, base_seed=7, max_workers=4)
+        again = run_replications(make_line, run_time=200, replications=4, base_seed=7, max_workers=4)
+        self.assertEqual(received(serial), received(parallel))
+        self.assertEqual(received(parallel), received(again))
+        self.assertEqual([r["stats"] for r in serial], [r["stats"] for r in parallel])
+        # the replications are independent
+        self.assertGreater(len(set(received(serial))), 1)
+
+    def test_common_random_numbers_across_scenarios(self):
+        results = run_replications(make_line, run_time=100, replications=3, base_seed=1, max_workers=1,
+                                   scenarios={"slow": {"delay": 0.9}, "fast": {"delay": 0.5}})
+        self.assertEqual([r["seed"] for r in results if r["scenario"] == "slow"],
+                         [r["seed"] for r in results if r["scenario"] == "fast"])
+        summary = summarize_replications(results)
+        self.assertEqual(summary["slow"]["TOP.sink.num_item_received"]["n"], 3)
+        self.assertLessEqual(summary["slow"]["TOP.sink.num_item_received"]["mean"],
+                             summary["fast"]["TOP.sink.num_item_received"]["mean"])
+
+
+if __name__ == '__main__':
+    unittest.main()
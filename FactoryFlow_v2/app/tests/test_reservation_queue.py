@@ -0,0 +1,76 @@
+# tests/test_reservation_queue.py
+
+import os
+import sys
+import unittest
+
+import simpy
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from factorysimpy.base.reservation_queue import ReservationQueue
+from factorysimpy.base.reservable_priority_req_store import ReservablePriorityReqStore
+
+
+class TestReservationQueue(unittest.TestCase):
+    def setUp(self):
+        self.env = simpy.Environment()
+        self.events = [self.env.event() for _ in range(5)]
+
+    def test_priority_then_arrival_order(self):
+        queue = ReservationQueue()
+        for event, priority in zip(self.events, (2, 0, 1, 0, 2)):
+            queue.push(event, priority)
+        expected = [self.events[i] for i in (1, 3, 2, 0, 4)]
+        self.assertEqual(list(queue), expected)
+        self.assertEqual([queue.pop() for _ in range(5)], expected)
+        with self.assertRaises(IndexError):
+            queue.peek()
+
+    def test_remove_skips_the_event(self):
+        queue = ReservationQueue()
+        for event in self.events:
+            queue.push(event)
+        queue.remove(self.events[0])
+        queue.remove(self.events[2])
+        self.assertNotIn(self.events[0], queue)
+        self.assertEqual(len(queue), 3)
+        self.assertIs(queue.peek(), self.events[1])
+        # the heap is compacted once the removed entries outnumber the pending ones
+        queue.remove(self.events[1])
+        queue.remove(self.events[3])
+        self.assertEqual(len(queue._heap), 1)
+        self.assertIs(queue.pop(), self.events[4])
+
+    def test_invalid_push_and_remove(self):
+        queue = ReservationQueue()
+        queue.push(self.events[0])
+        with self.assertRaises(ValueError):
+            queue.push(self.events[0])
+        with self.assertRaises(ValueError):
+            queue.remove(self.events[1])
+
+
+class TestPriorityReqStoreOrder(unittest.TestCase):
+    def test_get_reservations_are_served_by_priority(self):
+        env = simpy.Environment()
+        store = ReservablePriorityReqStore(env, capacity=10)
+        gets = [store.reserve_get(priority=p) for p in (2, 0, 1, 0)]
+        store.reserve_get_cancel(gets[3])
+        served = []
+
+        def producer():
+            for i in range(3):
+                put_event = store.reserve_put()
+                yield put_event
+                store.put(put_event, f"item{i}")
+                yield env.timeout(1)
+                served.append([i for i, event in enumerate(gets) if event.triggered])
+
+        env.process(producer())
+        env.run()
+        self.assertEqual(served, [[1], [1, 2], [0, 1, 2]])
+
+
+if __name__ == '__main__':
+    unittest.main()
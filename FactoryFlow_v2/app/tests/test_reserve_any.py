@@ -0,0 +1,73 @@
+# tests/test_reserve_any.py
+
+import os
+import sys
+import unittest
+
+import simpy
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from factorysimpy.base.buffer_store import BufferStore
+from factorysimpy.base.reserve_any import ReserveAnyOf
+
+
+class TestReserveAnyOf(unittest.TestCase):
+    def setUp(self):
+        self.env = simpy.Environment()
+        self.stores = [BufferStore(self.env, capacity=1) for _ in range(3)]
+        self.log = []
+
+    def fill(self, store, item, at=0):
+        yield self.env.timeout(at)
+        event = store.reserve_put()
+        yield event
+        store.put(event, (item, 0))
+
+    def test_put_goes_to_the_first_store_with_space(self):
+        def producer():
+            yield from self.fill(self.stores[0], "a")
+            event = ReserveAnyOf(self.env, self.stores, "PUT")
+            index = yield event
+            self.stores[index].put(event.reservation, ("b", 0))
+            self.log.append(index)
+
+        self.env.process(producer())
+        self.env.run()
+        self.assertEqual(self.log, [1])
+        self.assertEqual(list(self.stores[1].ready_items), ["b"])
+        # the request never reached the last store
+        self.assertEqual(len(self.stores[2].reserve_put_queue), 0)
+
+    def test_get_waits_for_the_first_item_and_withdraws_the_other_tokens(self):
+        def consumer():
+            event = ReserveAnyOf(self.env, self.stores, "GET")
+            self.assertTrue(all(len(store.reserve_get_queue) == 1 for store in self.stores))
+            index = yield event
+            self.log.append((self.env.now, index, self.stores[index].get(event.reservation)))
+
+        self.env.process(consumer())
+        self.env.process(self.fill(self.stores[2], "c", at=3))
+        self.env.process(self.fill(self.stores[0], "d", at=5))
+        self.env.run()
+        self.assertEqual(self.log, [(3, 2, "c")])
+        self.assertTrue(all(len(store.reserve_get_queue) == 0 for store in self.stores))
+        self.assertEqual(list(self.stores[0].ready_items), ["d"])
+
+    def test_cancel_a_waiting_request(self):
+        event = ReserveAnyOf(self.env, self.stores, "GET")
+        event.cancel()
+        self.assertTrue(all(len(store.reserve_get_queue) == 0 for store in self.stores))
+        self.env.process(self.fill(self.stores[1], "e"))
+        self.env.run()
+        self.assertFalse(event.triggered)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            ReserveAnyOf(self.env, self.stores, "TAKE")
+        with self.assertRaises(ValueError):
+            ReserveAnyOf(self.env, [], "PUT")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+# tests/test_reset_statistics.py
+
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+import simpy
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from factorysimpy.nodes.node import Node
+from factorysimpy.nodes.source import Source
+from factorysimpy.nodes.machine import Machine
+from factorysimpy.nodes.sink import Sink
+from factorysimpy.edges.buffer import Buffer
+from factorysimpy.utils.stream_stats import reset_statistics
+
+
+class ConstantLine(Node):
+    """Source -> Machine -> Sink with constant delays."""
+    def __init__(self, env, id):
+        super().__init__(env, id)
+        self.src = Source(env, id="src", inter_arrival_time=1)
+        self.M = Machine(env, id="M", processing_delay=0.3)
+        self.sink = Sink(env, id="sink")
+        self.add_child_node([self.src, self.M, self.sink])
+        self.e = [Buffer(env, id=f"e[{i}]", capacity=2) for i in range(2)]
+        self.add_child_edge(self.e)
+        self.e[0].connect(self.src, self.M)
+        self.e[1].connect(self.M, self.sink)
+
+
+class TestResetStatistics(unittest.TestCase):
+    def build(self):
+        env = simpy.Environment()
+        TOP = ConstantLine(env, "TOP")
+        TOP.fill_hierarchical_id()
+        return TOP
+
+    def run_model(self, TOP, time):
+        with contextlib.redirect_stdout(io.StringIO()):
+            TOP.run_simulation(time)
+        return TOP
+
+    def test_scheduled_reset_drops_the_warmup(self):
+        full = self.run_model(self.build(), 300)
+        warmup = self.run_model(self.build(), 100)
+        TOP = self.build()
+        self.assertIsNotNone(reset_statistics(TOP, at_time=100))
+        self.run_model(TOP, 300)
+        received = TOP.sink.stats["num_item_received"]
+        self.assertEqual(received, full.sink.stats["num_item_received"] - warmup.sink.stats["num_item_received"])
+        self.assertEqual(TOP.M.stats["num_item_processed"],
+                         full.M.stats["num_item_processed"] - warmup.M.stats["num_item_processed"])
+        # the state times cover the 200 time units after the reset
+        self.assertAlmostEqual(sum(TOP.sink.stats["total_time_spent_in_states"].values()), 200)
+        self.assertAlmostEqual(TOP.M.stats["total_time_spent_in_states"]["ATLEAST_ONE_PROCESSING_STATE"],
+                               0.3 * TOP.M.stats["num_item_processed"], delta=0.3)
+        self.assertEqual(TOP.M.stats["processing_delay"], [0.3] * len(TOP.M.stats["processing_delay"]))
+        self.assertLess(len(TOP.M.stats["processing_delay"]), len(full.M.stats["processing_delay"]))
+
+    def test_immediate_reset_keeps_the_items(self):
+        TOP = self.build()
+        TOP.env.run(until=50.5)
+        self.assertIsNone(reset_statistics(TOP))
+        self.assertEqual(TOP.sink.stats["num_item_received"], 0)
+        self.assertEqual(TOP.M.stats["processing_delay"], [])
+        with self.assertRaises(ValueError):
+            reset_statistics(TOP, at_time=10)
+        TOP.env.run(until=60.5)
+        self.assertEqual(TOP.sink.stats["num_item_received"], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
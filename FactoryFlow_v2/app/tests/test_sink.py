@@ -0,0 +1,49 @@
+# tests/test_sink.py
+
+import os
+import sys
+import unittest
+
+import simpy
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from factorysimpy.nodes.node import Node
+from factorysimpy.nodes.source import Source
+from factorysimpy.nodes.sink import Sink
+from factorysimpy.edges.continuous_conveyor import ConveyorBelt
+
+
+class ConveyorToSink(Node):
+    """Source -> ConveyorBelt -> Sink."""
+    def __init__(self, env, id, belt_engine="PROCESS"):
+        super().__init__(env, id)
+        self.src = Source(env, id="src", inter_arrival_time=1, blocking=True)
+        self.sink = Sink(env, id="sink")
+        self.add_child_node([self.src, self.sink])
+        self.belt = ConveyorBelt(env, id="belt", conveyor_length=5, speed=1, item_length=1, accumulating=1,
+                                 belt_engine=belt_engine)
+        self.belt.connect(self.src, self.sink)
+
+
+class TestSinkFromConveyor(unittest.TestCase):
+    def run_model(self, belt_engine):
+        env = simpy.Environment()
+        TOP = ConveyorToSink(env, "TOP", belt_engine)
+        TOP.fill_hierarchical_id()
+        TOP.run_simulation(30)
+        return TOP
+
+    def test_items_leave_the_conveyor_into_the_sink(self):
+        for belt_engine in ("PROCESS", "KINEMATIC"):
+            with self.subTest(belt_engine=belt_engine):
+                TOP = self.run_model(belt_engine)
+                self.assertGreater(TOP.sink.stats["num_item_received"], 20)
+                # the get went through the conveyor, which records the exit time of every item
+                for entry, exit, time_on_belt in TOP.sink.item_list.values():
+                    self.assertIsNotNone(exit)
+                    self.assertGreaterEqual(exit, entry)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+# tests/test_stats_summary.py
+
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+import numpy as np
+import simpy
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from factorysimpy.nodes.node import Node
+from factorysimpy.nodes.source import Source
+from factorysimpy.nodes.machine import Machine
+from factorysimpy.nodes.sink import Sink
+from factorysimpy.edges.buffer import Buffer
+from factorysimpy.utils.replication import run_replications
+from factorysimpy.utils.stats_summary import compute_kpis, stats_tables
+
+
+class TwoMachineLine(Node):
+    """Source -> M[0] -> M[1] -> Sink."""
+    def __init__(self, env, id, delay=0.5):
+        super().__init__(env, id)
+        self.src = Source(env, id="src", inter_arrival_time=1)
+        self.M = [Machine(env, id=f"M[{i}]", processing_delay=delay) for i in range(2)]
+        self.sink = Sink(env, id="sink")
+        self.add_child_node([self.src] + self.M + [self.sink])
+        self.e = [Buffer(env, id=f"e[{i}]", capacity=2) for i in range(3)]
+        self.add_child_edge(self.e)
+        self.e[0].connect(self.src, self.M[0])
+        self.e[1].connect(self.M[0], self.M[1])
+        self.e[2].connect(self.M[1], self.sink)
+
+
+def make_line(env, delay=0.5):
+    TOP = TwoMachineLine(env, "TOP", delay)
+    TOP.fill_hierarchical_id()
+    return TOP
+
+
+class TestStatsTables(unittest.TestCase):
+    def test_tables_of_models(self):
+        models = []
+        for delay in (0.5, 0.25):
+            TOP = make_line(simpy.Environment(), delay)
+            with contextlib.redirect_stdout(io.StringIO()):
+                TOP.run_simulation(100)
+            models.append(TOP)
+        tables = stats_tables(models)
+        self.assertIn("Buffer", tables)
+        machines = tables["Machine"]
+        self.assertEqual(len(machines), 4)
+        self.assertEqual(machines.replication.tolist(), [0, 0, 1, 1])
+        kpis = compute_kpis(machines, 100)
+        processed = [M.stats["num_item_processed"] for TOP in models for M in TOP.M]
+        self.assertEqual(kpis["num_processed"].tolist(), processed)
+        expected = [M.stats["total_time_spent_in_states"]["ATLEAST_ONE_PROCESSING_STATE"] / 100
+                    for TOP in models for M in TOP.M]
+        np.testing.assert_allclose(kpis["utilization"], expected)
+        # utilization is close to the processing delay per inter-arrival time
+        utilization = machines.mean_by_component(kpis["utilization"])
+        self.assertAlmostEqual(utilization["TOP.M[0]"], 0.375, delta=0.02)
+
+        sinks = tables["Sink"]
+        np.testing.assert_allclose(compute_kpis(sinks, 100)["throughput"],
+                                   [TOP.sink.stats["num_item_received"] / 100 for TOP in models])
+
+    def test_tables_of_replication_results(self):
+        results = run_replications(make_line, run_time=100, replications=3, base_seed=0, max_workers=1)
+        machines = stats_tables(results)["Machine"]
+        self.assertEqual(sorted(machines.ids), ["TOP.M[0]", "TOP.M[1]"])
+        self.assertEqual(len(machines), 6)
+        self.assertEqual(machines.column("num_item_processed").tolist(),
+                         [r["stats"][f"{m}.num_item_processed"] for r in results for m in ("TOP.M[0]", "TOP.M[1]")])
+        self.assertTrue(np.isnan(machines.column("no_such_stat")).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+# tests/test_steady_state.py
+
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+import numpy as np
+import simpy
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from factorysimpy.nodes.node import Node
+from factorysimpy.nodes.source import Source
+from factorysimpy.nodes.machine import Machine
+from factorysimpy.nodes.sink import Sink
+from factorysimpy.edges.buffer import Buffer
+from factorysimpy.utils.steady_state import SteadyStateStop, mser5
+
+
+class SlowStartLine(Node):
+    """Source -> Machine -> Sink whose machine is slow up to time 200."""
+    def __init__(self, env, id):
+        super().__init__(env, id)
+        rng = np.random.default_rng(3)
+        self.src = Source(env, id="src", inter_arrival_time=lambda: rng.exponential(1.0))
+        self.M = Machine(env, id="M", processing_delay=lambda: 2.0 if env.now < 200 else rng.exponential(0.6))
+        self.sink = Sink(env, id="sink")
+        self.add_child_node([self.src, self.M, self.sink])
+        self.e = [Buffer(env, id=f"e[{i}]", capacity=5) for i in range(2)]
+        self.add_child_edge(self.e)
+        self.e[0].connect(self.src, self.M)
+        self.e[1].connect(self.M, self.sink)
+
+
+class TestMSER5(unittest.TestCase):
+    def test_finds_the_end_of_a_transient(self):
+        rng = np.random.default_rng(0)
+        series = np.concatenate([np.full(50, 5.0), 1.0 + 0.1 * rng.standard_normal(450)])
+        self.assertEqual(mser5(series), 50)
+
+    def test_stationary_series_has_no_warmup(self):
+        rng = np.random.default_rng(1)
+        self.assertEqual(mser5(1.0 + 0.1 * rng.standard_normal(500)), 0)
+
+    def test_short_series(self):
+        self.assertIsNone(mser5([1.0] * 9))
+
+
+class TestSteadyStateStop(unittest.TestCase):
+    def run_model(self, reset_warmup):
+        env = simpy.Environment()
+        TOP = SlowStartLine(env, "TOP")
+        TOP.fill_hierarchical_id()
+        rule = SteadyStateStop(check_interval=10, precision=0.05, reset_warmup=reset_warmup)
+        with contextlib.redirect_stdout(io.StringIO()):
+            TOP.run_simulation(20000, stop_rule=rule)
+        return TOP, rule
+
+    def test_statistics_exclude_the_warmup(self):
+        TOP, rule = self.run_model(reset_warmup=True)
+        self.assertTrue(rule.converged)
+        self.assertGreaterEqual(rule.warmup_time, 200)
+        self.assertGreaterEqual(rule.reset_time, rule.warmup_time)
+        self.assertLess(rule.end_time, 20000)
+        # the sink statistics cover the time since the reset, like the estimate
+        estimate = rule.estimates["sink.throughput"]["estimate"]
+        measured = TOP.sink.stats["num_item_received"] / (rule.end_time - rule.reset_time)
+        self.assertAlmostEqual(measured, estimate, delta=0.05 * estimate)
+
+    def test_statistics_include_the_warmup_without_reset(self):
+        TOP, rule = self.run_model(reset_warmup=False)
+        self.assertTrue(rule.converged)
+        self.assertIsNone(rule.reset_time)
+        self.assertGreaterEqual(rule.warmup_time, 200)
+        # all the items since the start, including the slow ones
+        self.assertEqual(TOP.sink.stats["num_item_received"], TOP.M.stats["num_item_processed"])
+        self.assertLess(TOP.sink.stats["num_item_received"] / rule.end_time,
+                        rule.estimates["sink.throughput"]["estimate"])
+
+
+if __name__ == '__main__':
+    unittest.main()
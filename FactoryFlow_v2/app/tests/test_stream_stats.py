@@ -0,0 +1,116 @@
+# tests/test_stream_stats.py
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import simpy
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from factorysimpy.nodes.node import Node
+from factorysimpy.nodes.source import Source
+from factorysimpy.nodes.machine import Machine
+from factorysimpy.nodes.sink import Sink
+from factorysimpy.edges.buffer import Buffer
+from factorysimpy.utils.delay_sampler import from_numpy
+from factorysimpy.utils.stream_stats import (CategoryCounts, Histogram, ReservoirSample, RunningStats, SpillToDisk,
+                                             StreamingQuantiles, make_metric, set_stats_retention)
+
+
+class RandomLine(Node):
+    """Source -> Machine -> Sink with exponential delays."""
+    def __init__(self, env, id):
+        super().__init__(env, id)
+        self.src = Source(env, id="src", inter_arrival_time=from_numpy("exponential", 1.0))
+        self.M = Machine(env, id="M", processing_delay=from_numpy("exponential", 0.7))
+        self.sink = Sink(env, id="sink")
+        self.add_child_node([self.src, self.M, self.sink])
+        self.e = [Buffer(env, id=f"e[{i}]", capacity=4) for i in range(2)]
+        self.add_child_edge(self.e)
+        self.e[0].connect(self.src, self.M)
+        self.e[1].connect(self.M, self.sink)
+
+
+class TestRecorders(unittest.TestCase):
+    def setUp(self):
+        self.values = np.random.default_rng(0).gamma(2.0, 1.5, 20000)
+
+    def fill(self, recorder):
+        for value in self.values:
+            recorder.append(float(value))
+        return recorder
+
+    def test_running_stats_match_numpy(self):
+        stats = self.fill(RunningStats())
+        self.assertEqual(len(stats), len(self.values))
+        self.assertAlmostEqual(stats.mean, self.values.mean(), places=9)
+        self.assertAlmostEqual(stats.std, self.values.std(ddof=1), places=9)
+        self.assertEqual(stats.min, self.values.min())
+        self.assertEqual(stats.max, self.values.max())
+        stats.reset()
+        self.assertEqual(stats.summary()["mean"], None)
+
+    def test_quantile_estimates(self):
+        quantiles = self.fill(StreamingQuantiles()).quantiles()
+        for p, estimate in quantiles.items():
+            exact = np.quantile(self.values, p)
+            self.assertAlmostEqual(estimate, exact, delta=0.03 * exact)
+
+    def test_reservoir_and_histogram(self):
+        sample = self.fill(ReservoirSample(size=500, seed=1)).sample
+        self.assertEqual(len(sample), 500)
+        self.assertTrue(set(sample) <= set(self.values.tolist()))
+        histogram = self.fill(Histogram(0.0, 10.0, bins=20))
+        expected, _ = np.histogram(self.values, bins=histogram.edges)
+        self.assertEqual(histogram.counts, expected.tolist())
+        self.assertEqual(histogram.overflow, int((self.values >= 10.0).sum()))
+        self.assertEqual(histogram.underflow, 0)
+
+    def test_category_counts(self):
+        counts = CategoryCounts()
+        for value in [1, 0, 1, 1, 2]:
+            counts.append(value)
+        self.assertEqual(counts.summary(), {"count": 5, "counts": {0: 1, 1: 3, 2: 1}})
+
+    def test_spill_to_disk_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            recorder = self.fill(SpillToDisk(os.path.join(directory, "values.bin"), chunk_size=4096))
+            np.testing.assert_array_equal(recorder.load(), self.values)
+
+    def test_invalid_retention(self):
+        with self.assertRaises(ValueError):
+            make_metric("SOME")
+        with self.assertRaises(ValueError):
+            make_metric(lambda node: 1.0)
+
+
+class TestStatsRetention(unittest.TestCase):
+    def run_model(self, **policy):
+        env = simpy.Environment()
+        TOP = RandomLine(env, "TOP")
+        TOP.fill_hierarchical_id()
+        set_stats_retention(TOP, **policy)
+        with contextlib.redirect_stdout(io.StringIO()):
+            TOP.run_simulation(500, seed=3)
+        return TOP
+
+    def test_aggregates_match_the_full_lists(self):
+        full = self.run_model()
+        aggregated = self.run_model(processing_delay="AGGREGATE", out_edge_selection="COUNTS")
+        delays = full.M.stats["processing_delay"]
+        recorder = aggregated.M.stats["processing_delay"]
+        self.assertIsInstance(recorder, RunningStats)
+        self.assertEqual(recorder.count, len(delays))
+        self.assertAlmostEqual(recorder.mean, float(np.mean(delays)), places=9)
+        self.assertEqual(aggregated.M.stats["out_edge_selection"].summary()["counts"],
+                         {0: len(full.M.stats["out_edge_selection"])})
+        self.assertEqual(aggregated.sink.stats["num_item_received"], full.sink.stats["num_item_received"])
+
+
+if __name__ == '__main__':
+    unittest.main()
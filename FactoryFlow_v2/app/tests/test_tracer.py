@@ -0,0 +1,97 @@
+# tests/test_tracer.py
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+import simpy
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from factorysimpy.nodes.node import Node
+from factorysimpy.nodes.source import Source
+from factorysimpy.nodes.machine import Machine
+from factorysimpy.nodes.sink import Sink
+from factorysimpy.edges.buffer import Buffer
+from factorysimpy.utils.tracer import (DEBUG, INFO, OFF, BinaryTraceSink, RingBufferSink, Tracer, format_record,
+                                       read_binary_trace)
+
+
+class TracedLine(Node):
+    """Source -> M[0] -> M[1] -> Sink."""
+    def __init__(self, env, id):
+        super().__init__(env, id)
+        self.src = Source(env, id="src", inter_arrival_time=1)
+        self.M = [Machine(env, id=f"M[{i}]", processing_delay=0.5) for i in range(2)]
+        self.sink = Sink(env, id="sink")
+        self.add_child_node([self.src] + self.M + [self.sink])
+        self.e = [Buffer(env, id=f"e[{i}]", capacity=2) for i in range(3)]
+        self.add_child_edge(self.e)
+        self.e[0].connect(self.src, self.M[0])
+        self.e[1].connect(self.M[0], self.M[1])
+        self.e[2].connect(self.M[1], self.sink)
+
+
+def build():
+    with contextlib.redirect_stdout(io.StringIO()):
+        TOP = TracedLine(simpy.Environment(), "TOP")
+        TOP.fill_hierarchical_id()
+    return TOP
+
+
+class TestTracer(unittest.TestCase):
+    def test_levels_select_the_components(self):
+        TOP = build()
+        sink = RingBufferSink()
+        tracer = Tracer(sink, level=OFF)
+        tracer.set_level("Machine", INFO)
+        tracer.set_level("TOP.M[1]", DEBUG)
+        tracer.attach(TOP)
+        self.assertIsNone(TOP.src.trace)
+        self.assertIsNone(TOP.e[0].trace)
+        self.assertEqual(TOP.M[0].trace.level, INFO)
+        self.assertEqual(TOP.M[1].trace.level, DEBUG)
+
+        TOP.env.run(until=20)
+        components = {record[1] for record in sink.records}
+        self.assertEqual(components, {"M[0]", "M[1]"})
+        self.assertNotIn((DEBUG, "M[0]"), {(record[2], record[1]) for record in sink.records})
+        self.assertTrue(all(line.startswith("T=") for line in sink.lines()))
+
+        Tracer.detach(TOP)
+        count = len(sink.records)
+        TOP.env.run(until=40)
+        self.assertEqual(len(sink.records), count)
+
+    def test_binary_trace_round_trip(self):
+        TOP = build()
+        ring = RingBufferSink()
+        Tracer(ring, level=DEBUG).attach(TOP)
+        TOP.env.run(until=10)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.bin")
+            binary = BinaryTraceSink(path)
+            for record in ring.records:
+                binary.write(*record)
+            binary.close()
+            lines = [format_record(*record) for record in read_binary_trace(path)]
+        self.assertGreater(len(lines), 10)
+        self.assertEqual(lines, ring.lines())
+
+    def test_untraced_model_prints_nothing(self):
+        TOP = build()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            TOP.env.run(until=20)
+        self.assertEqual(output.getvalue(), "")
+
+    def test_invalid_level(self):
+        with self.assertRaises(ValueError):
+            Tracer(level=5)
+
+
+if __name__ == '__main__':
+    unittest.main()